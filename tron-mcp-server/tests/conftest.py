@@ -30,6 +30,10 @@ sys.modules["mcp"] = mock.MagicMock()
 sys.modules["mcp.server"] = mock.MagicMock()
 sys.modules["mcp.server.fastmcp"] = mock.MagicMock()
 
+# 能量估算固定使用常量，避免测试中访问 TronGrid / TRONSCAN
+# （实时估算的行为由 tests/unit/test_energy_estimator.py 单独覆盖）
+os.environ.setdefault("TRON_ENERGY_ESTIMATOR", "static")
+
 
 # ============ 通用 fixtures ============
 
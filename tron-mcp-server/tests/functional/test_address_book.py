@@ -11,6 +11,10 @@
 6. resolve_address 函数（合法地址直接返回 vs 别名查找）
 7. 空地址簿场景
 8. 地址验证（通过 call_router 调用时验证地址格式）
+9. 内存索引: 外部修改失效、原子写入、地址反查索引、追加日志与压缩
+10. 模糊搜索 n-gram 索引: 与全量扫描结果一致、增量维护
+11. SQLite 后端: 增删查、导入 JSON 地址簿、跨连接修改后模糊索引失效
+12. 地址反查: reverse_lookup 路由、交易历史对手方批量打标签
 """
 
 import unittest
@@ -332,5 +336,284 @@ class TestAddressBookViaCallRouter(unittest.TestCase):
         self.assertIn("已删除联系人", result["summary"])
 
 
+class TestAddressBookStore(unittest.TestCase):
+    """测试常驻内存的地址簿存储"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_file = Path(self.temp_dir.name) / "book.json"
+        self.env_patcher = patch.dict(os.environ, {"TRON_ADDRESSBOOK_PATH": str(self.temp_file)})
+        self.env_patcher.start()
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def _write_external(self, data: dict) -> None:
+        """模拟其他进程重写文件"""
+        tmp = self.temp_file.with_name("external.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.temp_file)
+
+    def test_loaded_once_until_file_changes(self):
+        """文件未变化时不应重复解析，外部修改后应重新加载"""
+        address_book.add_contact("小明", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+        with patch("tron_mcp_server.address_book.json.load", wraps=json.load) as mock_load:
+            for _ in range(5):
+                self.assertTrue(address_book.lookup("小明")["found"])
+            self.assertEqual(mock_load.call_count, 0)
+
+            self._write_external({"老板": {"address": "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn", "note": ""}})
+            self.assertFalse(address_book.lookup("小明")["found"])
+            self.assertTrue(address_book.lookup("老板")["found"])
+            self.assertEqual(mock_load.call_count, 1)
+
+    def test_atomic_write_keeps_original_on_failure(self):
+        """写入失败时原文件应保持完整，且不残留临时文件"""
+        address_book.add_contact("小明", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+        with patch("tron_mcp_server.address_book.json.dump", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                address_book.add_contact("老板", "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn")
+        with open(self.temp_file, "r", encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)), ["小明"])
+        self.assertEqual(os.listdir(self.temp_dir.name), ["book.json"])
+
+    def test_address_index(self):
+        """地址反查索引应随新增、更新、删除保持一致"""
+        addr_a = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+        addr_b = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+        address_book.add_contact("小明", addr_a)
+        address_book.add_contact("明哥", addr_a)
+        self.assertEqual(sorted(address_book.aliases_for_address(addr_a)), ["小明", "明哥"])
+
+        address_book.add_contact("明哥", addr_b)
+        self.assertEqual(address_book.aliases_for_address(addr_a), ["小明"])
+        self.assertEqual(address_book.aliases_for_address(addr_b), ["明哥"])
+
+        address_book.remove_contact("小明")
+        self.assertEqual(address_book.aliases_for_address(addr_a), [])
+
+    def test_journal_mode_and_compaction(self):
+        """日志模式下写入只追加日志，重新加载时重放，达到阈值后压缩"""
+        journal = self.temp_file.with_name("book.json.journal")
+        with patch.dict(os.environ, {"TRON_ADDRESSBOOK_JOURNAL": "1"}), \
+                patch.object(address_book, "JOURNAL_COMPACT_THRESHOLD", 3):
+            address_book.add_contact("小明", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+            address_book.add_contact("老板", "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn")
+            self.assertTrue(journal.exists())
+            self.assertFalse(self.temp_file.exists())
+
+            # 新的存储实例（模拟其他进程）应通过重放日志看到全部联系人；末尾半行被忽略
+            size = journal.stat().st_size
+            with open(journal, "a", encoding="utf-8") as f:
+                f.write('{"op": "put", "alias": "半')
+            self.assertEqual(len(address_book._AddressBookStore(self.temp_file)), 2)
+            os.truncate(journal, size)
+
+            address_book.remove_contact("小明")
+            self.assertFalse(journal.exists())
+            with open(self.temp_file, "r", encoding="utf-8") as f:
+                self.assertEqual(list(json.load(f)), ["老板"])
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """测试模糊搜索 n-gram 索引"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_file = Path(self.temp_dir.name) / "book.json"
+        self.env_patcher = patch.dict(os.environ, {"TRON_ADDRESSBOOK_PATH": str(self.temp_file)})
+        self.env_patcher.start()
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_ngram_candidates(self):
+        """n-gram 索引应召回拼写相近的别名，删除后不再召回"""
+        index = address_book._NgramIndex(["小明", "小明明", "老板", "alice_wallet"])
+        self.assertIn("小明", index.candidates("小名", 5))
+        self.assertIn("alice_wallet", index.candidates("alise_wallet", 5))
+        index.remove("alice_wallet")
+        self.assertNotIn("alice_wallet", index.candidates("alise_wallet", 5))
+
+    def test_matches_linear_scan(self):
+        """小规模地址簿上，索引搜索结果应与全量 SequenceMatcher 扫描一致"""
+        from difflib import SequenceMatcher
+        import random
+        rng = random.Random(7)
+        letters = "abcdefghij"
+        aliases = sorted({"".join(rng.choice(letters) for _ in range(rng.randint(3, 7))) for _ in range(150)})
+        data = {a: {"address": "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7", "note": ""} for a in aliases}
+        with open(self.temp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        for query in ["abcde", "jihgf", "aacc", "bbbbbb", "fedcba"]:
+            expected = sorted(
+                (SequenceMatcher(None, query, a).ratio() for a in aliases), reverse=True,
+            )
+            expected = [r for r in expected if r > address_book.SIMILARITY_THRESHOLD][:1]
+            result = address_book.lookup(query)
+            got = [m["similarity"] for m in result["similar_matches"]][:1]
+            self.assertEqual(got, expected, query)
+
+    def test_index_updated_incrementally(self):
+        """索引构建后，新增 / 删除联系人应立即反映在模糊搜索中"""
+        address_book.add_contact("小明", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+        self.assertEqual(address_book.lookup("小明明明")["similar_matches"][0]["alias"], "小明")
+
+        address_book.add_contact("张小明明", "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn")
+        self.assertEqual(address_book.lookup("小明明明")["similar_matches"][0]["alias"], "张小明明")
+
+        address_book.remove_contact("张小明明")
+        aliases = [m["alias"] for m in address_book.lookup("小明明明")["similar_matches"]]
+        self.assertEqual(aliases, ["小明"])
+
+    def test_resolve_address_did_you_mean(self):
+        """resolve_address 未命中时仍应提示最相似的别名"""
+        address_book.add_contact("binance_hot", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+        with self.assertRaises(ValueError) as ctx:
+            address_book.resolve_address("binanse_hot")
+        self.assertIn("您是否想找「binance_hot」", str(ctx.exception))
+
+
+class TestSqliteBackend(unittest.TestCase):
+    """测试 SQLite 存储后端"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.json_path = Path(self.temp_dir.name) / "book.json"
+        self.db_path = Path(self.temp_dir.name) / "book.db"
+        self.env_patcher = patch.dict(os.environ, {
+            "TRON_ADDRESSBOOK_PATH": str(self.json_path),
+            "TRON_ADDRESSBOOK_DB_PATH": str(self.db_path),
+            "TRON_ADDRESSBOOK_BACKEND": "sqlite",
+        })
+        self.env_patcher.start()
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        for store in list(address_book._stores.values()):
+            if isinstance(store, address_book._SqliteAddressBookStore):
+                store.close()
+        address_book._stores.clear()
+        self.temp_dir.cleanup()
+
+    def test_crud(self):
+        """SQLite 后端的增删查行为应与 JSON 后端一致"""
+        result = address_book.add_contact("小明", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7", "同学")
+        self.assertFalse(result["is_update"])
+        self.assertTrue(address_book.add_contact("小明", "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn")["is_update"])
+        self.assertEqual(address_book.lookup("小明")["address"], "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn")
+        self.assertEqual(address_book.list_contacts()["total"], 1)
+        self.assertEqual(address_book.lookup("小明明")["similar_matches"][0]["alias"], "小明")
+        self.assertTrue(address_book.remove_contact("小明")["found"])
+        self.assertFalse(address_book.remove_contact("小明")["found"])
+        self.assertFalse(self.json_path.exists())
+
+    def test_imports_existing_json(self):
+        """首次创建数据库时应导入已有 JSON 地址簿"""
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump({"老板": {"address": "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7", "note": "公司"}}, f)
+        self.assertEqual(address_book.lookup("老板")["note"], "公司")
+        self.assertEqual(address_book.aliases_for_address("TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"), ["老板"])
+
+    def test_other_connection_invalidates_fuzzy_index(self):
+        """其他连接写入后，模糊索引应重建"""
+        address_book.add_contact("alice_wallet", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+        self.assertEqual(address_book.lookup("alise_wallet")["similar_matches"][0]["alias"], "alice_wallet")
+
+        other = address_book._SqliteAddressBookStore(self.db_path)
+        other.put("bob_wallet", {"address": "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn", "note": ""})
+        other.close()
+        self.assertEqual(address_book.lookup("bop_wallet")["similar_matches"][0]["alias"], "bob_wallet")
+
+    def test_labels_single_query(self):
+        """批量反查应只执行一次 IN 查询"""
+        address_book.add_contact("小明", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+        address_book.add_contact("明哥", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7")
+        address_book.add_contact("老板", "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn")
+        store = address_book._get_store()
+        statements = []
+        store._connection().set_trace_callback(statements.append)
+        labels = address_book.labels_for_addresses([
+            "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7", "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf",
+            "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7", "",
+        ])
+        store._connection().set_trace_callback(None)
+        self.assertEqual(labels, {"TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7": ["小明", "明哥"]})
+        self.assertEqual(len(statements), 1)
+
+    def test_invalid_backend(self):
+        """无效的后端配置应返回 addressbook_error"""
+        from tron_mcp_server import call_router
+        with patch.dict(os.environ, {"TRON_ADDRESSBOOK_BACKEND": "redis"}):
+            result = call_router.call("addressbook_list", {})
+        self.assertIn("addressbook_error", result["error"])
+
+
+class TestReverseLookup(unittest.TestCase):
+    """测试地址反查与交易历史对手方标签"""
+
+    OWNER = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+    FRIEND = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+    STRANGER = "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_file = Path(self.temp_dir.name) / "book.json"
+        self.env_patcher = patch.dict(os.environ, {"TRON_ADDRESSBOOK_PATH": str(self.temp_file)})
+        self.env_patcher.start()
+        from tron_mcp_server import call_router
+        self.call_router = call_router
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_reverse_lookup_route(self):
+        """addressbook_reverse_lookup 应返回该地址的全部别名"""
+        address_book.add_contact("小明", self.FRIEND, "同学")
+        address_book.add_contact("明哥", self.FRIEND)
+        result = self.call_router.call("addressbook_reverse_lookup", {"address": self.FRIEND})
+        self.assertTrue(result["found"])
+        self.assertEqual(result["aliases"], ["小明", "明哥"])
+        self.assertIn("小明", result["summary"])
+
+        missing = self.call_router.call("addressbook_reverse_lookup", {"address": self.STRANGER})
+        self.assertFalse(missing["found"])
+        self.assertIn("error", self.call_router.call("addressbook_reverse_lookup", {}))
+        self.assertIn("error", self.call_router.call("addressbook_reverse_lookup", {"address": "bad"}))
+
+    @patch("tron_mcp_server.tron_client.get_transfer_history")
+    def test_history_rows_labeled(self, mock_history):
+        """交易历史应通过一次批量反查为对手方打标签"""
+        address_book.add_contact("小明", self.FRIEND)
+        mock_history.return_value = {"total": 2, "data": [
+            {"transactionHash": "a", "transferFromAddress": self.OWNER, "transferToAddress": self.FRIEND,
+             "amount": 1000000, "tokenName": "_", "timestamp": 2},
+            {"transactionHash": "b", "transferFromAddress": self.STRANGER, "transferToAddress": self.OWNER,
+             "amount": 1000000, "tokenName": "_", "timestamp": 1},
+        ]}
+        with patch.object(address_book, "labels_for_addresses",
+                          wraps=address_book.labels_for_addresses) as mock_labels:
+            result = self.call_router.call("get_transaction_history", {"address": self.OWNER, "token": "TRX"})
+        self.assertEqual(mock_labels.call_count, 1)
+        self.assertEqual(result["transfers"][0]["to_alias"], "小明")
+        self.assertIsNone(result["transfers"][0]["from_alias"])
+        self.assertIsNone(result["transfers"][1]["from_alias"])
+        self.assertIn("1 笔的对手方在地址簿中", result["summary"])
+
+    @patch("tron_mcp_server.tron_client.get_transfer_history")
+    def test_history_survives_addressbook_failure(self, mock_history):
+        """地址簿不可用时交易历史仍应正常返回"""
+        mock_history.return_value = {"total": 0, "data": []}
+        with patch.object(address_book, "labels_for_addresses", side_effect=ValueError("boom")):
+            result = self.call_router.call("get_transaction_history", {"address": self.OWNER, "token": "TRX"})
+        self.assertNotIn("error", result)
+        self.assertEqual(result["transfers"], [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,167 @@
+"""
+离线模拟服务与端到端基准测试
+============================
+
+覆盖 tests/stress/mock_tron_server.py 与 benchmark_actions.py:
+- 延迟 / 错误分布的解析与采样
+- 路由响应形状（ASGI 调用与标准库前端）
+- 错误注入
+- 所有 call_router 动作经模拟服务跑通基准且无错误
+"""
+
+import unittest
+import sys
+import os
+import json
+import random
+import asyncio
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+stress_dir = os.path.join(project_root, "tests", "stress")
+if stress_dir not in sys.path:
+    sys.path.insert(0, stress_dir)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+import httpx
+
+from mock_tron_server import ErrorModel, LatencyModel, MockTronServer, serve
+import benchmark_actions
+
+from tron_mcp_server import call_router, tron_client, trongrid_client
+
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+
+class TestModels(unittest.TestCase):
+
+    def test_latency_parse_and_sample(self):
+        rng = random.Random(1)
+        self.assertEqual(LatencyModel.parse("none").sample(rng), 0.0)
+        self.assertAlmostEqual(LatencyModel.parse("fixed:25").sample(rng), 0.025)
+        for _ in range(50):
+            self.assertTrue(0.01 <= LatencyModel.parse("uniform:10,20").sample(rng) <= 0.02)
+        samples = sorted(LatencyModel.parse("lognormal:40,0.5").sample(rng) for _ in range(501))
+        self.assertAlmostEqual(samples[250], 0.040, delta=0.008)
+        self.assertGreater(LatencyModel.parse("exp:5").sample(rng), 0)
+        for bad in ("fixed", "uniform:1", "gamma:1,2", "fixed:x"):
+            with self.assertRaises(ValueError):
+                LatencyModel.parse(bad)
+
+    def test_error_parse_and_sample(self):
+        rng = random.Random(7)
+        model = ErrorModel.parse("500:0.1,429:0.2")
+        self.assertEqual(model.rates, {500: 0.1, 429: 0.2})
+        results = [model.sample(rng) for _ in range(2000)]
+        self.assertAlmostEqual(results.count(500) / 2000, 0.1, delta=0.03)
+        self.assertAlmostEqual(results.count(429) / 2000, 0.2, delta=0.03)
+        self.assertIsNone(ErrorModel.parse("").sample(rng))
+        with self.assertRaises(ValueError):
+            ErrorModel.parse("500:0.7,502:0.6")
+
+
+class TestRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.app = MockTronServer(seed=1)
+
+    def test_fixture_backed_responses(self):
+        status, account, _ = self.app.handle("GET", "/api/account", {"address": ADDRESS}, b"")
+        self.assertEqual(status, 200)
+        self.assertEqual(account["address"], ADDRESS)
+        self.assertEqual(account["balance"], 1234567890)
+        self.assertEqual(account["trc20token_balances"][0]["balance"], "500000000")
+
+        _, info, _ = self.app.handle("GET", "/api/transaction-info", {"hash": "ab" * 32}, b"")
+        self.assertEqual(info["contractRet"], "SUCCESS")
+        self.assertEqual(info["hash"], "ab" * 32)
+
+        status, _, _ = self.app.handle("GET", "/api/unknown", {}, b"")
+        self.assertEqual(status, 404)
+        self.assertEqual(self.app.requests["/api/account"], 1)
+
+    def test_asgi_call(self):
+        async def request():
+            body = json.dumps({"owner_address": ADDRESS, "to_address": ADDRESS, "amount": 1}).encode()
+            messages = [{"type": "http.request", "body": body, "more_body": False}]
+            sent = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {"type": "http", "method": "POST", "path": "/wallet/createtransaction", "query_string": b""}
+            await self.app(scope, receive, send)
+            return sent
+
+        sent = asyncio.run(request())
+        self.assertEqual(sent[0]["status"], 200)
+        tx = json.loads(sent[1]["body"])
+        self.assertEqual(len(tx["txID"]), 64)
+        self.assertEqual(tx["raw_data"]["contract"][0]["parameter"]["value"]["amount"], 1)
+
+    def test_per_service_errors(self):
+        app = MockTronServer(errors={"trongrid": ErrorModel({503: 1.0})})
+        self.assertEqual(app.handle("POST", "/wallet/getaccountresource", {}, b"{}")[0], 503)
+        self.assertEqual(app.handle("GET", "/api/chainparameters", {}, b"")[0], 200)
+
+
+class TestHttpClients(unittest.TestCase):
+    """真实客户端经标准库前端访问模拟服务"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = MockTronServer(seed=3)
+        cls.running = serve(cls.app, backend="stdlib")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.running.stop()
+
+    def test_clients_hit_mock(self):
+        with patch.dict(os.environ, self.running.env()):
+            self.assertEqual(tron_client.get_balance_trx(ADDRESS), 1234.56789)
+            self.assertEqual(tron_client.get_usdt_balance(ADDRESS), 500.0)
+            resource = trongrid_client.get_account_resource(ADDRESS)
+            self.assertIn("freeNetLimit", str(resource))
+        self.assertGreaterEqual(self.app.requests["/wallet/getaccountresource"], 1)
+
+    def test_injected_error_surfaces(self):
+        app = MockTronServer(errors=ErrorModel({500: 1.0}))
+        with serve(app, backend="stdlib") as running, patch.dict(os.environ, running.env()):
+            with self.assertRaises(httpx.HTTPStatusError):
+                trongrid_client.get_account_resource(ADDRESS)
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_every_action_has_scenario(self):
+        self.assertEqual(set(benchmark_actions.build_scenarios("/tmp")), set(call_router._ACTION_HANDLERS))
+
+    def test_all_actions_without_errors(self):
+        results = benchmark_actions.run_benchmark(requests=2, concurrency=2, seed=5, backend="stdlib")
+        self.assertEqual(set(results), set(call_router._ACTION_HANDLERS))
+        for action, result in results.items():
+            self.assertEqual(result["errors"], {}, action)
+            self.assertEqual(result["requests"], 2)
+            self.assertGreater(result["throughput"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+    def test_unknown_action_rejected(self):
+        with self.assertRaises(ValueError):
+            benchmark_actions.run_benchmark(requests=1, actions=["no_such_action"], backend="stdlib")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+"""
+TronZap 客户端功能测试（本地 stub 服务）
+========================================
+
+在 127.0.0.1 上启动一个模拟 TronZap API 的 HTTP/1.1 stub 服务，离线验证:
+- 请求签名（Authorization Bearer + X-Signature）
+- 多次调用复用同一个长连接
+- 价格表 / 能量报价按 TTL 缓存
+- lease_energy / lease_bandwidth / get_lease_quote 路由完整流程
+- 错误响应与缺少凭证
+- 资源规划在未配置租赁单价时使用 TronZap 报价
+"""
+
+import unittest
+import sys
+import os
+import json
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import tronzap_client, call_router, fee_planner
+
+TOKEN = "test-token"
+SECRET = "test-secret"
+OWNER = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+ALICE = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+# stub 报价: 90 SUN / Energy
+STUB_PRICE_SUN = 90
+SERVICES = [
+    {"service": "energy", "duration": 1, "price_sun": STUB_PRICE_SUN},
+    {"service": "bandwidth", "price_sun": 300},
+]
+
+
+class _StubState:
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self.lock = threading.Lock()
+
+
+class _TronZapStubHandler(BaseHTTPRequestHandler):
+    """模拟 TronZap API: 校验签名后返回固定数据"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.state.lock:
+            self.server.state.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        expected = hashlib.sha256((raw + SECRET).encode("utf-8")).hexdigest()
+        if self.headers.get("Authorization") != f"Bearer {TOKEN}" or self.headers.get("X-Signature") != expected:
+            self._reply(401, {"code": 2, "error": "Invalid signature"})
+            return
+        data = json.loads(raw or "{}")
+        endpoint = self.path[len("/v1/"):]
+        with self.server.state.lock:
+            self.server.state.requests.append((endpoint, data))
+
+        if endpoint == "services":
+            self._reply(200, {"code": 0, "result": SERVICES})
+        elif endpoint == "calculate":
+            cost = data["energy"] * STUB_PRICE_SUN / 1_000_000
+            self._reply(200, {"code": 0, "result": {
+                "address": data["address"], "energy": data["energy"],
+                "duration": data["duration"], "cost": {"trx": cost},
+            }})
+        elif endpoint == "transaction/new":
+            if data["service"] == "energy" and data["params"]["energy_amount"] > 1_000_000:
+                self._reply(200, {"code": 10, "error": "Not enough balance"})
+                return
+            self._reply(200, {"code": 0, "result": {
+                "id": f"tz-{len(self.server.state.requests)}", "status": "pending", "cost": {"trx": 1.5},
+            }})
+        else:
+            self._reply(404, {"code": 404, "error": "Not found"})
+
+
+class TronZapStubTestCase(unittest.TestCase):
+    """启动 stub 服务并将 TRONZAP_API_URL 指向它"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _TronZapStubHandler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.state = _StubState()
+        self.patcher = patch.dict(os.environ, {
+            "TRONZAP_API_URL": self.url,
+            "TRONZAP_API_TOKEN": TOKEN,
+            "TRONZAP_API_SECRET": SECRET,
+        })
+        self.patcher.start()
+        tronzap_client.reset_clients()
+
+    def tearDown(self):
+        tronzap_client.reset_clients()
+        self.patcher.stop()
+
+    def endpoints(self):
+        return [endpoint for endpoint, _ in self.server.state.requests]
+
+
+class TestTronZapClient(TronZapStubTestCase):
+    """测试客户端复用与缓存"""
+
+    def test_shared_client_reuses_connection(self):
+        """同一凭证共享客户端，多次请求只建立一个连接"""
+        client = tronzap_client.get_client()
+        self.assertIs(tronzap_client.get_client(), client)
+        client.create_energy_transaction(ALICE, 65000)
+        client.create_bandwidth_transaction(ALICE, 1000)
+        client.quote_energy(ALICE, 65000)
+        self.assertEqual(len(self.server.state.requests), 3)
+        self.assertEqual(self.server.state.connections, 1)
+
+    def test_quote_and_services_cached(self):
+        client = tronzap_client.get_client()
+        first = client.quote_energy(ALICE, 65000)
+        second = client.quote_energy(ALICE, 65000)
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertAlmostEqual(tronzap_client.quote_cost_trx(second), 65000 * STUB_PRICE_SUN / 1_000_000)
+        client.quote_energy(ALICE, 32000)
+        self.assertEqual(client.get_services()["services"], SERVICES)
+        self.assertTrue(client.get_services()["cached"])
+        self.assertEqual(self.endpoints(), ["calculate", "calculate", "services"])
+
+    def test_zero_ttl_disables_cache(self):
+        client = tronzap_client.get_client()
+        with patch.dict(os.environ, {"TRONZAP_QUOTE_TTL": "0"}):
+            client.quote_energy(ALICE, 65000)
+            client.quote_energy(ALICE, 65000)
+        self.assertEqual(self.endpoints(), ["calculate", "calculate"])
+
+    def test_bad_signature_raises(self):
+        client = tronzap_client.get_client(TOKEN, "wrong-secret")
+        with self.assertRaises(tronzap_client.TronZapError) as ctx:
+            client.get_balance()
+        self.assertEqual(ctx.exception.code, 2)
+
+    def test_missing_credentials(self):
+        with patch.dict(os.environ, {"TRONZAP_API_SECRET": ""}):
+            with self.assertRaises(ValueError):
+                tronzap_client.get_client()
+
+
+class TestLeaseRoutes(TronZapStubTestCase):
+    """测试租赁与报价路由"""
+
+    def test_lease_energy_and_bandwidth(self):
+        energy = call_router.call("lease_energy", {"to_address": ALICE, "amount": 65000, "duration": 1})
+        self.assertNotIn("error", energy)
+        self.assertEqual(energy["transaction_id"], "tz-1")
+        self.assertEqual(self.server.state.requests[0][1]["params"]["energy_amount"], 65000)
+        bandwidth = call_router.call("lease_bandwidth", {"to_address": ALICE, "amount": 1000})
+        self.assertEqual(bandwidth["transaction_id"], "tz-2")
+        self.assertEqual(self.server.state.connections, 1)
+
+    def test_lease_api_error(self):
+        result = call_router.call("lease_energy", {"to_address": ALICE, "amount": 2_000_000})
+        self.assertEqual(result["error"], "tronzap_error")
+        self.assertIn("Not enough balance", result["summary"])
+
+    def test_missing_credentials_route(self):
+        with patch.dict(os.environ, {"TRONZAP_API_TOKEN": ""}):
+            result = call_router.call("lease_energy", {"to_address": ALICE, "amount": 65000})
+        self.assertEqual(result["error"], "missing_credentials")
+
+    @patch.dict(os.environ, {"TRON_ENERGY_ESTIMATOR": "static"})
+    def test_quote_compares_with_burn(self):
+        result = call_router.call("get_lease_quote", {"to_address": ALICE, "amount": 65000})
+        self.assertNotIn("error", result)
+        self.assertAlmostEqual(result["cost_trx"], 5.85)
+        self.assertAlmostEqual(result["burn_cost_trx"], 27.3)
+        self.assertIn("租赁更划算", result["summary"])
+        self.assertTrue(call_router.call("get_lease_quote", {"to_address": ALICE, "amount": 65000})["cached"])
+
+        prices = call_router.call("get_lease_quote", {})
+        self.assertEqual(prices["services"], SERVICES)
+        self.assertIn("error", call_router.call("get_lease_quote", {"amount": 65000}))
+
+
+class TestPlannerUsesQuote(TronZapStubTestCase):
+    """未配置租赁单价时，规划按 TronZap 报价比较"""
+
+    @patch.dict(os.environ, {"TRON_ENERGY_ESTIMATOR": "static"})
+    @patch('tron_mcp_server.tron_client.get_usdt_balance', return_value=1000.0)
+    @patch('tron_mcp_server.tron_client.get_balance_trx', return_value=500.0)
+    @patch('tron_mcp_server.trongrid_client.get_account_resource', return_value={})
+    def test_quoted_price(self, *_mocks):
+        plan = fee_planner.plan_transfers(OWNER, [{"to": ALICE, "amount": 1}, {"to": ALICE, "amount": 2}])
+        self.assertEqual(plan["energy"]["strategy"], "lease")
+        self.assertEqual(plan["energy"]["lease_cost_sun"], 130000 * STUB_PRICE_SUN)
+        self.assertEqual(self.server.state.requests[0][1]["energy"], 130000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+冷启动回归测试 - 包导入耗时与重依赖延迟加载
+==========================================
+
+stdio 部署下每个 Agent 会话都会拉起一个新的 server 进程，冷启动时间直接影响首个
+工具调用的延迟。本文件在独立子进程中导入包，防止以下回归：
+1. 导入 tron_mcp_server / call_router 时提前加载 ecdsa、pycryptodome、qrcode、PIL、tronzap_sdk
+2. 子模块按需加载（tron_mcp_server.<submodule>）失效
+3. 导入 call_router 的耗时超过预算（默认 500ms，可通过 TRON_MCP_IMPORT_BUDGET_MS 调整）
+"""
+
+import unittest
+import sys
+import os
+import json
+import subprocess
+import statistics
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 冷启动阶段不允许出现的重依赖
+HEAVY_MODULES = ("ecdsa", "Crypto", "qrcode", "PIL", "tronzap_sdk")
+
+# call_router 导入耗时预算（毫秒）
+IMPORT_BUDGET_MS = float(os.getenv("TRON_MCP_IMPORT_BUDGET_MS", "500"))
+
+# 计时采样次数（取中位数，降低 CI 抖动影响）
+IMPORT_SAMPLES = 5
+
+
+def _run_in_subprocess(code: str) -> dict:
+    """在干净的子进程中执行代码，返回其打印的 JSON 结果"""
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    if proc.returncode != 0:
+        raise AssertionError(f"子进程执行失败:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+_PROBE_TEMPLATE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {target}
+elapsed_ms = (time.perf_counter() - t0) * 1000
+heavy = {heavy!r}
+loaded = sorted(m for m in heavy if m in sys.modules)
+print(json.dumps({{"elapsed_ms": elapsed_ms, "loaded": loaded,
+                  "modules": sorted(m for m in sys.modules if m.startswith("tron_mcp_server"))}}))
+"""
+
+
+def _probe(target: str) -> dict:
+    return _run_in_subprocess(_PROBE_TEMPLATE.format(target=target, heavy=HEAVY_MODULES))
+
+
+class TestLazyPackageImport(unittest.TestCase):
+    """测试包级别的按需加载"""
+
+    def test_package_import_loads_no_submodules(self):
+        """import tron_mcp_server 不应加载业务子模块"""
+        result = _probe("tron_mcp_server")
+        self.assertEqual(result["loaded"], [])
+        self.assertNotIn("tron_mcp_server.call_router", result["modules"])
+        self.assertNotIn("tron_mcp_server.tron_client", result["modules"])
+
+    def test_submodule_attribute_access(self):
+        """tron_mcp_server.<submodule> 属性访问应触发导入"""
+        import tron_mcp_server
+        self.assertIs(tron_mcp_server.formatters, sys.modules["tron_mcp_server.formatters"])
+        self.assertIn("call_router", dir(tron_mcp_server))
+
+    def test_unknown_attribute_raises(self):
+        """未声明的属性应抛出 AttributeError"""
+        import tron_mcp_server
+        with self.assertRaises(AttributeError):
+            tron_mcp_server.not_a_module
+
+
+class TestCallRouterColdStart(unittest.TestCase):
+    """测试 call_router 冷启动"""
+
+    def test_call_router_import_skips_heavy_modules(self):
+        """导入 call_router 不应加载 ecdsa / pycryptodome / qrcode / PIL / tronzap_sdk"""
+        result = _probe("tron_mcp_server.call_router")
+        self.assertEqual(result["loaded"], [])
+
+    def test_heavy_modules_loaded_on_first_use(self):
+        """首次派生地址时才加载 ecdsa 与 pycryptodome"""
+        result = _run_in_subprocess(
+            "import json, sys\n"
+            "from tron_mcp_server import key_manager\n"
+            "before = 'ecdsa' in sys.modules\n"
+            "key_manager.get_address_from_private_key('00' * 31 + '01')\n"
+            "print(json.dumps({'before': before, 'after': 'ecdsa' in sys.modules,"
+            " 'keccak': 'Crypto.Hash.keccak' in sys.modules}))"
+        )
+        self.assertFalse(result["before"])
+        self.assertTrue(result["after"])
+        self.assertTrue(result["keccak"])
+
+    def test_call_router_import_within_budget(self):
+        """call_router 导入耗时（中位数）应低于预算"""
+        samples = [
+            _probe("tron_mcp_server.call_router")["elapsed_ms"]
+            for _ in range(IMPORT_SAMPLES)
+        ]
+        median_ms = statistics.median(samples)
+        print(f"\ncall_router 冷启动导入耗时: 中位数 {median_ms:.1f} ms "
+              f"(样本: {', '.join(f'{s:.1f}' for s in samples)})")
+        self.assertLess(
+            median_ms, IMPORT_BUDGET_MS,
+            f"call_router 冷启动导入耗时 {median_ms:.1f} ms 超出预算 {IMPORT_BUDGET_MS:.0f} ms",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""地址簿模糊搜索基准 - n-gram 索引 vs 全量 SequenceMatcher 扫描
+
+分别在 1k / 10k / 100k 联系人规模下，对 "拼错的别名" 执行模糊搜索，对比:
+1. linear: 旧实现，对每个别名计算 SequenceMatcher 相似度
+2. ngram: n-gram 倒排索引召回 + SequenceMatcher 精排
+并统计:
+- top1 一致率: 两者最相似结果的相似度一致（"您是否想找…" 只使用第一名）
+- 强匹配召回率: 全量扫描 top-3 中相似度 ≥ 0.7 的结果，有多少也出现在索引结果中
+
+用法:
+    python tests/stress/addressbook_fuzzy_benchmark.py [查询次数]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import statistics
+import tempfile
+from difflib import SequenceMatcher
+from pathlib import Path
+
+# 添加项目根目录到 path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tron_mcp_server import address_book
+
+SIZES = (1_000, 10_000, 100_000)
+DEFAULT_QUERIES = 50
+
+# 强匹配相似度阈值（用于统计召回率）
+STRONG_MATCH = 0.7
+
+_SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾"
+_GIVEN = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰飞鹏辉"
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+_ADDRESS = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+
+def _make_aliases(count: int, rng: random.Random) -> list:
+    aliases = set()
+    while len(aliases) < count:
+        if rng.random() < 0.5:
+            name = rng.choice(_SURNAMES) + "".join(rng.choice(_GIVEN) for _ in range(rng.randint(1, 2)))
+            aliases.add(f"{name}{rng.randint(1, count)}")
+        else:
+            word = "".join(rng.choice(_LETTERS) for _ in range(rng.randint(4, 9)))
+            aliases.add(f"{word}_{rng.randint(1, 999)}")
+    return list(aliases)
+
+
+def _typo(alias: str, rng: random.Random) -> str:
+    """随机替换一个字符，模拟用户输错别名"""
+    i = rng.randrange(len(alias))
+    return alias[:i] + rng.choice(_LETTERS) + alias[i + 1:]
+
+
+def _linear_similar(contacts: dict, query: str) -> list:
+    """旧实现：全量 SequenceMatcher 扫描"""
+    matches = []
+    for contact_alias in contacts:
+        similarity = SequenceMatcher(None, query.lower(), contact_alias.lower()).ratio()
+        if similarity > address_book.SIMILARITY_THRESHOLD:
+            matches.append((similarity, contact_alias))
+    matches.sort(reverse=True)
+    return [(alias, similarity) for similarity, alias in matches[:address_book.SIMILAR_MATCH_LIMIT]]
+
+
+def _timed(func, queries: list) -> tuple:
+    samples, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(func(query))
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, results
+
+
+def _run(size: int, query_count: int, rng: random.Random) -> None:
+    aliases = _make_aliases(size, rng)
+    contacts = {alias: {"address": _ADDRESS, "note": ""} for alias in aliases}
+    path = Path(tempfile.mkdtemp()) / "book.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(contacts, f, ensure_ascii=False)
+    store = address_book._AddressBookStore(path)
+    len(store)  # 加载文件
+
+    start = time.perf_counter()
+    store.similar("warmup")
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = [_typo(rng.choice(aliases), rng) for _ in range(query_count)]
+    # 全量扫描在 100k 时非常慢，只取部分查询
+    linear_queries = queries[:max(3, query_count * 1000 // size)]
+
+    ngram_ms, ngram_results = _timed(
+        lambda q: [(m["alias"], m["similarity"]) for m in store.similar(q)], queries,
+    )
+    linear_ms, linear_results = _timed(lambda q: _linear_similar(contacts, q), linear_queries)
+
+    pairs = list(zip(ngram_results, linear_results))
+    top1 = sum(a[:1] and b[:1] and a[0][1] == b[0][1] for a, b in pairs) / len(pairs)
+    strong = [(alias, a) for a, b in pairs for alias, sim in b if sim >= STRONG_MATCH]
+    recall = sum(alias in dict(a) for alias, a in strong) / len(strong) if strong else 1.0
+
+    print(f"{size:>7,} 联系人 | 索引构建 {build_ms:8.1f} ms | "
+          f"ngram p50 {statistics.median(ngram_ms):7.3f} ms p95 "
+          f"{sorted(ngram_ms)[int(len(ngram_ms) * 0.95) - 1]:7.3f} ms | "
+          f"linear p50 {statistics.median(linear_ms):9.2f} ms | "
+          f"top1 一致 {top1:.0%} 强匹配召回 {recall:.0%}")
+
+
+def main():
+    query_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_QUERIES
+    rng = random.Random(42)
+    print(f"🚀 地址簿模糊搜索基准: 每档 {query_count} 次查询")
+    print("=" * 120)
+    for size in SIZES:
+        _run(size, query_count, rng)
+    print("=" * 120)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""call_router 端到端基准 — 离线模拟服务 + 受控并发
+
+启动 mock_tron_server（TRONSCAN / TronGrid / TronZap 模拟服务），把所有客户端指向它，
+然后对 call_router 的每个动作按指定并发发起请求，统计吞吐与 p50/p95/p99 延迟。
+请求走完整的 HTTP 路径（httpx → 模拟服务 → 响应解析 → 格式化），
+可用于比较连接复用、缓存、序列化等优化前后的差异，且结果不受公网波动影响。
+
+用法:
+    python tests/stress/benchmark_actions.py
+    python tests/stress/benchmark_actions.py --requests 200 --concurrency 16 --latency lognormal:40,0.5
+    python tests/stress/benchmark_actions.py --actions transfer,get_balance --errors 500:0.01 --json out.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+stress_dir = os.path.dirname(os.path.abspath(__file__))
+if stress_dir not in sys.path:
+    sys.path.insert(0, stress_dir)
+
+from mock_tron_server import ErrorModel, LatencyModel, MockTronServer, serve
+
+# 测试私钥（私钥 = 1，切勿用于真实资产）
+BENCH_PRIVATE_KEY = "0000000000000000000000000000000000000000000000000000000000000001"
+BENCH_ADDRESS = "TMVQGm1qAQYVdetCeGRRkTWYYrLXuHK2HC"
+RECIPIENT = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+TXID = "1234567890abcdef" * 4
+
+DEFAULT_REQUESTS = 50
+DEFAULT_CONCURRENCY = 8
+
+
+def bench_env(base_env: Dict[str, str], workdir: str) -> Dict[str, str]:
+    """基准运行所需的环境变量（模拟服务地址 + 测试钱包 + 临时数据目录）"""
+    return {
+        **base_env,
+        "TRON_NETWORK": "mainnet",
+        "TRON_PRIVATE_KEY": BENCH_PRIVATE_KEY,
+        "TRON_PRIVATE_KEYS": "",
+        "TRON_HD_SEED": "000102030405060708090a0b0c0d0e0f",
+        "TRON_HD_INDEX_PATH": os.path.join(workdir, "hd_index.json"),
+        "TRON_ADDRESSBOOK_PATH": os.path.join(workdir, "addressbook.json"),
+        "TRONZAP_API_TOKEN": "bench-token",
+        "TRONZAP_API_SECRET": "bench-secret",
+        "TRON_ENERGY_TOPUP_WAIT": "0",
+    }
+
+
+def _unsigned_tx() -> dict:
+    return {
+        "txID": TXID,
+        "raw_data": {
+            "contract": [{
+                "parameter": {"value": {"owner_address": BENCH_ADDRESS, "to_address": RECIPIENT, "amount": 1_000_000}},
+                "type": "TransferContract",
+            }],
+            "ref_block_bytes": "abcd",
+            "ref_block_hash": "1234567890abcdef",
+            "expiration": 1704067260000,
+            "timestamp": 1704067200000,
+        },
+    }
+
+
+def build_scenarios(workdir: str) -> Dict[str, Callable[[int], dict]]:
+    """每个动作的参数工厂: 第 i 次请求 -> params"""
+    unsigned = json.dumps(_unsigned_tx())
+    signed = json.dumps({**_unsigned_tx(), "signature": ["00" * 65]})
+    transfer = {"from": BENCH_ADDRESS, "to": RECIPIENT, "amount": 1, "token": "USDT"}
+    return {
+        "skills": lambda i: {},
+        "get_usdt_balance": lambda i: {"address": RECIPIENT},
+        "get_balance": lambda i: {"address": RECIPIENT},
+        "get_gas_parameters": lambda i: {},
+        "get_transaction_status": lambda i: {"txid": TXID},
+        "get_network_status": lambda i: {},
+        "get_account_status": lambda i: {"address": RECIPIENT},
+        "check_account_safety": lambda i: {"address": RECIPIENT},
+        "check_account_safety_batch": lambda i: {"addresses": [RECIPIENT, BENCH_ADDRESS]},
+        "build_tx": lambda i: dict(transfer),
+        "sign_tx": lambda i: {"unsigned_tx_json": unsigned},
+        "broadcast_tx": lambda i: {"signed_tx_json": signed},
+        "transfer": lambda i: {"to": RECIPIENT, "amount": 1, "token": "USDT"},
+        "get_wallet_info": lambda i: {},
+        "get_transaction_history": lambda i: {"address": RECIPIENT, "limit": 10},
+        "get_internal_transactions": lambda i: {"address": RECIPIENT, "limit": 10},
+        "get_account_tokens": lambda i: {"address": RECIPIENT},
+        "addressbook_add": lambda i: {"alias": f"bench{i}", "address": RECIPIENT},
+        "addressbook_lookup": lambda i: {"alias": "bench0"},
+        "addressbook_reverse_lookup": lambda i: {"address": RECIPIENT},
+        "addressbook_list": lambda i: {},
+        "addressbook_remove": lambda i: {"alias": f"bench{i}"},
+        "generate_qrcode": lambda i: {
+            "address": RECIPIENT, "output_dir": workdir, "filename": f"bench_{i}.png",
+        },
+        "get_account_energy": lambda i: {"address": RECIPIENT},
+        "get_account_bandwidth": lambda i: {"address": RECIPIENT},
+        "lease_energy": lambda i: {"to_address": RECIPIENT, "amount": 65000},
+        "lease_bandwidth": lambda i: {"to_address": RECIPIENT, "amount": 1000},
+        "get_lease_quote": lambda i: {"to_address": RECIPIENT, "amount": 65000},
+        "plan_transfers": lambda i: {"from": BENCH_ADDRESS, "transfers": [
+            {"to": RECIPIENT, "amount": 1, "token": "USDT"},
+            {"to": RECIPIENT, "amount": 2, "token": "TRX"},
+        ]},
+        "hd_derive_addresses": lambda i: {"count": 1},
+        "hd_lookup_address": lambda i: {"address": RECIPIENT},
+        "get_metrics": lambda i: {},
+        "get_diagnostics": lambda i: {},
+    }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _run_action(call, action: str, factory: Callable[[int], dict], requests: int, concurrency: int) -> dict:
+    from tron_mcp_server import metrics
+
+    durations: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        start = time.perf_counter()
+        try:
+            error_type = metrics.result_error_type(call(action, factory(i)))
+        except Exception as e:
+            error_type = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            durations.append(elapsed)
+            if error_type:
+                errors[error_type] = errors.get(error_type, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    durations.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / wall if wall > 0 else 0.0,
+        "p50_ms": _percentile(durations, 0.50) * 1000,
+        "p95_ms": _percentile(durations, 0.95) * 1000,
+        "p99_ms": _percentile(durations, 0.99) * 1000,
+    }
+
+
+def run_benchmark(
+    requests: int = DEFAULT_REQUESTS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    latency: Optional[LatencyModel] = None,
+    errors: Optional[ErrorModel] = None,
+    actions: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    backend: str = "auto",
+) -> Dict[str, dict]:
+    """
+    启动模拟服务并对各动作运行基准
+
+    Returns:
+        {动作名: {requests, errors, throughput, p50_ms, p95_ms, p99_ms}}
+
+    Raises:
+        ValueError: 动作名未知，或基准场景与路由表不一致
+    """
+    from tron_mcp_server import call_router
+
+    with tempfile.TemporaryDirectory(prefix="tron-bench-") as workdir:
+        scenarios = build_scenarios(workdir)
+        missing = set(call_router._ACTION_HANDLERS) - set(scenarios)
+        if missing:
+            raise ValueError(f"以下动作缺少基准场景: {', '.join(sorted(missing))}")
+        selected = actions or list(scenarios)
+        unknown = [a for a in selected if a not in scenarios]
+        if unknown:
+            raise ValueError(f"未知动作: {', '.join(unknown)}")
+
+        app = MockTronServer(latency=latency, errors=errors, seed=seed)
+        with serve(app, backend=backend) as running:
+            saved = {key: os.environ.get(key) for key in bench_env(running.env(), workdir)}
+            os.environ.update(bench_env(running.env(), workdir))
+            try:
+                return {
+                    action: _run_action(call_router.call, action, scenarios[action], requests, concurrency)
+                    for action in selected
+                }
+            finally:
+                for key, value in saved.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+
+
+def print_report(results: Dict[str, dict]) -> None:
+    print(f"{'动作':<28} {'请求':>6} {'错误':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print("-" * 82)
+    for action, r in results.items():
+        error_count = sum(r["errors"].values())
+        print(
+            f"{action:<28} {r['requests']:>6} {error_count:>6} {r['throughput']:>9.1f} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+        )
+    failing = {a: r["errors"] for a, r in results.items() if r["errors"]}
+    if failing:
+        print("\n错误明细:")
+        for action, counts in failing.items():
+            print(f"  {action}: {', '.join(f'{k}={v}' for k, v in counts.items())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="call_router 端到端基准（离线模拟服务）")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="每个动作的请求数")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="并发线程数")
+    parser.add_argument("--latency", default="none", help="模拟服务延迟分布，如 fixed:20 / lognormal:40,0.5")
+    parser.add_argument("--errors", default="", help="模拟服务错误分布，如 500:0.01,429:0.02")
+    parser.add_argument("--actions", default="", help="只运行指定动作（逗号分隔）")
+    parser.add_argument("--backend", default="auto", choices=("auto", "uvicorn", "stdlib"))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="同时把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        latency=LatencyModel.parse(args.latency),
+        errors=ErrorModel.parse(args.errors),
+        actions=[a.strip() for a in args.actions.split(",") if a.strip()] or None,
+        seed=args.seed,
+        backend=args.backend,
+    )
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
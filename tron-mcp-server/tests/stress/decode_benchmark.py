@@ -0,0 +1,185 @@
+"""TRONSCAN 响应解码微基准
+
+对比（每种响应形状）:
+1. current: httpx Response.json() 完整解析（现有路径）
+2. json / orjson / msgspec: response_schemas.decode 按 schema 只物化使用的字段
+
+输出每次解码耗时与解码结果常驻内存（tracemalloc 统计）。响应体为按 TRONSCAN
+真实字段构造的合成数据：带大量 TRC20 持仓的 account、一页 TRC20 / TRX 转账、transaction-info。
+
+用法:
+    python tests/stress/decode_benchmark.py [TRC20 持仓数] [每页转账数]
+"""
+
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+# 添加项目根目录到 path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import httpx
+
+from tron_mcp_server import response_schemas
+
+DEFAULT_HOLDINGS = 300
+DEFAULT_PAGE = 50
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+COUNTERPARTY = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+USDT = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+def _token_info(i: int) -> dict:
+    return {
+        "tokenId": USDT, "tokenAbbr": f"TK{i}", "tokenName": f"Token {i}", "tokenDecimal": 6,
+        "tokenCanShow": 1, "tokenType": "trc20", "tokenLogo": f"https://static.tronscan.org/logo/{i}.png",
+        "tokenLevel": "2", "issuerAddr": COUNTERPARTY, "vip": False,
+    }
+
+
+def make_account(holdings: int) -> dict:
+    balances = []
+    for i in range(holdings):
+        balances.append({
+            **_token_info(i),
+            "balance": str(123_456_789 * (i + 1)),
+            "tokenPriceInTrx": 0.0123 * i, "tokenPriceInUsd": 0.0012 * i,
+            "amount": 1234.5678 * i, "nrOfTokenHolders": 1000 + i, "transferCount": 50_000 + i,
+            "project": f"project {i}", "description": "x" * 120,
+        })
+    return {
+        "address": ADDRESS, "balance": 12_345_678, "transactions": 4321,
+        "transactions_in": 2000, "transactions_out": 2321, "totalTransactionCount": 4321,
+        "date_created": 1600000000000, "latest_operation_time": 1700000000000,
+        "bandwidth": {"freeNetLimit": 600, "netLimit": 0, "energyLimit": 0, "assets": {}},
+        "withdrawCache": [], "representative": {"enabled": False, "allowance": 0},
+        "trc20token_balances": balances,
+        "tokenBalances": [{
+            "tokenId": "_", "tokenName": "trx", "tokenAbbr": "trx", "tokenDecimal": 6,
+            "balance": "12345678", "tokenLogo": "https://static.tronscan.org/logo/trx.png",
+        }],
+    }
+
+
+def make_trc20_page(size: int) -> dict:
+    rows = []
+    for i in range(size):
+        rows.append({
+            "transaction_id": f"{i:064x}", "block_ts": 1700000000000 - i * 3000,
+            "from_address": ADDRESS if i % 2 else COUNTERPARTY, "to_address": COUNTERPARTY if i % 2 else ADDRESS,
+            "block": 60_000_000 - i, "contract_address": USDT, "quant": str(1_000_000 * (i + 1)),
+            "approval_amount": "0", "event_type": "Transfer", "contract_type": "trc20",
+            "confirmed": True, "contractRet": "SUCCESS", "finalResult": "SUCCESS", "revert": False,
+            "tokenInfo": _token_info(i), "fromAddressIsContract": False, "toAddressIsContract": False,
+            "riskTransaction": False,
+        })
+    return {"total": 10_000, "rangeTotal": 10_000, "contractInfo": {USDT: {"tag1": "USDT Token"}},
+            "token_transfers": rows}
+
+
+def make_trx_page(size: int) -> dict:
+    rows = []
+    for i in range(size):
+        rows.append({
+            "id": "", "block": 60_000_000 - i, "transactionHash": f"{i:064x}",
+            "timestamp": 1700000000000 - i * 3000, "transferFromAddress": ADDRESS,
+            "transferToAddress": COUNTERPARTY, "amount": 1_000_000 * (i + 1), "tokenName": "_",
+            "confirmed": True, "data": "", "contractRet": "SUCCESS", "revert": False,
+            "tokenInfo": {"tokenId": "_", "tokenAbbr": "trx", "tokenName": "trx", "tokenDecimal": 6,
+                          "tokenCanShow": 1, "tokenType": "trc10", "tokenLogo": "https://static.tronscan.org/trx.png",
+                          "vip": False},
+            "cheatStatus": False, "riskTransaction": False,
+        })
+    return {"total": 10_000, "rangeTotal": 10_000, "data": rows, "contractMap": {ADDRESS: False, COUNTERPARTY: False}}
+
+
+def make_transaction_info() -> dict:
+    return {
+        "block": 60_000_000, "hash": "ab" * 32, "timestamp": 1700000000000,
+        "ownerAddress": ADDRESS, "toAddress": USDT, "contractType": 31, "confirmed": True,
+        "revert": False, "contractRet": "SUCCESS", "confirmations": 120,
+        "cost": {"net_fee": 0, "energy_penalty_total": 0, "energy_usage": 0, "fee": 13_844_850,
+                 "energy_fee": 13_844_850, "energy_usage_total": 64_979, "origin_energy_usage": 0,
+                 "net_usage": 345},
+        "trigger_info": {"method": "transfer(address _to,uint256 _value)",
+                         "parameter": {"_value": "1000000", "_to": COUNTERPARTY}, "call_value": 0},
+        "tokenTransferInfo": {"symbol": "USDT", "decimals": 6, "amount_str": "1000000",
+                              "to_address": COUNTERPARTY, "from_address": ADDRESS, "contract_address": USDT,
+                              "tokenType": "trc20", "name": "Tether USD", "icon_url": "https://static.tronscan.org/usdt.png"},
+        "contractData": {"data": "a9059cbb" + "0" * 128, "owner_address": ADDRESS, "contract_address": USDT},
+        "contract_map": {ADDRESS: False, USDT: True},
+        "signature_addresses": [], "srConfirmList": [{"address": COUNTERPARTY, "name": "SR", "block": 60_000_001}] * 19,
+        "info": {}, "addressTag": {}, "normalAddressInfo": {ADDRESS: {"risk": False}},
+    }
+
+
+def _response(payload: dict) -> httpx.Response:
+    return httpx.Response(200, content=json.dumps(payload).encode("utf-8"),
+                          headers={"content-type": "application/json"})
+
+
+def _retained_kib(func) -> float:
+    """解码结果常驻内存（KiB）"""
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / 1024
+
+
+def _run(label: str, func, iterations: int, baseline: float = None) -> float:
+    func()  # 预热（生成 msgspec Struct 等）
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    speedup = f"{baseline / per_call:>6.2f}x" if baseline else f"{'':>7}"
+    print(f"  {label:<9} {per_call:>10.1f} µs/op {speedup}   常驻 {_retained_kib(func):>8.1f} KiB")
+    return per_call
+
+
+def _backends() -> list:
+    backends = [response_schemas.BACKEND_JSON]
+    if response_schemas.orjson is not None:
+        backends.append(response_schemas.BACKEND_ORJSON)
+    if response_schemas.msgspec is not None:
+        backends.append(response_schemas.BACKEND_MSGSPEC)
+    return backends
+
+
+def main():
+    holdings = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_HOLDINGS
+    page = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PAGE
+    cases = [
+        ("account", make_account(holdings), f"{holdings} 个 TRC20 持仓"),
+        ("token_trc20/transfers", make_trc20_page(page), f"{page} 条"),
+        ("transfer", make_trx_page(page), f"{page} 条"),
+        ("transaction-info", make_transaction_info(), "TRC20 转账"),
+    ]
+
+    print("🚀 TRONSCAN 响应解码微基准")
+    for name in ("orjson", "msgspec"):
+        if getattr(response_schemas, name) is None:
+            print(f"{name} 未安装，跳过 (pip install {name})")
+    print("=" * 62)
+    for path, payload, desc in cases:
+        response = _response(payload)
+        content = response.content
+        iterations = max(200, 20_000_000 // max(len(content), 1))
+        print(f"{path}（{desc}，{len(content) / 1024:.1f} KiB，{iterations} 次）")
+        baseline = _run("current", response.json, iterations)
+        expected = response_schemas.project(response.json(), response_schemas.SCHEMAS[path])
+        for backend in _backends():
+            decode = lambda backend=backend: response_schemas.decode(path, content, backend)  # noqa: E731
+            assert decode() == expected, f"{backend} 解码结果与投影不一致"
+            _run(backend, decode, iterations, baseline)
+    print("=" * 62)
+
+
+if __name__ == "__main__":
+    main()
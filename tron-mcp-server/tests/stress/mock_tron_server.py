@@ -0,0 +1,550 @@
+"""离线 TRONSCAN / TronGrid / TronZap 模拟服务
+
+按 tests/fixtures/sample_responses.json 构造各客户端实际请求的接口响应，
+让真实的 HTTP 调用路径（httpx → 序列化 → 解析）在没有网络的环境下也能被压测:
+
+- TRONSCAN:  /api/account, /api/chainparameters, /api/transaction-info, /api/block,
+             /api/transfer, /api/token_trc20/transfers, /api/internal-transaction,
+             /api/accountv2, /api/security/account/data
+- TronGrid:  /wallet/createtransaction, /wallet/triggersmartcontract, /wallet/estimateenergy,
+             /wallet/triggerconstantcontract, /wallet/broadcasttransaction, /wallet/getaccountresource
+- TronZap:   /v1/services, /v1/calculate, /v1/transaction/new, /v1/balance（不校验签名）
+
+延迟与错误分布可配置（按服务区分），例如:
+    latency = LatencyModel.parse("lognormal:40,0.5")   # 中位数 40ms，sigma 0.5
+    errors = ErrorModel.parse("500:0.01,429:0.02")      # 1% 返回 500，2% 返回 429
+
+本身是一个 ASGI 应用；serve() 在安装了 uvicorn 时用 uvicorn 运行，
+否则退回标准库 ThreadingHTTPServer（同一套路由逻辑）。
+
+用法:
+    python tests/stress/mock_tron_server.py --port 9000 --latency lognormal:40,0.5 --errors 500:0.01
+    # 然后将客户端指向它:
+    TRONSCAN_API_URL=http://127.0.0.1:9000/api TRONSCAN_SECURITY_API_URL=http://127.0.0.1:9000/api \\
+    TRONGRID_API_URL=http://127.0.0.1:9000 TRONZAP_API_URL=http://127.0.0.1:9000 tron-mcp-server
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import socket
+import asyncio
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple, Union
+
+FIXTURES_PATH = Path(__file__).resolve().parent.parent / "fixtures" / "sample_responses.json"
+
+SERVICES = ("tronscan", "trongrid", "tronzap")
+# 估算能量: 接收方已持币 / 未持币
+ENERGY_HAS_BALANCE = 31895
+ENERGY_NO_BALANCE = 64895
+ENERGY_PRICE_SUN = 420
+
+
+class LatencyModel:
+    """
+    响应延迟分布（毫秒）
+
+    - none
+    - fixed:<ms>
+    - uniform:<min>,<max>
+    - lognormal:<中位数>,<sigma>
+    - exp:<均值>
+    """
+
+    KINDS = ("none", "fixed", "uniform", "lognormal", "exp")
+
+    def __init__(self, kind: str = "none", a: float = 0.0, b: float = 0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"不支持的延迟分布: {kind}，可选 {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.a = float(a)
+        self.b = float(b)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, args = (spec or "none").strip().partition(":")
+        values = [float(v) for v in args.split(",") if v.strip()]
+        expected = {"none": 0, "fixed": 1, "uniform": 2, "lognormal": 2, "exp": 1}.get(kind)
+        if expected is None or len(values) != expected:
+            raise ValueError(f"无效的延迟配置: {spec}")
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        """返回一次延迟（秒）"""
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.a, self.b)
+        elif self.kind == "lognormal":
+            ms = rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        elif self.kind == "exp":
+            ms = rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        else:
+            ms = 0.0
+        return max(0.0, ms) / 1000
+
+    def __repr__(self) -> str:
+        return f"LatencyModel({self.kind}, {self.a}, {self.b})"
+
+
+class ErrorModel:
+    """
+    错误分布: "<HTTP 状态码>:<概率>,..."，例如 "500:0.01,429:0.02"
+
+    概率之和不能超过 1；未命中时正常响应。
+    """
+
+    def __init__(self, rates: Optional[Dict[int, float]] = None):
+        self.rates = dict(rates or {})
+        if any(p < 0 for p in self.rates.values()) or sum(self.rates.values()) > 1:
+            raise ValueError(f"无效的错误概率: {self.rates}")
+
+    @classmethod
+    def parse(cls, spec: str) -> "ErrorModel":
+        rates = {}
+        for item in (spec or "").split(","):
+            if not item.strip():
+                continue
+            status, _, probability = item.partition(":")
+            rates[int(status)] = float(probability)
+        return cls(rates)
+
+    def sample(self, rng: random.Random) -> Optional[int]:
+        """返回本次应注入的错误状态码（不注入时返回 None）"""
+        if not self.rates:
+            return None
+        roll = rng.random()
+        for status, probability in self.rates.items():
+            if roll < probability:
+                return status
+            roll -= probability
+        return None
+
+
+PerService = Union[LatencyModel, ErrorModel, Dict[str, Union[LatencyModel, ErrorModel]], None]
+
+
+def _tx_id(seed: str) -> str:
+    return hashlib.sha256(seed.encode("utf-8")).hexdigest()
+
+
+class MockTronServer:
+    """
+    TRONSCAN / TronGrid / TronZap 模拟服务（ASGI 应用）
+
+    Args:
+        fixtures_path: 样例响应 JSON
+        latency: LatencyModel，或 {服务名 / "default": LatencyModel}
+        errors: ErrorModel，或 {服务名 / "default": ErrorModel}
+        seed: 随机种子（延迟与错误可复现）
+    """
+
+    def __init__(self, fixtures_path=FIXTURES_PATH, latency: PerService = None, errors: PerService = None,
+                 seed: Optional[int] = None):
+        with open(fixtures_path, "r", encoding="utf-8") as f:
+            self.fixtures = json.load(f)
+        self._latency = self._per_service(latency, LatencyModel())
+        self._errors = self._per_service(errors, ErrorModel())
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._counter = 0
+        self.requests: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self.routes: Dict[str, Tuple[str, Callable[[dict, dict], dict]]] = {
+            "/api/account": ("tronscan", self._account),
+            "/api/chainparameters": ("tronscan", self._chain_parameters),
+            "/api/transaction-info": ("tronscan", self._transaction_info),
+            "/api/block": ("tronscan", self._block),
+            "/api/transfer": ("tronscan", self._transfers),
+            "/api/token_trc20/transfers": ("tronscan", self._trc20_transfers),
+            "/api/internal-transaction": ("tronscan", self._internal_transactions),
+            "/api/accountv2": ("tronscan", self._account_v2),
+            "/api/security/account/data": ("tronscan", self._security),
+            "/wallet/createtransaction": ("trongrid", self._create_transaction),
+            "/wallet/triggersmartcontract": ("trongrid", self._trigger_smart_contract),
+            "/wallet/estimateenergy": ("trongrid", self._estimate_energy),
+            "/wallet/triggerconstantcontract": ("trongrid", self._trigger_constant_contract),
+            "/wallet/broadcasttransaction": ("trongrid", self._broadcast),
+            "/wallet/getaccountresource": ("trongrid", self._account_resource),
+            "/v1/services": ("tronzap", self._tronzap_services),
+            "/v1/calculate": ("tronzap", self._tronzap_calculate),
+            "/v1/transaction/new": ("tronzap", self._tronzap_order),
+            "/v1/balance": ("tronzap", self._tronzap_balance),
+        }
+
+    @staticmethod
+    def _per_service(value, default) -> dict:
+        if value is None:
+            return {"default": default}
+        if isinstance(value, dict):
+            return {"default": default, **value}
+        return {"default": value}
+
+    def _model(self, models: dict, service: str):
+        return models.get(service) or models["default"]
+
+    def _next_id(self) -> int:
+        with self._rng_lock:
+            self._counter += 1
+            return self._counter
+
+    # ============ 请求处理（同步核心，ASGI / 标准库前端共用） ============
+
+    def handle(self, method: str, path: str, query: dict, body: bytes) -> Tuple[int, dict, float]:
+        """
+        处理一次请求
+
+        Returns:
+            (HTTP 状态码, JSON 响应, 延迟秒数)
+        """
+        route = self.routes.get(path.rstrip("/") or "/")
+        if route is None:
+            return 404, {"Error": f"unknown path {path}"}, 0.0
+        service, handler = route
+        with self._stats_lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+        with self._rng_lock:
+            delay = self._model(self._latency, service).sample(self._rng)
+            status = self._model(self._errors, service).sample(self._rng)
+        if status is not None:
+            return status, {"Error": f"injected {status}", "code": status}, delay
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"Error": "invalid json"}, delay
+        return 200, handler(query, payload if isinstance(payload, dict) else {}), delay
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        status, payload, delay = self.handle(scope["method"], scope["path"], query, body)
+        if delay:
+            await asyncio.sleep(delay)
+        data = json.dumps(payload).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())],
+        })
+        await send({"type": "http.response.body", "body": data})
+
+    # ============ TRONSCAN ============
+
+    def _account(self, query: dict, payload: dict) -> dict:
+        account = dict(self.fixtures["tron_scan_account"]["data"])
+        account["address"] = query.get("address", account["address"])
+        account["transactions"] = 42
+        account["trc20token_balances"] = [
+            {
+                "tokenId": token["contract_address"],
+                "tokenName": token["token_name"],
+                "tokenAbbr": token["token_symbol"],
+                "tokenDecimal": token["token_decimal"],
+                "balance": token["balance"],
+            }
+            for token in self.fixtures["usdt_balance"]["data"]["trc20"]
+        ]
+        return account
+
+    def _chain_parameters(self, query: dict, payload: dict) -> dict:
+        return {"tronParameters": [
+            {"key": "getEnergyFee", "value": ENERGY_PRICE_SUN},
+            {"key": "getTransactionFee", "value": 1000},
+        ]}
+
+    def _transaction_info(self, query: dict, payload: dict) -> dict:
+        tx = self.fixtures["transaction_status"]["data"]
+        return {
+            "hash": query.get("hash", tx["txid"]),
+            "block": tx["block_number"],
+            "timestamp": tx["block_time_stamp"],
+            "contractRet": tx["contract_ret"],
+            "cost": {"fee": tx["fee"]},
+            "ownerAddress": self.fixtures["tron_scan_account"]["data"]["address"],
+            "toAddress": self.fixtures["usdt_balance"]["data"]["trc20"][0]["contract_address"],
+            "amount": 1_000_000,
+        }
+
+    def _block(self, query: dict, payload: dict) -> dict:
+        number = self.fixtures["transaction_status"]["data"]["block_number"] + self._next_id()
+        return {"data": [{"number": number, "hash": _tx_id(f"block-{number}")}], "total": 1}
+
+    def _history(self, query: dict, count: int, trc20: bool) -> list:
+        owner = query.get("address") or query.get("relatedAddress") or self.fixtures["tron_scan_account"]["data"]["address"]
+        counterparty = self.fixtures["tron_scan_account"]["data"]["address"]
+        usdt = self.fixtures["usdt_balance"]["data"]["trc20"][0]
+        base_ts = self.fixtures["transaction_status"]["data"]["block_time_stamp"]
+        items = []
+        for i in range(count):
+            parties = (owner, counterparty) if i % 2 else (counterparty, owner)
+            if trc20:
+                items.append({
+                    "transaction_id": _tx_id(f"trc20-{owner}-{i}"),
+                    "from_address": parties[0], "to_address": parties[1],
+                    "quant": str(1_000_000 * (i + 1)), "block_ts": base_ts - i * 3000,
+                    "tokenInfo": {"tokenAbbr": usdt["token_symbol"], "tokenDecimal": usdt["token_decimal"]},
+                })
+            else:
+                items.append({
+                    "transactionHash": _tx_id(f"trx-{owner}-{i}"),
+                    "transferFromAddress": parties[0], "transferToAddress": parties[1],
+                    "amount": 1_000_000 * (i + 1), "tokenName": "_", "timestamp": base_ts - i * 3000 - 1500,
+                })
+        return items
+
+    def _transfers(self, query: dict, payload: dict) -> dict:
+        limit = int(query.get("limit", 10))
+        return {"total": 100, "data": self._history(query, limit, trc20=False)}
+
+    def _trc20_transfers(self, query: dict, payload: dict) -> dict:
+        limit = int(query.get("limit", 10))
+        return {"total": 100, "token_transfers": self._history(query, limit, trc20=True)}
+
+    def _internal_transactions(self, query: dict, payload: dict) -> dict:
+        owner = query.get("address", "")
+        return {"total": 1, "data": [{
+            "hash": _tx_id(f"internal-{owner}"), "from": owner, "to": owner,
+            "callValueInfo": [{"callValue": 1_000_000}],
+        }]}
+
+    def _account_v2(self, query: dict, payload: dict) -> dict:
+        return {"address": query.get("address", ""), "redTag": "", "greyTag": "", "blueTag": "",
+                "publicTag": "", "feedbackRisk": False}
+
+    def _security(self, query: dict, payload: dict) -> dict:
+        return {"is_black_list": False, "has_fraud_transaction": False,
+                "fraud_token_creator": False, "send_ad_by_memo": False}
+
+    # ============ TronGrid ============
+
+    def _transaction(self, contract_type: str, value: dict) -> dict:
+        tx_id = _tx_id(f"{contract_type}-{self._next_id()}-{json.dumps(value, sort_keys=True)}")
+        return {
+            "visible": False,
+            "txID": tx_id,
+            "raw_data": {
+                "contract": [{
+                    "parameter": {"value": value, "type_url": f"type.googleapis.com/protocol.{contract_type}"},
+                    "type": contract_type,
+                }],
+                "ref_block_bytes": tx_id[:4],
+                "ref_block_hash": tx_id[4:20],
+                "expiration": 1704067260000,
+                "timestamp": 1704067200000,
+            },
+            "raw_data_hex": "0a02" + tx_id,
+        }
+
+    def _create_transaction(self, query: dict, payload: dict) -> dict:
+        value = {k: payload.get(k) for k in ("owner_address", "to_address", "amount")}
+        return self._transaction("TransferContract", value)
+
+    def _trigger_smart_contract(self, query: dict, payload: dict) -> dict:
+        value = {
+            "owner_address": payload.get("owner_address"),
+            "contract_address": payload.get("contract_address"),
+            "data": "a9059cbb" + (payload.get("parameter") or ""),
+        }
+        tx = self._transaction("TriggerSmartContract", value)
+        tx["raw_data"]["fee_limit"] = payload.get("fee_limit", 100_000_000)
+        return {"result": {"result": True}, "transaction": tx}
+
+    def _estimate_energy(self, query: dict, payload: dict) -> dict:
+        return {"result": {"result": True}, "energy_required": ENERGY_HAS_BALANCE}
+
+    def _trigger_constant_contract(self, query: dict, payload: dict) -> dict:
+        if (payload.get("function_selector") or "").startswith("balanceOf"):
+            balance = int(self.fixtures["usdt_balance"]["data"]["trc20"][0]["balance"])
+            return {"result": {"result": True}, "constant_result": [f"{balance:064x}"]}
+        return {"result": {"result": True}, "energy_used": ENERGY_HAS_BALANCE}
+
+    def _broadcast(self, query: dict, payload: dict) -> dict:
+        return {"result": True, "txid": payload.get("txID", "")}
+
+    def _account_resource(self, query: dict, payload: dict) -> dict:
+        return {
+            "freeNetLimit": 600, "freeNetUsed": 0,
+            "NetLimit": 0, "NetUsed": 0,
+            "EnergyLimit": 0, "EnergyUsed": 0,
+            "TotalEnergyLimit": 90_000_000_000, "TotalEnergyWeight": 20_000_000_000,
+        }
+
+    # ============ TronZap ============
+
+    def _tronzap_services(self, query: dict, payload: dict) -> dict:
+        return {"code": 0, "result": [
+            {"service": "energy", "duration": 1, "price_sun": 90},
+            {"service": "bandwidth", "price_sun": 300},
+        ]}
+
+    def _tronzap_calculate(self, query: dict, payload: dict) -> dict:
+        energy = int(payload.get("energy", 0))
+        return {"code": 0, "result": {
+            "address": payload.get("address"), "energy": energy,
+            "duration": payload.get("duration", 1), "cost": {"trx": energy * 90 / 1_000_000},
+        }}
+
+    def _tronzap_order(self, query: dict, payload: dict) -> dict:
+        return {"code": 0, "result": {"id": f"tz-{self._next_id()}", "status": "pending", "cost": {"trx": 1.5}}}
+
+    def _tronzap_balance(self, query: dict, payload: dict) -> dict:
+        return {"code": 0, "result": {"balance_trx": 1000}}
+
+
+# ============ 运行 ============
+
+
+class _StdlibHandler(BaseHTTPRequestHandler):
+    """标准库前端：把请求交给 MockTronServer.handle（未安装 uvicorn 时使用）"""
+
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，不关闭 Nagle 时每个请求会多出约 40ms 的延迟确认
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload, delay = self.server.app.handle(self.command, parts.path, dict(parse_qsl(parts.query)), body)
+        if delay:
+            time.sleep(delay)
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+
+class RunningServer:
+    """serve() 的返回值：base_url 与 stop()"""
+
+    def __init__(self, base_url: str, stop: Callable[[], None], backend: str):
+        self.base_url = base_url
+        self.backend = backend
+        self._stop = stop
+
+    def env(self) -> Dict[str, str]:
+        """把各客户端指向本服务的环境变量"""
+        return {
+            "TRONSCAN_API_URL": f"{self.base_url}/api",
+            "TRONSCAN_SECURITY_API_URL": f"{self.base_url}/api",
+            "TRONGRID_API_URL": self.base_url,
+            "TRONZAP_API_URL": self.base_url,
+        }
+
+    def stop(self) -> None:
+        self._stop()
+
+    def __enter__(self) -> "RunningServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _serve_uvicorn(app: MockTronServer, host: str, port: int) -> RunningServer:
+    import uvicorn
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=5)
+        sock.close()
+
+    return RunningServer(f"http://{host}:{sock.getsockname()[1]}", stop, "uvicorn")
+
+
+def _serve_stdlib(app: MockTronServer, host: str, port: int) -> RunningServer:
+    httpd = ThreadingHTTPServer((host, port), _StdlibHandler)
+    httpd.daemon_threads = True
+    httpd.app = app
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        httpd.shutdown()
+        httpd.server_close()
+
+    return RunningServer(f"http://{host}:{httpd.server_address[1]}", stop, "stdlib")
+
+
+def serve(app: MockTronServer, host: str = "127.0.0.1", port: int = 0, backend: str = "auto") -> RunningServer:
+    """
+    在后台线程中启动模拟服务
+
+    Args:
+        backend: auto（有 uvicorn 用 uvicorn，否则标准库）/ uvicorn / stdlib
+    """
+    if backend == "auto":
+        try:
+            import uvicorn  # noqa: F401
+            backend = "uvicorn"
+        except ImportError:
+            backend = "stdlib"
+    if backend == "uvicorn":
+        return _serve_uvicorn(app, host, port)
+    return _serve_stdlib(app, host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线 TRONSCAN / TronGrid / TronZap 模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="none", help="延迟分布，如 fixed:20 / uniform:10,50 / lognormal:40,0.5")
+    parser.add_argument("--errors", default="", help="错误分布，如 500:0.01,429:0.02")
+    parser.add_argument("--backend", default="auto", choices=("auto", "uvicorn", "stdlib"))
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = MockTronServer(latency=LatencyModel.parse(args.latency), errors=ErrorModel.parse(args.errors), seed=args.seed)
+    running = serve(app, args.host, args.port, args.backend)
+    print(f"🧪 模拟服务 ({running.backend}) 运行在 {running.base_url}")
+    for key, value in running.env().items():
+        print(f"  {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        running.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
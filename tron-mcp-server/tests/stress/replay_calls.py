@@ -0,0 +1,156 @@
+"""按 cassette 重放 call_router.call 调用序列
+
+先在真实环境中录制（TRON_CASSETTE_MODE=record），得到包含上游请求 / 响应 / 耗时
+以及工具调用序列的 cassette；然后在离线环境中用本脚本重放:
+上游响应来自 cassette，延迟按原始耗时 × --scale 模拟，call_router 之上的逻辑
+（缓存、并发、格式化等）真实执行。输出每个动作录制时与重放时的延迟对比。
+
+重放时的钱包 / 地址簿等环境变量应与录制时一致，否则签名、余额检查等结果可能不同。
+
+用法:
+    TRON_CASSETTE_MODE=record tron-mcp-server            # 录制（退出时写出 cassette）
+    python tests/stress/replay_calls.py ~/.tron_mcp/cassette.jsonl.gz
+    python tests/stress/replay_calls.py cassette.jsonl.gz --scale 0.5 --concurrency 8
+    python tests/stress/replay_calls.py cassette.jsonl.gz --timing     # 保留原始调用间隔
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def replay(
+    path: str,
+    latency_scale: float = 1.0,
+    concurrency: int = 1,
+    preserve_timing: bool = False,
+    actions: Optional[List[str]] = None,
+) -> Dict[str, dict]:
+    """
+    以 replay 模式重放 cassette 中的调用序列
+
+    Args:
+        path: cassette 文件
+        latency_scale: 上游延迟缩放系数（0 表示不等待）
+        concurrency: 并发线程数（1 时严格按录制顺序串行）
+        preserve_timing: 按录制时的调用时间偏移（× latency_scale）发起调用
+        actions: 只重放指定动作
+
+    Returns:
+        {动作名: {count, errors, recorded_p50_ms, p50_ms, p95_ms, p99_ms}}，
+        另含 "_total": {calls, recorded_ms, wall_ms}
+    """
+    from tron_mcp_server import call_router, cassette, metrics
+
+    previous = (cassette.mode(), cassette._path, cassette._scale)
+    cassette.configure("replay", path, latency_scale)
+    try:
+        calls = [c for c in cassette.recorded_calls() if not actions or c["action"] in actions]
+        durations: Dict[str, List[float]] = {}
+        errors: Dict[str, Dict[str, int]] = {}
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def one(entry: dict) -> None:
+            if preserve_timing:
+                delay = entry["offset_ms"] / 1000 * latency_scale - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            action = entry["action"]
+            start = time.perf_counter()
+            try:
+                error_type = metrics.result_error_type(call_router.call(action, dict(entry["params"])))
+            except Exception as e:
+                error_type = type(e).__name__
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                durations.setdefault(action, []).append(elapsed)
+                if error_type:
+                    counts = errors.setdefault(action, {})
+                    counts[error_type] = counts.get(error_type, 0) + 1
+
+        if concurrency <= 1:
+            for entry in calls:
+                one(entry)
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(one, calls))
+        wall_ms = (time.perf_counter() - started) * 1000
+    finally:
+        cassette.configure(previous[0], previous[1], previous[2])
+
+    results: Dict[str, dict] = {}
+    for action in dict.fromkeys(c["action"] for c in calls):
+        replayed = sorted(durations.get(action, []))
+        recorded = sorted(c["elapsed_ms"] for c in calls if c["action"] == action)
+        results[action] = {
+            "count": len(replayed),
+            "errors": errors.get(action, {}),
+            "recorded_p50_ms": _percentile(recorded, 0.50),
+            "p50_ms": _percentile(replayed, 0.50),
+            "p95_ms": _percentile(replayed, 0.95),
+            "p99_ms": _percentile(replayed, 0.99),
+        }
+    recorded_span = (calls[-1]["offset_ms"] + calls[-1]["elapsed_ms"] - calls[0]["offset_ms"]) if calls else 0.0
+    results["_total"] = {"calls": len(calls), "recorded_ms": recorded_span, "wall_ms": wall_ms}
+    return results
+
+
+def print_report(results: Dict[str, dict]) -> None:
+    print(f"{'动作':<28} {'次数':>6} {'错误':>6} {'录制p50':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print("-" * 84)
+    for action, r in results.items():
+        if action == "_total":
+            continue
+        print(
+            f"{action:<28} {r['count']:>6} {sum(r['errors'].values()):>6} {r['recorded_p50_ms']:>10.2f} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+        )
+    total = results["_total"]
+    print(f"\n共 {total['calls']} 次调用，录制跨度 {total['recorded_ms']:.0f} ms，重放耗时 {total['wall_ms']:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按 cassette 重放 call_router 调用序列")
+    parser.add_argument("path", help="cassette 文件（.jsonl.gz）")
+    parser.add_argument("--scale", type=float, default=1.0, help="上游延迟缩放系数（0 表示不等待）")
+    parser.add_argument("--concurrency", type=int, default=1, help="并发线程数（默认 1，按录制顺序串行）")
+    parser.add_argument("--timing", action="store_true", help="保留录制时的调用间隔")
+    parser.add_argument("--actions", default="", help="只重放指定动作（逗号分隔）")
+    parser.add_argument("--json", dest="json_path", default=None, help="同时把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    results = replay(
+        args.path,
+        latency_scale=args.scale,
+        concurrency=args.concurrency,
+        preserve_timing=args.timing,
+        actions=[a.strip() for a in args.actions.split(",") if a.strip()] or None,
+    )
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
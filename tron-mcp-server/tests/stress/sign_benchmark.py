@@ -0,0 +1,100 @@
+"""签名吞吐微基准 - 每秒签名数 (signatures/s)
+
+对比:
+1. legacy: ecdsa sign_digest_deterministic + 公钥恢复推导 recovery_id（旧实现）
+2. ecdsa: 签名时直接由 nonce 点 R 推导 recovery_id
+3. coincurve: libsecp256k1 可恢复签名（需 pip install coincurve）
+4. batch: sign_transactions_batch 进程池并行签名（ecdsa 后端，对比单进程串行）
+
+用法:
+    python tests/stress/sign_benchmark.py [签名次数]
+"""
+
+import os
+import sys
+import time
+import secrets
+
+# 添加项目根目录到 path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tron_mcp_server import key_manager
+
+# 默认签名次数
+DEFAULT_ITERATIONS = 300
+
+
+def _legacy_sign(tx_id_hex: str, private_key_hex: str) -> str:
+    """旧实现：签名后通过两次公钥恢复确定 recovery_id"""
+    import ecdsa
+    import ecdsa.util
+
+    sk = ecdsa.SigningKey.from_string(bytes.fromhex(private_key_hex), curve=ecdsa.SECP256k1)
+    vk = sk.get_verifying_key()
+    tx_id_bytes = bytes.fromhex(tx_id_hex)
+    signature = sk.sign_digest_deterministic(tx_id_bytes, sigencode=ecdsa.util.sigencode_string)
+    recovered_keys = ecdsa.VerifyingKey.from_public_key_recovery_with_digest(
+        signature, tx_id_bytes, curve=ecdsa.SECP256k1,
+    )
+    recovery_id = 0
+    for i, recovered_vk in enumerate(recovered_keys):
+        if recovered_vk.to_string() == vk.to_string():
+            recovery_id = i
+            break
+    return (signature + bytes([recovery_id])).hex()
+
+
+def _run(label: str, sign_func, tx_ids: list, private_key_hex: str) -> float:
+    # 预热（触发延迟导入与派生缓存）
+    sign_func(tx_ids[0], private_key_hex)
+    start = time.perf_counter()
+    for tx_id in tx_ids:
+        sign_func(tx_id, private_key_hex)
+    elapsed = time.perf_counter() - start
+    rate = len(tx_ids) / elapsed
+    print(f"{label:<10} {rate:>10.1f} sig/s   ({elapsed / len(tx_ids) * 1000:.3f} ms/sig)")
+    return rate
+
+
+def _with_backend(backend: str):
+    def sign(tx_id_hex: str, private_key_hex: str) -> str:
+        os.environ[key_manager.SIGNING_BACKEND_ENV] = backend
+        return key_manager.sign_transaction(tx_id_hex, private_key_hex)
+    return sign
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITERATIONS
+    private_key_hex = secrets.token_hex(32)
+    tx_ids = [secrets.token_hex(32) for _ in range(iterations)]
+
+    print(f"🚀 签名微基准: {iterations} 笔交易")
+    print("=" * 45)
+    baseline = _run("legacy", _legacy_sign, tx_ids, private_key_hex)
+    rate = _run("ecdsa", _with_backend("ecdsa"), tx_ids, private_key_hex)
+    print(f"{'':<10} 相对 legacy 提速 {rate / baseline:.2f}x")
+    if key_manager._coincurve_available():
+        rate = _run("coincurve", _with_backend("coincurve"), tx_ids, private_key_hex)
+        print(f"{'':<10} 相对 legacy 提速 {rate / baseline:.2f}x")
+    else:
+        print("coincurve  未安装，跳过 (pip install coincurve)")
+    print("=" * 45)
+
+    os.environ[key_manager.SIGNING_BACKEND_ENV] = "ecdsa"
+    txs = [{"txID": tx_id, "raw_data": {}} for tx_id in tx_ids]
+    start = time.perf_counter()
+    key_manager.sign_transactions_batch(txs, private_key_hex, max_workers=1)
+    serial = time.perf_counter() - start
+    start = time.perf_counter()
+    key_manager.sign_transactions_batch(txs, private_key_hex)
+    pooled = time.perf_counter() - start
+    print(f"batch 串行  {len(txs) / serial:>10.1f} sig/s")
+    print(f"batch 进程池 {len(txs) / pooled:>9.1f} sig/s   ({os.cpu_count()} 核, 含进程池启动, "
+          f"提速 {serial / pooled:.2f}x)")
+    print("=" * 45)
+
+
+if __name__ == "__main__":
+    main()
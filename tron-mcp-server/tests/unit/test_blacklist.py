@@ -0,0 +1,217 @@
+"""
+测试 blacklist.py - 本地黑名单快照预筛
+======================================
+
+覆盖以下功能：
+- 布隆过滤器: 无漏判、误判率在目标范围内、扩容
+- 快照: 批量来源刷新、学习网络检查结果、过期条目、持久化
+- 预筛: 干净地址 / 命中地址本地判定、无批量快照时回退网络、后台刷新不阻塞检查
+- check_recipient_security: 预筛命中时不发网络请求、预筛出错时回退网络、默认关闭时行为不变
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import blacklist, tx_builder, key_manager
+
+CLEAN = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+BAD = "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"
+LEARNED = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+RED_REPORT = {
+    "is_risky": True, "risk_type": "Scam", "risk_reasons": ["🔴 高危标签 (RedTag): Scam"],
+    "tags": {"Red": "Scam"}, "details": {"v2": {}, "sec": {}},
+}
+GREY_REPORT = {
+    "is_risky": True, "risk_type": "Grey: Disputed", "risk_reasons": ["⚪ 灰度存疑"],
+    "tags": {"Grey": "Disputed"}, "details": {"v2": {}, "sec": {}},
+}
+
+
+def _refresh(now: float) -> None:
+    """触发批量刷新并等待后台线程完成"""
+    thread = blacklist._get_blacklist().maybe_refresh(now)
+    if thread is not None:
+        thread.join(5)
+
+
+class TestBloomFilter(unittest.TestCase):
+    """测试布隆过滤器"""
+
+    def test_no_false_negatives_and_low_fp_rate(self):
+        addresses = [key_manager.get_address_from_private_key(f"{i + 1:064x}") for i in range(300)]
+        bloom = blacklist.BloomFilter(len(addresses))
+        for address in addresses:
+            bloom.add(address)
+        self.assertTrue(all(a in bloom for a in addresses))
+        others = [f"T{i:033d}" for i in range(5000)]
+        false_positives = sum(1 for a in others if a in bloom)
+        self.assertLess(false_positives / len(others), 0.01)
+
+    def test_snapshot_grows_bloom(self):
+        """条目超过容量时应扩容重建，且不丢失已有条目"""
+        snapshot = blacklist.BlacklistSnapshot()
+        capacity = snapshot._bloom.capacity
+        for i in range(capacity + 10):
+            snapshot.add(f"T{i:033d}", "Blacklisted", blacklist.SOURCE_BULK, 0)
+        self.assertGreater(snapshot._bloom.capacity, capacity)
+        self.assertIsNotNone(snapshot.get("T" + "0" * 33))
+
+
+class TestPrescreen(unittest.TestCase):
+    """测试预筛"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmpdir.name, "bulk.txt")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write(f"{BAD}\nnot-an-address\n")
+        self.env = {
+            "TRON_BLACKLIST_PRESCREEN": "1",
+            "TRON_BLACKLIST_PATH": os.path.join(self.tmpdir.name, "blacklist.json"),
+            "TRON_BLACKLIST_SOURCE": self.source,
+        }
+        self.patcher = patch.dict(os.environ, self.env)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        blacklist._instances.clear()
+        self.tmpdir.cleanup()
+
+    def test_bulk_snapshot_screens_locally(self):
+        """批量快照有效时，干净 / 命中地址都在本地判定"""
+        _refresh(1000)
+        hit = blacklist.prescreen(BAD, now=1000)
+        self.assertTrue(hit["is_risky"])
+        self.assertEqual(hit["source"], "local_snapshot")
+        clean = blacklist.prescreen(CLEAN, now=1001)
+        self.assertFalse(clean["is_risky"])
+        with open(self.env["TRON_BLACKLIST_PATH"], encoding="utf-8") as f:
+            self.assertIn(BAD, json.load(f)["addresses"])
+
+    def test_stale_snapshot_goes_to_network(self):
+        """快照或条目超过有效期时应回退网络检查"""
+        _refresh(1000)
+        with patch.dict(os.environ, {"TRON_BLACKLIST_SOURCE": "", "TRON_BLACKLIST_MAX_AGE": "60"}):
+            self.assertIsNone(blacklist.prescreen(CLEAN, now=2000))
+            self.assertIsNone(blacklist.prescreen(BAD, now=2000))
+
+    def test_refresh_failure_keeps_old_snapshot(self):
+        """刷新失败时继续使用旧快照"""
+        _refresh(1000)
+        os.remove(self.source)
+        with patch.dict(os.environ, {"TRON_BLACKLIST_REFRESH_INTERVAL": "10"}):
+            _refresh(2000)
+            self.assertTrue(blacklist.prescreen(BAD, now=2001)["is_risky"])
+
+    def test_refresh_runs_in_background(self):
+        """批量来源请求进行中时，检查不等待，继续使用当前快照"""
+        _refresh(1000)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_fetch(source):
+            started.set()
+            release.wait(5)
+            return [BAD, CLEAN]
+
+        with patch.dict(os.environ, {"TRON_BLACKLIST_REFRESH_INTERVAL": "10"}), \
+                patch.object(blacklist, "_fetch_bulk", side_effect=slow_fetch):
+            self.assertFalse(blacklist.prescreen(CLEAN, now=2000)["is_risky"])
+            self.assertTrue(started.wait(5))
+            # 刷新尚未完成：仍按旧快照判定，且不重复触发刷新
+            self.assertFalse(blacklist.prescreen(CLEAN, now=2001)["is_risky"])
+            self.assertIsNone(blacklist._get_blacklist().maybe_refresh(2001))
+            release.set()
+            deadline = time.monotonic() + 5
+            while blacklist._get_blacklist()._refresh_lock.locked() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(blacklist.prescreen(CLEAN, now=2002)["is_risky"])
+
+    def test_learn_without_bulk_source(self):
+        """没有批量来源时只能本地判定已学习的恶意地址，其余地址走网络"""
+        with patch.dict(os.environ, {"TRON_BLACKLIST_SOURCE": ""}):
+            blacklist.learn(LEARNED, RED_REPORT, now=1000)
+            blacklist.learn(CLEAN, GREY_REPORT, now=1000)
+            self.assertEqual(blacklist.prescreen(LEARNED, now=1001)["risk_type"], "Scam")
+            self.assertIsNone(blacklist.prescreen(CLEAN, now=1001))
+
+            blacklist._instances.clear()
+            self.assertIsNotNone(blacklist.prescreen(LEARNED, now=1002))
+
+    def test_disabled_by_default(self):
+        """未开启预筛时不做任何本地判定"""
+        with patch.dict(os.environ, {"TRON_BLACKLIST_PRESCREEN": ""}):
+            self.assertIsNone(blacklist.prescreen(BAD))
+            blacklist.learn(LEARNED, RED_REPORT)
+        self.assertFalse(os.path.exists(self.env["TRON_BLACKLIST_PATH"]))
+
+
+class TestRecipientSecurityPrescreen(unittest.TestCase):
+    """测试 check_recipient_security 集成"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        source = os.path.join(self.tmpdir.name, "bulk.json")
+        with open(source, "w", encoding="utf-8") as f:
+            json.dump({"addresses": [BAD]}, f)
+        self.patcher = patch.dict(os.environ, {
+            "TRON_BLACKLIST_PRESCREEN": "1",
+            "TRON_BLACKLIST_PATH": os.path.join(self.tmpdir.name, "blacklist.json"),
+            "TRON_BLACKLIST_SOURCE": source,
+        })
+        self.patcher.start()
+        _refresh(time.time())
+
+    def tearDown(self):
+        self.patcher.stop()
+        blacklist._instances.clear()
+        self.tmpdir.cleanup()
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_no_network_for_prescreened(self, mock_risk):
+        clean = tx_builder.check_recipient_security(CLEAN)
+        bad = tx_builder.check_recipient_security(BAD)
+        mock_risk.assert_not_called()
+        self.assertFalse(clean["is_risky"])
+        self.assertTrue(bad["is_risky"])
+        self.assertIn("security_warning", bad)
+
+    @patch('tron_mcp_server.tron_client.check_account_risk', return_value={"is_risky": False, "risk_type": "Safe"})
+    def test_prescreen_error_falls_back_to_network(self, mock_risk):
+        """预筛出错时不影响检查，改走网络"""
+        with patch.object(blacklist, "_get_blacklist", side_effect=OSError("disk error")):
+            result = tx_builder.check_recipient_security(CLEAN)
+        mock_risk.assert_called_once_with(CLEAN)
+        self.assertTrue(result["checked"])
+        self.assertFalse(result["is_risky"])
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_blocked_transfer_uses_local_reasons(self, mock_risk):
+        """本地命中的地址应被熔断拦截，且不再请求网络获取风险原因"""
+        result = tx_builder.build_unsigned_tx(CLEAN, BAD, 1, "TRX", check_balance=False)
+        self.assertTrue(result["blocked"])
+        self.assertIn("本地黑名单快照命中", result["summary"])
+        mock_risk.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+上游流量录制 / 回放测试
+======================
+
+覆盖 cassette 模块与上游 HTTP 层 / call_router 的集成:
+- 关闭时直接透传，不写文件
+- 录制请求 / 响应 / 耗时到 gzip cassette（不含请求头）
+- 回放匹配顺序、路径兜底、未命中、传输错误、延迟缩放
+- 经模拟服务录制 call_router 调用后离线重放（replay_calls 驱动）
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import json
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+stress_dir = os.path.join(project_root, "tests", "stress")
+if stress_dir not in sys.path:
+    sys.path.insert(0, stress_dir)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+import httpx
+
+from tron_mcp_server import cassette, call_router, tron_client, trongrid_client
+
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+
+def _response(payload, status=200, url="https://api.example/x"):
+    return httpx.Response(status, json=payload, request=httpx.Request("GET", url))
+
+
+class CassetteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (cassette.mode(), cassette._path, cassette._scale)
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = Path(self.tmpdir) / "cassette.jsonl.gz"
+
+    def tearDown(self):
+        cassette.configure(*self.saved)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def entries(self):
+        cassette.close()
+        return cassette.load(self.path)
+
+
+class TestRecordReplay(CassetteTestCase):
+
+    def test_off_passthrough(self):
+        cassette.configure("off", self.path)
+        send = MagicMock(return_value="raw")
+        self.assertEqual(cassette.request("tronscan", "account", send, "GET", "u", params={"a": 1}), "raw")
+        send.assert_called_once_with("u", params={"a": 1})
+        self.assertFalse(self.path.exists())
+
+    @patch('tron_mcp_server.tron_client.httpx.get')
+    def test_record_then_replay(self, mock_get):
+        mock_get.return_value = _response({"balance": 2_000_000})
+        cassette.configure("record", self.path)
+        self.assertEqual(tron_client.get_balance_trx(ADDRESS), 2.0)
+
+        (entry,) = self.entries()
+        self.assertEqual(entry["type"], "http")
+        self.assertEqual((entry["service"], entry["method"], entry["path"]), ("tronscan", "GET", "account"))
+        self.assertEqual(json.loads(entry["params"]), {"address": ADDRESS})
+        self.assertEqual(json.loads(entry["response"]), {"balance": 2_000_000})
+        self.assertNotIn("headers", entry)
+        self.assertEqual(self.path.read_bytes()[:2], b"\x1f\x8b")
+
+        cassette.configure("replay", self.path, latency_scale=0)
+        mock_get.reset_mock()
+        self.assertEqual(tron_client.get_balance_trx(ADDRESS), 2.0)
+        mock_get.assert_not_called()
+
+    @patch('tron_mcp_server.trongrid_client.httpx.post')
+    def test_replay_order_fallback_and_miss(self, mock_post):
+        mock_post.side_effect = [_response({"EnergyLimit": 1}), _response({"EnergyLimit": 2})]
+        cassette.configure("record", self.path)
+        trongrid_client._post("wallet/getaccountresource", {"address": "a"})
+        trongrid_client._post("wallet/getaccountresource", {"address": "a"})
+
+        cassette.configure("replay", self.path, latency_scale=0)
+        post = trongrid_client._post
+        self.assertEqual(post("wallet/getaccountresource", {"address": "a"})["EnergyLimit"], 1)
+        self.assertEqual(post("wallet/getaccountresource", {"address": "a"})["EnergyLimit"], 2)
+        # 用尽后重复最后一条
+        self.assertEqual(post("wallet/getaccountresource", {"address": "a"})["EnergyLimit"], 2)
+        # 请求体不同 → 按路径兜底
+        self.assertIn("EnergyLimit", post("wallet/getaccountresource", {"address": "b"}))
+        with self.assertRaises(cassette.CassetteMissError):
+            post("wallet/getnowblock", {})
+
+    @patch('tron_mcp_server.trongrid_client.httpx.post')
+    def test_errors_replayed(self, mock_post):
+        mock_post.side_effect = [httpx.ConnectError("down"), _response({}, status=503)]
+        cassette.configure("record", self.path)
+        with self.assertRaises(httpx.ConnectError):
+            trongrid_client._post("wallet/x", {})
+        with self.assertRaises(httpx.HTTPStatusError):
+            trongrid_client._post("wallet/y", {})
+        self.assertEqual(self.entries()[0]["error_type"], "ConnectError")
+
+        cassette.configure("replay", self.path, latency_scale=0)
+        with self.assertRaises(httpx.ConnectError):
+            trongrid_client._post("wallet/x", {})
+        with self.assertRaises(httpx.HTTPStatusError):
+            trongrid_client._post("wallet/y", {})
+
+    def test_latency_scale(self):
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "type": "http", "service": "tronscan", "method": "GET", "path": "block", "url": "u",
+                "params": None, "body": None, "status": 200, "response": "{}", "elapsed_ms": 200,
+            }) + "\n")
+        send = MagicMock()
+        cassette.configure("replay", self.path, latency_scale=0.25)
+        start = time.perf_counter()
+        cassette.request("tronscan", "block", send, "GET", "u")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.045)
+        cassette.configure("replay", self.path, latency_scale=0)
+        start = time.perf_counter()
+        cassette.request("tronscan", "block", send, "GET", "u")
+        self.assertLess(time.perf_counter() - start, 0.045)
+        send.assert_not_called()
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            cassette.configure("rewind")
+
+
+class TestCallReplay(CassetteTestCase):
+    """经模拟服务录制 call_router 调用序列，关闭服务后离线重放"""
+
+    def test_record_calls_and_replay_offline(self):
+        from mock_tron_server import MockTronServer, serve
+        import replay_calls
+
+        app = MockTronServer(seed=2)
+        with serve(app, backend="stdlib") as running, patch.dict(os.environ, running.env()):
+            cassette.configure("record", self.path)
+            recorded = {
+                "get_balance": call_router.call("get_balance", {"address": ADDRESS}),
+                "get_transaction_history": call_router.call("get_transaction_history", {"address": ADDRESS}),
+                "check_account_safety": call_router.call("check_account_safety", {"address": ADDRESS}),
+            }
+            call_router.call("get_balance", {})
+            cassette.close()
+            request_count = sum(app.requests.values())
+
+        calls = [e for e in self.entries() if e["type"] == "call"]
+        self.assertEqual([c["action"] for c in calls][:3], list(recorded))
+        self.assertEqual(calls[3]["error_type"], "missing_param")
+        self.assertEqual(calls[0]["params"], {"address": ADDRESS})
+        self.assertTrue(all(c["elapsed_ms"] >= 0 for c in calls))
+
+        # 服务已停止：重放只能依赖 cassette
+        results = replay_calls.replay(str(self.path), latency_scale=0)
+        self.assertEqual(results["_total"]["calls"], 4)
+        self.assertEqual(results["get_balance"]["count"], 2)
+        self.assertEqual(results["get_balance"]["errors"], {"missing_param": 1})
+        for action in ("get_transaction_history", "check_account_safety"):
+            self.assertEqual(results[action]["errors"], {}, action)
+        self.assertEqual(sum(app.requests.values()), request_count)
+        # 重放结束后恢复原模式
+        self.assertEqual(cassette.mode(), "record")
+
+        concurrent = replay_calls.replay(str(self.path), latency_scale=0, concurrency=4, actions=["get_balance"])
+        self.assertEqual(concurrent["_total"]["calls"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+测试 energy_estimator.py - TRC20 能量与手续费估算
+==================================================
+
+覆盖以下功能：
+- 按 (合约, 接收方是否已持币) 记忆能量估算，有效期内不重复请求
+- 已持币接收方的结论缓存
+- 链上能量单价每个刷新间隔最多查询一次，失败时回退默认值
+- estimateenergy 不可用时回退 triggerconstantcontract
+- static 模式、显式常量配置、估算失败时回退常量
+- check_sender_balance 使用实时估算拦截 / 放行
+"""
+
+import unittest
+import sys
+import os
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import energy_estimator, trongrid_client, tx_builder
+
+OWNER = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+HOLDER = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+NEWCOMER = "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"
+
+HOLDER_PARAM = trongrid_client._encode_address_parameter(HOLDER)
+
+
+def _fake_post(endpoint, data):
+    """模拟 TronGrid: HOLDER 持有余额，转给持币地址约 14650 能量，新地址约 29650 能量"""
+    if data["function_selector"] == "balanceOf(address)":
+        balance = "1" if data["parameter"] == HOLDER_PARAM else "0"
+        return {"result": {"result": True}, "constant_result": [balance.zfill(64)]}
+    energy = 14650 if data["parameter"].startswith(HOLDER_PARAM) else 29650
+    if endpoint == "wallet/estimateenergy":
+        return {"result": {"result": True}, "energy_required": energy}
+    return {"result": {"result": True}, "energy_used": energy}
+
+
+class _EstimatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        energy_estimator.reset()
+        energy_estimator._state.clock = lambda: self.now
+        env = {"TRON_ENERGY_ESTIMATOR": "live"}
+        self.patcher = patch.dict(os.environ, env)
+        self.patcher.start()
+        for name in ("ESTIMATED_USDT_ENERGY", "ENERGY_PRICE_SUN"):
+            os.environ.pop(name, None)
+
+    def tearDown(self):
+        self.patcher.stop()
+        energy_estimator.reset()
+        energy_estimator._state.clock = energy_estimator.time.monotonic
+
+
+class TestEnergyMemo(_EstimatorTestCase):
+    """测试能量估算记忆"""
+
+    @patch('tron_mcp_server.trongrid_client._post')
+    def test_memoized_by_recipient_balance(self, mock_post):
+        """同类接收方只估算一次，持币 / 未持币分别记忆"""
+        mock_post.side_effect = _fake_post
+        first = energy_estimator.estimate_trc20_energy(OWNER, HOLDER, 1)
+        self.assertEqual(first, {"energy": 14650, "source": "live", "recipient_has_balance": True})
+        newcomer = energy_estimator.estimate_trc20_energy(OWNER, NEWCOMER, 1)
+        self.assertEqual(newcomer["energy"], 29650)
+        calls = mock_post.call_count
+
+        again = energy_estimator.estimate_trc20_energy(OWNER, HOLDER, 500)
+        self.assertEqual(again["source"], "memoized")
+        self.assertEqual(again["energy"], 14650)
+        # 持币结论已缓存，不再调用 balanceOf
+        self.assertEqual(mock_post.call_count, calls)
+
+        self.now += energy_estimator.DEFAULT_ESTIMATE_TTL
+        self.assertEqual(energy_estimator.estimate_trc20_energy(OWNER, HOLDER, 1)["source"], "live")
+
+    @patch('tron_mcp_server.trongrid_client._post')
+    def test_falls_back_to_constant_contract(self, mock_post):
+        """节点不支持 estimateenergy 时使用 triggerconstantcontract 的 energy_used"""
+        def post(endpoint, data):
+            if endpoint == "wallet/estimateenergy":
+                return {"result": {"result": False, "message": "this node does not support estimate energy".encode().hex()}}
+            return _fake_post(endpoint, data)
+        mock_post.side_effect = post
+        self.assertEqual(energy_estimator.estimate_trc20_energy(OWNER, NEWCOMER, 1)["energy"], 29650)
+
+    @patch('tron_mcp_server.trongrid_client._post')
+    def test_failure_uses_constant(self, mock_post):
+        mock_post.side_effect = Exception("timeout")
+        result = energy_estimator.estimate_trc20_energy(OWNER, HOLDER, 1)
+        self.assertEqual(result["source"], "static")
+        self.assertEqual(result["energy"], energy_estimator.DEFAULT_ESTIMATED_USDT_ENERGY)
+
+    @patch('tron_mcp_server.trongrid_client._post')
+    def test_static_mode_and_explicit_constant(self, mock_post):
+        """static 模式、显式配置 ESTIMATED_USDT_ENERGY、未知接收方都不发请求"""
+        with patch.dict(os.environ, {"TRON_ENERGY_ESTIMATOR": "static"}):
+            self.assertEqual(energy_estimator.estimate_trc20_energy(OWNER, HOLDER, 1)["source"], "static")
+        with patch.dict(os.environ, {"ESTIMATED_USDT_ENERGY": "40000"}):
+            self.assertEqual(energy_estimator.estimate_trc20_energy(OWNER, HOLDER, 1)["energy"], 40000)
+        self.assertEqual(energy_estimator.estimate_trc20_energy(OWNER, None, 1)["source"], "static")
+        mock_post.assert_not_called()
+
+
+class TestEnergyPrice(_EstimatorTestCase):
+    """测试链上能量单价刷新"""
+
+    @patch('tron_mcp_server.tron_client.get_gas_parameters')
+    def test_refreshed_once_per_interval(self, mock_gas):
+        mock_gas.return_value = 100
+        self.assertEqual(energy_estimator.get_energy_price(), {"price_sun": 100, "source": "live"})
+        self.now += energy_estimator.DEFAULT_PRICE_REFRESH - 1
+        mock_gas.return_value = 210
+        self.assertEqual(energy_estimator.get_energy_price()["price_sun"], 100)
+        self.assertEqual(mock_gas.call_count, 1)
+        self.now += 1
+        self.assertEqual(energy_estimator.get_energy_price()["price_sun"], 210)
+        self.assertEqual(mock_gas.call_count, 2)
+
+    @patch('tron_mcp_server.tron_client.get_gas_parameters')
+    def test_failure_falls_back_and_retries_later(self, mock_gas):
+        mock_gas.side_effect = Exception("timeout")
+        price = energy_estimator.get_energy_price()
+        self.assertEqual(price, {"price_sun": energy_estimator.DEFAULT_ENERGY_PRICE_SUN, "source": "static"})
+        energy_estimator.get_energy_price()
+        self.assertEqual(mock_gas.call_count, 1)
+        self.now += energy_estimator.PRICE_RETRY_INTERVAL
+        mock_gas.side_effect = None
+        mock_gas.return_value = 100
+        self.assertEqual(energy_estimator.get_energy_price()["price_sun"], 100)
+
+
+class TestSenderBalanceCheck(_EstimatorTestCase):
+    """测试 check_sender_balance 使用实时估算"""
+
+    @patch('tron_mcp_server.tron_client.get_gas_parameters', return_value=100)
+    @patch('tron_mcp_server.trongrid_client._post')
+    @patch('tron_mcp_server.tron_client.get_usdt_balance', return_value=100.0)
+    @patch('tron_mcp_server.tron_client.get_balance_trx', return_value=5.0)
+    def test_accurate_fee_allows_transfer(self, _trx, _usdt, mock_post, _gas):
+        """5 TRX 足够支付向持币地址转账的实际手续费（14650 × 100 SUN），常量估算会误拦截"""
+        mock_post.side_effect = _fake_post
+        result = tx_builder.check_sender_balance(OWNER, 10, "USDT", to_address=HOLDER)
+        self.assertTrue(result["sufficient"])
+        self.assertEqual(result["fee_estimate"]["energy_fee_sun"], 14650 * 100)
+
+        with patch.dict(os.environ, {"TRON_ENERGY_ESTIMATOR": "static"}):
+            with self.assertRaises(tx_builder.InsufficientBalanceError):
+                tx_builder.check_sender_balance(OWNER, 10, "USDT", to_address=HOLDER)
+
+    @patch('tron_mcp_server.tron_client.get_gas_parameters', return_value=420)
+    @patch('tron_mcp_server.trongrid_client._post')
+    @patch('tron_mcp_server.tron_client.get_usdt_balance', return_value=100.0)
+    @patch('tron_mcp_server.tron_client.get_balance_trx', return_value=10.0)
+    def test_new_recipient_blocked(self, _trx, _usdt, mock_post, _gas):
+        mock_post.side_effect = _fake_post
+        with self.assertRaises(tx_builder.InsufficientBalanceError) as ctx:
+            tx_builder.check_sender_balance(OWNER, 10, "USDT", to_address=NEWCOMER)
+        self.assertEqual(ctx.exception.error_code, "insufficient_trx_for_gas")
+        self.assertEqual(ctx.exception.details["fee_estimate"]["energy"], 29650)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,317 @@
+"""
+自动补足能量测试
+================
+
+覆盖 energy_topup 模块与 transfer 路由集成:
+- 开关: 环境变量与逐笔参数
+- 剩余能量短暂缓存
+- 只租赁缺口 / 最小起租量
+- 租赁比燃烧贵、未配置凭证、下单失败时回退燃烧
+- 等待下单许可时不持有钱包锁
+- transfer 路由: 能量询价与安全检查并发，预检通过后才下单；TRX 仅不足以燃烧能量时租赁后放行
+"""
+
+import unittest
+import sys
+import os
+import threading
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import energy_topup, energy_estimator, call_router, tx_builder
+
+TEST_PRIVATE_KEY = "0000000000000000000000000000000000000000000000000000000000000001"
+OWNER = "TMVQGm1qAQYVdetCeGRRkTWYYrLXuHK2HC"
+ALICE = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+# 静态估算: 65000 Energy × 420 SUN
+STATIC_ENERGY = 65000
+STATIC_PRICE_SUN = 420
+
+ENV = {
+    "TRON_ENERGY_ESTIMATOR": "static",
+    "TRON_ENERGY_TOPUP_WAIT": "0",
+    "TRON_ENERGY_LEASE_MIN": "",
+    "TRON_AUTO_ENERGY_TOPUP": "",
+}
+
+
+def _energy(remaining):
+    return {"energy_remaining": remaining}
+
+
+def _tronzap(price_sun=90):
+    """模拟 TronZap 客户端: 报价按 price_sun / Energy 计费"""
+    client = MagicMock()
+    client.quote_energy.side_effect = lambda address, amount, duration=1: {
+        "energy": amount, "cost": {"trx": amount * price_sun / 1_000_000}, "cached": False,
+    }
+    client.create_energy_transaction.return_value = {"id": "tz-1", "status": "pending"}
+    return client
+
+
+class EnergyTopupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, ENV)
+        self.env.start()
+        energy_topup.invalidate()
+        energy_estimator.reset()
+
+    def tearDown(self):
+        energy_topup.invalidate()
+        self.env.stop()
+
+
+class TestEnabled(EnergyTopupTestCase):
+
+    def test_env_and_override(self):
+        self.assertFalse(energy_topup.enabled())
+        with patch.dict(os.environ, {"TRON_AUTO_ENERGY_TOPUP": "1"}):
+            self.assertTrue(energy_topup.enabled())
+            self.assertFalse(energy_topup.enabled(False))
+        self.assertTrue(energy_topup.enabled(True))
+
+
+class TestAvailableEnergy(EnergyTopupTestCase):
+
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(1000))
+    def test_cached_until_invalidated(self, mock_energy):
+        self.assertEqual(energy_topup.get_available_energy(OWNER), 1000)
+        self.assertEqual(energy_topup.get_available_energy(OWNER), 1000)
+        self.assertEqual(mock_energy.call_count, 1)
+        energy_topup.invalidate(OWNER)
+        energy_topup.get_available_energy(OWNER)
+        self.assertEqual(mock_energy.call_count, 2)
+
+    @patch.dict(os.environ, {"TRON_ENERGY_TOPUP_CACHE_TTL": "0"})
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(1000))
+    def test_zero_ttl_disables_cache(self, mock_energy):
+        energy_topup.get_available_energy(OWNER)
+        energy_topup.get_available_energy(OWNER)
+        self.assertEqual(mock_energy.call_count, 2)
+
+
+class TestTopUp(EnergyTopupTestCase):
+
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(STATIC_ENERGY))
+    def test_sufficient_skips_lease(self, _energy_mock, mock_client):
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["status"], energy_topup.STATUS_SUFFICIENT)
+        self.assertEqual(result["shortfall"], 0)
+        mock_client.assert_not_called()
+
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy')
+    def test_leases_only_shortfall(self, mock_energy, mock_client):
+        client = mock_client.return_value = _tronzap()
+        # 下单前 20000，到账后 65000
+        mock_energy.side_effect = [_energy(20000), _energy(STATIC_ENERGY)]
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["status"], energy_topup.STATUS_LEASED)
+        self.assertEqual(result["lease_amount"], 45000)
+        self.assertEqual(result["burn_cost_sun"], 45000 * STATIC_PRICE_SUN)
+        self.assertEqual(result["lease_cost_sun"], 45000 * 90)
+        self.assertEqual(result["saved_sun"], 45000 * (STATIC_PRICE_SUN - 90))
+        self.assertEqual(result["transaction_id"], "tz-1")
+        self.assertTrue(result["arrived"])
+        client.create_energy_transaction.assert_called_once_with(OWNER, 45000, energy_topup.TOPUP_LEASE_DURATION)
+
+    @patch.dict(os.environ, {"TRON_ENERGY_LEASE_MIN": "32000"})
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(60000))
+    def test_lease_minimum(self, _energy_mock, mock_client):
+        mock_client.return_value = _tronzap()
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["shortfall"], 5000)
+        self.assertEqual(result["lease_amount"], 32000)
+        # 最小起租量 32000 × 90 > 缺口 5000 × 420 → 燃烧更便宜
+        self.assertEqual(result["status"], energy_topup.STATUS_BURN)
+        mock_client.return_value.create_energy_transaction.assert_not_called()
+
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(0))
+    def test_burn_when_lease_expensive(self, _energy_mock, mock_client):
+        mock_client.return_value = _tronzap(price_sun=500)
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["status"], energy_topup.STATUS_BURN)
+        mock_client.return_value.create_energy_transaction.assert_not_called()
+
+    @patch('tron_mcp_server.tronzap_client.get_client', side_effect=ValueError("缺少 TronZap API 凭证"))
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(0))
+    def test_unavailable_without_credentials(self, *_mocks):
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["status"], energy_topup.STATUS_UNAVAILABLE)
+        self.assertEqual(result["shortfall"], STATIC_ENERGY)
+
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(0))
+    def test_order_failure(self, _energy_mock, mock_client):
+        client = mock_client.return_value = _tronzap()
+        client.create_energy_transaction.side_effect = RuntimeError("Not enough balance")
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["status"], energy_topup.STATUS_FAILED)
+        self.assertIn("Not enough balance", result["error"])
+
+    @patch('tron_mcp_server.tron_client.get_account_energy', side_effect=RuntimeError("timeout"))
+    def test_energy_query_failure(self, _energy_mock):
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["status"], energy_topup.STATUS_FAILED)
+
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(0))
+    def test_not_arrived(self, _energy_mock, mock_client):
+        mock_client.return_value = _tronzap()
+        result = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(result["status"], energy_topup.STATUS_LEASED)
+        self.assertFalse(result["arrived"])
+
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy')
+    def test_gate_wait_releases_wallet_lock(self, mock_energy, mock_client):
+        """等待下单许可时不持有钱包锁；获准后重新确认缺口，不重复租赁"""
+        client = mock_client.return_value = _tronzap()
+        leased = threading.Event()
+        client.create_energy_transaction.side_effect = lambda *_args: leased.set() or {"id": "tz-1"}
+        mock_energy.side_effect = lambda _address: _energy(STATIC_ENERGY if leased.is_set() else 0)
+
+        gate = energy_topup.OrderGate()
+        waiting = threading.Event()
+        gate_wait = gate.wait
+        gate.wait = lambda timeout=None: waiting.set() or gate_wait(timeout)
+        future = energy_topup.start(OWNER, ALICE, 10, gate=gate)
+        self.assertTrue(waiting.wait(5))
+        self.assertFalse(energy_topup._address_lock(OWNER).locked())
+
+        # 同一钱包的另一笔转账不必等待待定订单
+        other = energy_topup.top_up(OWNER, ALICE, 10)
+        self.assertEqual(other["status"], energy_topup.STATUS_LEASED)
+
+        gate.approve()
+        result = future.result(5)
+        self.assertEqual(result["status"], energy_topup.STATUS_SUFFICIENT)
+        client.create_energy_transaction.assert_called_once()
+
+
+class TestTransferIntegration(EnergyTopupTestCase):
+    """transfer 路由集成"""
+
+    def setUp(self):
+        super().setUp()
+        self.key_env = patch.dict(os.environ, {"TRON_PRIVATE_KEY": TEST_PRIVATE_KEY, "TRON_PRIVATE_KEYS": ""})
+        self.key_env.start()
+
+    def tearDown(self):
+        self.key_env.stop()
+        super().tearDown()
+
+    def _transfer(self, **extra):
+        return call_router.call("transfer", {"to": ALICE, "amount": 10, "token": "USDT", **extra})
+
+    @patch('tron_mcp_server.trongrid_client.broadcast_transaction', return_value={"result": True, "txid": "c" * 64})
+    @patch('tron_mcp_server.trongrid_client.build_trc20_transfer', return_value={"txID": "c" * 64, "raw_data": {}})
+    @patch('tron_mcp_server.energy_topup.top_up')
+    @patch('tron_mcp_server.tx_builder.build_unsigned_tx')
+    def test_topup_runs_concurrently_with_checks(self, mock_preview, mock_top_up, *_mocks):
+        """能量补足在后台线程执行，与安全检查同时进行"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def top_up(*_args):
+            started.set()
+            release.wait(5)
+            return {"status": "leased", "lease_amount": 45000, "lease_cost_sun": 4_050_000,
+                    "saved_sun": 14_850_000, "arrived": True}
+
+        def preview(*_args, **_kwargs):
+            # 安全检查进行中时，补足已在后台开始
+            self.assertTrue(started.wait(5))
+            release.set()
+            return {"txID": "preview", "raw_data": {}}
+
+        mock_top_up.side_effect = top_up
+        mock_preview.side_effect = preview
+        result = self._transfer(auto_energy_topup=True)
+        self.assertTrue(result.get("result"))
+        self.assertEqual(result["energy_topup"]["status"], "leased")
+        self.assertIn("已自动租赁 45,000 能量", result["summary"])
+
+    @patch('tron_mcp_server.trongrid_client.broadcast_transaction', return_value={"result": True, "txid": "c" * 64})
+    @patch('tron_mcp_server.trongrid_client.build_trc20_transfer', return_value={"txID": "c" * 64, "raw_data": {}})
+    @patch('tron_mcp_server.energy_topup.top_up', return_value={"status": "leased", "arrived": True})
+    @patch('tron_mcp_server.tx_builder.build_unsigned_tx')
+    def test_leased_energy_lifts_gas_rejection(self, mock_preview, *_mocks):
+        """仅因 TRX 不足以燃烧能量被拒绝时，租到能量后跳过余额检查重新构建"""
+        mock_preview.side_effect = [
+            tx_builder.InsufficientBalanceError(
+                "TRX 不足", "insufficient_trx_for_gas",
+                {"errors": [{"code": "insufficient_trx_for_gas"}]},
+            ),
+            {"txID": "preview", "raw_data": {}},
+        ]
+        result = self._transfer(auto_energy_topup=True)
+        self.assertTrue(result.get("result"))
+        self.assertFalse(mock_preview.call_args.kwargs["check_balance"])
+
+    @patch('tron_mcp_server.energy_topup.top_up', return_value={"status": "leased", "arrived": True})
+    @patch('tron_mcp_server.tx_builder.build_unsigned_tx')
+    def test_usdt_shortage_still_rejected(self, mock_preview, _top_up):
+        mock_preview.side_effect = tx_builder.InsufficientBalanceError(
+            "USDT 不足", "insufficient_usdt",
+            {"errors": [{"code": "insufficient_usdt"}, {"code": "insufficient_trx_for_gas"}]},
+        )
+        result = self._transfer(auto_energy_topup=True)
+        self.assertEqual(result["error_type"], "insufficient_usdt")
+        self.assertEqual(result["energy_topup"]["status"], "leased")
+        self.assertEqual(mock_preview.call_count, 1)
+
+    @patch('tron_mcp_server.tronzap_client.get_client')
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value=_energy(0))
+    @patch('tron_mcp_server.tx_builder.build_unsigned_tx')
+    def test_rejected_transfer_never_orders(self, mock_preview, _energy_mock, mock_client):
+        """预检拦截或余额不足时只询价，不向 TronZap 下单"""
+        client = mock_client.return_value = _tronzap()
+        rejections = {
+            "blocked": {"blocked": True, "summary": "⛔ 风险地址"},
+            "insufficient_usdt": tx_builder.InsufficientBalanceError(
+                "USDT 不足", "insufficient_usdt", {"errors": [{"code": "insufficient_usdt"}]},
+            ),
+        }
+        for name, rejection in rejections.items():
+            with self.subTest(name):
+                energy_topup.invalidate()
+                mock_preview.side_effect = [rejection] if isinstance(rejection, Exception) else None
+                mock_preview.return_value = rejection
+                result = self._transfer(auto_energy_topup=True)
+                self.assertEqual(result["energy_topup"]["status"], energy_topup.STATUS_CANCELLED)
+        self.assertEqual(client.quote_energy.call_count, 2)
+        client.create_energy_transaction.assert_not_called()
+
+    @patch('tron_mcp_server.trongrid_client.broadcast_transaction', return_value={"result": True, "txid": "c" * 64})
+    @patch('tron_mcp_server.trongrid_client.build_trx_transfer', return_value={"txID": "d" * 64, "raw_data": {}})
+    @patch('tron_mcp_server.trongrid_client.build_trc20_transfer', return_value={"txID": "c" * 64, "raw_data": {}})
+    @patch('tron_mcp_server.energy_topup.start')
+    @patch('tron_mcp_server.tx_builder.build_unsigned_tx', return_value={"txID": "preview", "raw_data": {}})
+    def test_disabled_by_default(self, _preview, mock_start, *_mocks):
+        result = self._transfer()
+        self.assertNotIn("energy_topup", result)
+        mock_start.assert_not_called()
+        # TRX 转账不补足能量
+        call_router.call("transfer", {"to": ALICE, "amount": 1, "token": "TRX", "auto_energy_topup": True})
+        mock_start.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
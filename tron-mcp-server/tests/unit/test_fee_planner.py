@@ -0,0 +1,152 @@
+"""
+测试 fee_planner.py - 批量转账手续费与资源规划
+==============================================
+
+覆盖以下功能：
+- 能量缺口: 租赁比燃烧便宜时租赁，未配置租赁单价 / 最小起租量过大时燃烧
+- 执行顺序: 先租赁，再按带宽从大到小执行转账（按笔全额覆盖的带宽少烧 TRX）
+- 带宽租赁补足缺口
+- 余额可行性检查
+- plan_transfers 路由参数校验
+"""
+
+import unittest
+import sys
+import os
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import fee_planner, call_router
+
+OWNER = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+ALICE = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+BOB = "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"
+
+NO_RESOURCES = {"freeNetLimit": 600, "freeNetUsed": 600}
+
+
+@patch.dict(os.environ, {"TRON_ENERGY_ESTIMATOR": "static"})
+@patch('tron_mcp_server.tron_client.get_usdt_balance', return_value=1000.0)
+@patch('tron_mcp_server.tron_client.get_balance_trx', return_value=500.0)
+class TestPlanTransfers(unittest.TestCase):
+    """测试规划结果（静态能量估算: 每笔 USDT 65000 Energy，420 SUN/Energy）"""
+
+    @patch('tron_mcp_server.trongrid_client.get_account_resource', return_value=NO_RESOURCES)
+    def test_lease_cheaper_than_burn(self, _resource, *_balances):
+        transfers = [
+            {"to": ALICE, "amount": 1, "token": "TRX"},
+            {"to": ALICE, "amount": 10},
+            {"to": BOB, "amount": 20, "token": "usdt"},
+        ]
+        plan = fee_planner.plan_transfers(OWNER, transfers, energy_lease_price_sun=90)
+        self.assertEqual(plan["demand"]["energy"], 130000)
+        self.assertEqual(plan["energy"]["strategy"], "lease")
+        self.assertEqual(plan["energy"]["lease_amount"], 130000)
+        self.assertEqual(plan["energy"]["saved_sun"], 130000 * (420 - 90))
+
+        actions = [(s["action"], s["params"].get("token")) for s in plan["steps"]]
+        self.assertEqual(actions, [
+            ("lease_energy", None), ("transfer", "USDT"), ("transfer", "USDT"), ("transfer", "TRX"),
+        ])
+        self.assertEqual([s["step"] for s in plan["steps"]], [1, 2, 3, 4])
+        self.assertEqual(plan["steps"][0]["params"], {"to_address": OWNER, "amount": 130000, "duration": 1})
+        self.assertTrue(all(s["energy_burn_sun"] == 0 for s in plan["steps"][1:]))
+        # 带宽无可用额度，三笔全部燃烧
+        self.assertEqual(plan["totals"]["burn_sun"], (350 + 350 + 270) * 1000)
+        self.assertTrue(plan["feasible"])
+
+    @patch('tron_mcp_server.trongrid_client.get_account_resource')
+    def test_burn_without_lease_price_or_below_minimum(self, mock_resource, *_balances):
+        """未配置租赁单价时燃烧；缺口小于最小起租量且租赁更贵时也燃烧"""
+        mock_resource.return_value = {"EnergyLimit": 60000, "EnergyUsed": 0}
+        transfers = [{"to": ALICE, "amount": 1}]
+        plan = fee_planner.plan_transfers(OWNER, transfers)
+        self.assertEqual(plan["energy"]["strategy"], "burn")
+        self.assertEqual(plan["energy"]["shortfall"], 5000)
+        self.assertEqual(plan["steps"][0]["action"], "transfer")
+        self.assertEqual(plan["steps"][0]["energy_burn_sun"], 5000 * 420)
+
+        with patch.dict(os.environ, {"TRON_ENERGY_LEASE_MIN": "32000"}):
+            plan = fee_planner.plan_transfers(OWNER, transfers, energy_lease_price_sun=90)
+        self.assertEqual(plan["energy"]["strategy"], "burn")
+
+        mock_resource.return_value = {"EnergyLimit": 100000, "EnergyUsed": 0}
+        plan = fee_planner.plan_transfers(OWNER, transfers, energy_lease_price_sun=90)
+        self.assertEqual(plan["energy"]["strategy"], "none")
+        self.assertEqual(plan["totals"]["total_cost_sun"], 0)
+
+    @patch('tron_mcp_server.trongrid_client.get_account_resource', return_value={"freeNetLimit": 600})
+    def test_order_uses_free_bandwidth_for_larger_transfer(self, _resource, *_balances):
+        """600 免费带宽: 先执行 USDT（350）再执行 TRX（270），只烧 270 字节"""
+        transfers = [{"to": ALICE, "amount": 1, "token": "TRX"}, {"to": BOB, "amount": 1}]
+        plan = fee_planner.plan_transfers(OWNER, transfers)
+        self.assertEqual([s["input_index"] for s in plan["steps"]], [1, 0])
+        self.assertEqual(plan["bandwidth"]["shortfall"], 270)
+        self.assertEqual([s["bandwidth_burn_sun"] for s in plan["steps"]], [0, 270 * 1000])
+
+    @patch('tron_mcp_server.trongrid_client.get_account_resource', return_value=NO_RESOURCES)
+    def test_bandwidth_lease(self, _resource, *_balances):
+        transfers = [{"to": ALICE, "amount": 1, "token": "TRX"}] * 3
+        plan = fee_planner.plan_transfers(OWNER, transfers, bandwidth_lease_price_sun=300)
+        self.assertEqual(plan["bandwidth"]["strategy"], "lease")
+        self.assertEqual(plan["bandwidth"]["lease_amount"], 810)
+        self.assertEqual(plan["steps"][0]["action"], "lease_bandwidth")
+        self.assertEqual(plan["totals"]["burn_sun"], 0)
+        self.assertEqual(plan["totals"]["saved_sun"], 810 * (1000 - 300))
+
+    @patch('tron_mcp_server.trongrid_client.get_account_resource', return_value=NO_RESOURCES)
+    def test_infeasible_balance(self, _resource, mock_trx, _usdt):
+        mock_trx.return_value = 10.0
+        plan = fee_planner.plan_transfers(OWNER, [{"to": ALICE, "amount": 1}])
+        self.assertFalse(plan["feasible"])
+        self.assertGreater(plan["required"]["trx"], 10.0)
+
+    def test_invalid_transfers(self, *_balances):
+        for transfers in ([], [{"to": "bad", "amount": 1}], [{"to": ALICE, "amount": 0}],
+                          [{"to": ALICE, "amount": 1, "token": "BTC"}], ["x"]):
+            with self.assertRaises(ValueError):
+                fee_planner.plan_transfers(OWNER, transfers)
+
+
+@patch.dict(os.environ, {"TRON_ENERGY_ESTIMATOR": "static"})
+class TestPlanTransfersRouter(unittest.TestCase):
+    """测试 plan_transfers 路由"""
+
+    @patch('tron_mcp_server.tron_client.get_usdt_balance', return_value=1000.0)
+    @patch('tron_mcp_server.tron_client.get_balance_trx', return_value=500.0)
+    @patch('tron_mcp_server.trongrid_client.get_account_resource', return_value=NO_RESOURCES)
+    def test_plan_with_summary(self, *_mocks):
+        result = call_router.call("plan_transfers", {
+            "from": OWNER,
+            "transfers": [{"to": ALICE, "amount": 5}],
+            "energy_lease_price_sun": "90",
+        })
+        self.assertNotIn("error", result)
+        self.assertEqual(result["energy"]["strategy"], "lease")
+        self.assertIn("租赁 65,000", result["summary"])
+
+    def test_invalid_params(self):
+        self.assertIn("error", call_router.call("plan_transfers", {"from": OWNER}))
+        self.assertIn("error", call_router.call("plan_transfers", {
+            "from": OWNER, "transfers": [{"to": ALICE, "amount": 1}], "lease_duration": 3,
+        }))
+        self.assertIn("error", call_router.call("plan_transfers", {
+            "from": OWNER, "transfers": [{"to": ALICE, "amount": 1}], "energy_lease_price_sun": "cheap",
+        }))
+        result = call_router.call("plan_transfers", {"from": OWNER, "transfers": [{"to": "bad", "amount": 1}]})
+        self.assertIn("error", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
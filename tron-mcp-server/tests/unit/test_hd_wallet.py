@@ -0,0 +1,254 @@
+"""
+测试 key_manager.py - HD 钱包 (BIP32 / BIP44) 派生
+==================================================
+
+覆盖以下功能：
+- BIP32 官方测试向量（主节点、硬化 / 非硬化子节点）
+- BIP39 助记词 → TRON BIP44 地址
+- 派生路径解析与格式化
+- 批量派生: 与逐个派生结果一致、复用缓存的中间节点
+- 地址索引: 持久化、原子写入、种子指纹校验、O(1) 反查
+- hd_derive_addresses / hd_lookup_address 路由
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import key_manager, call_router
+
+# BIP32 测试向量 1
+BIP32_SEED = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+
+# 标准测试助记词（仅用于测试，切勿用于真实资金）
+TEST_MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+TEST_MNEMONIC_ADDRESS = "TUEZSdKsoDHQMeZwihtdoBiN46zxhGWYdH"
+
+
+class TestBip32Derivation(unittest.TestCase):
+    """测试 BIP32 派生正确性"""
+
+    def setUp(self):
+        self.deriver = key_manager.HDKeyDeriver(BIP32_SEED)
+
+    def test_master_key(self):
+        """主私钥应与 BIP32 测试向量一致"""
+        self.assertEqual(
+            self.deriver.derive_private_key("m"),
+            "e8f32e723decf4051aefac8e2c93c9c5b214313817cdb01a1494b917c8436b35",
+        )
+
+    def test_hardened_child(self):
+        """硬化子节点 m/0' 应与测试向量一致"""
+        self.assertEqual(
+            self.deriver.derive_private_key("m/0'"),
+            "edb2e14f9ee77d26dd93b4ecede8d16ed408ce149b6cd80b0715a2d911a0afea",
+        )
+
+    def test_mixed_path(self):
+        """混合路径 m/0'/1/2'/2/1000000000 应与测试向量一致"""
+        self.assertEqual(
+            self.deriver.derive_private_key("m/0'/1/2'/2/1000000000"),
+            "471b76e389e528d6de6d816857e012c5455051cad6660850e58372a6c3e6e7c8",
+        )
+
+    def test_mnemonic_tron_address(self):
+        """标准助记词在 m/44'/195'/0'/0/0 应派生出已知 TRON 地址"""
+        deriver = key_manager.HDKeyDeriver(key_manager.mnemonic_to_seed(TEST_MNEMONIC))
+        self.assertEqual(deriver.derive_address(key_manager.tron_bip44_path(0, 0)), TEST_MNEMONIC_ADDRESS)
+
+    def test_ecdsa_fallback_matches(self):
+        """未安装 coincurve 时派生结果应一致"""
+        with patch.object(key_manager, "_coincurve_available", return_value=False):
+            deriver = key_manager.HDKeyDeriver(key_manager.mnemonic_to_seed(TEST_MNEMONIC))
+            self.assertEqual(deriver.derive_address("m/44'/195'/0'/0/0"), TEST_MNEMONIC_ADDRESS)
+
+
+class TestDerivationPath(unittest.TestCase):
+    """测试派生路径解析"""
+
+    def test_parse_and_format_roundtrip(self):
+        path = "m/44'/195'/3'/0/17"
+        indexes = key_manager.parse_derivation_path(path)
+        self.assertEqual(indexes, (44 | key_manager.HD_HARDENED, 195 | key_manager.HD_HARDENED,
+                                   3 | key_manager.HD_HARDENED, 0, 17))
+        self.assertEqual(key_manager.format_derivation_path(indexes), path)
+
+    def test_invalid_paths(self):
+        """无效路径应抛出 ValueError"""
+        for path in ("44'/195'", "m/abc", "m/2147483648", "m//1"):
+            with self.assertRaises(ValueError, msg=path):
+                key_manager.parse_derivation_path(path)
+
+
+class TestBatchDerivation(unittest.TestCase):
+    """测试批量派生"""
+
+    def setUp(self):
+        self.deriver = key_manager.HDKeyDeriver(key_manager.mnemonic_to_seed(TEST_MNEMONIC))
+
+    def test_batch_matches_single_and_private_key(self):
+        """批量派生结果应与逐个派生、以及私钥推导的地址一致"""
+        entries = self.deriver.derive_addresses(account=1, start=5, count=4)
+        self.assertEqual([e["index"] for e in entries], [5, 6, 7, 8])
+        for entry in entries:
+            self.assertEqual(entry["path"], f"m/44'/195'/1'/0/{entry['index']}")
+            self.assertEqual(entry["address"], self.deriver.derive_address(entry["path"]))
+            pk = self.deriver.derive_private_key(entry["path"])
+            self.assertEqual(entry["address"], key_manager.get_address_from_private_key(pk))
+
+    def test_intermediate_nodes_cached(self):
+        """批量派生应缓存中间节点，叶子节点不进入缓存"""
+        self.deriver.derive_addresses(account=0, start=0, count=50)
+        cached = self.deriver._nodes
+        change_path = key_manager.parse_derivation_path("m/44'/195'/0'/0")
+        self.assertIn(change_path, cached)
+        self.assertEqual(len(cached), 5)  # m, 44', 195', 0', 0
+        with patch.object(key_manager, "_ckd_priv", wraps=key_manager._ckd_priv) as ckd:
+            self.deriver.derive_addresses(account=0, start=50, count=10)
+        self.assertEqual(ckd.call_count, 10)
+
+
+class TestHDAddressIndex(unittest.TestCase):
+    """测试持久化地址索引"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmpdir.name, "hd_index.json")
+        from pathlib import Path
+        self.path = Path(self.index_path)
+        self.seed = key_manager.mnemonic_to_seed(TEST_MNEMONIC)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_derive_next_continues_and_persists(self):
+        """derive_next 应从上次序号继续，并持久化到索引文件"""
+        wallet = key_manager.HDWallet(self.seed, self.path)
+        first = wallet.derive_next(3)
+        second = wallet.derive_next(2)
+        self.assertEqual([e["index"] for e in first + second], [0, 1, 2, 3, 4])
+        self.assertFalse(os.path.exists(self.index_path + ".tmp"))
+
+        reloaded = key_manager.HDWallet(self.seed, self.path)
+        self.assertEqual(len(reloaded.index), 5)
+        self.assertEqual(reloaded.index.next_index(0), 5)
+        self.assertEqual(reloaded.lookup(TEST_MNEMONIC_ADDRESS),
+                         {"path": "m/44'/195'/0'/0/0", "account": 0, "change": 0, "index": 0})
+        with open(self.index_path, encoding="utf-8") as f:
+            content = f.read()
+        self.assertNotIn(reloaded.deriver.derive_private_key("m/44'/195'/0'/0/0"), content)
+
+    def test_accounts_tracked_independently(self):
+        """不同账户的序号应独立递增"""
+        wallet = key_manager.HDWallet(self.seed, self.path)
+        wallet.derive_next(2, account=0)
+        entries = wallet.derive_next(1, account=7)
+        self.assertEqual(entries[0]["path"], "m/44'/195'/7'/0/0")
+        self.assertEqual(wallet.lookup(entries[0]["address"])["account"], 7)
+
+    def test_unknown_address(self):
+        """未派生的地址反查应返回 None"""
+        wallet = key_manager.HDWallet(self.seed, self.path)
+        self.assertIsNone(wallet.lookup("TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"))
+
+    def test_index_of_other_seed_rejected(self):
+        """索引文件属于其他种子时应拒绝加载"""
+        key_manager.HDWallet(self.seed, self.path).derive_next(1)
+        with self.assertRaises(ValueError) as ctx:
+            key_manager.HDWallet(BIP32_SEED, self.path)
+        self.assertIn("另一个种子", str(ctx.exception))
+
+    def test_invalid_count(self):
+        """派生数量越界应抛出 ValueError"""
+        wallet = key_manager.HDWallet(self.seed, self.path)
+        with self.assertRaises(ValueError):
+            wallet.derive_next(0)
+        with self.assertRaises(ValueError):
+            wallet.derive_next(key_manager.HD_MAX_BATCH + 1)
+
+
+class TestLoadHDSeed(unittest.TestCase):
+    """测试种子加载"""
+
+    def test_hex_seed_preferred(self):
+        env = {"TRON_HD_SEED": "0x" + BIP32_SEED.hex(), "TRON_MNEMONIC": TEST_MNEMONIC}
+        with patch.dict(os.environ, env, clear=True):
+            self.assertEqual(key_manager.load_hd_seed(), BIP32_SEED)
+
+    def test_mnemonic_seed(self):
+        with patch.dict(os.environ, {"TRON_MNEMONIC": TEST_MNEMONIC}, clear=True):
+            self.assertEqual(key_manager.load_hd_seed(), key_manager.mnemonic_to_seed(TEST_MNEMONIC))
+
+    def test_missing_or_invalid_seed(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(ValueError):
+                key_manager.load_hd_seed()
+        for bad in ("zz" * 16, "00" * 8):
+            with patch.dict(os.environ, {"TRON_HD_SEED": bad}, clear=True):
+                with self.assertRaises(ValueError):
+                    key_manager.load_hd_seed()
+
+
+class TestHDRoutes(unittest.TestCase):
+    """测试 hd_derive_addresses / hd_lookup_address 路由"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.env = {
+            "TRON_MNEMONIC": TEST_MNEMONIC,
+            "TRON_HD_INDEX_PATH": os.path.join(self.tmpdir.name, "hd_index.json"),
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_derive_then_lookup(self):
+        """派生后应能反查到派生路径"""
+        with patch.dict(os.environ, self.env, clear=True):
+            result = call_router.call("hd_derive_addresses", {"count": 3})
+            self.assertNotIn("error", result)
+            self.assertEqual(result["count"], 3)
+            self.assertEqual(result["addresses"][0]["address"], TEST_MNEMONIC_ADDRESS)
+            self.assertNotIn("private_key", json.dumps(result))
+
+            found = call_router.call("hd_lookup_address", {"address": result["addresses"][2]["address"]})
+            self.assertTrue(found["found"])
+            self.assertEqual(found["index"], 2)
+
+            missing = call_router.call("hd_lookup_address", {"address": "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"})
+            self.assertFalse(missing["found"])
+
+    def test_invalid_params(self):
+        """参数无效应返回错误"""
+        with patch.dict(os.environ, self.env, clear=True):
+            self.assertIn("error", call_router.call("hd_derive_addresses", {"count": "abc"}))
+            self.assertIn("error", call_router.call("hd_derive_addresses", {"count": 0}))
+            self.assertIn("error", call_router.call("hd_derive_addresses", {"account": -1}))
+            self.assertIn("error", call_router.call("hd_lookup_address", {}))
+            self.assertIn("error", call_router.call("hd_lookup_address", {"address": "bad"}))
+
+    def test_seed_not_configured(self):
+        """未配置种子应返回 hd_wallet_error"""
+        with patch.dict(os.environ, {"TRON_HD_INDEX_PATH": self.env["TRON_HD_INDEX_PATH"]}, clear=True):
+            result = call_router.call("hd_derive_addresses", {"count": 1})
+            self.assertIn("hd_wallet_error", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
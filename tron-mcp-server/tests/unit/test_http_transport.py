@@ -0,0 +1,258 @@
+"""
+streamable-HTTP 传输与停机排空测试
+==================================
+
+覆盖:
+- lifecycle: 写操作计数、排空后拒绝、wait_idle 超时
+- call_router: 排空期间拒绝 transfer 等写操作，只读动作照常执行
+- drain_app: lifespan.shutdown 时等待进行中的写操作
+- run: 收到停机信号时先进入排空，再交给 uvicorn 停止接收连接
+- create_app: 多 worker 时开启无状态会话
+- server.main: --http / --sse 命令行参数
+"""
+
+import unittest
+import sys
+import os
+import time
+import asyncio
+import threading
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import lifecycle, call_router, http_transport, server
+
+
+class LifecycleTestCase(unittest.TestCase):
+
+    def setUp(self):
+        lifecycle.reset()
+
+    def tearDown(self):
+        lifecycle.reset()
+
+
+class TestLifecycle(LifecycleTestCase):
+
+    def test_drain_rejects_new_writes(self):
+        self.assertTrue(lifecycle.try_begin())
+        self.assertEqual(lifecycle.in_flight(), 1)
+        lifecycle.begin_drain()
+        self.assertTrue(lifecycle.draining())
+        self.assertFalse(lifecycle.try_begin())
+        self.assertFalse(lifecycle.wait_idle(0.05))
+        lifecycle.end()
+        self.assertTrue(lifecycle.wait_idle(0))
+        self.assertEqual(lifecycle.in_flight(), 0)
+
+    def test_wait_idle_wakes_on_completion(self):
+        self.assertTrue(lifecycle.try_begin())
+
+        def finish():
+            time.sleep(0.05)
+            lifecycle.end()
+
+        threading.Thread(target=finish).start()
+        start = time.monotonic()
+        self.assertTrue(lifecycle.wait_idle(5))
+        self.assertLess(time.monotonic() - start, 2)
+
+
+class TestRouterDraining(LifecycleTestCase):
+
+    def test_mutating_action_rejected_while_draining(self):
+        lifecycle.begin_drain()
+        result = call_router.call("transfer", {"to": "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn", "amount": 1})
+        self.assertEqual(result["error"], "server_draining")
+        self.assertIn("transfer", result["summary"])
+        self.assertNotIn("error", call_router.call("skills"))
+
+    def test_in_flight_counted_during_transfer(self):
+        seen = []
+
+        def handler(params):
+            seen.append(lifecycle.in_flight())
+            return {"summary": "ok"}
+
+        with patch.dict(call_router._ACTION_HANDLERS, {"transfer": handler}):
+            call_router.call("transfer", {})
+        self.assertEqual(seen, [1])
+        self.assertEqual(lifecycle.in_flight(), 0)
+
+    def test_in_flight_released_on_exception(self):
+        def handler(params):
+            raise RuntimeError("boom")
+
+        with patch.dict(call_router._ACTION_HANDLERS, {"broadcast_tx": handler}):
+            with self.assertRaises(RuntimeError):
+                call_router.call("broadcast_tx", {})
+        self.assertEqual(lifecycle.in_flight(), 0)
+
+
+class TestDrainApp(LifecycleTestCase):
+
+    def run_lifespan(self, timeout):
+        received = []
+
+        async def inner(scope, receive, send):
+            while True:
+                message = await receive()
+                received.append((message["type"], lifecycle.in_flight()))
+                if message["type"] == "lifespan.shutdown":
+                    return
+
+        async def main():
+            messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                pass
+
+            await http_transport.drain_app(inner, timeout)({"type": "lifespan"}, receive, send)
+
+        asyncio.run(main())
+        return received
+
+    def test_shutdown_waits_for_in_flight(self):
+        self.assertTrue(lifecycle.try_begin())
+        threading.Timer(0.05, lifecycle.end).start()
+        received = self.run_lifespan(timeout=5)
+        self.assertEqual(received, [("lifespan.startup", 1), ("lifespan.shutdown", 0)])
+        self.assertTrue(lifecycle.draining())
+
+    def test_shutdown_timeout(self):
+        self.assertTrue(lifecycle.try_begin())
+        try:
+            with self.assertLogs("tron_mcp_server.http_transport", level="WARNING"):
+                received = self.run_lifespan(timeout=0.05)
+            self.assertEqual(received[-1], ("lifespan.shutdown", 1))
+        finally:
+            lifecycle.end()
+
+    def test_http_passthrough(self):
+        calls = []
+
+        async def inner(scope, receive, send):
+            calls.append(scope["type"])
+
+        asyncio.run(http_transport.drain_app(inner, 1)({"type": "http"}, None, None))
+        self.assertEqual(calls, ["http"])
+        self.assertFalse(lifecycle.draining())
+
+
+class TestCreateApp(unittest.TestCase):
+
+    def test_stateless_with_multiple_workers(self):
+        fake_mcp = MagicMock()
+        fake_mcp.settings.stateless_http = False
+        with patch.object(server, "mcp", fake_mcp), patch.dict(os.environ, {"MCP_WORKERS": "3"}):
+            app = http_transport.create_app()
+        self.assertTrue(callable(app))
+        self.assertTrue(fake_mcp.settings.stateless_http)
+        self.assertEqual(fake_mcp.settings.streamable_http_path, "/mcp")
+        fake_mcp.streamable_http_app.assert_called_once()
+
+    def test_single_worker_keeps_sessions(self):
+        fake_mcp = MagicMock()
+        fake_mcp.settings.stateless_http = False
+        with patch.object(server, "mcp", fake_mcp), patch.dict(os.environ, {"MCP_WORKERS": ""}):
+            http_transport.create_app()
+        self.assertFalse(fake_mcp.settings.stateless_http)
+
+    def test_env_parsing(self):
+        with patch.dict(os.environ, {"MCP_HOST": "", "MCP_PORT": "abc", "MCP_WORKERS": "0", "MCP_DRAIN_TIMEOUT": "x"}):
+            self.assertEqual(http_transport.get_host(), "127.0.0.1")
+            self.assertEqual(http_transport.get_port(), 8765)
+            self.assertEqual(http_transport.get_workers(), 1)
+            self.assertEqual(http_transport.get_drain_timeout(), 30.0)
+
+
+class TestServerMain(unittest.TestCase):
+
+    def setUp(self):
+        self.uvicorn = MagicMock()
+        self.modules = patch.dict(sys.modules, {
+            "uvicorn": self.uvicorn, "uvicorn.supervisors": self.uvicorn.supervisors,
+        })
+        self.modules.start()
+        self.env = patch.dict(os.environ, {"MCP_HOST": "", "MCP_PORT": "", "MCP_WORKERS": ""})
+        self.env.start()
+        lifecycle.reset()
+
+    def tearDown(self):
+        lifecycle.reset()
+        self.env.stop()
+        self.modules.stop()
+
+    def run_main(self, *argv):
+        with patch.object(sys, "argv", ["tron-mcp-server", *argv]), patch("builtins.print"):
+            server.main()
+
+    def test_http_mode(self):
+        self.run_main("--http", "--host", "0.0.0.0", "--port", "9000", "--workers", "4")
+        args, kwargs = self.uvicorn.Config.call_args
+        self.assertEqual(args, ("tron_mcp_server.http_transport:create_app",))
+        self.assertTrue(kwargs["factory"])
+        self.assertEqual((kwargs["host"], kwargs["port"], kwargs["workers"]), ("0.0.0.0", 9000, 4))
+        self.assertEqual(os.environ["MCP_WORKERS"], "4")
+        # 多 worker: 经 Multiprocess 启动，子进程入口为带排空的 _serve
+        supervisor = self.uvicorn.supervisors.Multiprocess
+        target = supervisor.call_args.kwargs["target"]
+        self.assertIs(target.func, http_transport._serve)
+        supervisor.return_value.run.assert_called_once()
+        self.uvicorn.Server.assert_not_called()
+
+    def test_signal_starts_drain_before_uvicorn_exit(self):
+        """停机信号先让写操作进入排空，再交给 uvicorn 停止接收连接"""
+        fake_server = self.uvicorn.Server.return_value
+        draining_at_exit = []
+        fake_server.handle_exit.side_effect = lambda sig, frame: draining_at_exit.append(lifecycle.draining())
+        fake_server.run.side_effect = lambda sockets=None: fake_server.handle_exit(15, None)
+        self.run_main("--http")
+        self.assertEqual(draining_at_exit, [True])
+        result = call_router.call("transfer", {"to": "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn", "amount": 1})
+        self.assertEqual(result["error"], "server_draining")
+
+    def test_drain_timeout_passed_through(self):
+        """MCP_DRAIN_TIMEOUT 原样传给 uvicorn，0 / 小数不会变成无限等待"""
+        for raw, expected in (("0", 0.0), ("0.5", 0.5), ("", 30.0)):
+            with self.subTest(raw=raw), patch.dict(os.environ, {"MCP_DRAIN_TIMEOUT": raw}):
+                self.run_main("--http")
+                self.assertEqual(self.uvicorn.Config.call_args.kwargs["timeout_graceful_shutdown"], expected)
+
+    def test_http_mode_env_defaults(self):
+        os.environ.update({"MCP_HOST": "127.0.0.1", "MCP_PORT": "9100", "MCP_WORKERS": "2"})
+        self.run_main("--http")
+        kwargs = self.uvicorn.Config.call_args.kwargs
+        self.assertEqual((kwargs["host"], kwargs["port"], kwargs["workers"]), ("127.0.0.1", 9100, 2))
+
+    def test_sse_mode_honours_host(self):
+        with patch.object(server, "mcp", MagicMock()):
+            self.run_main("--sse", "--host", "0.0.0.0")
+        kwargs = self.uvicorn.run.call_args.kwargs
+        self.assertEqual((kwargs["host"], kwargs["port"]), ("0.0.0.0", 8765))
+
+    def test_invalid_workers(self):
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            self.run_main("--http", "--workers", "0")
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            self.run_main("--http", "--sse")
+        self.uvicorn.run.assert_not_called()
+        self.uvicorn.Config.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
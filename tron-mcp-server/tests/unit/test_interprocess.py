@@ -0,0 +1,194 @@
+"""
+跨进程共享状态测试
+==================
+
+覆盖 streamable-HTTP 多 worker 部署时的共享状态:
+- FileLock 互斥与 mark / last_mark
+- 多进程并发派生 HD 地址不重复
+- 多进程并发写 JSON 地址簿不丢失更新
+- 其他进程租赁能量后本进程的剩余能量缓存失效
+"""
+
+import unittest
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from pathlib import Path
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import interprocess, key_manager, address_book, energy_topup
+
+SEED = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+PROCESSES = 4
+
+
+def _derive_worker(index_path: str, rounds: int, queue) -> None:
+    wallet = key_manager.HDWallet(SEED, Path(index_path))
+    addresses = []
+    for _ in range(rounds):
+        addresses.extend(entry["address"] for entry in wallet.derive_next(1))
+    queue.put(addresses)
+
+
+def _addressbook_worker(book_path: str, worker: int, rounds: int) -> None:
+    store = address_book._AddressBookStore(Path(book_path))
+    for i in range(rounds):
+        store.put(f"w{worker}_{i}", {"address": ADDRESS, "note": "", "created_at": None, "updated_at": None})
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+
+@unittest.skipIf(interprocess.fcntl is None and interprocess.msvcrt is None, "平台不支持文件锁")
+class TestFileLock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.lock_path = Path(self.tmpdir) / "sub" / "state.lock"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_mutual_exclusion(self):
+        order = []
+        first = interprocess.FileLock(self.lock_path)
+        first.acquire()
+
+        def contender():
+            with interprocess.FileLock(self.lock_path):
+                order.append("second")
+
+        thread = threading.Thread(target=contender)
+        thread.start()
+        time.sleep(0.1)
+        order.append("first")
+        first.release()
+        thread.join(timeout=5)
+        self.assertEqual(order, ["first", "second"])
+
+    def test_mark(self):
+        with interprocess.FileLock(self.lock_path) as lock:
+            self.assertEqual(lock.last_mark(), 0.0)
+            before = time.time()
+            lock.mark()
+        with interprocess.FileLock(self.lock_path) as lock:
+            self.assertGreaterEqual(lock.last_mark(), before - 0.001)
+
+    def test_lock_path_for(self):
+        with patch.dict(os.environ, {"TRON_LOCK_DIR": self.tmpdir}):
+            path = interprocess.lock_path_for(f"energy-{ADDRESS}/x")
+            book = Path(self.tmpdir) / "data" / "book.json"
+            file_lock = interprocess.lock_path_for_file(book)
+            self.assertEqual(file_lock, interprocess.lock_path_for_file(str(book)))
+            self.assertNotEqual(file_lock, interprocess.lock_path_for_file(book.with_name("other.json")))
+        self.assertEqual(path, Path(self.tmpdir) / f"energy-{ADDRESS}_x.lock")
+        self.assertEqual(file_lock.parent, Path(self.tmpdir))
+        self.assertTrue(file_lock.name.startswith("book.json-"))
+
+
+@unittest.skipIf(interprocess.fcntl is None and interprocess.msvcrt is None, "平台不支持文件锁")
+class TestMultiProcessState(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {"TRON_LOCK_DIR": os.path.join(self.tmpdir, "locks")})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_hd_derive_across_processes_no_duplicates(self):
+        index_path = os.path.join(self.tmpdir, "hd_index.json")
+        ctx = _mp_context()
+        queue = ctx.Queue()
+        rounds = 5
+        procs = [ctx.Process(target=_derive_worker, args=(index_path, rounds, queue)) for _ in range(PROCESSES)]
+        for p in procs:
+            p.start()
+        addresses = []
+        for _ in procs:
+            addresses.extend(queue.get(timeout=60))
+        for p in procs:
+            p.join(timeout=60)
+            self.assertEqual(p.exitcode, 0)
+
+        self.assertEqual(len(addresses), PROCESSES * rounds)
+        self.assertEqual(len(set(addresses)), len(addresses))
+        wallet = key_manager.HDWallet(SEED, Path(index_path))
+        self.assertEqual(wallet.index.next_index(0), PROCESSES * rounds)
+
+    def test_hd_lookup_sees_other_process(self):
+        index_path = Path(self.tmpdir) / "hd_index.json"
+        local = key_manager.HDWallet(SEED, index_path)
+        other = key_manager.HDWallet(SEED, index_path)
+        (entry,) = other.derive_next(1)
+        self.assertIsNotNone(local.lookup(entry["address"]))
+        (second,) = local.derive_next(1)
+        self.assertEqual(second["index"], entry["index"] + 1)
+
+    def test_json_addressbook_across_processes_no_lost_updates(self):
+        book_path = os.path.join(self.tmpdir, "addressbook.json")
+        ctx = _mp_context()
+        rounds = 15
+        procs = [ctx.Process(target=_addressbook_worker, args=(book_path, w, rounds)) for w in range(PROCESSES)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(timeout=60)
+            self.assertEqual(p.exitcode, 0)
+
+        store = address_book._AddressBookStore(Path(book_path))
+        self.assertEqual(len(store), PROCESSES * rounds)
+
+
+class TestEnergyTopupSharedLock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {"TRON_LOCK_DIR": self.tmpdir})
+        self.env.start()
+        energy_topup.invalidate()
+
+    def tearDown(self):
+        self.env.stop()
+        energy_topup.invalidate()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    @patch("tron_mcp_server.energy_topup.energy_estimator.estimate_trc20_energy", return_value={"energy": 1000})
+    @patch("tron_mcp_server.energy_topup.tron_client.get_account_energy")
+    def test_cache_invalidated_after_other_process_lease(self, mock_energy, _mock_estimate):
+        mock_energy.return_value = {"energy_remaining": 5000}
+        self.assertEqual(energy_topup._top_up(ADDRESS, ADDRESS, 1, None)["status"], "sufficient")
+        energy_topup._top_up(ADDRESS, ADDRESS, 1, None)
+        self.assertEqual(mock_energy.call_count, 1)
+
+        # 模拟另一个 worker 刚为同一钱包租赁
+        time.sleep(0.01)
+        with interprocess.FileLock(interprocess.lock_path_for(f"energy-{ADDRESS}")) as lock:
+            lock.mark()
+        energy_topup._top_up(ADDRESS, ADDRESS, 1, None)
+        self.assertEqual(mock_energy.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
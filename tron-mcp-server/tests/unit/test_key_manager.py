@@ -11,6 +11,9 @@
 - sign_transaction: 签名格式验证
 - get_configured_address: 未配置时返回 None
 - verify_address_ownership: 地址归属验证
+- 派生结果缓存: SigningKey / 公钥 / 地址只派生一次，环境变量变化时失效
+- 签名后端: recovery_id 直接推导、ecdsa / coincurve 后端选择、两种后端签名逐字节一致
+- 批量签名: 进程池并行签名，结果确定且与输入顺序一致
 """
 
 import unittest
@@ -263,5 +266,210 @@ class TestKeyManagerClass(unittest.TestCase):
             self.assertIn("signature", signed)
 
 
+class TestKeyMaterialCache(unittest.TestCase):
+    """测试私钥派生结果缓存"""
+
+    def setUp(self):
+        key_manager._derive_key_material.cache_clear()
+
+    def test_address_derived_once(self):
+        """同一私钥多次派生地址只做一次 EC 计算"""
+        key_manager.get_address_from_private_key(TEST_PRIVATE_KEY)
+        key_manager.get_address_from_private_key(TEST_PRIVATE_KEY)
+        key_manager.sign_transaction("a" * 64, TEST_PRIVATE_KEY)
+        info = key_manager._derive_key_material.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 2)
+
+    def test_key_manager_reuses_material(self):
+        """KeyManager 重复调用不重新派生"""
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": TEST_PRIVATE_KEY}):
+            km = key_manager.KeyManager()
+            addr = km.get_address()
+            with patch.object(key_manager, "_derive_key_material") as mock_derive:
+                self.assertEqual(km.get_address(), addr)
+                self.assertTrue(km.is_configured())
+                km.sign_transaction({"txID": "a" * 64, "raw_data": {}})
+                mock_derive.assert_not_called()
+
+    def test_key_manager_invalidates_on_env_change(self):
+        """环境变量变化后 KeyManager 应返回新私钥的地址"""
+        key2 = "0" * 63 + "2"
+        km = key_manager.KeyManager()
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": TEST_PRIVATE_KEY}):
+            addr1 = km.get_address()
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": key2}):
+            addr2 = km.get_address()
+        self.assertEqual(addr1, key_manager.get_address_from_private_key(TEST_PRIVATE_KEY))
+        self.assertEqual(addr2, key_manager.get_address_from_private_key(key2))
+
+    def test_key_manager_becomes_configured(self):
+        """先未配置、后配置私钥时应能正确加载"""
+        km = key_manager.KeyManager()
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertFalse(km.is_configured())
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": TEST_PRIVATE_KEY}):
+            self.assertTrue(km.is_configured())
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": "g" * 64}):
+            self.assertFalse(km.is_configured())
+
+    def test_cached_signature_matches_module_function(self):
+        """KeyManager 签名结果应与函数式接口一致"""
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": TEST_PRIVATE_KEY}):
+            km = key_manager.KeyManager()
+            signed = km.sign_transaction({"txID": "c" * 64, "raw_data": {}})
+        expected = key_manager.sign_transaction("c" * 64, TEST_PRIVATE_KEY)
+        self.assertEqual(signed["signature"][0], expected)
+
+
+class TestRecoveryId(unittest.TestCase):
+    """测试签名时直接推导 recovery_id"""
+
+    def _recover_public_keys(self, signature_hex: str, tx_id: str) -> list:
+        import ecdsa
+        recovered = ecdsa.VerifyingKey.from_public_key_recovery_with_digest(
+            bytes.fromhex(signature_hex)[:64], bytes.fromhex(tx_id), curve=ecdsa.SECP256k1,
+        )
+        return [vk.to_string() for vk in recovered]
+
+    def test_ecdsa_backend_recovery_id_matches_public_key(self):
+        """ecdsa 后端的 recovery_id 应能恢复出签名者公钥"""
+        public_key = key_manager._derive_key_material(TEST_PRIVATE_KEY).public_key
+        with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "ecdsa"}):
+            for i in range(8):
+                tx_id = f"{i:02x}" * 32
+                signature = key_manager.sign_transaction(tx_id, TEST_PRIVATE_KEY)
+                recovery_id = bytes.fromhex(signature)[64]
+                self.assertIn(recovery_id, (0, 1))
+                self.assertEqual(self._recover_public_keys(signature, tx_id)[recovery_id], public_key)
+
+    def test_ecdsa_backend_matches_library_signature(self):
+        """r/s 应与 ecdsa 库 SHA-256 确定性签名经 low-s 规范化后的结果一致"""
+        import hashlib
+        import ecdsa
+        import ecdsa.util
+        n = ecdsa.SECP256k1.order
+        sk = ecdsa.SigningKey.from_string(bytes.fromhex(TEST_PRIVATE_KEY), curve=ecdsa.SECP256k1)
+        with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "ecdsa"}):
+            for i in range(16):
+                tx_id = f"{i:02x}" * 32
+                r, s = sk.sign_digest_deterministic(
+                    bytes.fromhex(tx_id), hashfunc=hashlib.sha256, sigencode=ecdsa.util.sigencode_strings,
+                )
+                s = min(int.from_bytes(s, "big"), n - int.from_bytes(s, "big"))
+                signature = bytes.fromhex(key_manager.sign_transaction(tx_id, TEST_PRIVATE_KEY))
+                self.assertEqual(signature[:32], r)
+                self.assertEqual(int.from_bytes(signature[32:64], "big"), s)
+                self.assertLessEqual(s, n // 2)
+
+    def test_ecdsa_backend_rejects_oversized_digest(self):
+        """超过 32 bytes 的交易 ID 应抛出 ValueError"""
+        with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "ecdsa"}):
+            with self.assertRaises(ValueError):
+                key_manager.sign_transaction("a" * 66, TEST_PRIVATE_KEY)
+
+    def test_invalid_backend_raises(self):
+        """无效的签名后端应抛出 ValueError"""
+        with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "openssl"}):
+            with self.assertRaises(ValueError) as ctx:
+                key_manager.sign_transaction("a" * 64, TEST_PRIVATE_KEY)
+            self.assertIn("签名后端", str(ctx.exception))
+
+    def test_auto_backend_falls_back_to_ecdsa(self):
+        """未安装 coincurve 时 auto 应回退到 ecdsa"""
+        with patch.object(key_manager, "_coincurve_available", return_value=False):
+            with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "auto"}):
+                self.assertEqual(key_manager._get_signing_backend(), "ecdsa")
+            with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "coincurve"}):
+                with self.assertRaises(ValueError):
+                    key_manager._get_signing_backend()
+
+    @unittest.skipUnless(key_manager._coincurve_available(), "coincurve 未安装")
+    def test_coincurve_backend_recovery_id_matches_public_key(self):
+        """coincurve 后端的签名应能恢复出签名者公钥且确定性"""
+        public_key = key_manager._derive_key_material(TEST_PRIVATE_KEY).public_key
+        tx_id = "e" * 64
+        with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "coincurve"}):
+            sig1 = key_manager.sign_transaction(tx_id, TEST_PRIVATE_KEY)
+            sig2 = key_manager.sign_transaction(tx_id, TEST_PRIVATE_KEY)
+        self.assertEqual(sig1, sig2)
+        self.assertEqual(len(sig1), 130)
+        recovery_id = bytes.fromhex(sig1)[64]
+        self.assertEqual(self._recover_public_keys(sig1, tx_id)[recovery_id], public_key)
+
+
+    @unittest.skipUnless(key_manager._coincurve_available(), "coincurve 未安装")
+    def test_backends_produce_identical_signatures(self):
+        """ecdsa 与 coincurve 后端的签名应逐字节一致（切换后端不改变签名）"""
+        import hashlib
+        for i in range(200):
+            tx_id = hashlib.sha256(i.to_bytes(4, "big")).hexdigest()
+            with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "ecdsa"}):
+                expected = key_manager.sign_transaction(tx_id, TEST_PRIVATE_KEY)
+            with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "coincurve"}):
+                self.assertEqual(key_manager.sign_transaction(tx_id, TEST_PRIVATE_KEY), expected)
+
+
+class TestBatchSigning(unittest.TestCase):
+    """测试 sign_transactions_batch 进程池批量签名"""
+
+    def _make_txs(self, count: int) -> list:
+        return [{"txID": f"{i:064x}", "raw_data": {"ref": i}} for i in range(count)]
+
+    def test_parallel_matches_serial_in_input_order(self):
+        """进程池签名结果应与逐笔签名逐字节一致，且保持输入顺序"""
+        txs = self._make_txs(key_manager.BATCH_SIGN_MIN_PARALLEL + 4)
+        with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "ecdsa"}):
+            signed = key_manager.sign_transactions_batch(txs, TEST_PRIVATE_KEY, max_workers=2)
+            expected = [key_manager.sign_transaction(tx["txID"], TEST_PRIVATE_KEY) for tx in txs]
+        self.assertEqual([tx["txID"] for tx in signed], [tx["txID"] for tx in txs])
+        self.assertEqual([tx["signature"][0] for tx in signed], expected)
+        self.assertEqual(signed[3]["raw_data"], {"ref": 3})
+        self.assertNotIn("signature", txs[0])
+
+    def test_parallel_accepts_prefixed_key(self):
+        """带 0x 前缀与空白的私钥在进程池路径下也应正常签名"""
+        txs = self._make_txs(key_manager.BATCH_SIGN_MIN_PARALLEL)
+        with patch.dict(os.environ, {key_manager.SIGNING_BACKEND_ENV: "ecdsa"}):
+            signed = key_manager.sign_transactions_batch(txs, f"  0x{TEST_PRIVATE_KEY}\n", max_workers=2)
+            expected = [key_manager.sign_transaction(tx["txID"], TEST_PRIVATE_KEY) for tx in txs]
+        self.assertEqual([tx["signature"][0] for tx in signed], expected)
+
+    def test_small_batch_signs_in_process(self):
+        """少量交易不应启动进程池"""
+        with patch("concurrent.futures.ProcessPoolExecutor") as pool:
+            signed = key_manager.sign_transactions_batch(self._make_txs(3), TEST_PRIVATE_KEY)
+        pool.assert_not_called()
+        self.assertEqual(len(signed), 3)
+
+    def test_invalid_tx_rejected_before_pool_start(self):
+        """交易结构无效时应在启动进程池前报错，并指出是第几笔"""
+        txs = self._make_txs(20)
+        del txs[5]["raw_data"]
+        with patch("concurrent.futures.ProcessPoolExecutor") as pool:
+            with self.assertRaises(ValueError) as ctx:
+                key_manager.sign_transactions_batch(txs, TEST_PRIVATE_KEY, max_workers=2)
+        pool.assert_not_called()
+        self.assertIn("第 6 笔", str(ctx.exception))
+
+    def test_invalid_private_key_raises(self):
+        """私钥无效时应抛出 ValueError"""
+        with self.assertRaises(ValueError):
+            key_manager.sign_transactions_batch(self._make_txs(1), "zz")
+
+    def test_key_manager_batch_uses_configured_key(self):
+        """KeyManager.sign_transactions 使用已配置的私钥，未配置时报错"""
+        txs = self._make_txs(2)
+        km = key_manager.KeyManager()
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": TEST_PRIVATE_KEY}):
+            signed = km.sign_transactions(txs)
+            self.assertEqual(signed[1]["signature"][0],
+                             key_manager.sign_transaction(txs[1]["txID"], TEST_PRIVATE_KEY))
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": ""}):
+            with self.assertRaises(ValueError) as ctx:
+                km.sign_transactions(txs)
+            self.assertIn("私钥未配置", str(ctx.exception))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,191 @@
+"""
+运行指标测试
+============
+
+覆盖 metrics 模块与 call_router / 上游客户端的集成:
+- 关闭时不记录（共享空上下文）
+- 动作耗时直方图与按 error_type 的错误计数
+- 上游接口耗时与异常计数
+- 分位数估算、Prometheus 文本格式、/metrics ASGI 包装
+- get_metrics 路由
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+import httpx
+
+from tron_mcp_server import metrics, call_router, trongrid_client
+
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._was_enabled = metrics.enabled()
+        metrics.set_enabled(True)
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+        metrics.set_enabled(self._was_enabled)
+
+
+class TestDisabled(MetricsTestCase):
+
+    def test_noop_when_disabled(self):
+        metrics.set_enabled(False)
+        self.assertIs(metrics.track_upstream("trongrid", "wallet/x"), metrics.track_upstream("tronscan", "y"))
+        call_router.call("get_usdt_balance", {})
+        metrics.observe_action("skills", 0.1, {})
+        self.assertEqual(metrics.snapshot()["actions"], {})
+        result = call_router.call("get_metrics", {})
+        self.assertFalse(result["enabled"])
+        self.assertIn("TRON_METRICS", result["summary"])
+
+
+class TestActionMetrics(MetricsTestCase):
+
+    def test_durations_and_error_types(self):
+        call_router.call("skills")
+        call_router.call("get_usdt_balance", {})
+        call_router.call("get_usdt_balance", {"address": "bad"})
+        call_router.call("no_such_action", {})
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["actions"]["skills"]["count"], 1)
+        self.assertEqual(snapshot["actions"]["skills"]["errors"], {})
+        balance = snapshot["actions"]["get_usdt_balance"]
+        self.assertEqual(balance["count"], 2)
+        self.assertEqual(balance["errors"], {"missing_param": 1, "invalid_address": 1})
+        # 未知动作不进入分发，不产生新的标签
+        self.assertNotIn("no_such_action", snapshot["actions"])
+
+    def test_error_type_extraction(self):
+        self.assertEqual(metrics.result_error_type({"error": "rpc_error"}), "rpc_error")
+        self.assertEqual(
+            metrics.result_error_type({"error": True, "error_type": "insufficient_usdt"}), "insufficient_usdt",
+        )
+        self.assertIsNone(metrics.result_error_type({"blocked": True, "error": False}))
+        self.assertIsNone(metrics.result_error_type({"balance": 1}))
+
+    def test_handler_exception_counted(self):
+        with patch.dict(call_router._ACTION_HANDLERS, {"skills": MagicMock(side_effect=RuntimeError("boom"))}):
+            with self.assertRaises(RuntimeError):
+                call_router.call("skills")
+        self.assertEqual(metrics.snapshot()["actions"]["skills"]["errors"], {"RuntimeError": 1})
+
+
+class TestUpstreamMetrics(MetricsTestCase):
+
+    @patch('tron_mcp_server.trongrid_client.httpx.post')
+    def test_trongrid_paths(self, mock_post):
+        response = MagicMock()
+        response.json.return_value = {"EnergyLimit": 0}
+        mock_post.return_value = response
+        trongrid_client.get_account_resource(ADDRESS)
+        mock_post.side_effect = httpx.ConnectError("down")
+        with self.assertRaises(httpx.ConnectError):
+            trongrid_client.get_account_resource(ADDRESS)
+
+        entry = metrics.snapshot()["upstream"]["trongrid wallet/getaccountresource"]
+        self.assertEqual(entry["count"], 2)
+        self.assertEqual(entry["errors"], 1)
+
+    @patch('tron_mcp_server.tron_client.httpx.get')
+    def test_tronscan_paths(self, mock_get):
+        response = MagicMock()
+        response.json.return_value = {"balance": 1_000_000}
+        mock_get.return_value = response
+        from tron_mcp_server import tron_client
+        tron_client.get_balance_trx(ADDRESS)
+        self.assertIn("tronscan account", metrics.snapshot()["upstream"])
+
+
+class TestExport(MetricsTestCase):
+
+    def test_quantile_interpolation(self):
+        buckets = (0.1, 0.2, 0.4)
+        # 10 次落在 (0.1, 0.2]
+        self.assertAlmostEqual(metrics._quantile(0.5, buckets, [0, 10, 0, 0]), 0.15)
+        self.assertEqual(metrics._quantile(0.99, buckets, [0, 0, 0, 3]), 0.4)
+        self.assertIsNone(metrics._quantile(0.5, buckets, [0, 0, 0, 0]))
+
+    def test_snapshot_percentiles(self):
+        for _ in range(90):
+            metrics.ACTION_DURATION.observe(("get_balance",), 0.02)
+        for _ in range(10):
+            metrics.ACTION_DURATION.observe(("get_balance",), 0.6)
+        entry = metrics.snapshot()["actions"]["get_balance"]
+        self.assertEqual(entry["count"], 100)
+        self.assertLessEqual(entry["p50_ms"], 25)
+        self.assertGreater(entry["p95_ms"], 500)
+        self.assertLessEqual(entry["p99_ms"], 750)
+
+    def test_prometheus_text(self):
+        metrics.ACTION_DURATION.observe(("skills",), 0.003)
+        metrics.ACTION_ERRORS.inc(("transfer", "insufficient_usdt"))
+        metrics.UPSTREAM_DURATION.observe(("trongrid", 'wallet/"x"'), 20.0)
+        text = metrics.render_prometheus()
+        self.assertIn("# TYPE tron_action_duration_seconds histogram", text)
+        self.assertIn('tron_action_duration_seconds_bucket{action="skills",le="0.005"} 1', text)
+        self.assertIn('tron_action_duration_seconds_bucket{action="skills",le="+Inf"} 1', text)
+        self.assertIn('tron_action_duration_seconds_count{action="skills"} 1', text)
+        self.assertIn('tron_action_errors_total{action="transfer",error_type="insufficient_usdt"} 1', text)
+        self.assertIn('path="wallet/\\"x\\"",le="10.0"} 0', text)
+        self.assertIn('path="wallet/\\"x\\"",le="+Inf"} 1', text)
+
+    def test_get_metrics_route(self):
+        call_router.call("get_usdt_balance", {})
+        result = call_router.call("get_metrics", {})
+        self.assertTrue(result["enabled"])
+        self.assertIn("get_usdt_balance", result["summary"])
+        text = call_router.call("get_metrics", {"format": "prometheus"})["text"]
+        self.assertIn('action="get_usdt_balance"', text)
+        self.assertIn("error", call_router.call("get_metrics", {"format": "xml"}))
+
+    def test_asgi_metrics_endpoint(self):
+        inner = MagicMock()
+
+        async def downstream(scope, receive, send):
+            inner(scope["path"])
+
+        app = metrics.asgi_app(downstream)
+        metrics.ACTION_DURATION.observe(("skills",), 0.01)
+
+        async def request(path, method="GET"):
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            await app({"type": "http", "path": path, "method": method}, None, send)
+            return sent
+
+        sent = asyncio.run(request("/metrics"))
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn((b"content-type", metrics.PROMETHEUS_CONTENT_TYPE.encode()), sent[0]["headers"])
+        self.assertIn(b'tron_action_duration_seconds_count{action="skills"} 1', sent[1]["body"])
+        self.assertEqual(asyncio.run(request("/metrics", "POST"))[0]["status"], 405)
+        asyncio.run(request("/sse"))
+        inner.assert_called_once_with("/sse")
+
+
+if __name__ == "__main__":
+    unittest.main()
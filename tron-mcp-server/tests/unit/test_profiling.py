@@ -0,0 +1,190 @@
+"""
+性能剖析与慢调用日志测试
+========================
+
+覆盖 profiling 模块与 call_router / metrics 的集成:
+- 关闭时不经 profiling 包裹
+- 指定动作剖析，热点函数按动作累计
+- 抽样比例
+- 慢调用日志：脱敏参数、耗时拆分、上游请求明细
+- get_diagnostics 路由
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+import httpx
+
+from tron_mcp_server import profiling, call_router, metrics
+
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+
+class ProfilingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (profiling._actions, profiling._sample_rate, profiling._slow_ms, profiling._log_path)
+        self.tmpdir = tempfile.mkdtemp()
+        self.log_path = Path(self.tmpdir) / "slow.jsonl"
+        profiling.reset()
+
+    def tearDown(self):
+        profiling._actions, profiling._sample_rate, profiling._slow_ms, profiling._log_path = self.saved
+        profiling.reset()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def log_entries(self):
+        if not self.log_path.exists():
+            return []
+        return [json.loads(line) for line in self.log_path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestProfiling(ProfilingTestCase):
+
+    def test_disabled_bypasses_profiling(self):
+        profiling.configure()
+        self.assertFalse(profiling.enabled())
+        with patch.object(profiling, "run") as mock_run:
+            call_router.call("skills")
+        mock_run.assert_not_called()
+        self.assertFalse(profiling.collecting())
+        self.assertIs(metrics.track_upstream("trongrid", "x"), metrics.track_upstream("tronscan", "y"))
+
+    def test_profiled_action_hot_functions(self):
+        profiling.configure(actions=["skills"])
+        call_router.call("skills")
+        call_router.call("skills")
+        call_router.call("get_usdt_balance", {})
+
+        snapshot = profiling.snapshot(top=50, action="skills")
+        self.assertEqual(snapshot["profiled_calls"], {"skills": 2})
+        functions = [f["function"] for f in snapshot["hot_functions"]]
+        self.assertTrue(any("get_skills" in f for f in functions), functions)
+        self.assertTrue(any(f.startswith("tron_mcp_server/") for f in functions), functions)
+        entry = next(f for f in snapshot["hot_functions"] if "get_skills" in f["function"])
+        self.assertEqual(entry["calls"], 2)
+        self.assertLessEqual(len(profiling.snapshot(top=3)["hot_functions"]), 3)
+
+    def test_sampling(self):
+        profiling.configure(sample_percent=100)
+        call_router.call("get_usdt_balance", {})
+        self.assertEqual(profiling.snapshot()["profiled_calls"], {"get_usdt_balance": 1})
+        profiling.reset()
+        profiling.configure(sample_percent=0.0001)
+        with patch("tron_mcp_server.profiling.random.random", return_value=0.5):
+            call_router.call("get_usdt_balance", {})
+        self.assertEqual(profiling.snapshot()["profiled_calls"], {})
+        with self.assertRaises(ValueError):
+            profiling.configure(sample_percent=150)
+
+    def test_redact_params(self):
+        redacted = profiling.redact_params({
+            "to": ADDRESS,
+            "private_key": "abc",
+            "nested": {"api_secret": "s", "amount": 1.5},
+            "signed_tx_json": "x" * 500,
+            "addresses": [ADDRESS] * 12,
+            "token": "USDT",
+        })
+        self.assertEqual(redacted["to"], ADDRESS)
+        self.assertEqual(redacted["private_key"], "<redacted>")
+        self.assertEqual(redacted["nested"], {"api_secret": "<redacted>", "amount": 1.5})
+        self.assertTrue(redacted["signed_tx_json"].endswith("(500 chars)"))
+        self.assertEqual(len(redacted["addresses"]), 11)
+        self.assertEqual(redacted["addresses"][-1], "...(+2)")
+        self.assertEqual(redacted["token"], "USDT")
+
+
+class TestSlowCallLog(ProfilingTestCase):
+
+    @patch('tron_mcp_server.tron_client.httpx.get')
+    def test_slow_call_entry(self, mock_get):
+        def slow_get(*args, **kwargs):
+            time.sleep(0.02)
+            return httpx.Response(200, json={"balance": 3_000_000}, request=httpx.Request("GET", args[0]))
+
+        mock_get.side_effect = slow_get
+        profiling.configure(actions=["get_balance"], slow_ms=10, log_path=self.log_path)
+        result = call_router.call("get_balance", {"address": ADDRESS})
+        self.assertEqual(result["balance_trx"], 3.0)
+
+        (entry,) = self.log_entries()
+        self.assertEqual(entry["action"], "get_balance")
+        self.assertEqual(entry["params"], {"address": ADDRESS})
+        self.assertGreaterEqual(entry["duration_ms"], 20)
+        self.assertEqual(entry["upstream_count"], 1)
+        self.assertEqual(entry["upstream"][0]["service"], "tronscan")
+        self.assertEqual(entry["upstream"][0]["path"], "account")
+        self.assertGreaterEqual(entry["upstream_ms"], 20)
+        self.assertAlmostEqual(entry["local_ms"], entry["duration_ms"] - entry["upstream_ms"], places=2)
+        self.assertTrue(entry["profiled"])
+        self.assertTrue(entry["hot_functions"])
+        self.assertIsNone(entry["error_type"])
+
+    def test_fast_calls_not_logged_and_errors_recorded(self):
+        profiling.configure(slow_ms=60_000, log_path=self.log_path)
+        call_router.call("skills")
+        self.assertEqual(self.log_entries(), [])
+
+        profiling.configure(slow_ms=0.000001, log_path=self.log_path)
+        call_router.call("get_usdt_balance", {"private_key": "secret"})
+        (entry,) = self.log_entries()
+        self.assertEqual(entry["error_type"], "missing_param")
+        self.assertEqual(entry["params"], {"private_key": "<redacted>"})
+        self.assertFalse(entry["profiled"])
+        self.assertEqual(profiling.snapshot()["slow_calls_total"], 1)
+
+    @patch('tron_mcp_server.trongrid_client.httpx.post', side_effect=httpx.ConnectError("down"))
+    def test_upstream_error_recorded(self, _mock_post):
+        profiling.configure(slow_ms=0.000001, log_path=self.log_path)
+        call_router.call("get_account_energy", {"address": ADDRESS})
+        upstream = self.log_entries()[0]["upstream"]
+        self.assertTrue(upstream)
+        self.assertEqual(upstream[0]["error"], "ConnectError")
+
+
+class TestDiagnosticsRoute(ProfilingTestCase):
+
+    def test_disabled_summary(self):
+        profiling.configure()
+        result = call_router.call("get_diagnostics", {})
+        self.assertFalse(result["enabled"])
+        self.assertIn("TRON_SLOW_CALL_MS", result["summary"])
+
+    def test_snapshot_summary(self):
+        profiling.configure(actions=["*"], slow_ms=0.000001, log_path=self.log_path)
+        call_router.call("skills")
+        result = call_router.call("get_diagnostics", {"top": 5, "action": "skills"})
+        self.assertTrue(result["enabled"])
+        self.assertLessEqual(len(result["hot_functions"]), 5)
+        self.assertIn("热点函数", result["summary"])
+        self.assertIn("最近慢调用", result["summary"])
+        self.assertEqual(result["recent_slow_calls"][0]["action"], "skills")
+
+    def test_invalid_params(self):
+        self.assertEqual(call_router.call("get_diagnostics", {"top": "x"})["error"], "invalid_param")
+        self.assertEqual(call_router.call("get_diagnostics", {"top": 0})["error"], "invalid_param")
+        self.assertEqual(call_router.call("get_diagnostics", {"action": "nope"})["error"], "invalid_param")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+"""
+TRONSCAN 响应快速解码测试
+========================
+
+覆盖 response_schemas 与 tron_client 接入:
+- project: 只保留 schema 声明的字段，嵌套对象 / 对象列表递归投影
+- decode: 各后端结果一致，无 schema 的路径完整解析
+- get_backend: TRON_FAST_DECODE 解析与未安装后端报错
+- decode_response: 关闭时沿用 response.json()
+- tron_client: 开启快速解码后 account / 转账 / transaction-info 的查询结果与默认路径一致
+"""
+
+import unittest
+import sys
+import os
+import json
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+stress_dir = os.path.join(project_root, "tests", "stress")
+if stress_dir not in sys.path:
+    sys.path.insert(0, stress_dir)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+import httpx
+
+import decode_benchmark
+from tron_mcp_server import formatters, response_schemas, tron_client, shared_cache
+
+ADDRESS = decode_benchmark.ADDRESS
+
+
+def _response(payload) -> httpx.Response:
+    return httpx.Response(
+        200,
+        content=json.dumps(payload).encode("utf-8"),
+        request=httpx.Request("GET", "https://apilist.tronscanapi.com/api/x"),
+    )
+
+
+def _backends() -> list:
+    return [
+        backend for backend in response_schemas.BACKENDS
+        if getattr(response_schemas, backend, True) is not None
+    ]
+
+
+class TestProject(unittest.TestCase):
+
+    def test_drops_unused_fields(self):
+        account = decode_benchmark.make_account(3)
+        result = response_schemas.project(account, response_schemas.ACCOUNT)
+        self.assertEqual(set(result), {"address", "balance", "transactions", "totalTransactionCount",
+                                       "trc20token_balances", "tokenBalances"})
+        self.assertEqual(set(result["trc20token_balances"][0]),
+                         {"tokenId", "tokenAbbr", "tokenName", "tokenDecimal", "balance"})
+
+    def test_nested_object(self):
+        page = decode_benchmark.make_trc20_page(2)
+        result = response_schemas.project(page, response_schemas.TRANSFER_PAGE)
+        self.assertEqual(set(result), {"total", "token_transfers"})
+        self.assertEqual(set(result["token_transfers"][0]["tokenInfo"]), {"tokenAbbr", "tokenName", "tokenDecimal"})
+
+    def test_unexpected_shapes_kept(self):
+        schema = response_schemas.TRANSFER_PAGE
+        self.assertEqual(response_schemas.project([1, 2], schema), [1, 2])
+        self.assertEqual(response_schemas.project({"data": None, "x": 1}, schema), {"data": None})
+        self.assertEqual(response_schemas.project({"data": [None, "a"]}, schema), {"data": [None, "a"]})
+        self.assertEqual(response_schemas.project({"data": [{"tokenInfo": "?"}]}, schema),
+                         {"data": [{"tokenInfo": "?"}]})
+
+    def test_any_fields_kept_whole(self):
+        info = decode_benchmark.make_transaction_info()
+        result = response_schemas.project(info, response_schemas.TRANSACTION_INFO)
+        self.assertEqual(result["tokenTransferInfo"], info["tokenTransferInfo"])
+        self.assertEqual(result["cost"], {"fee": info["cost"]["fee"]})
+        self.assertNotIn("srConfirmList", result)
+
+
+class TestDecode(unittest.TestCase):
+
+    def test_backends_agree(self):
+        cases = {
+            "account": decode_benchmark.make_account(5),
+            "transfer": decode_benchmark.make_trx_page(3),
+            "token_trc20/transfers": decode_benchmark.make_trc20_page(3),
+            "transaction-info": decode_benchmark.make_transaction_info(),
+        }
+        for path, payload in cases.items():
+            expected = response_schemas.project(payload, response_schemas.SCHEMAS[path])
+            content = json.dumps(payload).encode("utf-8")
+            for backend in _backends():
+                with self.subTest(path=path, backend=backend):
+                    self.assertEqual(response_schemas.decode(path, content, backend), expected)
+
+    def test_path_without_schema(self):
+        payload = {"data": [{"number": 1, "hash": "ab"}], "total": 1}
+        content = json.dumps(payload).encode("utf-8")
+        self.assertEqual(response_schemas.decode("block", content, "json"), payload)
+
+    @unittest.skipIf(response_schemas.msgspec is None, "msgspec 未安装")
+    def test_msgspec_type_mismatch_falls_back(self):
+        payload = {"balance": {"unexpected": True}, "transactions": 1, "extra": 2}
+        content = json.dumps(payload).encode("utf-8")
+        self.assertEqual(
+            response_schemas.decode("account", content, "msgspec"),
+            {"balance": {"unexpected": True}, "transactions": 1},
+        )
+
+
+class TestBackend(unittest.TestCase):
+
+    def backend(self, value):
+        with patch.dict(os.environ, {"TRON_FAST_DECODE": value}):
+            return response_schemas.get_backend()
+
+    def test_parsing(self):
+        self.assertEqual(self.backend(""), "off")
+        self.assertEqual(self.backend("0"), "off")
+        self.assertEqual(self.backend("json"), "json")
+        with patch.object(response_schemas, "msgspec", None), patch.object(response_schemas, "orjson", None):
+            self.assertEqual(self.backend("auto"), "off")
+        with patch.object(response_schemas, "msgspec", None), patch.object(response_schemas, "orjson", object()):
+            self.assertEqual(self.backend("1"), "orjson")
+
+    def test_invalid_or_missing(self):
+        with self.assertRaises(ValueError):
+            self.backend("simdjson")
+        with patch.object(response_schemas, "msgspec", None), self.assertRaises(ValueError):
+            self.backend("msgspec")
+
+    def test_decode_response_off(self):
+        response = MagicMock()
+        response.json.return_value = {"balance": 1, "extra": 2}
+        with patch.dict(os.environ, {"TRON_FAST_DECODE": "off"}):
+            self.assertEqual(response_schemas.decode_response("account", response), {"balance": 1, "extra": 2})
+        # 非 bytes 响应体（测试替身）同样沿用 response.json()
+        with patch.dict(os.environ, {"TRON_FAST_DECODE": "json"}):
+            self.assertEqual(response_schemas.decode_response("account", response), {"balance": 1, "extra": 2})
+
+
+class TestTronClientFastDecode(unittest.TestCase):
+    """开启快速解码后 tron_client 的查询结果与默认路径一致"""
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"TRON_CACHE_BACKEND": "off"})
+        self.env.start()
+        shared_cache.close()
+
+    def tearDown(self):
+        self.env.stop()
+        shared_cache.close()
+
+    def compare(self, payload, func, *args):
+        results = {}
+        for backend in ["off"] + _backends():
+            with patch.dict(os.environ, {"TRON_FAST_DECODE": backend}), \
+                    patch("tron_mcp_server.tron_client.httpx.get", return_value=_response(payload)):
+                results[backend] = func(*args)
+        for backend, result in results.items():
+            with self.subTest(backend=backend):
+                self.assertEqual(result, results["off"])
+        return results["off"]
+
+    def test_account_queries(self):
+        account = decode_benchmark.make_account(20)
+        tokens = self.compare(account, tron_client.get_account_tokens, ADDRESS)
+        self.assertEqual(tokens["tokens"][1]["token_abbr"], "TK0")
+        self.compare(account, tron_client.get_account_status, ADDRESS)
+        self.compare(account, tron_client.get_balance_trx, ADDRESS)
+        self.compare(account, tron_client.get_usdt_balance, ADDRESS)
+
+    def test_transfer_history(self):
+        def trc20_history(address):
+            data = tron_client.get_trc20_transfer_history(address)
+            return formatters.format_transaction_history(address, data["token_transfers"], data["total"])
+
+        def trx_history(address):
+            data = tron_client.get_transfer_history(address)
+            return formatters.format_transaction_history(address, data["data"], data["total"])
+
+        result = self.compare(decode_benchmark.make_trc20_page(5), trc20_history, ADDRESS)
+        self.assertEqual(result["transfers"][1]["direction"], "OUT")
+        self.compare(decode_benchmark.make_trx_page(5), trx_history, ADDRESS)
+
+    def test_transaction_status(self):
+        status = self.compare(decode_benchmark.make_transaction_info(), tron_client.get_transaction_status, "ab" * 32)
+        self.assertEqual(status["token_type"], "USDT")
+        self.assertTrue(status["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""
+响应详略（verbosity / fields）测试
+==================================
+
+覆盖:
+- formatters.dumps: 紧凑 JSON，orjson 与标准库回退结果一致
+- formatters.apply_view: minimal 精简、fields 投影、错误结果不裁剪
+- full 模式附带上游原始数据
+- call_router: 参数校验、TRON_RESPONSE_VERBOSITY 默认值、处理函数透传 verbosity
+"""
+
+import unittest
+import sys
+import os
+import json
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import formatters, call_router
+
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+OTHER = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+TRANSFERS = [
+    {
+        "transactionHash": "a" * 64,
+        "transferFromAddress": ADDRESS,
+        "transferToAddress": OTHER,
+        "amount": 1_500_000,
+        "tokenName": "_",
+        "timestamp": 1700000000000,
+    },
+    {
+        "transactionHash": "b" * 64,
+        "transferFromAddress": OTHER,
+        "transferToAddress": ADDRESS,
+        "amount": 2_000_000,
+        "tokenName": "_",
+        "timestamp": 1700000001000,
+    },
+]
+
+RISK_INFO = {
+    "is_risky": True,
+    "risk_type": "Scam",
+    "risk_reasons": ["⛔ 红标: Scam"],
+    "tags": {"Red": "Scam"},
+    "details": {"account_info": {"redTag": "Scam"}},
+}
+
+
+class TestDumps(unittest.TestCase):
+
+    def test_compact_and_round_trip(self):
+        obj = {"txID": "ab", "raw_data": {"contract": [1, 2]}, "memo": "备注"}
+        text = formatters.dumps(obj)
+        self.assertEqual(json.loads(text), obj)
+        self.assertNotIn(", ", text)
+        self.assertIn("备注", text)
+
+    def test_stdlib_fallback(self):
+        obj = {"a": [1, 2.5, None], "b": "x"}
+        with patch.object(formatters, "orjson", None):
+            fallback = formatters.dumps(obj)
+        self.assertEqual(fallback, '{"a":[1,2.5,null],"b":"x"}')
+        self.assertEqual(json.loads(formatters.dumps(obj)), obj)
+
+    def test_signed_tx_json_compact(self):
+        signed = {"txID": "c" * 64, "signature": ["d" * 130]}
+        result = formatters.format_signed_tx(signed, ADDRESS, OTHER, 1, "TRX")
+        self.assertEqual(json.loads(result["signed_tx_json"]), signed)
+        self.assertNotIn(" ", result["signed_tx_json"])
+
+
+class TestApplyView(unittest.TestCase):
+
+    def test_standard_is_unchanged(self):
+        result = formatters.format_account_safety(ADDRESS, RISK_INFO)
+        self.assertIs(formatters.apply_view("check_account_safety", result), result)
+        self.assertNotIn("raw", result)
+
+    def test_minimal_safety(self):
+        result = formatters.format_account_safety(ADDRESS, RISK_INFO)
+        view = formatters.apply_view("check_account_safety", result, formatters.VERBOSITY_MINIMAL)
+        self.assertEqual(
+            set(view), {"address", "is_safe", "is_risky", "risk_type", "safety_status", "summary"}
+        )
+        self.assertTrue(view["is_risky"])
+
+    def test_minimal_history_rows(self):
+        result = formatters.format_transaction_history(
+            ADDRESS, TRANSFERS, 2, labels={OTHER: ["交易所"]},
+        )
+        view = formatters.apply_view("get_transaction_history", result, formatters.VERBOSITY_MINIMAL)
+        self.assertEqual(view["displayed"], 2)
+        self.assertEqual(view["transfers"][0], {
+            "txid": "a" * 64,
+            "direction": "OUT",
+            "counterparty": OTHER,
+            "amount": 1.5,
+            "token": "TRX",
+            "timestamp": 1700000000000,
+            "alias": "交易所",
+        })
+        self.assertEqual(view["transfers"][1]["counterparty"], OTHER)
+        self.assertLess(len(formatters.dumps(view)), len(formatters.dumps(result)))
+
+    def test_minimal_history_keeps_risk_flag(self):
+        risk = {OTHER: {"is_risky": True, "risk_type": "Scam"}}
+        result = formatters.format_transaction_history(ADDRESS, TRANSFERS, 2, risk=risk)
+        view = formatters.apply_view("get_transaction_history", result, formatters.VERBOSITY_MINIMAL)
+        self.assertTrue(all(row["risky"] for row in view["transfers"]))
+
+    def test_minimal_batch(self):
+        result = formatters.format_account_safety_batch(2, [ADDRESS, OTHER], {ADDRESS: RISK_INFO})
+        view = formatters.apply_view("check_account_safety_batch", result, formatters.VERBOSITY_MINIMAL)
+        self.assertEqual(view["verdicts"], [
+            {"address": ADDRESS, "verdict": "risky"},
+            {"address": OTHER, "verdict": "unknown"},
+        ])
+        self.assertEqual(view["risky_addresses"], [ADDRESS])
+        self.assertNotIn("total_input", view)
+
+    def test_fields_projection(self):
+        result = formatters.format_transaction_history(ADDRESS, TRANSFERS, 2)
+        view = formatters.apply_view("get_transaction_history", result, fields=["total"])
+        self.assertEqual(set(view), {"total", "summary"})
+
+    def test_unlisted_action_minimal_is_standard(self):
+        result = {"latest_block": 1, "chain": "TRON Mainnet", "summary": "ok"}
+        self.assertIs(formatters.apply_view("get_network_status", result, formatters.VERBOSITY_MINIMAL), result)
+
+    def test_error_untouched(self):
+        error = formatters.format_error("rpc_error", "失败")
+        view = formatters.apply_view("get_transaction_history", error, formatters.VERBOSITY_MINIMAL, ["total"])
+        self.assertIs(view, error)
+
+
+class TestFullVerbosity(unittest.TestCase):
+
+    def test_safety_raw(self):
+        result = formatters.format_account_safety(ADDRESS, RISK_INFO, formatters.VERBOSITY_FULL)
+        self.assertEqual(result["raw"]["details"], RISK_INFO["details"])
+
+    def test_history_and_internal_raw(self):
+        history = formatters.format_transaction_history(
+            ADDRESS, TRANSFERS, 2, verbosity=formatters.VERBOSITY_FULL,
+        )
+        self.assertIs(history["transfers"][0]["raw"], TRANSFERS[0])
+        internal = formatters.format_internal_transactions(
+            ADDRESS, [{"hash": "e" * 64, "callValueInfo": []}], 1, verbosity=formatters.VERBOSITY_FULL,
+        )
+        self.assertEqual(internal["internal_transactions"][0]["raw"]["hash"], "e" * 64)
+
+
+class TestRouterVerbosity(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"TRON_RESPONSE_VERBOSITY": ""})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+
+    def test_invalid_params(self):
+        result = call_router.call("check_account_safety", {"address": ADDRESS, "verbosity": "tiny"})
+        self.assertEqual(result["error"], "invalid_param")
+        result = call_router.call("check_account_safety", {"address": ADDRESS, "fields": 3})
+        self.assertEqual(result["error"], "invalid_param")
+
+    @patch("tron_mcp_server.call_router.tron_client.check_account_risk", return_value=RISK_INFO)
+    def test_safety_minimal_and_full(self, _mock_risk):
+        minimal = call_router.call("check_account_safety", {"address": ADDRESS, "verbosity": "minimal"})
+        self.assertNotIn("tags", minimal)
+        self.assertTrue(minimal["is_risky"])
+        full = call_router.call("check_account_safety", {"address": ADDRESS, "verbosity": "full"})
+        self.assertEqual(full["raw"], RISK_INFO)
+
+    @patch("tron_mcp_server.call_router.address_book.labels_for_addresses", return_value={})
+    @patch("tron_mcp_server.call_router.tron_client.get_transfer_history")
+    def test_history_env_default_and_fields(self, mock_history, _mock_labels):
+        mock_history.return_value = {"data": TRANSFERS, "total": 2}
+        params = {"address": ADDRESS, "token": "TRX", "fields": "transfers"}
+        with patch.dict(os.environ, {"TRON_RESPONSE_VERBOSITY": "minimal"}):
+            result = call_router.call("get_transaction_history", dict(params))
+        self.assertEqual(set(result), {"transfers", "summary"})
+        self.assertNotIn("from", result["transfers"][0])
+
+        result = call_router.call("get_transaction_history", dict(params, verbosity="full"))
+        self.assertEqual(result["transfers"][0]["raw"], TRANSFERS[0])
+
+    def test_default_verbosity(self):
+        self.assertEqual(call_router.get_default_verbosity(), "standard")
+        with patch.dict(os.environ, {"TRON_RESPONSE_VERBOSITY": "FULL"}):
+            self.assertEqual(call_router.get_default_verbosity(), "full")
+        with patch.dict(os.environ, {"TRON_RESPONSE_VERBOSITY": "verbose"}):
+            self.assertEqual(call_router.get_default_verbosity(), "standard")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+"""
+测试 risk_cache.py - 地址风险判定缓存
+======================================
+
+覆盖以下功能：
+- TTL 过期、LRU 容量淘汰、TTL=0 关闭缓存
+- 批量查询: 去重、命中缓存、单个地址失败不影响其他地址
+- "Unknown"（安全接口全部失败）结果不缓存
+- 交易历史 enrich: 对手方去重后批量查询、附加风险标签
+- 令牌桶限速器
+- check_account_safety_batch: 去重、无效地址、判定统计、缓存复用
+"""
+
+import unittest
+import sys
+import os
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import risk_cache, call_router
+
+OWNER = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+FRIEND = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+SCAMMER = "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"
+
+SAFE_REPORT = {"is_risky": False, "risk_type": "Safe", "risk_reasons": []}
+RISKY_REPORT = {"is_risky": True, "risk_type": "Scam", "risk_reasons": ["🔴 高危标签 (RedTag): Scam"]}
+
+
+def _fake_risk(address):
+    return RISKY_REPORT if address == SCAMMER else SAFE_REPORT
+
+
+class TestRiskVerdictCache(unittest.TestCase):
+    """测试 TTL 缓存"""
+
+    def setUp(self):
+        self.now = 1000.0
+        self.cache = risk_cache.RiskVerdictCache(max_entries=2, clock=lambda: self.now)
+
+    def test_expiry(self):
+        """超过 TTL 后应视为未命中"""
+        self.cache.put(OWNER, SAFE_REPORT, ttl=10)
+        self.assertIs(self.cache.get(OWNER), SAFE_REPORT)
+        self.now += 10
+        self.assertIsNone(self.cache.get(OWNER))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        """超出容量时淘汰最久未使用的条目"""
+        self.cache.put(OWNER, SAFE_REPORT, ttl=10)
+        self.cache.put(FRIEND, SAFE_REPORT, ttl=10)
+        self.cache.get(OWNER)
+        self.cache.put(SCAMMER, RISKY_REPORT, ttl=10)
+        self.assertIsNone(self.cache.get(FRIEND))
+        self.assertIsNotNone(self.cache.get(OWNER))
+
+    def test_zero_ttl_disables(self):
+        self.cache.put(OWNER, SAFE_REPORT, ttl=0)
+        self.assertIsNone(self.cache.get(OWNER))
+
+
+class TestBatchReports(unittest.TestCase):
+    """测试批量查询"""
+
+    def setUp(self):
+        risk_cache.clear_cache()
+
+    def tearDown(self):
+        risk_cache.clear_cache()
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_dedupe_and_cache(self, mock_risk):
+        """重复地址只查询一次，第二次批量查询全部命中缓存"""
+        mock_risk.side_effect = _fake_risk
+        reports = risk_cache.get_risk_reports([FRIEND, SCAMMER, FRIEND, ""])
+        self.assertEqual(set(reports), {FRIEND, SCAMMER})
+        self.assertEqual(mock_risk.call_count, 2)
+
+        risk_cache.get_risk_reports([SCAMMER, FRIEND])
+        self.assertIs(risk_cache.get_risk_report(FRIEND), SAFE_REPORT)
+        self.assertEqual(mock_risk.call_count, 2)
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_failure_isolated(self, mock_risk):
+        """单个地址查询异常不影响其他地址"""
+        def risk(address):
+            if address == FRIEND:
+                raise Exception("timeout")
+            return _fake_risk(address)
+        mock_risk.side_effect = risk
+        reports = risk_cache.get_risk_reports([FRIEND, SCAMMER])
+        self.assertEqual(list(reports), [SCAMMER])
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_unknown_not_cached(self, mock_risk):
+        """安全接口全部失败的结果不缓存"""
+        mock_risk.return_value = {"is_risky": False, "risk_type": "Unknown", "risk_reasons": []}
+        risk_cache.get_risk_report(FRIEND)
+        risk_cache.get_risk_report(FRIEND)
+        self.assertEqual(mock_risk.call_count, 2)
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_ttl_env_zero_disables_cache(self, mock_risk):
+        mock_risk.side_effect = _fake_risk
+        with patch.dict(os.environ, {"TRON_RISK_CACHE_TTL": "0"}):
+            risk_cache.get_risk_reports([FRIEND])
+            risk_cache.get_risk_reports([FRIEND])
+        self.assertEqual(mock_risk.call_count, 2)
+
+
+class TestHistoryEnrichment(unittest.TestCase):
+    """测试交易历史对手方风险标签"""
+
+    def setUp(self):
+        risk_cache.clear_cache()
+        self.transfers = {"total": 3, "data": [
+            {"transactionHash": "a", "transferFromAddress": OWNER, "transferToAddress": SCAMMER,
+             "amount": 1000000, "tokenName": "_", "timestamp": 3},
+            {"transactionHash": "b", "transferFromAddress": FRIEND, "transferToAddress": OWNER,
+             "amount": 1000000, "tokenName": "_", "timestamp": 2},
+            {"transactionHash": "c", "transferFromAddress": SCAMMER, "transferToAddress": OWNER,
+             "amount": 1000000, "tokenName": "_", "timestamp": 1},
+        ]}
+
+    def tearDown(self):
+        risk_cache.clear_cache()
+
+    @patch('tron_mcp_server.address_book.labels_for_addresses', return_value={})
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    @patch('tron_mcp_server.tron_client.get_transfer_history')
+    def test_enrich_attaches_risk(self, mock_history, mock_risk, _labels):
+        """enrich=True 时每个对手方只检查一次，并附加风险标签"""
+        mock_history.return_value = self.transfers
+        mock_risk.side_effect = _fake_risk
+        result = call_router.call("get_transaction_history", {
+            "address": OWNER, "token": "TRX", "enrich": True,
+        })
+        self.assertEqual(sorted(c[0][0] for c in mock_risk.call_args_list), sorted([SCAMMER, FRIEND]))
+        rows = result["transfers"]
+        self.assertEqual([r["counterparty"] for r in rows], [SCAMMER, FRIEND, SCAMMER])
+        self.assertTrue(rows[0]["counterparty_risk"]["is_risky"])
+        self.assertFalse(rows[1]["counterparty_risk"]["is_risky"])
+        self.assertIn("2 笔交易的对手方存在风险标记（共 1 个地址）", result["summary"])
+
+    @patch('tron_mcp_server.address_book.labels_for_addresses', return_value={})
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    @patch('tron_mcp_server.tron_client.get_transfer_history')
+    def test_enrich_off_by_default(self, mock_history, mock_risk, _labels):
+        """默认不进行风险查询"""
+        mock_history.return_value = self.transfers
+        result = call_router.call("get_transaction_history", {"address": OWNER, "token": "TRX"})
+        mock_risk.assert_not_called()
+        self.assertNotIn("counterparty_risk", result["transfers"][0])
+
+
+class TestRateLimiter(unittest.TestCase):
+    """测试令牌桶限速器"""
+
+    def test_waits_when_bucket_empty(self):
+        """令牌耗尽后应按速率等待"""
+        clock = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        limiter = risk_cache.RateLimiter(4, clock=lambda: clock[0], sleep=sleep)
+        for _ in range(4):
+            limiter.acquire(2)
+        # 容量 4：前两次突发，之后每次需要等待 0.5 秒
+        self.assertEqual(len(sleeps), 2)
+        self.assertAlmostEqual(clock[0], 1.0)
+
+    def test_zero_rate_unlimited(self):
+        limiter = risk_cache.RateLimiter(0, sleep=lambda s: self.fail("不应等待"))
+        for _ in range(100):
+            limiter.acquire(2)
+
+
+class TestSafetyBatch(unittest.TestCase):
+    """测试 check_account_safety_batch 路由"""
+
+    def setUp(self):
+        risk_cache.clear_cache()
+
+    def tearDown(self):
+        risk_cache.clear_cache()
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_verdict_table(self, mock_risk):
+        """输入去重、无效地址单独统计、危险地址附带原因"""
+        def risk(address):
+            if address == OWNER:
+                return {"is_risky": False, "risk_type": "Unknown", "risk_reasons": []}
+            return _fake_risk(address)
+        mock_risk.side_effect = risk
+        result = call_router.call("check_account_safety_batch", {
+            "addresses": [FRIEND, SCAMMER, FRIEND, "bad_address", OWNER],
+        })
+        self.assertEqual(mock_risk.call_count, 3)
+        self.assertEqual(result["total_input"], 5)
+        self.assertEqual(result["unique"], 4)
+        self.assertEqual(result["counts"], {"risky": 1, "safe": 1, "partial": 0, "unknown": 1, "invalid": 1})
+        self.assertEqual(result["risky_addresses"], [SCAMMER])
+        table = {row["address"]: row for row in result["verdicts"]}
+        self.assertEqual(table[SCAMMER]["reasons"], RISKY_REPORT["risk_reasons"])
+        self.assertEqual(table["bad_address"]["verdict"], "invalid")
+        self.assertIn("危险 1", result["summary"])
+
+    @patch('tron_mcp_server.tron_client.check_account_risk')
+    def test_cache_reused_and_string_input(self, mock_risk):
+        """逗号分隔字符串输入；再次检查命中缓存，查询失败的地址判定为 unknown"""
+        mock_risk.side_effect = _fake_risk
+        call_router.call("check_account_safety_batch", {"addresses": f"{FRIEND},{SCAMMER}"})
+        mock_risk.side_effect = Exception("timeout")
+        result = call_router.call("check_account_safety_batch", {"addresses": [FRIEND, SCAMMER, OWNER]})
+        self.assertEqual(result["counts"]["risky"], 1)
+        self.assertEqual(result["counts"]["safe"], 1)
+        self.assertEqual(result["counts"]["unknown"], 1)
+
+    def test_invalid_params(self):
+        self.assertIn("error", call_router.call("check_account_safety_batch", {}))
+        self.assertIn("error", call_router.call("check_account_safety_batch", {"addresses": 123}))
+        too_many = [FRIEND] * (call_router.SAFETY_BATCH_MAX + 1)
+        self.assertIn("error", call_router.call("check_account_safety_batch", {"addresses": too_many}))
+
+
+if __name__ == "__main__":
+    unittest.main()
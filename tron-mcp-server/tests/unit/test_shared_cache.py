@@ -0,0 +1,354 @@
+"""
+跨进程共享读缓存测试
+====================
+
+覆盖 shared_cache 的三种后端与 tron_client 集成:
+- memory: TTL 过期、按条目数 / 字节数 LRU 淘汰
+- sqlite: 多个连接（进程）共享、过期、上限淘汰
+- socket: 守护进程读写、断线重连、不可用时降级、自动拉起
+- tron_client: 可缓存路径命中缓存，未确认交易 / 失败响应不缓存，广播后账户失效
+- transfer: 经 TronGrid 广播后付款方与 TRC20 收款方账户缓存失效
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+import httpx
+
+from tron_mcp_server import shared_cache, tron_client, call_router
+
+ADDRESS = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+# 私钥 1 对应的地址
+TEST_PRIVATE_KEY = "0000000000000000000000000000000000000000000000000000000000000001"
+OWNER = "TMVQGm1qAQYVdetCeGRRkTWYYrLXuHK2HC"
+TXID = "1234567890abcdef" * 4
+
+
+def _sqlite_writer(db_path: str, worker: int, rounds: int) -> None:
+    backend = shared_cache.SqliteCacheBackend(db_path)
+    for i in range(rounds):
+        backend.set(f"w{worker}_{i}", json.dumps({"worker": worker, "i": i}), 60)
+    backend.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryBackend(unittest.TestCase):
+
+    def test_ttl(self):
+        clock = FakeClock()
+        backend = shared_cache.MemoryCacheBackend(clock=clock)
+        backend.set("a", "1", 10)
+        backend.set("b", "2", 0)
+        self.assertEqual(backend.get("a"), "1")
+        self.assertIsNone(backend.get("b"))
+        clock.now += 10
+        self.assertIsNone(backend.get("a"))
+        self.assertEqual(backend.stats(), {"entries": 0, "bytes": 0})
+
+    def test_lru_eviction_by_entries_and_bytes(self):
+        backend = shared_cache.MemoryCacheBackend(max_entries=2, max_bytes=10)
+        backend.set("a", "1", 60)
+        backend.set("b", "2", 60)
+        backend.get("a")
+        backend.set("c", "3", 60)
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("a"), "1")
+
+        backend.set("big", "x" * 9, 60)
+        self.assertEqual(backend.stats(), {"entries": 2, "bytes": 10})
+        self.assertIsNone(backend.get("c"))
+        backend.set("d", "12", 60)
+        self.assertEqual(backend.stats(), {"entries": 1, "bytes": 2})
+        backend.set("huge", "x" * 11, 60)
+        self.assertIsNone(backend.get("huge"))
+        self.assertEqual(backend.get("d"), "12")
+
+
+class TestSqliteBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = Path(self.tmpdir) / "cache.db"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_shared_between_connections(self):
+        first = shared_cache.SqliteCacheBackend(self.db_path)
+        second = shared_cache.SqliteCacheBackend(self.db_path)
+        try:
+            first.set("k", '{"v":1}', 60)
+            self.assertEqual(second.get("k"), '{"v":1}')
+            second.delete("k")
+            self.assertIsNone(first.get("k"))
+            first.set("short", "1", 0.05)
+            time.sleep(0.1)
+            self.assertIsNone(second.get("short"))
+        finally:
+            first.close()
+            second.close()
+
+    def test_eviction(self):
+        backend = shared_cache.SqliteCacheBackend(self.db_path, max_entries=3, max_bytes=100)
+        backend.evict_interval = 1
+        try:
+            for i in range(5):
+                backend.set(f"k{i}", "x" * 10, 60)
+            stats = backend.stats()
+            self.assertEqual(stats["entries"], 3)
+            self.assertIsNone(backend.get("k0"))
+            self.assertEqual(backend.get("k4"), "x" * 10)
+
+            backend.set("big", "y" * 90, 60)
+            stats = backend.stats()
+            self.assertLessEqual(stats["bytes"], 100)
+            self.assertEqual(backend.get("big"), "y" * 90)
+        finally:
+            backend.close()
+
+    def test_concurrent_processes(self):
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        procs = [ctx.Process(target=_sqlite_writer, args=(str(self.db_path), w, 20)) for w in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(timeout=60)
+            self.assertEqual(p.exitcode, 0)
+        backend = shared_cache.SqliteCacheBackend(self.db_path)
+        try:
+            self.assertEqual(backend.stats()["entries"], 80)
+            self.assertEqual(json.loads(backend.get("w3_19")), {"worker": 3, "i": 19})
+        finally:
+            backend.close()
+
+
+@unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"), "平台不支持 Unix socket")
+class TestSocketBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="tc-", dir="/tmp" if os.path.isdir("/tmp") else None)
+        self.socket_path = Path(self.tmpdir) / "cache.sock"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def start_daemon(self, **kwargs):
+        daemon = shared_cache.CacheDaemon(self.socket_path, **kwargs)
+        thread = daemon.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(daemon.stop)
+        return daemon
+
+    def test_get_set_stats(self):
+        self.start_daemon(max_entries=2)
+        client = shared_cache.SocketCacheBackend(self.socket_path, autostart=False)
+        other = shared_cache.SocketCacheBackend(self.socket_path, autostart=False)
+        self.addCleanup(client.close)
+        self.addCleanup(other.close)
+
+        client.set("a", '{"x": "a b"}', 60)
+        self.assertEqual(other.get("a"), '{"x": "a b"}')
+        self.assertIsNone(other.get("missing"))
+        client.set("b", "2", 60)
+        client.set("c", "3", 60)
+        stats = other.stats()
+        self.assertTrue(stats["available"])
+        self.assertEqual((stats["entries"], stats["max_entries"]), (2, 2))
+        other.delete("c")
+        other.clear()
+        self.assertIsNone(client.get("b"))
+
+    def test_reconnect_after_daemon_restart(self):
+        daemon = self.start_daemon()
+        client = shared_cache.SocketCacheBackend(self.socket_path, autostart=False)
+        self.addCleanup(client.close)
+        client.set("a", "1", 60)
+        daemon.stop()
+        time.sleep(0.1)
+
+        self.start_daemon()
+        client.set("a", "2", 60)
+        self.assertEqual(client.get("a"), "2")
+
+    def test_unavailable_degrades_to_miss(self):
+        client = shared_cache.SocketCacheBackend(self.socket_path, autostart=False)
+        with self.assertLogs("tron_mcp_server.shared_cache", level="WARNING"):
+            self.assertIsNone(client.get("a"))
+        with patch.object(client, "_connect") as mock_connect:
+            client.set("a", "1", 60)
+            mock_connect.assert_not_called()
+        self.assertFalse(client.stats()["available"])
+
+    def test_refuses_to_replace_running_daemon(self):
+        self.start_daemon()
+        with self.assertRaises(RuntimeError):
+            shared_cache.CacheDaemon(self.socket_path)
+
+    def test_autostart(self):
+        env = {
+            "PYTHONPATH": os.pathsep.join(filter(None, [project_root, os.environ.get("PYTHONPATH")])),
+            "TRON_CACHE_DAEMON_IDLE": "1",
+            "TRON_LOCK_DIR": self.tmpdir,
+        }
+        with patch.dict(os.environ, env):
+            client = shared_cache.SocketCacheBackend(self.socket_path)
+            self.addCleanup(client.close)
+            client.set("a", "1", 60)
+            self.assertEqual(client.get("a"), "1")
+            client.close()
+        # 空闲超时后守护进程退出并删除 socket
+        deadline = time.monotonic() + 10
+        while self.socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertFalse(self.socket_path.exists())
+
+
+class TestTronClientCache(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"TRON_CACHE_BACKEND": "memory", "TRON_CACHE_TTLS": ""})
+        self.env.start()
+        shared_cache.close()
+        shared_cache.clear()
+
+    def tearDown(self):
+        shared_cache.close()
+        self.env.stop()
+
+    @staticmethod
+    def response(payload, status=200):
+        return httpx.Response(status, json=payload, request=httpx.Request("GET", "https://example.com"))
+
+    @patch("tron_mcp_server.tron_client.httpx.get")
+    def test_cacheable_paths(self, mock_get):
+        mock_get.return_value = self.response({"chainParameter": [{"key": "getEnergyFee", "value": 420}]})
+        self.assertEqual(tron_client.get_gas_parameters(), 420)
+        self.assertEqual(tron_client.get_gas_parameters(), 420)
+        self.assertEqual(mock_get.call_count, 1)
+
+        mock_get.return_value = self.response({"data": [{"number": 1}]})
+        tron_client.get_network_status()
+        tron_client.get_network_status()
+        self.assertEqual(mock_get.call_count, 3)
+
+        stats = shared_cache.stats()
+        self.assertEqual(stats["backend"], "memory")
+        self.assertEqual(stats["hits"], {"chainparameters": 1})
+
+    @patch("tron_mcp_server.tron_client.httpx.get")
+    def test_only_final_transactions_cached(self, mock_get):
+        mock_get.return_value = self.response({"contractRet": "SUCCESS", "block": 0, "confirmed": False})
+        tron_client.get_transaction_status(TXID)
+        tron_client.get_transaction_status(TXID)
+        self.assertEqual(mock_get.call_count, 2)
+
+        mock_get.return_value = self.response({"contractRet": "SUCCESS", "block": 100, "confirmed": True})
+        tron_client.get_transaction_status(TXID)
+        self.assertEqual(tron_client.get_transaction_status(TXID)["block_number"], 100)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("tron_mcp_server.tron_client.httpx.get")
+    def test_risk_checks_cached_only_on_success(self, mock_get):
+        mock_get.return_value = self.response({"message": "busy"}, status=503)
+        tron_client.check_account_risk(ADDRESS)
+        tron_client.check_account_risk(ADDRESS)
+        self.assertEqual(mock_get.call_count, 4)
+
+        mock_get.return_value = self.response({"redTag": ""})
+        tron_client.check_account_risk(ADDRESS)
+        report = tron_client.check_account_risk(ADDRESS)
+        self.assertEqual(mock_get.call_count, 6)
+        self.assertEqual(report["risk_type"], "Safe")
+
+    @patch("tron_mcp_server.tron_client.httpx.post")
+    @patch("tron_mcp_server.tron_client.httpx.get")
+    def test_broadcast_invalidates_accounts(self, mock_get, mock_post):
+        mock_get.return_value = self.response({"balance": 5_000_000})
+        self.assertEqual(tron_client.get_balance_trx(ADDRESS), 5.0)
+        mock_get.return_value = self.response({"balance": 4_000_000})
+        self.assertEqual(tron_client.get_balance_trx(ADDRESS), 5.0)
+
+        owner_hex = "41" + tron_client.base58.b58decode_check(ADDRESS)[1:].hex()
+        mock_post.return_value = httpx.Response(
+            200, json={"result": True, "txid": TXID}, request=httpx.Request("POST", "https://example.com"),
+        )
+        tron_client.broadcast_transaction({
+            "txID": TXID,
+            "signature": ["00"],
+            "raw_data": {"contract": [{"parameter": {"value": {"owner_address": owner_hex}}}]},
+        })
+        self.assertEqual(tron_client.get_balance_trx(ADDRESS), 4.0)
+
+    @patch("tron_mcp_server.trongrid_client._post", return_value={"result": True})
+    @patch("tron_mcp_server.trongrid_client.build_trc20_transfer")
+    @patch("tron_mcp_server.tx_builder.build_unsigned_tx", return_value={"txID": "preview", "raw_data": {}})
+    @patch("tron_mcp_server.tron_client.httpx.get")
+    def test_transfer_invalidates_trc20_recipient(self, mock_get, _preview, mock_build, mock_post):
+        """transfer 经 TronGrid 广播后，付款方与 TRC20 收款方（编码在 data 中）的账户缓存均失效"""
+        def to_hex(address):
+            return tron_client.base58.b58decode_check(address).hex()
+
+        mock_build.return_value = {
+            "txID": TXID,
+            "raw_data": {"contract": [{"parameter": {"value": {
+                "owner_address": to_hex(OWNER),
+                "contract_address": tron_client.USDT_CONTRACT_HEX,
+                "data": "a9059cbb" + to_hex(ADDRESS)[2:].rjust(64, "0") + hex(10_000_000)[2:].rjust(64, "0"),
+            }}}]},
+        }
+        mock_get.return_value = self.response({"balance": 5_000_000})
+        tron_client.get_balance_trx(OWNER)
+        tron_client.get_balance_trx(ADDRESS)
+        mock_get.return_value = self.response({"balance": 4_000_000})
+
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": TEST_PRIVATE_KEY, "TRON_PRIVATE_KEYS": ""}):
+            result = call_router.call("transfer", {"to": ADDRESS, "amount": 10, "token": "USDT"})
+        self.assertTrue(result.get("result"), result)
+        self.assertEqual(mock_post.call_args.args[0], "wallet/broadcasttransaction")
+        self.assertEqual(tron_client.get_balance_trx(OWNER), 4.0)
+        self.assertEqual(tron_client.get_balance_trx(ADDRESS), 4.0)
+
+    @patch("tron_mcp_server.tron_client.httpx.get")
+    def test_ttl_override_and_disabled(self, mock_get):
+        mock_get.return_value = self.response({"chainParameter": [{"key": "getEnergyFee", "value": 420}]})
+        with patch.dict(os.environ, {"TRON_CACHE_TTLS": "chainparameters=0"}):
+            tron_client.get_gas_parameters()
+            tron_client.get_gas_parameters()
+        self.assertEqual(mock_get.call_count, 2)
+        with patch.dict(os.environ, {"TRON_CACHE_BACKEND": "off"}):
+            tron_client.get_gas_parameters()
+            tron_client.get_gas_parameters()
+            self.assertEqual(shared_cache.stats()["backend"], "off")
+        self.assertEqual(mock_get.call_count, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+请求追踪测试
+============
+
+覆盖 tracing 模块与路由 / 交易构建 / HTTP 层的集成:
+- 关闭时返回共享空 span，不写文件
+- 嵌套 span 的父子关系与错误记录
+- 根 span 结束时导出 Chrome trace-event / OTLP JSON
+- TRON_TRACE_MIN_MS 阈值
+- transfer 全流程的 span 归属（含后台能量补足线程）
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import tracing, call_router
+
+TEST_PRIVATE_KEY = "0000000000000000000000000000000000000000000000000000000000000001"
+ALICE = "TKyPzHiXW4Zms4txUxfWjXBidGzZpiCchn"
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (tracing._directory, tracing._format, tracing._min_ms)
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        tracing._directory, tracing._format, tracing._min_ms = self.saved
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def files(self, suffix):
+        return sorted(Path(self.tmpdir).glob(f"*{suffix}"))
+
+    def load_chrome(self):
+        files = self.files(".trace.json")
+        self.assertEqual(len(files), 1)
+        return json.loads(files[0].read_text(encoding="utf-8"))
+
+
+class TestSpans(TracingTestCase):
+
+    def test_disabled_is_noop(self):
+        tracing.configure(None)
+        first = tracing.span("a")
+        self.assertIs(first, tracing.span("b", kind="client"))
+        with first as s:
+            s.set_attribute("x", 1)
+        self.assertIs(tracing.current_span(), first)
+        fn = lambda: 1
+        self.assertIs(tracing.wrap_context(fn), fn)
+        self.assertEqual(self.files(".json"), [])
+
+    def test_nested_spans_chrome(self):
+        tracing.configure(self.tmpdir)
+        with tracing.span("root", action="transfer"):
+            with tracing.span("child", kind="client") as child:
+                child.set_attribute("status", 200)
+            with self.assertRaises(ValueError):
+                with tracing.span("failing"):
+                    raise ValueError("bad")
+        self.assertIs(tracing.current_span(), tracing._NOOP_SPAN)
+
+        data = self.load_chrome()
+        events = {e["name"]: e for e in data["traceEvents"]}
+        self.assertEqual(set(events), {"root", "child", "failing"})
+        root_id = events["root"]["args"]["span_id"]
+        self.assertNotIn("parent_id", events["root"]["args"])
+        self.assertEqual(events["child"]["args"]["parent_id"], root_id)
+        self.assertEqual(events["child"]["args"]["status"], 200)
+        self.assertEqual(events["child"]["cat"], "client")
+        self.assertEqual(events["failing"]["args"]["error"], "ValueError: bad")
+        self.assertEqual(events["root"]["ph"], "X")
+        self.assertGreaterEqual(events["root"]["dur"], events["child"]["dur"])
+
+    def test_otlp_export(self):
+        tracing.configure(self.tmpdir, fmt="otlp")
+        with tracing.span("root", count=3, ratio=0.5, ok=True):
+            with tracing.span("trongrid wallet/x", kind="client"):
+                pass
+        files = self.files(".otlp.json")
+        self.assertEqual(len(files), 1)
+        self.assertEqual(self.files(".trace.json"), [])
+        resource = json.loads(files[0].read_text(encoding="utf-8"))["resourceSpans"][0]
+        self.assertEqual(resource["resource"]["attributes"][0]["value"]["stringValue"], tracing.SERVICE_NAME)
+        spans = {s["name"]: s for s in resource["scopeSpans"][0]["spans"]}
+        root, client = spans["root"], spans["trongrid wallet/x"]
+        self.assertEqual(len(root["traceId"]), 32)
+        self.assertEqual(len(root["spanId"]), 16)
+        self.assertEqual(client["parentSpanId"], root["spanId"])
+        self.assertEqual(client["traceId"], root["traceId"])
+        self.assertEqual(client["kind"], 3)
+        self.assertEqual(root["status"], {"code": 1})
+        attributes = {a["key"]: a["value"] for a in root["attributes"]}
+        self.assertEqual(attributes["count"], {"intValue": "3"})
+        self.assertEqual(attributes["ratio"], {"doubleValue": 0.5})
+        self.assertEqual(attributes["ok"], {"boolValue": True})
+        self.assertLessEqual(int(root["startTimeUnixNano"]), int(client["startTimeUnixNano"]))
+
+    def test_min_duration_threshold(self):
+        tracing.configure(self.tmpdir, fmt="both", min_duration_ms=60_000)
+        with tracing.span("fast"):
+            pass
+        self.assertEqual(self.files(".json"), [])
+        tracing.configure(self.tmpdir, fmt="both")
+        with tracing.span("fast"):
+            pass
+        self.assertEqual(len(self.files(".trace.json")), 1)
+        self.assertEqual(len(self.files(".otlp.json")), 1)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            tracing.configure(self.tmpdir, fmt="xml")
+
+
+class TestRouterTracing(TracingTestCase):
+
+    def test_action_span_records_error_type(self):
+        tracing.configure(self.tmpdir)
+        call_router.call("get_usdt_balance", {})
+        (event,) = self.load_chrome()["traceEvents"]
+        self.assertEqual(event["name"], "action get_usdt_balance")
+        self.assertEqual(event["args"]["error_type"], "missing_param")
+
+    @patch.dict(os.environ, {
+        "TRON_PRIVATE_KEY": TEST_PRIVATE_KEY, "TRON_PRIVATE_KEYS": "",
+        "TRON_ENERGY_ESTIMATOR": "static", "TRON_ENERGY_TOPUP_WAIT": "0",
+    })
+    @patch('tron_mcp_server.tronzap_client.get_client', side_effect=ValueError("no credentials"))
+    @patch('tron_mcp_server.tron_client.get_account_energy', return_value={"energy_remaining": 0})
+    @patch('tron_mcp_server.tron_client.check_account_risk', return_value={"is_risky": False, "risk_type": "Safe"})
+    @patch('tron_mcp_server.tx_builder.check_sender_balance', return_value={"checked": True, "sufficient": True})
+    @patch('tron_mcp_server.tx_builder.check_recipient_status', return_value={"checked": True, "warnings": []})
+    @patch('tron_mcp_server.tx_builder._get_ref_block', return_value=("abcd", "1234567890abcdef"))
+    @patch('tron_mcp_server.trongrid_client.httpx.post')
+    def test_transfer_spans(self, mock_post, *_mocks):
+        from tron_mcp_server import energy_topup
+        energy_topup.invalidate()
+        response = MagicMock()
+        response.json.side_effect = [
+            {"result": {"result": True}, "transaction": {"txID": "c" * 64, "raw_data": {}}},
+            {"result": True, "txid": "c" * 64},
+        ]
+        mock_post.return_value = response
+        tracing.configure(self.tmpdir)
+
+        result = call_router.call("transfer", {"to": ALICE, "amount": 1, "token": "USDT", "auto_energy_topup": True})
+        self.assertTrue(result.get("result"), result)
+
+        events = self.load_chrome()["traceEvents"]
+        by_name = {e["name"]: e for e in events}
+        for name in (
+            "action transfer", "transfer.preflight", "tx_builder.check_recipient_security",
+            "tx_builder.check_sender_balance", "tx_builder.check_recipient_status", "tx_builder.build_preview",
+            "trongrid wallet/triggersmartcontract", "transfer.sign", "trongrid wallet/broadcasttransaction",
+            "transfer.wait_energy_topup", "energy_topup.top_up",
+        ):
+            self.assertIn(name, by_name)
+        root_id = by_name["action transfer"]["args"]["span_id"]
+        preflight_id = by_name["transfer.preflight"]["args"]["span_id"]
+        self.assertEqual(by_name["transfer.preflight"]["args"]["parent_id"], root_id)
+        self.assertEqual(by_name["tx_builder.check_sender_balance"]["args"]["parent_id"], preflight_id)
+        # 后台线程中的能量补足挂在根 span 下
+        self.assertEqual(by_name["energy_topup.top_up"]["args"]["parent_id"], root_id)
+        self.assertEqual(by_name["energy_topup.top_up"]["args"]["status"], "unavailable")
+        self.assertNotEqual(by_name["energy_topup.top_up"]["tid"], by_name["action transfer"]["tid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
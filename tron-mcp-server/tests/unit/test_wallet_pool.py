@@ -0,0 +1,244 @@
+"""
+测试 wallet_pool.py - 多钱包密钥池
+==================================
+
+覆盖以下功能：
+- 私钥来源: TRON_PRIVATE_KEYS / 编号私钥 / keystore / TRON_PRIVATE_KEY 合并去重
+- 加密 keystore: 写入 → 读取往返、口令错误
+- 选择策略: round_robin / most_energy / most_balance / 指定付款地址
+- 钱包隔离: 繁忙钱包跳过、同一钱包串行
+- transfer 路由: 多钱包时按策略选择付款钱包
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from unittest.mock import patch, MagicMock
+
+sys.modules["mcp"] = MagicMock()
+sys.modules["mcp.server"] = MagicMock()
+sys.modules["mcp.server.fastmcp"] = MagicMock()
+
+from tron_mcp_server import wallet_pool, key_manager, call_router
+
+# 测试用私钥（仅用于测试，不要在生产中使用）
+KEY_1 = "00" * 31 + "01"
+KEY_2 = "00" * 31 + "02"
+KEY_3 = "00" * 31 + "03"
+ADDR_1 = key_manager.get_address_from_private_key(KEY_1)
+ADDR_2 = key_manager.get_address_from_private_key(KEY_2)
+ADDR_3 = key_manager.get_address_from_private_key(KEY_3)
+TEST_TO = "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"
+
+
+class TestKeySources(unittest.TestCase):
+    """测试私钥来源合并"""
+
+    def test_multi_numbered_and_single_merged(self):
+        """多个来源应按顺序合并并去重"""
+        env = {
+            "TRON_PRIVATE_KEYS": f"{KEY_1}, 0x{KEY_2}",
+            "TRON_PRIVATE_KEY_1": KEY_3,
+            "TRON_PRIVATE_KEY_2": KEY_1,
+            "TRON_PRIVATE_KEY": KEY_2,
+        }
+        with patch.dict(os.environ, env, clear=True):
+            pool = wallet_pool.get_wallet_pool()
+            self.assertEqual(pool.addresses, [ADDR_1, ADDR_2, ADDR_3])
+            self.assertTrue(wallet_pool.is_multi_wallet_configured())
+
+    def test_numbered_keys_stop_at_gap(self):
+        """编号私钥遇到空缺应停止"""
+        env = {"TRON_PRIVATE_KEY_1": KEY_1, "TRON_PRIVATE_KEY_3": KEY_3}
+        with patch.dict(os.environ, env, clear=True):
+            self.assertEqual(wallet_pool.get_wallet_pool().addresses, [ADDR_1])
+
+    def test_single_key_is_not_multi_wallet(self):
+        """仅配置 TRON_PRIVATE_KEY 时不视为多钱包"""
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEY": KEY_1}, clear=True):
+            self.assertFalse(wallet_pool.is_multi_wallet_configured())
+            self.assertEqual(wallet_pool.get_wallet_pool().size, 1)
+
+    def test_pool_reloads_on_config_change(self):
+        """配置变化时密钥池应重新加载"""
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEYS": KEY_1}, clear=True):
+            first = wallet_pool.get_wallet_pool()
+            self.assertIs(wallet_pool.get_wallet_pool(), first)
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEYS": f"{KEY_1},{KEY_2}"}, clear=True):
+            self.assertEqual(wallet_pool.get_wallet_pool().size, 2)
+
+    def test_invalid_key_raises(self):
+        """无效私钥应抛出 ValueError"""
+        with patch.dict(os.environ, {"TRON_PRIVATE_KEYS": f"{KEY_1},xyz"}, clear=True):
+            with self.assertRaises(ValueError):
+                wallet_pool.get_wallet_pool()
+
+
+class TestKeystore(unittest.TestCase):
+    """测试加密 keystore"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "keys.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_roundtrip(self):
+        """写入后应能用相同口令解密，且文件不含明文私钥"""
+        wallet_pool.write_keystore(self.path, [KEY_2, KEY_3], "secret")
+        self.assertEqual(wallet_pool.read_keystore(self.path, "secret"), [KEY_2, KEY_3])
+        with open(self.path, encoding="utf-8") as f:
+            self.assertNotIn(KEY_2, f.read())
+
+    def test_wrong_password(self):
+        """口令错误应抛出 ValueError"""
+        wallet_pool.write_keystore(self.path, [KEY_2], "secret")
+        with self.assertRaises(ValueError) as ctx:
+            wallet_pool.read_keystore(self.path, "wrong")
+        self.assertIn("解密失败", str(ctx.exception))
+
+    def test_keystore_as_pool_source(self):
+        """keystore 应作为密钥池来源，缺少口令时报错"""
+        wallet_pool.write_keystore(self.path, [KEY_2, KEY_3], "secret")
+        env = {"TRON_KEYSTORE_PATH": self.path, "TRON_KEYSTORE_PASSWORD": "secret"}
+        with patch.dict(os.environ, env, clear=True):
+            self.assertEqual(wallet_pool.get_wallet_pool().addresses, [ADDR_2, ADDR_3])
+        with patch.dict(os.environ, {"TRON_KEYSTORE_PATH": self.path}, clear=True):
+            with self.assertRaises(ValueError):
+                wallet_pool.get_wallet_pool()
+
+
+class TestSelectionPolicies(unittest.TestCase):
+    """测试钱包选择策略"""
+
+    def setUp(self):
+        self.pool = wallet_pool.WalletPool([KEY_1, KEY_2, KEY_3])
+
+    def test_round_robin(self):
+        """轮询策略应依次选择钱包"""
+        picked = [self.pool.select("round_robin").address for _ in range(4)]
+        self.assertEqual(picked, [ADDR_1, ADDR_2, ADDR_3, ADDR_1])
+
+    def test_round_robin_skips_busy_wallet(self):
+        """繁忙钱包应被跳过，全部繁忙时仍能选出钱包"""
+        with self.pool.hold(self.pool.get(ADDR_1)):
+            self.assertEqual(self.pool.select("round_robin").address, ADDR_2)
+            with self.pool.hold(self.pool.get(ADDR_2)), self.pool.hold(self.pool.get(ADDR_3)):
+                self.assertIn(self.pool.select("round_robin").address, self.pool.addresses)
+
+    @patch('tron_mcp_server.tron_client.get_account_energy')
+    def test_most_energy(self, mock_energy):
+        """most_energy 应选择剩余能量最多的钱包，查询失败视为 0"""
+        def energy(addr):
+            if addr == ADDR_3:
+                raise Exception("timeout")
+            return {"energy_remaining": {ADDR_1: 1000, ADDR_2: 65000}[addr]}
+        mock_energy.side_effect = energy
+        self.assertEqual(self.pool.select("most_energy").address, ADDR_2)
+
+    @patch('tron_mcp_server.tron_client.get_balance_trx')
+    @patch('tron_mcp_server.tron_client.get_usdt_balance')
+    def test_most_balance_uses_transfer_token(self, mock_usdt, mock_trx):
+        """most_balance 应按转账代币的余额排序"""
+        mock_usdt.side_effect = lambda addr: {ADDR_1: 5.0, ADDR_2: 1.0, ADDR_3: 50.0}[addr]
+        mock_trx.side_effect = lambda addr: {ADDR_1: 900.0, ADDR_2: 10.0, ADDR_3: 1.0}[addr]
+        self.assertEqual(self.pool.select("most_balance", "USDT").address, ADDR_3)
+        self.assertEqual(self.pool.select("most_balance", "TRX").address, ADDR_1)
+
+    def test_pinned_address(self):
+        """指定付款地址应直接返回，不在池中时报错"""
+        self.assertEqual(self.pool.select(address=ADDR_2).address, ADDR_2)
+        with self.assertRaises(ValueError):
+            self.pool.select(address=TEST_TO)
+
+    def test_invalid_policy_and_empty_pool(self):
+        """无效策略与空密钥池应抛出 ValueError"""
+        with self.assertRaises(ValueError):
+            self.pool.select("cheapest")
+        with self.assertRaises(ValueError):
+            wallet_pool.WalletPool([]).select()
+
+    def test_same_wallet_serialized(self):
+        """同一钱包的持有应互斥"""
+        wallet = self.pool.get(ADDR_1)
+        acquired = threading.Event()
+
+        def worker():
+            with self.pool.hold(wallet):
+                acquired.set()
+
+        with self.pool.hold(wallet):
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join(0.1)
+            self.assertFalse(acquired.is_set())
+        t.join(1)
+        self.assertTrue(acquired.is_set())
+
+
+class TestTransferWithWalletPool(unittest.TestCase):
+    """测试 transfer 路由使用密钥池"""
+
+    def _run_transfer(self, params: dict, env: dict) -> tuple:
+        with patch.dict(os.environ, env, clear=True), \
+                patch('tron_mcp_server.tx_builder.build_unsigned_tx') as mock_preview, \
+                patch('tron_mcp_server.trongrid_client.build_trc20_transfer') as mock_build, \
+                patch('tron_mcp_server.trongrid_client.broadcast_transaction') as mock_broadcast:
+            mock_preview.return_value = {"txID": "a" * 64, "raw_data": {}}
+            mock_build.return_value = {"txID": "b" * 64, "raw_data": {}}
+            mock_broadcast.return_value = {"result": True, "txid": "b" * 64}
+            result = call_router.call("transfer", dict({"to": TEST_TO, "amount": 10}, **params))
+            return result, mock_preview, mock_broadcast
+
+    def test_round_robin_across_wallets(self):
+        """多钱包配置下连续转账应轮流使用不同付款钱包"""
+        env = {"TRON_PRIVATE_KEYS": f"{KEY_1},{KEY_2}"}
+        first, _, _ = self._run_transfer({}, env)
+        second, _, mock_broadcast = self._run_transfer({}, env)
+        self.assertNotEqual(first["from"], second["from"])
+        self.assertEqual({first["from"], second["from"]}, {ADDR_1, ADDR_2})
+        self.assertEqual(second["wallet_policy"], "round_robin")
+        signed = mock_broadcast.call_args[0][0]
+        self.assertEqual(signed["signature"][0],
+                         key_manager.sign_transaction("b" * 64, KEY_1 if second["from"] == ADDR_1 else KEY_2))
+
+    def test_pinned_from_address(self):
+        """指定 from 时使用该钱包进行安全检查与签名"""
+        env = {"TRON_PRIVATE_KEYS": f"{KEY_1},{KEY_2}"}
+        result, mock_preview, _ = self._run_transfer({"from": ADDR_2}, env)
+        self.assertEqual(result["from"], ADDR_2)
+        self.assertEqual(mock_preview.call_args[0][0], ADDR_2)
+        self.assertEqual(result["wallet_policy"], "pinned")
+
+    def test_from_address_not_in_pool(self):
+        """指定的付款地址不在密钥池中应返回 wallet_error"""
+        result, _, _ = self._run_transfer({"from": TEST_TO}, {"TRON_PRIVATE_KEY": KEY_1})
+        self.assertIn("wallet_error", result["error"])
+
+    def test_invalid_policy(self):
+        """无效策略应返回 wallet_error"""
+        result, _, _ = self._run_transfer({"wallet_policy": "random"}, {"TRON_PRIVATE_KEYS": KEY_1})
+        self.assertIn("wallet_error", result["error"])
+
+    def test_non_string_policy(self):
+        """非字符串策略应返回 invalid_param，而非抛出异常"""
+        for policy in (1, ["round_robin"], {"name": "least_used"}):
+            with self.subTest(policy=policy):
+                result, mock_preview, _ = self._run_transfer({"wallet_policy": policy}, {"TRON_PRIVATE_KEYS": KEY_1})
+                self.assertIn("invalid_param", result["error"])
+                mock_preview.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
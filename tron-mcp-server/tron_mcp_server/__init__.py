@@ -1,22 +1,18 @@
 # TRON MCP Server
 # 渐进式披露架构实现
 
+import importlib
+
 from tron_mcp_server.logging_config import setup_logging
 
 # 初始化统一日志配置
 setup_logging()
 
-from tron_mcp_server import skills
-from tron_mcp_server import validators
-from tron_mcp_server import formatters
-from tron_mcp_server import tron_client
-from tron_mcp_server import tx_builder
-from tron_mcp_server import key_manager
-from tron_mcp_server import call_router
-from tron_mcp_server import address_book
-from tron_mcp_server import qrcode_generator
-
-# server 模块延迟导入，避免在测试环境中因缺少 mcp 包报错
+# 子模块按需加载（PEP 562）：
+# stdio 模式下每个 Agent 会话都会拉起一个 server 进程，冷启动时间很关键，
+# 因此包导入时不再一次性加载 ecdsa / pycryptodome / qrcode(PIL) 等重依赖，
+# 首次访问 tron_mcp_server.<submodule> 时才真正导入。
+# server 模块同样延迟导入，避免在测试环境中因缺少 mcp 包报错
 # from tron_mcp_server.server import mcp
 
 __all__ = [
@@ -29,4 +25,31 @@ __all__ = [
     "call_router",
     "address_book",
     "qrcode_generator",
+    "wallet_pool",
+    "risk_cache",
+    "blacklist",
+    "energy_estimator",
+    "fee_planner",
+    "tronzap_client",
+    "energy_topup",
+    "metrics",
+    "tracing",
+    "cassette",
+    "profiling",
+    "interprocess",
+    "lifecycle",
+    "http_transport",
+    "shared_cache",
+    "response_schemas",
 ]
+
+
+def __getattr__(name: str):
+    """按需导入 __all__ 中声明的子模块"""
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
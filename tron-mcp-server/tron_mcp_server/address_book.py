@@ -3,15 +3,49 @@
 使用 JSON 文件持久化存储 TRON 钱包地址的别名映射。
 默认存储路径: ~/.tron_mcp/address_book.json
 可通过环境变量 TRON_ADDRESSBOOK_PATH 自定义存储路径。
+
+地址簿在进程内只加载一次，常驻内存并维护 别名 → 联系人、地址 → 别名 两个哈希索引；
+每次访问只做一次 os.stat，文件被外部修改（mtime / size / inode 变化）时才重新加载。
+写入采用 临时文件 + fsync + rename 的原子替换，进程崩溃不会留下半截文件；
+写入期间持有跨进程文件锁（见 interprocess）并先重新加载，多个 worker 进程共享同一文件时不会丢失更新。
+可选开启追加式日志（TRON_ADDRESSBOOK_JOURNAL=1）：每次写入只追加一行到
+<路径>.journal，累计到一定条数后再压缩合并进主文件，适合联系人很多、写入频繁的场景。
+
+可选 SQLite 后端（TRON_ADDRESSBOOK_BACKEND=sqlite）：联系人表在 alias 和 address 上
+都有索引，适合联系人很多、或多个进程共享同一地址簿的场景；路径可通过
+TRON_ADDRESSBOOK_DB_PATH 自定义，首次创建时自动导入已有的 JSON 地址簿。
+
+模糊搜索（"您是否想找…"）使用 n-gram 倒排索引：先按共享 2/3-gram 的 Dice 系数选出
+少量候选，再只对候选计算 SequenceMatcher 相似度，避免每次未命中都扫描全部别名。
 """
 
+import heapq
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List
+from collections import Counter
+from typing import Optional, Dict, List, Set
 from difflib import SequenceMatcher
 
+from . import interprocess
+
+# 日志模式下，累计多少条日志记录后压缩合并进主文件
+JOURNAL_COMPACT_THRESHOLD = 500
+
+# 模糊搜索：相似度阈值、返回条数、进入 SequenceMatcher 精排的候选数
+SIMILARITY_THRESHOLD = 0.5
+SIMILAR_MATCH_LIMIT = 3
+FUZZY_CANDIDATE_LIMIT = 32
+# 单次模糊搜索累加的倒排表总长度预算
+FUZZY_POSTING_BUDGET = 2000
+
+# 可选存储后端
+BACKENDS = ("json", "sqlite")
+# SQLite 单条语句的参数个数上限（旧版本 SQLite 为 999）
+SQLITE_MAX_PARAMS = 900
+
 
 def _get_storage_path() -> Path:
     """获取地址簿存储路径"""
@@ -26,27 +60,565 @@ def _get_storage_path() -> Path:
     return tron_dir / "address_book.json"
 
 
-def _load_addressbook() -> dict:
-    """加载地址簿数据"""
-    path = _get_storage_path()
-    if not path.exists():
-        return {}
-    
+def _journal_enabled() -> bool:
+    return os.getenv("TRON_ADDRESSBOOK_JOURNAL", "").strip().lower() in ("1", "true", "yes")
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    """文件签名 (mtime_ns, size, inode)，文件不存在时返回 None"""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        # 文件损坏或读取失败，返回空字典
-        return {}
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
 
 
-def _save_addressbook(data: dict) -> None:
-    """保存地址簿数据"""
-    path = _get_storage_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def _ngrams(text: str) -> Set[str]:
+    """
+    别名的 n-gram 集合（小写，首尾加边界符，取 2-gram 与 3-gram）
+
+    中文别名通常只有 2~3 个字，只用 3-gram 会让短别名几乎没有可比的 gram，
+    因此同时索引 2-gram。
+    """
+    padded = f"\x02{text.lower()}\x03"
+    grams = set()
+    for n in (2, 3):
+        grams.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+class _NgramIndex:
+    """别名 n-gram 倒排索引：gram → 别名集合"""
+
+    def __init__(self, aliases=()):
+        self._postings: Dict[str, Set[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        for alias in aliases:
+            self.add(alias)
+
+    def add(self, alias: str) -> None:
+        grams = _ngrams(alias)
+        self._gram_counts[alias] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(alias)
+
+    def remove(self, alias: str) -> None:
+        if self._gram_counts.pop(alias, None) is None:
+            return
+        for gram in _ngrams(alias):
+            aliases = self._postings.get(gram)
+            if aliases is not None:
+                aliases.discard(alias)
+                if not aliases:
+                    del self._postings[gram]
+
+    def candidates(self, query: str, limit: int) -> List[str]:
+        """
+        按共享 gram 的 Dice 系数返回前 limit 个候选别名
+
+        数字、常见姓氏等高频 gram 的倒排表很长，但几乎没有区分度；
+        因此按倒排表长度从短到长累加，总量超过预算后不再累加更高频的 gram
+        （至少使用一个 gram），单次查询的工作量基本不随地址簿规模增长。
+        """
+        grams = _ngrams(query)
+        postings = sorted(
+            (self._postings[gram] for gram in grams if gram in self._postings),
+            key=len,
+        )
+
+        shared = Counter()
+        budget = FUZZY_POSTING_BUDGET
+        for aliases in postings:
+            if budget < len(aliases) and shared:
+                break
+            shared.update(aliases)
+            budget -= len(aliases)
+        if len(shared) > limit:
+            # 共享 gram 数不足最佳候选三分之一的别名几乎不可能排进前列，直接丢弃
+            floor = max(shared.values()) // 3
+            shared = {alias: c for alias, c in shared.items() if c > floor}
+
+        total = len(grams)
+        counts = self._gram_counts
+        return heapq.nlargest(
+            limit, shared, key=lambda alias: 2 * shared[alias] / (total + counts[alias]),
+        )
+
+
+def _rank_similar(query: str, contacts: List[tuple], limit: int) -> List[dict]:
+    """
+    对候选联系人按 SequenceMatcher 相似度精排
+
+    Args:
+        query: 查询别名
+        contacts: (别名, 联系人) 候选列表
+        limit: 最多返回条数
+
+    Returns:
+        相似度高于阈值的联系人列表（按相似度降序，最多 limit 个）
+    """
+    query_lower = query.lower()
+    matches = []
+    for contact_alias, contact_data in contacts:
+        # 使用 SequenceMatcher 计算相似度；quick_ratio 是 ratio 的上界，
+        # 上界不超过阈值或不可能进入前 limit 名时跳过精确计算
+        matcher = SequenceMatcher(None, query_lower, contact_alias.lower())
+        floor = SIMILARITY_THRESHOLD
+        if len(matches) >= limit:
+            floor = max(floor, sorted(m["similarity"] for m in matches)[-limit])
+        if matcher.quick_ratio() <= floor:
+            continue
+        similarity = matcher.ratio()
+        if similarity > SIMILARITY_THRESHOLD:
+            matches.append({
+                "alias": contact_alias,
+                "address": contact_data["address"],
+                "note": contact_data.get("note", ""),
+                "similarity": similarity,
+            })
+
+    # 按相似度降序排序
+    matches.sort(key=lambda x: x["similarity"], reverse=True)
+    return matches[:limit]
+
+
+class _AddressBookStore:
+    """
+    常驻内存的地址簿
+
+    - _contacts: 别名 → 联系人数据（与 JSON 文件结构一致）
+    - _by_address: 地址 → 别名列表（同一地址可能有多个别名）
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.journal_path = path.with_name(path.name + ".journal")
+        self.lock_path = interprocess.lock_path_for_file(path)
+        self._lock = threading.RLock()
+        self._contacts: Dict[str, dict] = {}
+        self._by_address: Dict[str, List[str]] = {}
+        # 模糊搜索索引在首次模糊搜索时才构建，之后随写入增量维护
+        self._fuzzy_index: Optional[_NgramIndex] = None
+        self._signature: Optional[tuple] = None
+        self._journal_entries = 0
+        self._loaded = False
+
+    # ---------- 加载与失效 ----------
+
+    def _current_signature(self) -> tuple:
+        return (_file_signature(self.path), _file_signature(self.journal_path))
+
+    def _ensure_fresh(self) -> None:
+        """文件被外部修改时重新加载（调用方需持有锁）"""
+        signature = self._current_signature()
+        if self._loaded and signature == self._signature:
+            return
+        self._contacts = self._read_snapshot()
+        self._journal_entries = self._replay_journal()
+        self._rebuild_address_index()
+        self._signature = signature
+        self._loaded = True
+
+    def _read_snapshot(self) -> Dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            # 文件损坏或读取失败，视为空地址簿
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _replay_journal(self) -> int:
+        """重放日志到内存，返回有效日志条数（末尾被截断的半行会被忽略）"""
+        if not self.journal_path.exists():
+            return 0
+        count = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if entry.get("op") == "put":
+                        self._contacts[entry["alias"]] = entry["contact"]
+                    elif entry.get("op") == "remove":
+                        self._contacts.pop(entry["alias"], None)
+                    count += 1
+        except IOError:
+            pass
+        return count
+
+    def _rebuild_address_index(self) -> None:
+        self._by_address = {}
+        self._fuzzy_index = None
+        for alias, contact in self._contacts.items():
+            self._by_address.setdefault(contact.get("address"), []).append(alias)
+
+    def _index_add(self, alias: str, address: str) -> None:
+        self._by_address.setdefault(address, []).append(alias)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(alias)
+
+    def _index_remove(self, alias: str, address: str) -> None:
+        aliases = self._by_address.get(address)
+        if aliases and alias in aliases:
+            aliases.remove(alias)
+            if not aliases:
+                del self._by_address[address]
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(alias)
+
+    # ---------- 持久化 ----------
+
+    def _write_snapshot(self) -> None:
+        """原子写入主文件：临时文件 → fsync → rename"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._contacts, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def _append_journal(self, entry: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries += 1
+
+    def compact(self) -> None:
+        """将日志合并进主文件并删除日志"""
+        with self._lock, interprocess.FileLock(self.lock_path):
+            self._ensure_fresh()
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """合并日志（调用方需持有线程锁与跨进程锁）"""
+        self._write_snapshot()
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self._journal_entries = 0
+        self._signature = self._current_signature()
+
+    def _persist(self, entry: dict) -> None:
+        """持久化一次变更（调用方需持有线程锁与跨进程锁）"""
+        if _journal_enabled():
+            self._append_journal(entry)
+            if self._journal_entries >= JOURNAL_COMPACT_THRESHOLD:
+                self._compact_locked()
+                return
+        else:
+            self._write_snapshot()
+            if self.journal_path.exists():
+                # 从日志模式切回快照模式：日志已包含在内存中，写入快照后即可删除
+                self.journal_path.unlink()
+                self._journal_entries = 0
+        self._signature = self._current_signature()
+
+    # ---------- 读写接口 ----------
+
+    def get(self, alias: str) -> Optional[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            return self._contacts.get(alias)
+
+    def aliases_for_address(self, address: str) -> List[str]:
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._by_address.get(address, []))
+
+    def similar(self, query: str, limit: int = SIMILAR_MATCH_LIMIT) -> List[dict]:
+        """模糊搜索相似别名：n-gram 索引召回候选，SequenceMatcher 精排"""
+        with self._lock:
+            self._ensure_fresh()
+            if self._fuzzy_index is None:
+                self._fuzzy_index = _NgramIndex(self._contacts)
+            candidates = self._fuzzy_index.candidates(query, FUZZY_CANDIDATE_LIMIT)
+            contacts = [(alias, self._contacts[alias]) for alias in candidates]
+        return _rank_similar(query, contacts, limit)
+
+    def labels_for_addresses(self, addresses) -> Dict[str, List[str]]:
+        """批量反查：地址 → 别名列表（只包含地址簿中存在的地址）"""
+        with self._lock:
+            self._ensure_fresh()
+            return {
+                address: list(self._by_address[address])
+                for address in set(addresses) if address in self._by_address
+            }
+
+    def items(self) -> List[tuple]:
+        """返回 (别名, 联系人) 快照列表"""
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._contacts.items())
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._contacts)
+
+    def put(self, alias: str, contact: dict) -> Optional[dict]:
+        """写入联系人，返回旧数据（不存在则为 None）"""
+        with self._lock, interprocess.FileLock(self.lock_path):
+            self._ensure_fresh()
+            previous = self._contacts.get(alias)
+            if previous is not None:
+                self._index_remove(alias, previous.get("address"))
+            self._contacts[alias] = contact
+            self._index_add(alias, contact.get("address"))
+            self._persist({"op": "put", "alias": alias, "contact": contact})
+            return previous
+
+    def remove(self, alias: str) -> Optional[dict]:
+        """删除联系人，返回被删除的数据（不存在则为 None）"""
+        with self._lock, interprocess.FileLock(self.lock_path):
+            self._ensure_fresh()
+            if alias not in self._contacts:
+                return None
+            removed = self._contacts.pop(alias)
+            self._index_remove(alias, removed.get("address"))
+            self._persist({"op": "remove", "alias": alias})
+            return removed
+
+
+class _SqliteAddressBookStore:
+    """
+    SQLite 地址簿（TRON_ADDRESSBOOK_BACKEND=sqlite）
+
+    联系人表以 alias 为主键，并在 address 上建立索引，正查 / 反查都走 B-tree 索引，
+    不需要把整个地址簿加载进内存；多个进程可以安全地共享同一个数据库文件。
+    首次创建数据库时自动导入同目录下已有的 JSON 地址簿。
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS contacts ("
+        " alias TEXT PRIMARY KEY,"
+        " address TEXT NOT NULL,"
+        " note TEXT NOT NULL DEFAULT '',"
+        " created_at TEXT,"
+        " updated_at TEXT)",
+        "CREATE INDEX IF NOT EXISTS idx_contacts_address ON contacts(address)",
+    )
+    _COLUMNS = "alias, address, note, created_at, updated_at"
+
+    def __init__(self, path: Path, import_from: Optional[Path] = None):
+        self.path = path
+        self.import_from = import_from
+        self._lock = threading.RLock()
+        self._conn = None
+        # 模糊搜索索引：首次模糊搜索时构建；其他连接提交写入后 PRAGMA data_version 变化即失效
+        self._fuzzy_index: Optional[_NgramIndex] = None
+        self._data_version: Optional[int] = None
+
+    # ---------- 连接与初始化 ----------
+
+    def _connection(self):
+        """获取连接，首次调用时建表（调用方需持有锁）"""
+        if self._conn is not None:
+            return self._conn
+        import sqlite3
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            existed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='contacts'"
+            ).fetchone() is not None
+            with conn:
+                for statement in self._SCHEMA:
+                    conn.execute(statement)
+                if not existed:
+                    self._import_json(conn)
+        except Exception:
+            conn.close()
+            raise
+        self._conn = conn
+        return conn
+
+    def _import_json(self, conn) -> None:
+        """导入旧 JSON 地址簿（仅在新建数据库时执行一次）"""
+        if self.import_from is None or not self.import_from.exists():
+            return
+        contacts = _AddressBookStore(self.import_from).items()
+        conn.executemany(
+            f"INSERT OR REPLACE INTO contacts ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+            [self._row_values(alias, contact) for alias, contact in contacts],
+        )
+
+    @staticmethod
+    def _row_values(alias: str, contact: dict) -> tuple:
+        return (
+            alias,
+            contact.get("address"),
+            contact.get("note") or "",
+            contact.get("created_at"),
+            contact.get("updated_at"),
+        )
+
+    @staticmethod
+    def _row_contact(row) -> dict:
+        return {"address": row[1], "note": row[2], "created_at": row[3], "updated_at": row[4]}
+
+    def _fuzzy(self, conn) -> _NgramIndex:
+        """获取模糊搜索索引，其他连接修改过数据库时重建（调用方需持有锁）"""
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._fuzzy_index is None or version != self._data_version:
+            aliases = [row[0] for row in conn.execute("SELECT alias FROM contacts")]
+            self._fuzzy_index = _NgramIndex(aliases)
+            self._data_version = version
+        return self._fuzzy_index
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._fuzzy_index = None
+
+    # ---------- 读写接口 ----------
+
+    def get(self, alias: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {self._COLUMNS} FROM contacts WHERE alias = ?", (alias,)
+            ).fetchone()
+        return self._row_contact(row) if row else None
+
+    def aliases_for_address(self, address: str) -> List[str]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT alias FROM contacts WHERE address = ? ORDER BY rowid", (address,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def similar(self, query: str, limit: int = SIMILAR_MATCH_LIMIT) -> List[dict]:
+        """模糊搜索相似别名：n-gram 索引召回候选，按主键取回候选后精排"""
+        with self._lock:
+            conn = self._connection()
+            candidates = self._fuzzy(conn).candidates(query, FUZZY_CANDIDATE_LIMIT)
+            if not candidates:
+                return []
+            placeholders = ",".join("?" * len(candidates))
+            rows = conn.execute(
+                f"SELECT {self._COLUMNS} FROM contacts WHERE alias IN ({placeholders})",
+                candidates,
+            ).fetchall()
+        contacts = {row[0]: self._row_contact(row) for row in rows}
+        return _rank_similar(
+            query, [(alias, contacts[alias]) for alias in candidates if alias in contacts], limit,
+        )
+
+    def labels_for_addresses(self, addresses) -> Dict[str, List[str]]:
+        """批量反查：一次 IN 查询取回一页交易涉及的全部地址的别名"""
+        unique = list(dict.fromkeys(a for a in addresses if a))
+        labels: Dict[str, List[str]] = {}
+        with self._lock:
+            conn = self._connection()
+            # SQLite 单条语句的参数个数有上限，超大批量时分块查询
+            for i in range(0, len(unique), SQLITE_MAX_PARAMS):
+                chunk = unique[i:i + SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT address, alias FROM contacts WHERE address IN ({placeholders}) "
+                    "ORDER BY rowid",
+                    chunk,
+                )
+                for address, alias in rows:
+                    labels.setdefault(address, []).append(alias)
+        return labels
+
+    def items(self) -> List[tuple]:
+        """返回 (别名, 联系人) 快照列表"""
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT {self._COLUMNS} FROM contacts ORDER BY rowid"
+            ).fetchall()
+        return [(row[0], self._row_contact(row)) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def put(self, alias: str, contact: dict) -> Optional[dict]:
+        """写入联系人，返回旧数据（不存在则为 None）"""
+        with self._lock:
+            conn = self._connection()
+            fuzzy = self._fuzzy_index
+            with conn:
+                row = conn.execute(
+                    f"SELECT {self._COLUMNS} FROM contacts WHERE alias = ?", (alias,)
+                ).fetchone()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO contacts ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                    self._row_values(alias, contact),
+                )
+            # 本连接的提交不会改变 data_version，需要增量维护模糊索引
+            if fuzzy is not None and row is None:
+                fuzzy.add(alias)
+            return self._row_contact(row) if row else None
+
+    def remove(self, alias: str) -> Optional[dict]:
+        """删除联系人，返回被删除的数据（不存在则为 None）"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                row = conn.execute(
+                    f"SELECT {self._COLUMNS} FROM contacts WHERE alias = ?", (alias,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("DELETE FROM contacts WHERE alias = ?", (alias,))
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.remove(alias)
+            return self._row_contact(row)
+
+
+_stores: Dict[tuple, object] = {}
+_stores_lock = threading.Lock()
+
+
+def _get_backend() -> str:
+    """获取存储后端（TRON_ADDRESSBOOK_BACKEND，默认 json）"""
+    backend = (os.getenv("TRON_ADDRESSBOOK_BACKEND") or "json").strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"无效的地址簿存储后端: {backend}，可选值: {', '.join(BACKENDS)}"
+        )
+    return backend
+
+
+def _get_db_path() -> Path:
+    """获取 SQLite 地址簿路径（TRON_ADDRESSBOOK_DB_PATH，默认与 JSON 地址簿同目录）"""
+    custom_path = os.getenv("TRON_ADDRESSBOOK_DB_PATH")
+    if custom_path:
+        return Path(custom_path)
+    return _get_storage_path().with_name("address_book.db")
+
+
+def _get_store():
+    """获取当前后端与路径对应的地址簿（按后端 + 路径缓存）"""
+    backend = _get_backend()
+    path = _get_db_path() if backend == "sqlite" else _get_storage_path()
+    key = (backend, str(path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == "sqlite":
+                store = _SqliteAddressBookStore(path, import_from=_get_storage_path())
+            else:
+                store = _AddressBookStore(path)
+            _stores[key] = store
+        return store
 
 
 def add_contact(alias: str, address: str, note: str = "") -> dict:
@@ -61,27 +633,26 @@ def add_contact(alias: str, address: str, note: str = "") -> dict:
     Returns:
         包含 alias, address, note, is_update, total_contacts 的结果字典
     """
-    addressbook = _load_addressbook()
+    store = _get_store()
+    existing = store.get(alias)
     
     # 检查是否为更新操作
-    is_update = alias in addressbook
+    is_update = existing is not None
     
     # 保存联系人
-    addressbook[alias] = {
+    store.put(alias, {
         "address": address,
         "note": note,
-        "created_at": datetime.now().isoformat() if not is_update else addressbook[alias].get("created_at", datetime.now().isoformat()),
+        "created_at": datetime.now().isoformat() if not is_update else existing.get("created_at", datetime.now().isoformat()),
         "updated_at": datetime.now().isoformat() if is_update else None,
-    }
-    
-    _save_addressbook(addressbook)
+    })
     
     return {
         "alias": alias,
         "address": address,
         "note": note,
         "is_update": is_update,
-        "total_contacts": len(addressbook),
+        "total_contacts": len(store),
     }
 
 
@@ -95,25 +666,23 @@ def remove_contact(alias: str) -> dict:
     Returns:
         包含 alias, found, removed_address, total_contacts 的结果字典
     """
-    addressbook = _load_addressbook()
+    store = _get_store()
     
-    if alias not in addressbook:
+    # 删除联系人
+    removed_contact = store.remove(alias)
+    if removed_contact is None:
         return {
             "alias": alias,
             "found": False,
             "removed_address": None,
-            "total_contacts": len(addressbook),
+            "total_contacts": len(store),
         }
     
-    # 删除联系人
-    removed_contact = addressbook.pop(alias)
-    _save_addressbook(addressbook)
-    
     return {
         "alias": alias,
         "found": True,
         "removed_address": removed_contact["address"],
-        "total_contacts": len(addressbook),
+        "total_contacts": len(store),
     }
 
 
@@ -127,11 +696,11 @@ def lookup(alias: str) -> dict:
     Returns:
         包含 alias, found, address, note, similar_matches 的结果字典
     """
-    addressbook = _load_addressbook()
+    store = _get_store()
     
-    # 精确匹配
-    if alias in addressbook:
-        contact = addressbook[alias]
+    # 精确匹配（哈希索引）
+    contact = store.get(alias)
+    if contact is not None:
         return {
             "alias": alias,
             "found": True,
@@ -140,24 +709,8 @@ def lookup(alias: str) -> dict:
             "created_at": contact.get("created_at", ""),
         }
     
-    # 模糊搜索：查找相似的别名
-    similar_matches = []
-    for contact_alias, contact_data in addressbook.items():
-        # 使用 SequenceMatcher 计算相似度
-        similarity = SequenceMatcher(None, alias.lower(), contact_alias.lower()).ratio()
-        if similarity > 0.5:  # 相似度阈值 50%
-            similar_matches.append({
-                "alias": contact_alias,
-                "address": contact_data["address"],
-                "note": contact_data.get("note", ""),
-                "similarity": similarity,
-            })
-    
-    # 按相似度降序排序
-    similar_matches.sort(key=lambda x: x["similarity"], reverse=True)
-    
-    # 只返回前 3 个最相似的结果
-    similar_matches = similar_matches[:3]
+    # 模糊搜索：查找相似的别名（只返回前 3 个最相似的结果）
+    similar_matches = store.similar(alias, SIMILAR_MATCH_LIMIT)
     
     return {
         "alias": alias,
@@ -175,10 +728,8 @@ def list_contacts() -> dict:
     Returns:
         包含 total, contacts 列表的结果字典
     """
-    addressbook = _load_addressbook()
-    
     contacts = []
-    for alias, contact_data in addressbook.items():
+    for alias, contact_data in _get_store().items():
         contacts.append({
             "alias": alias,
             "address": contact_data["address"],
@@ -195,6 +746,65 @@ def list_contacts() -> dict:
     }
 
 
+def aliases_for_address(address: str) -> List[str]:
+    """
+    通过地址反查别名（地址哈希索引，O(1)）
+    
+    Args:
+        address: TRON 地址
+    
+    Returns:
+        该地址对应的别名列表（可能为空）
+    """
+    return _get_store().aliases_for_address(address)
+
+
+def labels_for_addresses(addresses) -> Dict[str, List[str]]:
+    """
+    批量反查地址别名（用于给交易历史等列表的对手方打标签）
+    
+    JSON 后端直接查内存哈希索引，SQLite 后端合并为一次 IN 查询，
+    避免逐行调用 aliases_for_address。
+    
+    Args:
+        addresses: TRON 地址可迭代对象（允许重复与空值）
+    
+    Returns:
+        地址 → 别名列表 的字典，只包含地址簿中存在的地址
+    """
+    return _get_store().labels_for_addresses([a for a in addresses if a])
+
+
+def reverse_lookup(address: str) -> dict:
+    """
+    通过地址反查联系人
+    
+    Args:
+        address: TRON 地址
+    
+    Returns:
+        包含 address, found, aliases, contacts 的结果字典
+    """
+    store = _get_store()
+    contacts = []
+    for alias in store.aliases_for_address(address):
+        contact = store.get(alias)
+        if contact is None:
+            continue
+        contacts.append({
+            "alias": alias,
+            "note": contact.get("note", ""),
+            "created_at": contact.get("created_at", ""),
+        })
+    
+    return {
+        "address": address,
+        "found": bool(contacts),
+        "aliases": [c["alias"] for c in contacts],
+        "contacts": contacts,
+    }
+
+
 def resolve_address(alias_or_address: str) -> str:
     """
     解析地址：如果输入是合法 TRON 地址则直接返回，否则从地址簿查找
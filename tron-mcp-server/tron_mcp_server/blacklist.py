@@ -0,0 +1,350 @@
+"""本地黑名单快照：布隆过滤器 + 精确集合预筛
+
+check_recipient_security 每次都要实时请求 TRONSCAN 的两个安全接口。
+开启预筛（TRON_BLACKLIST_PRESCREEN=1）后，在本地维护一份已知恶意地址快照
+（USDT 黑名单、红标地址），先在本地判定，只有本地无法确定的地址才走网络:
+
+1. 布隆过滤器未命中，且批量快照在有效期内 → 判定为干净，不发网络请求（微秒级）
+2. 布隆命中 → 查精确集合排除误判；精确命中且条目未过期 → 直接判定为高危
+3. 条目已过期、快照过期或没有批量来源 → 走网络检查
+
+快照来源:
+- 批量来源 TRON_BLACKLIST_SOURCE: URL 或本地文件（JSON 数组 / {"addresses": [...]} / 每行一个地址），
+  每隔 TRON_BLACKLIST_REFRESH_INTERVAL 秒在后台线程刷新一次，刷新期间继续使用当前快照
+- 学习: 网络检查发现 USDT 黑名单或红标地址时自动加入快照
+
+快照持久化到 TRON_BLACKLIST_PATH（默认 ~/.tron_mcp/blacklist.json），写入采用原子替换。
+预筛默认关闭，关闭时本模块不读写任何文件、不影响原有检查流程。
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+# 默认批量刷新间隔（6 小时）与条目 / 快照最大有效期（7 天）
+DEFAULT_REFRESH_INTERVAL = 6 * 3600
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+# 批量刷新失败后的重试间隔
+REFRESH_RETRY_INTERVAL = 300
+# 布隆过滤器目标误判率与最小容量
+BLOOM_ERROR_RATE = 0.001
+BLOOM_MIN_CAPACITY = 1024
+
+SOURCE_BULK = "bulk"
+SOURCE_LEARNED = "learned"
+
+
+def prescreen_enabled() -> bool:
+    return os.getenv("TRON_BLACKLIST_PRESCREEN", "").strip().lower() in ("1", "true", "yes")
+
+
+def _get_snapshot_path() -> Path:
+    custom_path = os.getenv("TRON_BLACKLIST_PATH")
+    if custom_path:
+        return Path(custom_path)
+    return Path.home() / ".tron_mcp" / "blacklist.json"
+
+
+def _get_seconds(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+
+
+class BloomFilter:
+    """
+    布隆过滤器（双重哈希，blake2b 取两个 64 位哈希值）
+
+    不存在误报为 "不在集合中" 的情况：未命中即一定不在集合中；
+    命中则可能是误判，需要用精确集合确认。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class BlacklistSnapshot:
+    """
+    已知恶意地址快照
+
+    - _entries: 地址 → {"reason", "source", "seen_at"}（精确集合）
+    - _bloom: 所有地址的布隆过滤器，容量不足时按两倍扩容重建
+    - refreshed_at: 最近一次批量来源刷新成功的时间（0 表示从未刷新）
+    """
+
+    def __init__(self, entries: Optional[Dict[str, dict]] = None, refreshed_at: float = 0.0):
+        self._entries: Dict[str, dict] = dict(entries or {})
+        self.refreshed_at = refreshed_at
+        self._rebuild_bloom()
+
+    def _rebuild_bloom(self) -> None:
+        capacity = max(BLOOM_MIN_CAPACITY, 2 * len(self._entries))
+        self._bloom = BloomFilter(capacity)
+        for address in self._entries:
+            self._bloom.add(address)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, address: str) -> Optional[dict]:
+        """布隆过滤器预筛，命中时再查精确集合"""
+        if address not in self._bloom:
+            return None
+        return self._entries.get(address)
+
+    def add(self, address: str, reason: str, source: str, seen_at: float) -> None:
+        self._entries[address] = {"reason": reason, "source": source, "seen_at": seen_at}
+        if len(self._entries) > self._bloom.capacity:
+            self._rebuild_bloom()
+        else:
+            self._bloom.add(address)
+
+    def replace_bulk(self, addresses: Iterable[str], reason: str, now: float) -> None:
+        """用批量来源替换快照中的批量条目（学习到的条目保留）"""
+        entries = {
+            address: entry for address, entry in self._entries.items()
+            if entry.get("source") == SOURCE_LEARNED
+        }
+        for address in addresses:
+            entries.setdefault(address, {"reason": reason, "source": SOURCE_BULK, "seen_at": now})
+        self._entries = entries
+        self.refreshed_at = now
+        self._rebuild_bloom()
+
+    @classmethod
+    def load(cls, path: Path) -> "BlacklistSnapshot":
+        if not path.exists():
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"黑名单快照读取失败，忽略: {e}")
+            return cls()
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return cls()
+        return cls(data.get("addresses") or {}, float(data.get("refreshed_at") or 0))
+
+    def save(self, path: Path) -> None:
+        """原子写入：临时文件 → fsync → rename"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": SNAPSHOT_VERSION,
+                    "refreshed_at": self.refreshed_at,
+                    "addresses": self._entries,
+                }, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+
+def _parse_bulk(text: str) -> List[str]:
+    """解析批量来源：JSON 数组 / {"addresses": [...]} / 每行一个地址"""
+    from . import validators
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = [line.strip() for line in text.splitlines()]
+    if isinstance(data, dict):
+        data = data.get("addresses") or []
+    if not isinstance(data, list):
+        raise ValueError("黑名单来源格式无效")
+    return [a for a in data if isinstance(a, str) and validators.is_valid_address(a)]
+
+
+def _fetch_bulk(source: str) -> List[str]:
+    if source.startswith(("http://", "https://")):
+        import httpx
+
+        response = httpx.get(source, timeout=30)
+        response.raise_for_status()
+        return _parse_bulk(response.text)
+    with open(source, "r", encoding="utf-8") as f:
+        return _parse_bulk(f.read())
+
+
+class _Blacklist:
+    """进程内的快照持有者：负责加载、学习与按间隔刷新"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.snapshot = BlacklistSnapshot.load(path)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._next_refresh_at = 0.0
+
+    def maybe_refresh(self, now: float) -> Optional[threading.Thread]:
+        """
+        批量来源到期时在后台线程刷新，返回刷新线程（未触发刷新时返回 None）
+
+        检查始终使用当前快照，不等待批量来源的网络请求；已有线程在刷新时不重复触发。
+        """
+        source = os.getenv("TRON_BLACKLIST_SOURCE", "").strip()
+        if not source:
+            return None
+        interval = _get_seconds("TRON_BLACKLIST_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL)
+        due_at = self.snapshot.refreshed_at + interval if self.snapshot.refreshed_at else 0.0
+        if now < max(self._next_refresh_at, due_at):
+            return None
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+        try:
+            thread = threading.Thread(
+                target=self._refresh, args=(source, now), name="blacklist-refresh", daemon=True,
+            )
+            thread.start()
+        except Exception:
+            self._refresh_lock.release()
+            raise
+        return thread
+
+    def _refresh(self, source: str, now: float) -> None:
+        try:
+            addresses = _fetch_bulk(source)
+            with self._lock:
+                self.snapshot.replace_bulk(addresses, "Blacklisted", now)
+                self.snapshot.save(self.path)
+            logger.info(f"黑名单快照已刷新: {len(addresses)} 个地址")
+        except Exception as e:
+            self._next_refresh_at = now + REFRESH_RETRY_INTERVAL
+            logger.warning(f"黑名单快照刷新失败，继续使用旧快照: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def learn(self, address: str, reason: str, now: float) -> None:
+        with self._lock:
+            entry = self.snapshot.get(address)
+            if entry is not None and entry.get("reason") == reason and now - entry["seen_at"] < 60:
+                return
+            self.snapshot.add(address, reason, SOURCE_LEARNED, now)
+            try:
+                self.snapshot.save(self.path)
+            except OSError as e:
+                logger.warning(f"黑名单快照保存失败: {e}")
+
+
+_instances: Dict[str, _Blacklist] = {}
+_instances_lock = threading.Lock()
+
+
+def _get_blacklist() -> _Blacklist:
+    path = _get_snapshot_path()
+    with _instances_lock:
+        instance = _instances.get(str(path))
+        if instance is None:
+            instance = _Blacklist(path)
+            _instances[str(path)] = instance
+        return instance
+
+
+def prescreen(address: str, now: Optional[float] = None) -> Optional[dict]:
+    """
+    本地预筛
+
+    Args:
+        address: TRON 地址
+        now: 当前时间（测试用）
+
+    Returns:
+        能在本地判定时返回与 tron_client.check_account_risk 结构一致的风险报告
+        （附带 source="local_snapshot"）；需要走网络检查或预筛出错时返回 None
+    """
+    if not prescreen_enabled():
+        return None
+    try:
+        return _prescreen(address, time.time() if now is None else now)
+    except Exception as e:
+        # 快照损坏 / 刷新线程无法启动等：不影响检查，回退网络
+        logger.warning(f"黑名单预筛失败，回退网络检查 ({address}): {e}")
+        return None
+
+
+def _prescreen(address: str, now: float) -> Optional[dict]:
+    blacklist = _get_blacklist()
+    blacklist.maybe_refresh(now)
+    max_age = _get_seconds("TRON_BLACKLIST_MAX_AGE", DEFAULT_MAX_AGE)
+    snapshot = blacklist.snapshot
+
+    entry = snapshot.get(address)
+    if entry is not None:
+        if now - entry.get("seen_at", 0) > max_age:
+            return None  # 条目过期，需要重新确认
+        reason = entry.get("reason") or "Blacklisted"
+        return {
+            "is_risky": True,
+            "risk_type": reason,
+            "detail": f"Address is in the local blacklist snapshot ({reason}).",
+            "risk_reasons": [f"💀 本地黑名单快照命中: {reason}"],
+            "source": "local_snapshot",
+        }
+
+    if snapshot.refreshed_at and now - snapshot.refreshed_at <= max_age:
+        return {
+            "is_risky": False,
+            "risk_type": "Safe",
+            "detail": "Not found in the local blacklist snapshot.",
+            "risk_reasons": [],
+            "source": "local_snapshot",
+        }
+    # 没有有效的批量快照，无法判定为干净
+    return None
+
+
+def _known_bad_reason(report: dict) -> Optional[str]:
+    """从网络检查结果中提取可进入快照的恶意类型（USDT 黑名单 / 红标）"""
+    red_tag = (report.get("tags") or {}).get("Red")
+    if red_tag:
+        return str(red_tag)[:50]
+    sec = (report.get("details") or {}).get("sec") or {}
+    if sec.get("is_black_list") or report.get("risk_type") == "Blacklisted":
+        return "Blacklisted"
+    return None
+
+
+def learn(address: str, report: dict, now: Optional[float] = None) -> None:
+    """将网络检查发现的 USDT 黑名单 / 红标地址加入本地快照（预筛关闭时不做任何事）"""
+    if not prescreen_enabled() or not report.get("is_risky"):
+        return
+    reason = _known_bad_reason(report)
+    if reason:
+        _get_blacklist().learn(address, reason, time.time() if now is None else now)
@@ -1,6 +1,8 @@
 """调用路由器 - 单入口 call 函数实现"""
 
+import os
 import json
+import time
 import logging
 
 from . import skills as skills_module
@@ -12,13 +14,18 @@ from . import validators
 from . import formatters
 from . import address_book
 from . import qrcode_generator
-from .key_manager import KeyManager
+from . import wallet_pool
+from . import energy_topup
+from . import cassette
+from . import lifecycle
+from . import metrics
+from . import profiling
+from . import tracing
 
 logger = logging.getLogger(__name__)
 
-# 全局 KeyManager 实例
-_key_manager = KeyManager()
-
+# 批量安全检查单次最多地址数（去重前）
+SAFETY_BATCH_MAX = 1000
 
 def _get_skills() -> dict:
     """获取技能列表（可被测试 mock）"""
@@ -57,10 +64,10 @@ def _get_network_status() -> dict:
     return formatters.format_network_status(block_height)
 
 
-def _check_account_safety(addr: str) -> dict:
+def _check_account_safety(addr: str, verbosity: str = formatters.VERBOSITY_STANDARD) -> dict:
     """检查账户安全性（可被测试 mock）"""
     risk_info = tron_client.check_account_risk(addr)
-    return formatters.format_account_safety(addr, risk_info)
+    return formatters.format_account_safety(addr, risk_info, verbosity)
 
 
 def _build_unsigned_tx(from_addr: str, to_addr: str, amount: float, token: str = "USDT", force_execution: bool = False) -> dict:
@@ -122,7 +129,118 @@ def call(action: str, params: dict = None) -> dict:
             "unknown_action",
             f"未知的动作: {action}",
         )
-    return handler(params)
+    try:
+        verbosity, fields = _response_view(params)
+    except ValueError as e:
+        return _error_response("invalid_param", str(e))
+    if action in lifecycle.MUTATING_ACTIONS:
+        # 停机排空期间拒绝新的链上写操作，已开始的写操作在退出前完成
+        if not lifecycle.try_begin():
+            return _error_response(
+                "server_draining",
+                f"服务正在停机，暂不接受 {action}，请稍后重试（可连接其他实例）",
+            )
+        with lifecycle.track():
+            result = _invoke(action, handler, params)
+    else:
+        result = _invoke(action, handler, params)
+    return formatters.apply_view(action, result, verbosity, fields)
+
+
+def get_default_verbosity() -> str:
+    """默认响应详略级别（TRON_RESPONSE_VERBOSITY，默认 standard，非法值回退 standard）"""
+    value = os.getenv("TRON_RESPONSE_VERBOSITY", "").strip().lower()
+    return value if value in formatters.VERBOSITY_LEVELS else formatters.VERBOSITY_STANDARD
+
+
+def _verbosity(params: dict) -> str:
+    """处理函数读取本次调用的详略级别（已在 call 中校验）"""
+    return params.get("verbosity") or get_default_verbosity()
+
+
+def _response_view(params: dict) -> tuple:
+    """
+    解析通用响应参数 verbosity / fields
+
+    Returns:
+        (verbosity, fields)，fields 为字段名列表或 None
+
+    Raises:
+        ValueError: 参数值非法
+    """
+    verbosity = params.get("verbosity")
+    if verbosity is None:
+        verbosity = get_default_verbosity()
+    elif verbosity not in formatters.VERBOSITY_LEVELS:
+        raise ValueError(f"verbosity 必须为 {' / '.join(formatters.VERBOSITY_LEVELS)}，当前值: {verbosity}")
+
+    fields = params.get("fields")
+    if isinstance(fields, str):
+        # 允许逗号分隔的字符串
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+    if fields is not None and not (
+        isinstance(fields, (list, tuple)) and all(isinstance(f, str) for f in fields)
+    ):
+        raise ValueError("fields 必须为字段名列表或逗号分隔的字符串")
+    return verbosity, list(fields) if fields else None
+
+
+def _invoke(action: str, handler, params: dict) -> dict:
+    if cassette.recording():
+        return _record_call(action, handler, params)
+    return _run(action, handler, params)
+
+
+def _run(action: str, handler, params: dict) -> dict:
+    """执行动作（开启剖析 / 慢调用日志时经 profiling 包裹）"""
+    if profiling.enabled():
+        return profiling.run(action, params, lambda: _traced_dispatch(action, handler, params))
+    return _traced_dispatch(action, handler, params)
+
+
+def _record_call(action: str, handler, params: dict) -> dict:
+    """录制模式：执行动作并把调用写入 cassette，供 replay_calls 按原顺序重放"""
+    # 处理函数可能修改 params，执行前先快照
+    snapshot = json.loads(json.dumps(params, ensure_ascii=False, default=str))
+    offset_ms = cassette.offset_ms()
+    start = time.perf_counter()
+    try:
+        result = _run(action, handler, params)
+    except Exception as e:
+        cassette.record_call(action, snapshot, offset_ms, (time.perf_counter() - start) * 1000, type(e).__name__)
+        raise
+    cassette.record_call(
+        action, snapshot, offset_ms, (time.perf_counter() - start) * 1000, metrics.result_error_type(result),
+    )
+    return result
+
+
+def _traced_dispatch(action: str, handler, params: dict) -> dict:
+    """执行动作（开启追踪时包裹根 span）"""
+    if not tracing.enabled():
+        return _dispatch(action, handler, params)
+
+    with tracing.span(f"action {action}", action=action) as span:
+        result = _dispatch(action, handler, params)
+        error_type = metrics.result_error_type(result)
+        if error_type:
+            span.set_attribute("error_type", error_type)
+        return result
+
+
+def _dispatch(action: str, handler, params: dict) -> dict:
+    """执行动作处理函数（开启指标时记录耗时与错误）"""
+    if not metrics.enabled():
+        return handler(params)
+
+    start = time.perf_counter()
+    try:
+        result = handler(params)
+    except Exception as e:
+        metrics.record_action_exception(action, time.perf_counter() - start, e)
+        raise
+    metrics.observe_action(action, time.perf_counter() - start, result)
+    return result
 
 
 def _handle_skills(params: dict) -> dict:
@@ -228,7 +346,37 @@ def _handle_check_account_safety(params: dict) -> dict:
         return _error_response("invalid_address", f"无效的地址格式: {address}")
 
     try:
-        return _check_account_safety(address)
+        return _check_account_safety(address, _verbosity(params))
+    except Exception as e:
+        return _error_response("rpc_error", str(e))
+
+
+def _handle_check_account_safety_batch(params: dict) -> dict:
+    """处理 check_account_safety_batch 动作 - 批量筛查地址安全性"""
+    addresses = params.get("addresses")
+    if isinstance(addresses, str):
+        # 允许逗号 / 空白分隔的字符串
+        addresses = addresses.replace(",", " ").split()
+    if not addresses:
+        return _error_response("missing_param", "缺少必填参数: addresses（地址列表）")
+    if not isinstance(addresses, (list, tuple)):
+        return _error_response("invalid_param", "addresses 必须为地址列表")
+    if len(addresses) > SAFETY_BATCH_MAX:
+        return _error_response(
+            "invalid_param", f"单次最多检查 {SAFETY_BATCH_MAX} 个地址，当前 {len(addresses)} 个"
+        )
+
+    unique = list(dict.fromkeys(str(a).strip() for a in addresses if str(a).strip()))
+    valid, invalid = [], []
+    for address in unique:
+        (valid if validators.is_valid_address(address) else invalid).append(address)
+
+    try:
+        from . import risk_cache
+        reports = risk_cache.get_risk_reports(valid)
+        return formatters.format_account_safety_batch(
+            len(addresses), valid, reports, invalid, verbosity=_verbosity(params),
+        )
     except Exception as e:
         return _error_response("rpc_error", str(e))
 
@@ -337,6 +485,9 @@ def _handle_transfer(params: dict) -> dict:
     token = params.get("token", "USDT")
     force_execution = params.get("force_execution", False)
     memo = params.get("memo", "")
+    from_addr = params.get("from")
+    wallet_policy = params.get("wallet_policy")
+    auto_energy = energy_topup.enabled(params.get("auto_energy_topup"))
 
     if not to_addr:
         return _error_response("missing_param", "缺少必填参数: to")
@@ -346,6 +497,33 @@ def _handle_transfer(params: dict) -> dict:
         return _error_response("invalid_address", f"无效的接收方地址: {to_addr}")
     if not validators.is_positive_amount(amount):
         return _error_response("invalid_amount", f"金额必须为正数: {amount}")
+    if from_addr and not validators.is_valid_address(from_addr):
+        return _error_response("invalid_address", f"无效的付款地址: {from_addr}")
+    if wallet_policy is not None and not isinstance(wallet_policy, str):
+        return _error_response("invalid_param", f"wallet_policy 必须为字符串: {wallet_policy!r}")
+
+    token_upper = token.upper()
+    if token_upper not in ("USDT", "TRX"):
+        return _error_response("invalid_token", f"不支持的代币类型: {token}")
+
+    amount_float = float(amount)
+
+    # 配置了多钱包（或显式指定付款钱包 / 策略）时，从密钥池按策略选择付款钱包
+    if from_addr or wallet_policy or wallet_pool.is_multi_wallet_configured():
+        policy = (wallet_policy or wallet_pool.get_default_policy()).strip().lower()
+        try:
+            pool = wallet_pool.get_wallet_pool()
+            wallet = pool.select(policy, token_upper, address=from_addr)
+        except ValueError as e:
+            return _error_response("wallet_error", str(e))
+        with pool.hold(wallet):
+            result = _execute_transfer(
+                wallet.private_key, wallet.address, to_addr, amount_float,
+                token_upper, force_execution, memo, auto_energy=auto_energy,
+            )
+        if not result.get("error") and not result.get("blocked"):
+            result["wallet_policy"] = "pinned" if from_addr else policy
+        return result
 
     try:
         # 1. 加载私钥，派生钱包地址
@@ -354,31 +532,83 @@ def _handle_transfer(params: dict) -> dict:
     except ValueError as e:
         return _error_response("wallet_error", str(e))
 
-    token_upper = token.upper()
-    if token_upper not in ("USDT", "TRX"):
-        return _error_response("invalid_token", f"不支持的代币类型: {token}")
+    return _execute_transfer(
+        pk, from_addr, to_addr, amount_float, token_upper, force_execution, memo, auto_energy=auto_energy,
+    )
 
-    amount_float = float(amount)
+
+def _execute_transfer(
+    pk: str,
+    from_addr: str,
+    to_addr: str,
+    amount_float: float,
+    token_upper: str,
+    force_execution: bool,
+    memo: str,
+    auto_energy: bool = False,
+) -> dict:
+    """使用指定付款钱包执行转账闭环（参数已校验）"""
+    # 自动补足能量：估算、查询能量与询价在后台与安全检查并发执行；
+    # 付费下单要等预检通过（topup_gate.approve），被拦截的转账不会租赁能量
+    topup_future = None
+    topup_gate = None
+    if auto_energy and token_upper == "USDT":
+        topup_gate = energy_topup.OrderGate()
+        topup_future = energy_topup.start(from_addr, to_addr, amount_float, gate=topup_gate)
 
     # 2. 安全检查（复用 tx_builder 的全部检查逻辑）
     try:
-        preview = tx_builder.build_unsigned_tx(
-            from_addr, to_addr, amount_float, token_upper,
-            force_execution=force_execution,
-        )
+        try:
+            with tracing.span("transfer.preflight", token=token_upper):
+                preview = tx_builder.build_unsigned_tx(
+                    from_addr, to_addr, amount_float, token_upper,
+                    force_execution=force_execution,
+                )
+        except tx_builder.InsufficientBalanceError as e:
+            # 仅因 TRX 不足以燃烧能量而被拒绝时（安全检查已通过），租到能量即可转账：
+            # 放行下单，能量到账后跳过该项检查重新构建
+            codes = {err.get("code") for err in e.details.get("errors", [])}
+            if topup_future is None or codes != {"insufficient_trx_for_gas"}:
+                raise
+            topup_gate.approve()
+            topup = _wait_topup(topup_future)
+            if topup.get("status") != energy_topup.STATUS_LEASED or not topup.get("arrived"):
+                raise
+            preview = tx_builder.build_unsigned_tx(
+                from_addr, to_addr, amount_float, token_upper,
+                check_balance=False, force_execution=force_execution,
+            )
         # 如果被熔断拦截
         if preview.get("blocked"):
+            if topup_future is not None:
+                topup_gate.cancel()
+                preview["energy_topup"] = _wait_topup(topup_future)
             return preview
+        if topup_gate is not None:
+            topup_gate.approve()
     except tx_builder.InsufficientBalanceError as e:
-        return {
+        result = {
             "error": True,
             "error_type": e.error_code,
             "message": str(e),
             "details": e.details,
             "summary": str(e),
         }
+        if topup_future is not None:
+            topup_gate.cancel()
+            result["energy_topup"] = _wait_topup(topup_future)
+        return result
     except ValueError as e:
         return _error_response("validation_error", str(e))
+    finally:
+        # 预检未通过（拦截 / 参数错误 / 异常）时撤销下单许可；已放行时无影响
+        if topup_gate is not None:
+            topup_gate.cancel()
+
+    topup = None
+    if topup_future is not None:
+        with tracing.span("transfer.wait_energy_topup"):
+            topup = _wait_topup(topup_future)
 
     # 3. 通过 TronGrid 构建真实交易
     try:
@@ -401,7 +631,8 @@ def _handle_transfer(params: dict) -> dict:
     # 4. 签名
     try:
         tx_id = unsigned_tx["txID"]
-        signature = key_manager.sign_transaction(tx_id, pk)
+        with tracing.span("transfer.sign"):
+            signature = key_manager.sign_transaction(tx_id, pk)
         signed_tx = dict(unsigned_tx)
         signed_tx["signature"] = [signature]
     except Exception as e:
@@ -414,11 +645,24 @@ def _handle_transfer(params: dict) -> dict:
         return _error_response("broadcast_error", f"广播失败: {e}")
 
     # 6. 返回完整结果
-    return formatters.format_transfer_result(
+    result = formatters.format_transfer_result(
         broadcast_result, from_addr, to_addr, amount_float, token_upper,
         security_check=preview.get("security_check"),
         recipient_check=preview.get("recipient_check"),
+        energy_topup=topup,
     )
+    if topup is not None:
+        energy_topup.invalidate(from_addr)
+    return result
+
+
+def _wait_topup(future) -> dict:
+    """等待自动补足能量的结果（异常不影响转账本身）"""
+    try:
+        return future.result()
+    except Exception as e:
+        logger.warning(f"自动补足能量异常: {e}")
+        return {"status": energy_topup.STATUS_FAILED, "error": str(e)}
 
 
 def _handle_get_wallet_info(params: dict) -> dict:
@@ -444,12 +688,51 @@ def _handle_get_wallet_info(params: dict) -> dict:
     return formatters.format_wallet_info(address, trx_balance, usdt_balance)
 
 
+def _format_history(
+    address: str, transfers: list, total: int, token, limit: int, enrich: bool = False,
+    verbosity: str = formatters.VERBOSITY_STANDARD,
+) -> dict:
+    """
+    格式化交易历史，并为对手方打标签
+
+    - 别名：地址簿批量反查，一页只查询一次
+    - 风险（enrich=True 时）：对手方去重后批量查询短 TTL 风险缓存，未命中的地址并发查询
+    """
+    addresses = set()
+    counterparties = set()
+    for tx in transfers:
+        from_addr, to_addr = formatters.transfer_parties(tx)
+        addresses.update(a for a in (from_addr, to_addr) if a)
+        counterparties.add(to_addr if from_addr == address else from_addr)
+    counterparties.discard(address)
+    counterparties.discard("")
+
+    try:
+        labels = address_book.labels_for_addresses(addresses)
+    except Exception as e:
+        # 地址簿不可用时不影响交易历史查询
+        logger.warning(f"地址簿批量反查失败: {e}")
+        labels = None
+
+    risk = None
+    if enrich:
+        from . import risk_cache
+        reports = risk_cache.get_risk_reports(counterparties)
+        risk = {addr: risk_cache.risk_tag(report) for addr, report in reports.items()}
+
+    return formatters.format_transaction_history(
+        address, transfers, total, token, limit, labels=labels, risk=risk, verbosity=verbosity,
+    )
+
+
 def _handle_get_transaction_history(params: dict) -> dict:
     """处理 get_transaction_history 动作 — 查询交易历史记录"""
     address = params.get("address")
     limit = params.get("limit", 10)
     start = params.get("start", 0)
     token = params.get("token")
+    enrich = bool(params.get("enrich", False))
+    verbosity = _verbosity(params)
 
     # 参数校验
     if not address:
@@ -514,8 +797,8 @@ def _handle_get_transaction_history(params: dict) -> dict:
             # 警告：如果某些交易同时出现在两个 API 结果中，total 可能不准确
             total = trx_total + trc20_total
             
-            return formatters.format_transaction_history(
-                address, all_transfers, total, token, limit
+            return _format_history(
+                address, all_transfers, total, token, limit, enrich, verbosity
             )
         
         elif token.upper() == "USDT":
@@ -525,8 +808,8 @@ def _handle_get_transaction_history(params: dict) -> dict:
             )
             transfers = data.get("token_transfers", data.get("data", []))
             total = data.get("total", 0)
-            return formatters.format_transaction_history(
-                address, transfers, total, "USDT", limit
+            return _format_history(
+                address, transfers, total, "USDT", limit, enrich, verbosity
             )
         
         elif token.upper() == "TRX":
@@ -534,8 +817,8 @@ def _handle_get_transaction_history(params: dict) -> dict:
             data = tron_client.get_transfer_history(address, limit, start, token="_")
             transfers = data.get("data", [])
             total = data.get("total", 0)
-            return formatters.format_transaction_history(
-                address, transfers, total, "TRX", limit
+            return _format_history(
+                address, transfers, total, "TRX", limit, enrich, verbosity
             )
         
         elif token.startswith("T") and len(token) == 34:
@@ -545,8 +828,8 @@ def _handle_get_transaction_history(params: dict) -> dict:
             )
             transfers = data.get("token_transfers", data.get("data", []))
             total = data.get("total", 0)
-            return formatters.format_transaction_history(
-                address, transfers, total, token, limit
+            return _format_history(
+                address, transfers, total, token, limit, enrich, verbosity
             )
         
         else:
@@ -554,8 +837,8 @@ def _handle_get_transaction_history(params: dict) -> dict:
             data = tron_client.get_transfer_history(address, limit, start, token=token)
             transfers = data.get("data", [])
             total = data.get("total", 0)
-            return formatters.format_transaction_history(
-                address, transfers, total, token, limit
+            return _format_history(
+                address, transfers, total, token, limit, enrich, verbosity
             )
     
     except Exception as e:
@@ -667,7 +950,9 @@ def _handle_get_internal_transactions(params: dict) -> dict:
         total = data.get("total", 0)
         
         # 格式化返回
-        return formatters.format_internal_transactions(address, internal_txs, total, limit)
+        return formatters.format_internal_transactions(
+            address, internal_txs, total, limit, verbosity=_verbosity(params),
+        )
     
     except Exception as e:
         logger.error(f"查询内部交易失败: {e}", exc_info=True)
@@ -747,6 +1032,21 @@ def _handle_addressbook_lookup(params: dict) -> dict:
         return _error_response("addressbook_error", f"查找联系人失败: {e}")
 
 
+def _handle_addressbook_reverse_lookup(params: dict) -> dict:
+    """处理 addressbook_reverse_lookup 动作 — 通过地址反查联系人"""
+    address = params.get("address")
+    if not address:
+        return _error_response("missing_param", "缺少必填参数: address（TRON 地址）")
+    if not validators.is_valid_address(address):
+        return _error_response("invalid_address", f"无效的地址格式: {address}")
+
+    try:
+        result = address_book.reverse_lookup(address)
+        return formatters.format_addressbook_reverse_lookup(result)
+    except Exception as e:
+        return _error_response("addressbook_error", f"反查联系人失败: {e}")
+
+
 def _handle_addressbook_list(params: dict) -> dict:
     """处理 addressbook_list 动作 — 列出所有联系人"""
     try:
@@ -808,8 +1108,7 @@ def _handle_get_account_bandwidth(params: dict) -> dict:
 
 def _handle_lease_energy(params: dict) -> dict:
     """处理 lease_energy 动作 — 租赁 TRON 能量"""
-    from tronzap_sdk import Client, TronZapException
-    from . import config
+    from . import tronzap_client
     
     address = params.get("to_address")
     amount = params.get("amount")
@@ -838,18 +1137,13 @@ def _handle_lease_energy(params: dict) -> dict:
     except (TypeError, ValueError):
         return _error_response("invalid_duration", "租赁时长必须是整数")
     
-    # 获取 API 凭证
-    api_token = config.get_tronzap_api_token()
-    api_secret = config.get_tronzap_api_secret()
-    
-    if not api_token or not api_secret:
-        return _error_response(
-            "missing_credentials",
-            "缺少 TronZap API 凭证，请设置环境变量 TRONZAP_API_TOKEN 和 TRONZAP_API_SECRET"
-        )
+    # 获取共享客户端（复用长连接）
+    try:
+        client = tronzap_client.get_client()
+    except ValueError as e:
+        return _error_response("missing_credentials", str(e))
     
     try:
-        client = Client(api_token=api_token, api_secret=api_secret)
         result = client.create_energy_transaction(
             address=address,
             energy_amount=amount,
@@ -870,7 +1164,7 @@ def _handle_lease_energy(params: dict) -> dict:
         }
         return formatters.format_lease_energy(formatted_result)
         
-    except TronZapException as e:
+    except tronzap_client.TronZapError as e:
         return _error_response("tronzap_error", f"TronZap API 错误: {str(e)}")
     except Exception as e:
         return _error_response("unknown_error", f"租赁能量失败: {str(e)}")
@@ -878,8 +1172,7 @@ def _handle_lease_energy(params: dict) -> dict:
 
 def _handle_lease_bandwidth(params: dict) -> dict:
     """处理 lease_bandwidth 动作 — 租赁 TRON 带宽"""
-    from tronzap_sdk import Client, TronZapException
-    from . import config
+    from . import tronzap_client
     
     address = params.get("to_address")
     amount = params.get("amount")
@@ -899,18 +1192,13 @@ def _handle_lease_bandwidth(params: dict) -> dict:
     except (TypeError, ValueError):
         return _error_response("invalid_amount", "带宽数量必须为整数")
     
-    # 获取 API 凭证
-    api_token = config.get_tronzap_api_token()
-    api_secret = config.get_tronzap_api_secret()
-    
-    if not api_token or not api_secret:
-        return _error_response(
-            "missing_credentials",
-            "缺少 TronZap API 凭证，请设置环境变量 TRONZAP_API_TOKEN 和 TRONZAP_API_SECRET"
-        )
+    # 获取共享客户端（复用长连接）
+    try:
+        client = tronzap_client.get_client()
+    except ValueError as e:
+        return _error_response("missing_credentials", str(e))
     
     try:
-        client = Client(api_token=api_token, api_secret=api_secret)
         result = client.create_bandwidth_transaction(
             address=address,
             amount=amount,
@@ -927,12 +1215,187 @@ def _handle_lease_bandwidth(params: dict) -> dict:
         }
         return formatters.format_lease_bandwidth(formatted_result)
         
-    except TronZapException as e:
+    except tronzap_client.TronZapError as e:
         return _error_response("tronzap_error", f"TronZap API 错误: {str(e)}")
     except Exception as e:
         return _error_response("unknown_error", f"租赁带宽失败: {str(e)}")
 
 
+def _handle_get_lease_quote(params: dict) -> dict:
+    """处理 get_lease_quote 动作 — 查询 TronZap 价格表或能量租赁报价（不下单）"""
+    from . import tronzap_client, energy_estimator
+
+    address = params.get("to_address")
+    amount = params.get("amount")
+    duration = params.get("duration", 1)
+    activate_account = bool(params.get("activate_account", False))
+
+    if amount is not None:
+        if not address:
+            return _error_response("missing_param", "查询能量报价需要参数: to_address")
+        if not validators.is_valid_address(address):
+            return _error_response("invalid_address", f"无效的地址格式: {address}")
+        try:
+            amount = int(amount)
+            if amount <= 0:
+                return _error_response("invalid_amount", "能量数量必须为正整数")
+        except (TypeError, ValueError):
+            return _error_response("invalid_amount", "能量数量必须为整数")
+        try:
+            duration = int(duration)
+            if duration not in (1, 24):
+                return _error_response("invalid_duration", "租赁时长必须是 1 或 24 小时")
+        except (TypeError, ValueError):
+            return _error_response("invalid_duration", "租赁时长必须是整数")
+
+    try:
+        client = tronzap_client.get_client()
+    except ValueError as e:
+        return _error_response("missing_credentials", str(e))
+
+    try:
+        if amount is None:
+            return formatters.format_lease_quote(client.get_services())
+        quote = client.quote_energy(address, amount, duration, activate_account)
+    except tronzap_client.TronZapError as e:
+        return _error_response("tronzap_error", f"TronZap API 错误: {str(e)}")
+    except Exception as e:
+        return _error_response("unknown_error", f"查询租赁报价失败: {str(e)}")
+
+    price = energy_estimator.get_energy_price()
+    return formatters.format_lease_quote({
+        "address": address,
+        "energy_amount": amount,
+        "duration": duration,
+        "activate_account": activate_account,
+        "cost_trx": tronzap_client.quote_cost_trx(quote),
+        "energy_price_sun": price["price_sun"],
+        "burn_cost_trx": amount * price["price_sun"] / tx_builder.SUN_PER_TRX,
+        "cached": quote.get("cached", False),
+        "raw_response": {k: v for k, v in quote.items() if k != "cached"},
+    })
+
+
+def _handle_plan_transfers(params: dict) -> dict:
+    """处理 plan_transfers 动作 — 批量转账的资源规划（租赁 / 燃烧组合与执行顺序）"""
+    from . import fee_planner
+
+    transfers = params.get("transfers")
+    from_addr = params.get("from")
+    duration = params.get("lease_duration", 1)
+
+    if not transfers:
+        return _error_response("missing_param", "缺少必填参数: transfers")
+    if from_addr and not validators.is_valid_address(from_addr):
+        return _error_response("invalid_address", f"无效的付款地址: {from_addr}")
+    try:
+        duration = int(duration)
+        if duration not in (1, 24):
+            return _error_response("invalid_duration", "租赁时长必须是 1 或 24 小时")
+    except (TypeError, ValueError):
+        return _error_response("invalid_duration", "租赁时长必须是整数")
+
+    prices = {}
+    for key in ("energy_lease_price_sun", "bandwidth_lease_price_sun"):
+        if params.get(key) is None:
+            continue
+        try:
+            prices[key] = float(params[key])
+        except (TypeError, ValueError):
+            return _error_response("invalid_param", f"{key} 必须为数字")
+        if prices[key] < 0:
+            return _error_response("invalid_param", f"{key} 不能为负数")
+
+    if not from_addr:
+        try:
+            from_addr = key_manager.get_address_from_private_key(key_manager.load_private_key())
+        except ValueError as e:
+            return _error_response("wallet_error", str(e))
+
+    try:
+        plan = fee_planner.plan_transfers(from_addr, transfers, lease_duration=duration, **prices)
+    except ValueError as e:
+        return _error_response("invalid_param", str(e))
+    except Exception as e:
+        return _error_response("rpc_error", f"资源规划失败: {e}")
+    return formatters.format_transfer_plan(plan)
+
+
+def _handle_hd_derive_addresses(params: dict) -> dict:
+    """处理 hd_derive_addresses 动作 — 批量派生 HD 充值地址"""
+    count = params.get("count", 1)
+    account = params.get("account", 0)
+
+    try:
+        count = int(count)
+    except (ValueError, TypeError):
+        return _error_response("invalid_param", "count 必须为整数")
+    if count < 1 or count > key_manager.HD_MAX_BATCH:
+        return _error_response(
+            "invalid_param", f"count 必须在 1-{key_manager.HD_MAX_BATCH} 范围内，当前值: {count}"
+        )
+    try:
+        account = int(account)
+    except (ValueError, TypeError):
+        return _error_response("invalid_param", "account 必须为非负整数")
+    if account < 0:
+        return _error_response("invalid_param", "account 必须为非负整数")
+
+    try:
+        wallet = key_manager.get_hd_wallet()
+        entries = wallet.derive_next(count, account)
+    except ValueError as e:
+        return _error_response("hd_wallet_error", str(e))
+    except OSError as e:
+        return _error_response("hd_wallet_error", f"写入 HD 地址索引失败: {e}")
+    return formatters.format_hd_addresses(entries, account, len(wallet.index))
+
+
+def _handle_hd_lookup_address(params: dict) -> dict:
+    """处理 hd_lookup_address 动作 — 反查充值地址的派生路径"""
+    address = params.get("address")
+    if not address:
+        return _error_response("missing_param", "缺少必填参数: address")
+    if not validators.is_valid_address(address):
+        return _error_response("invalid_address", f"无效的地址格式: {address}")
+
+    try:
+        result = key_manager.get_hd_wallet().lookup(address)
+    except ValueError as e:
+        return _error_response("hd_wallet_error", str(e))
+    return formatters.format_hd_lookup(address, result)
+
+
+def _handle_get_metrics(params: dict) -> dict:
+    """处理 get_metrics 动作 — 各动作 / 上游接口的耗时分位数与错误计数"""
+    output_format = (params.get("format") or "json").strip().lower()
+    if output_format not in ("json", "prometheus"):
+        return _error_response("invalid_param", f"format 必须为 json 或 prometheus: {output_format}")
+    if output_format == "prometheus":
+        return {
+            "enabled": metrics.enabled(),
+            "content_type": metrics.PROMETHEUS_CONTENT_TYPE,
+            "text": metrics.render_prometheus(),
+            "summary": "📈 已导出 Prometheus 文本格式指标，详见 text 字段。",
+        }
+    return formatters.format_metrics(metrics.snapshot())
+
+
+def _handle_get_diagnostics(params: dict) -> dict:
+    """处理 get_diagnostics 动作 — 剖析得到的热点函数与最近的慢调用"""
+    top = params.get("top", 20)
+    action = params.get("action") or None
+    try:
+        top = int(top)
+    except (TypeError, ValueError):
+        return _error_response("invalid_param", "top 必须为整数")
+    if not 1 <= top <= 200:
+        return _error_response("invalid_param", f"top 必须在 1-200 范围内，当前值: {top}")
+    if action and action not in _ACTION_HANDLERS:
+        return _error_response("invalid_param", f"未知的动作: {action}")
+    return formatters.format_diagnostics(profiling.snapshot(top, action), action)
+
+
 # 动作路由表 — 字典映射提升可维护性
 _ACTION_HANDLERS = {
     "skills": _handle_skills,
@@ -943,6 +1406,7 @@ _ACTION_HANDLERS = {
     "get_network_status": _handle_get_network_status,
     "get_account_status": _handle_get_account_status,
     "check_account_safety": _handle_check_account_safety,
+    "check_account_safety_batch": _handle_check_account_safety_batch,
     "build_tx": _handle_build_tx,
     "sign_tx": _handle_sign_tx,
     "broadcast_tx": _handle_broadcast_tx,
@@ -954,12 +1418,19 @@ _ACTION_HANDLERS = {
     "addressbook_add": _handle_addressbook_add,
     "addressbook_remove": _handle_addressbook_remove,
     "addressbook_lookup": _handle_addressbook_lookup,
+    "addressbook_reverse_lookup": _handle_addressbook_reverse_lookup,
     "addressbook_list": _handle_addressbook_list,
     "generate_qrcode": _handle_generate_qrcode,
     "get_account_energy": _handle_get_account_energy,
     "get_account_bandwidth": _handle_get_account_bandwidth,
     "lease_energy": _handle_lease_energy,
     "lease_bandwidth": _handle_lease_bandwidth,
+    "get_lease_quote": _handle_get_lease_quote,
+    "plan_transfers": _handle_plan_transfers,
+    "hd_derive_addresses": _handle_hd_derive_addresses,
+    "hd_lookup_address": _handle_hd_lookup_address,
+    "get_metrics": _handle_get_metrics,
+    "get_diagnostics": _handle_get_diagnostics,
 }
 
 
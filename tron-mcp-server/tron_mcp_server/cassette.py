@@ -0,0 +1,296 @@
+"""上游流量录制 / 回放（cassette）
+
+生产环境偶发变慢时，很难在本地复现当时的上游响应与耗时。本模块在上游 HTTP 层
+（TRONSCAN / TronGrid / TronZap）提供录制与回放:
+
+- record: 透传真实请求，并把请求 / 响应 / 耗时追加写入 gzip 压缩的 cassette 文件；
+  同时记录 call_router.call 的调用序列（动作、参数、时间偏移、耗时）
+- replay: 不访问网络，按请求匹配 cassette 中的响应返回，并按原始耗时 × 缩放系数等待
+
+配合 tests/stress/replay_calls.py 按录制顺序重放 call_router.call，即可在离线环境中
+用真实流量评估缓存、并发等改动。
+
+cassette 格式: gzip 压缩的 JSON Lines，每行一条记录:
+- {"type": "http", "service", "method", "path", "url", "params", "body", "status",
+   "content_type", "response", "elapsed_ms", "offset_ms"}（请求失败时为 "error"）
+- {"type": "call", "action", "params", "offset_ms", "elapsed_ms", "error_type"}
+
+请求头不写入 cassette（避免泄露 API Key），但请求参数与响应原文会原样保存。
+
+回放匹配: (服务, 方法, 路径, 查询参数, 请求体) 完全一致的记录按录制顺序依次返回，
+用尽后重复最后一条；无完全匹配时退回仅按 (服务, 方法, 路径) 匹配。
+
+配置:
+- TRON_CASSETTE_MODE: off（默认）/ record / replay
+- TRON_CASSETTE_PATH: cassette 文件路径（默认 ~/.tron_mcp/cassette.jsonl.gz）
+- TRON_CASSETTE_LATENCY_SCALE: 回放延迟缩放系数（默认 1.0，0 表示不等待）
+"""
+
+import os
+import gzip
+import atexit
+import json
+import time
+import logging
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+DEFAULT_PATH = Path.home() / ".tron_mcp" / "cassette.jsonl.gz"
+DEFAULT_LATENCY_SCALE = 1.0
+
+
+class CassetteMissError(LookupError):
+    """回放时 cassette 中没有与请求匹配的记录"""
+
+
+def _parse_mode(raw: str) -> str:
+    value = (raw or "off").strip().lower()
+    if value not in MODES:
+        logger.warning(f"无效的 TRON_CASSETTE_MODE: {raw}，使用默认值 off")
+        return "off"
+    return value
+
+
+def _parse_scale(raw: str) -> float:
+    try:
+        return max(0.0, float(raw)) if raw.strip() else DEFAULT_LATENCY_SCALE
+    except ValueError:
+        logger.warning(f"无效的 TRON_CASSETTE_LATENCY_SCALE: {raw}，使用默认值 {DEFAULT_LATENCY_SCALE}")
+        return DEFAULT_LATENCY_SCALE
+
+
+def _canonical(value) -> Optional[str]:
+    """请求参数 / 请求体的规范化 JSON（用于匹配）"""
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8", errors="replace")
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return value
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class Recorder:
+    """追加写入 cassette（线程安全）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._start = time.monotonic()
+
+    def offset_ms(self) -> float:
+        return (time.monotonic() - self._start) * 1000
+
+    def write(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # 追加模式写入新的 gzip member，gzip.open 读取时自动拼接
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Player:
+    """按请求匹配 cassette 中的响应"""
+
+    def __init__(self, entries: List[dict]):
+        self._exact: Dict[tuple, List[dict]] = defaultdict(list)
+        self._by_path: Dict[tuple, List[dict]] = defaultdict(list)
+        self._positions: Dict[tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.calls: List[dict] = []
+        for entry in entries:
+            if entry.get("type") == "call":
+                self.calls.append(entry)
+            elif entry.get("type") == "http":
+                route = (entry["service"], entry["method"], entry["path"])
+                self._exact[route + (entry.get("params"), entry.get("body"))].append(entry)
+                self._by_path[route].append(entry)
+
+    def _take(self, table: dict, key: tuple) -> Optional[dict]:
+        entries = table.get(key)
+        if not entries:
+            return None
+        position_key = (id(table),) + key
+        position = self._positions[position_key]
+        self._positions[position_key] = position + 1
+        return entries[min(position, len(entries) - 1)]
+
+    def match(self, service: str, method: str, path: str, params: Optional[str], body: Optional[str]) -> dict:
+        route = (service, method, path)
+        with self._lock:
+            entry = self._take(self._exact, route + (params, body)) or self._take(self._by_path, route)
+        if entry is None:
+            raise CassetteMissError(f"cassette 中没有 {service} {method} {path} 的记录")
+        return entry
+
+
+def load(path) -> List[dict]:
+    """读取 cassette 文件中的全部记录"""
+    entries = []
+    with gzip.open(Path(path).expanduser(), "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+_mode = _parse_mode(os.getenv("TRON_CASSETTE_MODE", ""))
+_path = Path(os.getenv("TRON_CASSETTE_PATH", "").strip() or DEFAULT_PATH).expanduser()
+_scale = _parse_scale(os.getenv("TRON_CASSETTE_LATENCY_SCALE", ""))
+_recorder: Optional[Recorder] = None
+_player: Optional[Player] = None
+_state_lock = threading.Lock()
+
+
+def mode() -> str:
+    """当前模式: off / record / replay"""
+    return _mode
+
+
+def recording() -> bool:
+    return _mode == "record"
+
+
+def configure(mode: str = "off", path=None, latency_scale: float = DEFAULT_LATENCY_SCALE) -> None:
+    """
+    运行时切换录制 / 回放（会关闭当前正在写入的 cassette）
+
+    Args:
+        mode: off / record / replay
+        path: cassette 文件路径（默认 TRON_CASSETTE_PATH）
+        latency_scale: 回放延迟缩放系数（0 表示不等待）
+    """
+    global _mode, _path, _scale, _recorder, _player
+    if mode not in MODES:
+        raise ValueError(f"不支持的 cassette 模式: {mode}，可选 {', '.join(MODES)}")
+    with _state_lock:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder = None
+        _player = None
+        _mode = mode
+        if path is not None:
+            _path = Path(path).expanduser()
+        _scale = max(0.0, float(latency_scale))
+
+
+def close() -> None:
+    """刷新并关闭正在写入的 cassette"""
+    with _state_lock:
+        if _recorder is not None:
+            _recorder.close()
+
+
+# 进程退出时写出 gzip 尾部，否则 cassette 无法完整读取
+atexit.register(close)
+
+
+def _get_recorder() -> Recorder:
+    global _recorder
+    with _state_lock:
+        if _recorder is None:
+            _recorder = Recorder(_path)
+        return _recorder
+
+
+def _get_player() -> Player:
+    global _player
+    with _state_lock:
+        if _player is None:
+            _player = Player(load(_path))
+        return _player
+
+
+def recorded_calls() -> List[dict]:
+    """回放模式下 cassette 中记录的 call_router 调用序列"""
+    return list(_get_player().calls)
+
+
+def request(service: str, path: str, send: Callable, method: str, url: str, **kwargs):
+    """
+    经录制 / 回放层发送上游请求
+
+    关闭时直接调用 send(url, **kwargs)；record 模式透传并写入 cassette；
+    replay 模式不调用 send，返回由 cassette 还原的 httpx.Response。
+
+    用法:
+        response = cassette.request("tronscan", path, httpx.get, "GET", url, params=params, headers=headers)
+    """
+    if _mode == "off":
+        return send(url, **kwargs)
+
+    params = _canonical(kwargs.get("params"))
+    body = _canonical(kwargs["json"] if "json" in kwargs else kwargs.get("content"))
+
+    if _mode == "replay":
+        entry = _get_player().match(service, method, path, params, body)
+        if _scale > 0 and entry.get("elapsed_ms"):
+            time.sleep(entry["elapsed_ms"] / 1000 * _scale)
+        if "error" in entry:
+            error_class = getattr(httpx, entry.get("error_type", ""), None)
+            if not (isinstance(error_class, type) and issubclass(error_class, httpx.TransportError)):
+                error_class = httpx.TransportError
+            raise error_class(entry["error"])
+        return httpx.Response(
+            entry["status"],
+            content=(entry.get("response") or "").encode("utf-8"),
+            headers={"content-type": entry.get("content_type") or "application/json"},
+            request=httpx.Request(method, entry.get("url") or url),
+        )
+
+    recorder = _get_recorder()
+    entry = {
+        "type": "http", "service": service, "method": method, "path": path, "url": str(url),
+        "params": params, "body": body, "offset_ms": round(recorder.offset_ms(), 3),
+    }
+    start = time.perf_counter()
+    try:
+        response = send(url, **kwargs)
+    except httpx.TransportError as e:
+        entry.update(elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+                     error=str(e), error_type=type(e).__name__)
+        recorder.write(entry)
+        raise
+    entry.update(
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+        status=response.status_code,
+        content_type=response.headers.get("content-type"),
+        response=response.text,
+    )
+    recorder.write(entry)
+    return response
+
+
+def record_call(action: str, params: dict, offset_ms: float, elapsed_ms: float, error_type: Optional[str]) -> None:
+    """记录一次 call_router.call（仅 record 模式）"""
+    if _mode != "record":
+        return
+    _get_recorder().write({
+        "type": "call", "action": action, "params": params,
+        "offset_ms": round(offset_ms, 3), "elapsed_ms": round(elapsed_ms, 3), "error_type": error_type,
+    })
+
+
+def offset_ms() -> float:
+    """距录制开始的毫秒数（仅 record 模式有意义）"""
+    return _get_recorder().offset_ms()
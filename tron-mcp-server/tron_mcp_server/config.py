@@ -6,8 +6,11 @@
 """
 
 import os
+import logging
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # 加载 .env 文件
 load_dotenv()
 
@@ -49,6 +52,11 @@ def get_api_url() -> str:
     return os.getenv("TRONSCAN_API_URL", "") or _preset("TRONSCAN_API_URL")
 
 
+def get_security_api_url() -> str:
+    """获取 TRONSCAN 账户标签 / 安全服务 API URL（accountv2、security/account/data）"""
+    return (os.getenv("TRONSCAN_SECURITY_API_URL", "") or "https://apilist.tronscanapi.com/api").rstrip("/")
+
+
 def get_trongrid_url() -> str:
     """获取 TronGrid API URL（用户显式设置优先）"""
     url = os.getenv("TRONGRID_API_URL", "") or _preset("TRONGRID_API_URL")
@@ -70,6 +78,18 @@ def get_timeout() -> float:
     return float(os.getenv("REQUEST_TIMEOUT", "10.0"))
 
 
+def get_number(name: str, default: float = 0.0) -> float:
+    """读取非负数值型环境变量（未设置或无效时返回 default）"""
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+
+
 # ============ 合约地址 ============
 
 
@@ -94,3 +114,8 @@ def get_tronzap_api_token() -> str:
 def get_tronzap_api_secret() -> str:
     """获取 TronZap API Secret"""
     return os.getenv("TRONZAP_API_SECRET", "")
+
+
+def get_tronzap_api_url() -> str:
+    """获取 TronZap API URL（可指向本地 stub 服务做离线测试）"""
+    return (os.getenv("TRONZAP_API_URL", "") or "https://api.tronzap.com").rstrip("/")
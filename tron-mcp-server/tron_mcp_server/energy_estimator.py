@@ -0,0 +1,212 @@
+"""TRC20 转账能量与手续费估算
+
+tx_builder 原先使用固定常量（ESTIMATED_USDT_ENERGY=65000、ENERGY_PRICE_SUN=420）估算 Gas：
+向已持币地址转账实际只需约一半能量，会误拦截余额足够的转账；
+网络调整能量单价后又会低估或高估手续费。
+
+本模块:
+- 能量: 通过 TronGrid estimateenergy / triggerconstantcontract 对本次转账做只读估算。
+  TRC20 转账的能量主要取决于接收方余额存储槽是否为零（新写入 vs 修改），
+  因此按 (合约, 接收方是否已持币) 记忆估算结果，有效期内同类转账不再重复估算；
+  接收方已持币的结论也会缓存（持币地址极少清零）。
+- 单价: 读取链上参数 getEnergyFee（tron_client.get_gas_parameters），每个刷新间隔最多查询一次。
+- 任一步骤失败时回退到原有常量，不阻塞转账。
+
+配置:
+- TRON_ENERGY_ESTIMATOR: live（默认）或 static（始终使用常量）
+- TRON_ENERGY_ESTIMATE_TTL: 能量估算记忆有效期（秒，默认 3600）
+- TRON_ENERGY_PRICE_REFRESH: 能量单价刷新间隔（秒，默认 600）
+- 显式设置 ESTIMATED_USDT_ENERGY / ENERGY_PRICE_SUN 时，对应项使用配置值而不做实时查询
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from . import tron_client
+from . import trongrid_client
+
+logger = logging.getLogger(__name__)
+
+# 常量回退值（唯一定义处，tx_builder.ESTIMATED_USDT_ENERGY / ENERGY_PRICE_SUN 引用这里）
+# 激活账户约 29,000 Energy，未激活账户约 65,000 Energy，保守估计使用较高值
+DEFAULT_ESTIMATED_USDT_ENERGY = 65000
+DEFAULT_ENERGY_PRICE_SUN = 420
+DEFAULT_ESTIMATE_TTL = 3600
+DEFAULT_PRICE_REFRESH = 600
+# 单价查询失败后，多久内不再重试（避免每笔转账都卡在失败的请求上）
+PRICE_RETRY_INTERVAL = 60
+# 缓存 "接收方已持币" 结论的地址数上限
+HOLDER_CACHE_MAX_ENTRIES = 10000
+
+SOURCE_LIVE = "live"
+SOURCE_MEMO = "memoized"
+SOURCE_STATIC = "static"
+
+
+def live_enabled() -> bool:
+    return os.getenv("TRON_ENERGY_ESTIMATOR", "live").strip().lower() != "static"
+
+
+def _get_seconds(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+
+
+def _static_energy() -> int:
+    return int(os.getenv("ESTIMATED_USDT_ENERGY", str(DEFAULT_ESTIMATED_USDT_ENERGY)))
+
+
+def _static_price() -> int:
+    return int(os.getenv("ENERGY_PRICE_SUN", str(DEFAULT_ENERGY_PRICE_SUN)))
+
+
+class _State:
+    """进程内的估算状态（记忆的能量估算、持币地址、能量单价）"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.lock = threading.Lock()
+        # (合约, 接收方是否已持币) → (过期时间, 能量)
+        self.energy: Dict[Tuple[str, bool], Tuple[float, int]] = {}
+        # 已确认持币的接收方 → 过期时间
+        self.holders: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        # (下次刷新时间, 单价, 来源)
+        self.price: Optional[Tuple[float, int, str]] = None
+
+
+_state = _State()
+
+
+def reset() -> None:
+    """清空所有记忆（测试或切换网络时使用）"""
+    global _state
+    _state = _State(_state.clock)
+
+
+def get_energy_price() -> dict:
+    """
+    获取能量单价（SUN / Energy），每个刷新间隔最多查询一次链上参数
+
+    Returns:
+        包含 price_sun, source 的字典（source: live / static）
+    """
+    if "ENERGY_PRICE_SUN" in os.environ or not live_enabled():
+        return {"price_sun": _static_price(), "source": SOURCE_STATIC}
+
+    state = _state
+    now = state.clock()
+    with state.lock:
+        if state.price is not None and now < state.price[0]:
+            return {"price_sun": state.price[1], "source": state.price[2]}
+
+    try:
+        price = int(tron_client.get_gas_parameters())
+        if price <= 0:
+            raise ValueError(f"无效的能量单价: {price}")
+        cached = (now + _get_seconds("TRON_ENERGY_PRICE_REFRESH", DEFAULT_PRICE_REFRESH), price, SOURCE_LIVE)
+    except Exception as e:
+        logger.warning(f"获取实时能量单价失败，使用默认值 {_static_price()} SUN: {e}")
+        cached = (now + PRICE_RETRY_INTERVAL, _static_price(), SOURCE_STATIC)
+    with state.lock:
+        state.price = cached
+    return {"price_sun": cached[1], "source": cached[2]}
+
+
+def _recipient_has_balance(to_address: str, contract: str) -> bool:
+    """接收方是否已持有该代币（已持币的结论缓存，未持币每次重新确认）"""
+    state = _state
+    key = (contract, to_address)
+    now = state.clock()
+    with state.lock:
+        expires_at = state.holders.get(key)
+        if expires_at is not None and now < expires_at:
+            state.holders.move_to_end(key)
+            return True
+
+    has_balance = trongrid_client.trc20_balance_of(to_address, contract) > 0
+    if has_balance:
+        with state.lock:
+            state.holders[key] = now + _get_seconds("TRON_ENERGY_ESTIMATE_TTL", DEFAULT_ESTIMATE_TTL)
+            state.holders.move_to_end(key)
+            while len(state.holders) > HOLDER_CACHE_MAX_ENTRIES:
+                state.holders.popitem(last=False)
+    return has_balance
+
+
+def estimate_trc20_energy(
+    from_address: str,
+    to_address: Optional[str],
+    amount: float,
+    contract_address: Optional[str] = None,
+) -> dict:
+    """
+    估算一笔 TRC20 转账的能量消耗
+
+    Args:
+        from_address: 发送方地址
+        to_address: 接收方地址（未知时使用常量估算）
+        amount: 转账金额
+        contract_address: TRC20 合约地址, 默认 USDT
+
+    Returns:
+        包含 energy, source, recipient_has_balance 的字典
+        （source: live / memoized / static；recipient_has_balance 未知时为 None）
+    """
+    if "ESTIMATED_USDT_ENERGY" in os.environ or not live_enabled() or not to_address:
+        return {"energy": _static_energy(), "source": SOURCE_STATIC, "recipient_has_balance": None}
+
+    contract = contract_address or trongrid_client.USDT_CONTRACT_BASE58
+    state = _state
+    try:
+        has_balance = _recipient_has_balance(to_address, contract)
+        key = (contract, has_balance)
+        now = state.clock()
+        with state.lock:
+            memo = state.energy.get(key)
+        if memo is not None and now < memo[0]:
+            return {"energy": memo[1], "source": SOURCE_MEMO, "recipient_has_balance": has_balance}
+
+        energy = trongrid_client.estimate_trc20_transfer_energy(
+            from_address, to_address, amount, contract_address=contract,
+        )
+        with state.lock:
+            state.energy[key] = (now + _get_seconds("TRON_ENERGY_ESTIMATE_TTL", DEFAULT_ESTIMATE_TTL), energy)
+        return {"energy": energy, "source": SOURCE_LIVE, "recipient_has_balance": has_balance}
+    except Exception as e:
+        logger.warning(f"TRC20 能量估算失败，使用默认值 {_static_energy()}: {e}")
+        return {"energy": _static_energy(), "source": SOURCE_STATIC, "recipient_has_balance": None}
+
+
+def estimate_trc20_fee(
+    from_address: str,
+    to_address: Optional[str],
+    amount: float,
+    contract_address: Optional[str] = None,
+) -> dict:
+    """
+    估算一笔 TRC20 转账燃烧 TRX 支付能量的费用（不含带宽）
+
+    Returns:
+        包含 energy, energy_price_sun, energy_fee_sun, energy_source, price_source,
+        recipient_has_balance 的字典
+    """
+    energy = estimate_trc20_energy(from_address, to_address, amount, contract_address)
+    price = get_energy_price()
+    return {
+        "energy": energy["energy"],
+        "energy_price_sun": price["price_sun"],
+        "energy_fee_sun": energy["energy"] * price["price_sun"],
+        "energy_source": energy["source"],
+        "price_source": price["source"],
+        "recipient_has_balance": energy["recipient_has_balance"],
+    }
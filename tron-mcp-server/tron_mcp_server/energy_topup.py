@@ -0,0 +1,305 @@
+"""USDT 转账前自动补足能量（可选策略）
+
+付款钱包能量不足时，USDT 转账会燃烧最多约 27 TRX 支付能量；原先 Agent 需要依次调用
+tron_get_account_energy、tron_lease_energy 才能避免。开启本策略后，转账流程会:
+
+1. 估算本笔转账所需能量（energy_estimator），读取钱包剩余能量（短暂缓存）
+2. 只对缺口部分向 TronZap 询价，租赁费用低于燃烧费用时才下单
+3. 下单后等待能量到账（TRON_ENERGY_TOPUP_WAIT 秒内轮询）
+
+估算、查询能量与询价在后台线程中与安全检查并发执行，不增加串行延迟；
+付费下单须等转账预检通过（OrderGate.approve），被拦截的转账不会产生租赁订单，
+等待许可期间不持有钱包锁。同一付款钱包的询价、下单分别串行执行，下单前重新确认缺口，
+避免并发转账重复租赁；多 worker 部署时通过跨进程文件锁串行，且其他 worker 刚为该钱包
+租赁后本进程的剩余能量缓存会失效。
+
+配置:
+- TRON_AUTO_ENERGY_TOPUP: 1 开启（默认关闭；transfer 的 auto_energy_topup 参数可逐笔覆盖）
+- TRON_ENERGY_TOPUP_CACHE_TTL: 钱包剩余能量缓存有效期（秒，默认 10）
+- TRON_ENERGY_TOPUP_WAIT: 下单后等待能量到账的最长时间（秒，默认 20，0 表示不等待）
+- TRON_ENERGY_LEASE_MIN: 最小起租量（与资源规划共用）
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from . import config
+from . import tron_client
+from . import energy_estimator
+from . import interprocess
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TTL = 10
+DEFAULT_ARRIVAL_WAIT = 20
+# 等待能量到账时的轮询间隔（秒）
+ARRIVAL_POLL_INTERVAL = 1.0
+# 能量租期（小时）: 单笔补足只需覆盖本次转账
+TOPUP_LEASE_DURATION = 1
+TOPUP_WORKERS = 4
+# 等待下单许可的最长时间（秒），超时视为取消
+GATE_TIMEOUT = 120
+
+STATUS_SUFFICIENT = "sufficient"
+STATUS_LEASED = "leased"
+STATUS_BURN = "burn"
+STATUS_UNAVAILABLE = "unavailable"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+
+class OrderGate:
+    """
+    租赁下单许可
+
+    转账预检通过后调用 approve()；转账被拦截或出错时调用 cancel()，补足流程不再下单。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._approved = False
+
+    def approve(self) -> None:
+        self._approved = True
+        self._event.set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待决定，返回是否允许下单（超时视为取消）"""
+        return self._event.wait(timeout) and self._approved
+
+
+def enabled(override: Optional[bool] = None) -> bool:
+    """是否开启自动补足（参数优先于 TRON_AUTO_ENERGY_TOPUP）"""
+    if override is not None:
+        return bool(override)
+    return os.getenv("TRON_AUTO_ENERGY_TOPUP", "").strip().lower() in ("1", "true", "yes")
+
+
+def _get_seconds(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+
+
+# 地址 → (过期时间 monotonic, 剩余能量, 查询时间 wall clock)
+_energy_cache: Dict[str, Tuple[float, int, float]] = {}
+_cache_lock = threading.Lock()
+_address_locks: Dict[str, threading.Lock] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_available_energy(address: str) -> int:
+    """钱包剩余能量（缓存 TRON_ENERGY_TOPUP_CACHE_TTL 秒）"""
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _energy_cache.get(address)
+        if entry is not None and now < entry[0]:
+            return entry[1]
+    remaining = int(tron_client.get_account_energy(address).get("energy_remaining", 0))
+    ttl = _get_seconds("TRON_ENERGY_TOPUP_CACHE_TTL", DEFAULT_CACHE_TTL)
+    if ttl > 0:
+        with _cache_lock:
+            _energy_cache[address] = (now + ttl, remaining, time.time())
+    return remaining
+
+
+def invalidate(address: Optional[str] = None) -> None:
+    """清除剩余能量缓存（租赁或转账后能量已变化）"""
+    with _cache_lock:
+        if address is None:
+            _energy_cache.clear()
+        else:
+            _energy_cache.pop(address, None)
+
+
+def _address_lock(address: str) -> threading.Lock:
+    with _cache_lock:
+        return _address_locks.setdefault(address, threading.Lock())
+
+
+def _invalidate_before(address: str, timestamp: float) -> None:
+    """缓存早于 timestamp（其他进程最近一次租赁）时失效"""
+    with _cache_lock:
+        entry = _energy_cache.get(address)
+        if entry is not None and entry[2] <= timestamp:
+            del _energy_cache[address]
+
+
+def _wait_for_energy(address: str, needed: int, sleep=time.sleep) -> bool:
+    """轮询直到剩余能量覆盖本次转账，或等待超时"""
+    deadline = time.monotonic() + _get_seconds("TRON_ENERGY_TOPUP_WAIT", DEFAULT_ARRIVAL_WAIT)
+    while True:
+        invalidate(address)
+        try:
+            if get_available_energy(address) >= needed:
+                return True
+        except Exception as e:
+            logger.debug(f"等待能量到账时查询失败: {e}")
+        if time.monotonic() + ARRIVAL_POLL_INTERVAL > deadline:
+            return False
+        sleep(ARRIVAL_POLL_INTERVAL)
+
+
+def top_up(
+    from_address: str,
+    to_address: str,
+    amount: float,
+    contract_address: Optional[str] = None,
+    gate: Optional[OrderGate] = None,
+) -> dict:
+    """
+    为一笔 USDT 转账补足能量（只租赁缺口，且仅在比燃烧便宜时租赁）
+
+    提供 gate 时，询价后等待下单许可；未获许可则不下单，返回 status=cancelled。
+
+    Returns:
+        包含 status, needed, available, shortfall 的字典；租赁时附带 lease_amount,
+        lease_cost_sun, burn_cost_sun, saved_sun, transaction_id, arrived。
+        status: sufficient / leased / burn（燃烧更便宜或无报价）/ unavailable（未配置 TronZap）/ failed /
+        cancelled（转账未通过预检）
+    """
+    with tracing.span("energy_topup.top_up") as span:
+        result = _top_up(from_address, to_address, amount, contract_address, gate)
+        span.set_attribute("status", result["status"])
+        return result
+
+
+@contextmanager
+def _wallet_lock(address: str):
+    """同一付款钱包的补足串行：进程内线程锁 + 跨进程文件锁，取锁后失效其他进程租赁前的缓存"""
+    shared_lock = interprocess.FileLock(interprocess.lock_path_for(f"energy-{address}"))
+    with _address_lock(address), shared_lock:
+        _invalidate_before(address, shared_lock.last_mark())
+        yield shared_lock
+
+
+def _top_up(
+    from_address: str, to_address: str, amount: float, contract_address: Optional[str],
+    gate: Optional[OrderGate] = None,
+) -> dict:
+    if gate is None:
+        with _wallet_lock(from_address) as shared_lock:
+            result, client = _quote_lease(from_address, to_address, amount, contract_address)
+            if client is None:
+                return result
+            return _place_order(from_address, result, client, shared_lock)
+
+    with _wallet_lock(from_address):
+        result, client = _quote_lease(from_address, to_address, amount, contract_address)
+    if client is None:
+        return result
+
+    # 等待下单许可时不持有钱包锁，同一钱包的其他转账（含其他进程）不必排在待定订单之后
+    if not gate.wait(GATE_TIMEOUT):
+        return {**result, "status": STATUS_CANCELLED}
+
+    with _wallet_lock(from_address) as shared_lock:
+        # 等待期间其他转账可能已为该钱包租到能量（其租赁已到账或超时后才释放锁）
+        try:
+            available = get_available_energy(from_address)
+        except Exception as e:
+            return {**result, "status": STATUS_FAILED, "error": f"查询能量失败: {e}"}
+        if available >= result["needed"]:
+            return {**result, "available": available, "shortfall": 0, "status": STATUS_SUFFICIENT}
+        return _place_order(from_address, result, client, shared_lock)
+
+
+def _place_order(from_address: str, result: dict, client, shared_lock) -> dict:
+    """按询价结果下单并等待能量到账（调用方持有钱包锁）"""
+    try:
+        order = client.create_energy_transaction(from_address, result["lease_amount"], TOPUP_LEASE_DURATION)
+    except Exception as e:
+        logger.warning(f"自动补足能量失败，本笔转账将燃烧 TRX ({from_address}): {e}")
+        return {**result, "status": STATUS_FAILED, "error": str(e)}
+
+    shared_lock.mark()
+    invalidate(from_address)
+    arrived = _wait_for_energy(from_address, result["needed"])
+    if not arrived:
+        logger.warning(f"租赁的能量尚未到账 ({from_address})，本笔转账可能仍会燃烧部分 TRX")
+    return {
+        **result,
+        "status": STATUS_LEASED,
+        "saved_sun": result["burn_cost_sun"] - result["lease_cost_sun"],
+        "transaction_id": order.get("transaction_id") or order.get("tx_id") or order.get("id", ""),
+        "arrived": arrived,
+    }
+
+
+def _quote_lease(
+    from_address: str, to_address: str, amount: float, contract_address: Optional[str],
+) -> Tuple[dict, Optional[object]]:
+    """
+    估算缺口并向 TronZap 询价（调用方持有钱包锁）
+
+    Returns:
+        (result, client)：值得租赁时 client 为 TronZap 客户端；否则 client 为 None，
+        result 已带最终 status（sufficient / burn / unavailable / failed）
+    """
+    from . import tronzap_client
+
+    try:
+        needed = energy_estimator.estimate_trc20_energy(
+            from_address, to_address, amount, contract_address,
+        )["energy"]
+        available = get_available_energy(from_address)
+    except Exception as e:
+        return {"status": STATUS_FAILED, "error": f"查询能量失败: {e}"}, None
+
+    result = {"needed": needed, "available": available, "shortfall": max(0, needed - available)}
+    if result["shortfall"] <= 0:
+        return {**result, "status": STATUS_SUFFICIENT}, None
+
+    lease_amount = int(max(result["shortfall"], config.get_number("TRON_ENERGY_LEASE_MIN")))
+    burn_cost_sun = result["shortfall"] * energy_estimator.get_energy_price()["price_sun"]
+    result.update({"lease_amount": lease_amount, "burn_cost_sun": burn_cost_sun})
+    try:
+        client = tronzap_client.get_client()
+    except ValueError as e:
+        return {**result, "status": STATUS_UNAVAILABLE, "error": str(e)}, None
+
+    try:
+        quote = client.quote_energy(from_address, lease_amount, TOPUP_LEASE_DURATION)
+        cost_trx = tronzap_client.quote_cost_trx(quote)
+    except Exception as e:
+        logger.warning(f"自动补足能量失败，本笔转账将燃烧 TRX ({from_address}): {e}")
+        return {**result, "status": STATUS_FAILED, "error": str(e)}, None
+    if cost_trx is None:
+        return {**result, "status": STATUS_BURN, "error": "TronZap 报价缺少费用"}, None
+    lease_cost_sun = int(round(cost_trx * 1_000_000))
+    result["lease_cost_sun"] = lease_cost_sun
+    if lease_cost_sun >= burn_cost_sun:
+        return {**result, "status": STATUS_BURN}, None
+    return result, client
+
+
+def start(
+    from_address: str,
+    to_address: str,
+    amount: float,
+    contract_address: Optional[str] = None,
+    gate: Optional[OrderGate] = None,
+) -> Future:
+    """在后台线程中执行 top_up，返回 Future（供转账流程与安全检查并发）"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=TOPUP_WORKERS, thread_name_prefix="energy-topup")
+        return _executor.submit(
+            tracing.wrap_context(top_up), from_address, to_address, amount, contract_address, gate,
+        )
@@ -0,0 +1,306 @@
+"""批量转账手续费与资源规划
+
+多笔转账逐笔执行时，每笔都要查询资源、按常量估算手续费，且无法事先判断
+"租赁能量" 与 "直接燃烧 TRX" 哪个更便宜。本模块在执行前一次性完成规划:
+
+1. 查询一次付款账户资源（getaccountresource）与链上能量单价（getEnergyFee）
+2. 逐笔估算能量（energy_estimator，按接收方是否已持币记忆）与带宽需求
+3. 比较租赁与燃烧的成本，选出最便宜的组合
+4. 给出执行顺序: 先租赁（租来的资源需要先到账），再按带宽从大到小执行转账
+   —— 带宽是按笔 "全额覆盖或全额燃烧"，大笔优先使用质押 / 免费带宽能少烧 TRX；
+   USDT 转账排在前面，也能在 1 小时租期内用完租来的能量
+
+返回的 steps 可直接逐条交给 call_router.call 执行。
+
+租赁单价（SUN / 单位资源）依次取自参数、环境变量；能量单价未配置但有 TronZap 凭证时，
+按缺口数量向 TronZap 询价（报价有缓存）。都没有时只考虑燃烧:
+- TRON_ENERGY_LEASE_PRICE_SUN / TRON_ENERGY_LEASE_MIN
+- TRON_BANDWIDTH_LEASE_PRICE_SUN / TRON_BANDWIDTH_LEASE_MIN
+"""
+
+import os
+import logging
+from typing import List, Optional
+
+from . import config
+from . import tron_client
+from . import trongrid_client
+from . import tx_builder
+from . import validators
+from . import energy_estimator
+
+logger = logging.getLogger(__name__)
+
+# 单次规划最多包含的转账笔数
+PLAN_MAX_TRANSFERS = 200
+# 租赁带宽时，补足燃烧缺口的最大迭代次数（按笔全额覆盖，补一次不一定够）
+_BANDWIDTH_LEASE_ROUNDS = 5
+
+STRATEGY_NONE = "none"
+STRATEGY_LEASE = "lease"
+STRATEGY_BURN = "burn"
+
+
+def _quoted_energy_lease_price(address: str, amount: int, duration: int) -> float:
+    """向 TronZap 询价，换算为 SUN / Energy；未配置凭证或询价失败时返回 0（只考虑燃烧）"""
+    from . import tronzap_client
+
+    if amount <= 0 or not (config.get_tronzap_api_token() and config.get_tronzap_api_secret()):
+        return 0.0
+    try:
+        quote = tronzap_client.get_client().quote_energy(address, amount, duration)
+    except Exception as e:
+        logger.warning(f"TronZap 询价失败，规划时只考虑燃烧: {e}")
+        return 0.0
+    cost_trx = tronzap_client.quote_cost_trx(quote)
+    if not cost_trx:
+        return 0.0
+    return cost_trx * tx_builder.SUN_PER_TRX / amount
+
+
+def _transfer_bandwidth(token: str) -> int:
+    return tx_builder.USDT_BANDWIDTH_BYTES if token == "USDT" else tx_builder.TRX_BANDWIDTH_BYTES
+
+
+def _normalize_transfers(transfers: list) -> List[dict]:
+    """校验并规范化转账列表，保留原始序号"""
+    if not isinstance(transfers, list) or not transfers:
+        raise ValueError("transfers 必须是非空列表")
+    if len(transfers) > PLAN_MAX_TRANSFERS:
+        raise ValueError(f"单次规划最多 {PLAN_MAX_TRANSFERS} 笔转账，当前 {len(transfers)} 笔")
+
+    normalized = []
+    for index, item in enumerate(transfers):
+        if not isinstance(item, dict):
+            raise ValueError(f"第 {index + 1} 笔转账格式无效，应为包含 to / amount / token 的对象")
+        to_addr = item.get("to")
+        amount = item.get("amount")
+        token = str(item.get("token", "USDT")).upper()
+        if not to_addr or not validators.is_valid_address(to_addr):
+            raise ValueError(f"第 {index + 1} 笔转账接收方地址无效: {to_addr}")
+        if amount is None or not validators.is_positive_amount(amount):
+            raise ValueError(f"第 {index + 1} 笔转账金额必须为正数: {amount}")
+        if token not in ("USDT", "TRX"):
+            raise ValueError(f"第 {index + 1} 笔转账代币类型不支持: {token}")
+        normalized.append({"index": index, "to": to_addr, "amount": float(amount), "token": token})
+    return normalized
+
+
+def _simulate_bandwidth(ordered: List[dict], staked: int, free: int) -> List[int]:
+    """
+    按执行顺序模拟带宽消耗，返回每笔需要燃烧的字节数
+
+    每笔交易先尝试质押带宽，不足时尝试免费带宽，都不足时按全部字节燃烧 TRX。
+    """
+    burned = []
+    for item in ordered:
+        need = item["bandwidth"]
+        if staked >= need:
+            staked -= need
+            burned.append(0)
+        elif free >= need:
+            free -= need
+            burned.append(0)
+        else:
+            burned.append(need)
+    return burned
+
+
+def _choose(shortfall: int, burn_cost: int, lease_price: float, lease_min: float) -> dict:
+    """比较燃烧与租赁（租赁数量不低于最小起租量）的成本"""
+    choice = {
+        "shortfall": shortfall,
+        "strategy": STRATEGY_NONE if shortfall <= 0 else STRATEGY_BURN,
+        "lease_amount": 0,
+        "lease_cost_sun": 0,
+        "burn_cost_sun": burn_cost,
+    }
+    if shortfall <= 0 or lease_price <= 0:
+        return choice
+    lease_amount = int(max(shortfall, lease_min))
+    lease_cost = int(round(lease_amount * lease_price))
+    if lease_cost < burn_cost:
+        choice.update({
+            "strategy": STRATEGY_LEASE,
+            "lease_amount": lease_amount,
+            "lease_cost_sun": lease_cost,
+            "burn_cost_sun": 0,
+            "saved_sun": burn_cost - lease_cost,
+        })
+    return choice
+
+
+def plan_transfers(
+    from_address: str,
+    transfers: list,
+    energy_lease_price_sun: Optional[float] = None,
+    bandwidth_lease_price_sun: Optional[float] = None,
+    lease_duration: int = 1,
+) -> dict:
+    """
+    为一批转账生成手续费与资源规划
+
+    Args:
+        from_address: 付款地址
+        transfers: 转账列表，每项为 {"to", "amount", "token"}（token 默认 USDT）
+        energy_lease_price_sun: 能量租赁单价（SUN / Energy），默认读取 TRON_ENERGY_LEASE_PRICE_SUN，
+            未配置时向 TronZap 询价
+        bandwidth_lease_price_sun: 带宽租赁单价（SUN / 字节），默认读取 TRON_BANDWIDTH_LEASE_PRICE_SUN
+        lease_duration: 能量租期（小时，1 或 24）
+
+    Returns:
+        包含 resources, demand, energy, bandwidth, steps, totals, balances, feasible 的规划字典
+
+    Raises:
+        ValueError: 转账列表无效
+    """
+    items = _normalize_transfers(transfers)
+    if energy_lease_price_sun is None and os.getenv("TRON_ENERGY_LEASE_PRICE_SUN", "").strip():
+        energy_lease_price_sun = config.get_number("TRON_ENERGY_LEASE_PRICE_SUN")
+    if bandwidth_lease_price_sun is None:
+        bandwidth_lease_price_sun = config.get_number("TRON_BANDWIDTH_LEASE_PRICE_SUN")
+
+    # 1. 账户资源与单价（整批只查询一次）
+    resource = trongrid_client.get_account_resource(from_address)
+    energy_available = max(0, resource.get("EnergyLimit", 0) - resource.get("EnergyUsed", 0))
+    staked_bw = max(0, resource.get("NetLimit", 0) - resource.get("NetUsed", 0))
+    free_bw = max(0, resource.get("freeNetLimit", tx_builder.FREE_BANDWIDTH_DAILY) - resource.get("freeNetUsed", 0))
+    price = energy_estimator.get_energy_price()
+    energy_price = price["price_sun"]
+    bandwidth_price = tx_builder.BANDWIDTH_PRICE_SUN
+
+    # 2. 逐笔需求
+    for item in items:
+        item["bandwidth"] = _transfer_bandwidth(item["token"])
+        if item["token"] == "USDT":
+            estimate = energy_estimator.estimate_trc20_energy(
+                from_address, item["to"], item["amount"], contract_address=tx_builder.USDT_CONTRACT,
+            )
+            item["energy"] = estimate["energy"]
+            item["energy_source"] = estimate["source"]
+        else:
+            item["energy"] = 0
+
+    # 3. 执行顺序: 带宽从大到小（USDT 在前），同类保持原始顺序
+    ordered = sorted(items, key=lambda item: -item["bandwidth"])
+
+    # 4. 能量: 燃烧按差额计费，与顺序无关
+    energy_demand = sum(item["energy"] for item in items)
+    energy_shortfall = max(0, energy_demand - energy_available)
+    if energy_lease_price_sun is None:
+        energy_lease_price_sun = 0.0
+        if energy_shortfall > 0:
+            lease_amount = int(max(energy_shortfall, config.get_number("TRON_ENERGY_LEASE_MIN")))
+            energy_lease_price_sun = _quoted_energy_lease_price(from_address, lease_amount, lease_duration)
+    energy = _choose(
+        energy_shortfall, energy_shortfall * energy_price,
+        energy_lease_price_sun, config.get_number("TRON_ENERGY_LEASE_MIN"),
+    )
+
+    # 5. 带宽: 按笔全额覆盖，需按执行顺序模拟
+    baseline_bw_burn = _simulate_bandwidth(ordered, staked_bw, free_bw)
+    bandwidth_shortfall = sum(baseline_bw_burn)
+    bandwidth = _choose(
+        bandwidth_shortfall, bandwidth_shortfall * bandwidth_price,
+        bandwidth_lease_price_sun, config.get_number("TRON_BANDWIDTH_LEASE_MIN"),
+    )
+    bw_burn = baseline_bw_burn
+    if bandwidth["strategy"] == STRATEGY_LEASE:
+        lease_amount = bandwidth["lease_amount"]
+        for _ in range(_BANDWIDTH_LEASE_ROUNDS):
+            bw_burn = _simulate_bandwidth(ordered, staked_bw + lease_amount, free_bw)
+            if not any(bw_burn):
+                break
+            lease_amount += sum(bw_burn)
+        lease_cost = int(round(lease_amount * bandwidth_lease_price_sun))
+        remaining_burn = sum(bw_burn) * bandwidth_price
+        if lease_cost + remaining_burn < bandwidth_shortfall * bandwidth_price:
+            bandwidth.update({
+                "lease_amount": lease_amount,
+                "lease_cost_sun": lease_cost,
+                "burn_cost_sun": remaining_burn,
+                "saved_sun": bandwidth_shortfall * bandwidth_price - lease_cost - remaining_burn,
+            })
+        else:
+            bw_burn = baseline_bw_burn
+            bandwidth = _choose(bandwidth_shortfall, bandwidth_shortfall * bandwidth_price, 0, 0)
+
+    # 6. 组装可执行步骤
+    steps = []
+    if energy["strategy"] == STRATEGY_LEASE:
+        steps.append({
+            "action": "lease_energy",
+            "params": {"to_address": from_address, "amount": energy["lease_amount"], "duration": lease_duration},
+            "cost_sun": energy["lease_cost_sun"],
+        })
+    if bandwidth["strategy"] == STRATEGY_LEASE:
+        steps.append({
+            "action": "lease_bandwidth",
+            "params": {"to_address": from_address, "amount": bandwidth["lease_amount"]},
+            "cost_sun": bandwidth["lease_cost_sun"],
+        })
+
+    energy_pool = energy_available + energy["lease_amount"]
+    burn_total = 0
+    for item, bw_burned in zip(ordered, bw_burn):
+        covered = min(energy_pool, item["energy"])
+        energy_pool -= covered
+        energy_burn_sun = (item["energy"] - covered) * energy_price
+        bandwidth_burn_sun = bw_burned * bandwidth_price
+        burn_total += energy_burn_sun + bandwidth_burn_sun
+        steps.append({
+            "action": "transfer",
+            "params": {"to": item["to"], "amount": item["amount"], "token": item["token"], "from": from_address},
+            "input_index": item["index"],
+            "energy": item["energy"],
+            "bandwidth": item["bandwidth"],
+            "energy_burn_sun": energy_burn_sun,
+            "bandwidth_burn_sun": bandwidth_burn_sun,
+        })
+    for number, step in enumerate(steps, 1):
+        step["step"] = number
+
+    lease_total = energy["lease_cost_sun"] + bandwidth["lease_cost_sun"]
+    baseline_sun = energy_shortfall * energy_price + bandwidth_shortfall * bandwidth_price
+    totals = {
+        "burn_sun": burn_total,
+        "lease_sun": lease_total,
+        "total_cost_sun": burn_total + lease_total,
+        "total_cost_trx": (burn_total + lease_total) / tx_builder.SUN_PER_TRX,
+        "burn_only_cost_sun": baseline_sun,
+        "saved_sun": baseline_sun - burn_total - lease_total,
+    }
+
+    # 7. 余额可行性（租赁费用由 TronZap 账户支付，不计入钱包 TRX）
+    required_trx = sum(i["amount"] for i in items if i["token"] == "TRX") + burn_total / tx_builder.SUN_PER_TRX
+    required_usdt = sum(i["amount"] for i in items if i["token"] == "USDT")
+    balances = None
+    feasible = None
+    try:
+        balances = {"trx": tron_client.get_balance_trx(from_address)}
+        if required_usdt:
+            balances["usdt"] = tron_client.get_usdt_balance(from_address)
+        feasible = balances["trx"] >= required_trx and balances.get("usdt", 0) >= required_usdt
+    except Exception as e:
+        logger.warning(f"规划时查询付款地址余额失败 ({from_address}): {e}")
+
+    return {
+        "from": from_address,
+        "transfer_count": len(items),
+        "resources": {
+            "energy_available": energy_available,
+            "bandwidth_staked_available": staked_bw,
+            "bandwidth_free_available": free_bw,
+        },
+        "energy_price_sun": energy_price,
+        "energy_price_source": price["source"],
+        "bandwidth_price_sun": bandwidth_price,
+        "demand": {"energy": energy_demand, "bandwidth": sum(item["bandwidth"] for item in items)},
+        "energy": energy,
+        "bandwidth": bandwidth,
+        "steps": steps,
+        "totals": totals,
+        "required": {"trx": required_trx, "usdt": required_usdt},
+        "balances": balances,
+        "feasible": feasible,
+    }
@@ -2,6 +2,24 @@
 
 import json
 
+try:
+    import orjson
+except ImportError:  # 可选依赖：pip install tron-mcp-server[fast]
+    orjson = None
+
+# 响应详略级别：minimal 只保留判定字段，standard 为默认输出，full 附带上游原始数据
+VERBOSITY_MINIMAL = "minimal"
+VERBOSITY_STANDARD = "standard"
+VERBOSITY_FULL = "full"
+VERBOSITY_LEVELS = (VERBOSITY_MINIMAL, VERBOSITY_STANDARD, VERBOSITY_FULL)
+
+
+def dumps(obj) -> str:
+    """紧凑 JSON 序列化（无多余空白；安装 orjson 时使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
 
 def format_usdt_balance(address: str, balance_raw: int) -> dict:
     """
@@ -156,7 +174,7 @@ def format_account_status(account_status: dict) -> dict:
     }
 
 
-def format_account_safety(address: str, risk_info: dict) -> dict:
+def format_account_safety(address: str, risk_info: dict, verbosity: str = VERBOSITY_STANDARD) -> dict:
     """
     格式化账户安全检查结果（全量反馈模式）
     
@@ -166,6 +184,7 @@ def format_account_safety(address: str, risk_info: dict) -> dict:
     Args:
         address: TRON 地址
         risk_info: 来自 tron_client.check_account_risk() 的结果
+        verbosity: 为 full 时附带原始风险报告（raw）
     
     Returns:
         包含安全检查结果的字典
@@ -226,7 +245,7 @@ def format_account_safety(address: str, risk_info: dict) -> dict:
         reasons_text = " | ".join(risk_reasons) if risk_reasons else risk_type
         summary = f"地址 {address} 安全检查完成：⛔ 危险！{reasons_text}"
     
-    return {
+    result = {
         "address": address,
         "is_safe": is_safe,
         "is_risky": is_risky,
@@ -239,6 +258,91 @@ def format_account_safety(address: str, risk_info: dict) -> dict:
         "detail": detail,
         "summary": summary,
     }
+    if verbosity == VERBOSITY_FULL:
+        result["raw"] = risk_info
+    return result
+
+
+# 批量安全检查摘要中最多列出的高危地址数
+_SAFETY_BATCH_PREVIEW = 10
+
+
+def _safety_verdict(risk_info: dict) -> str:
+    """风险报告 → 判定：risky / safe / partial / unknown（规则与 format_account_safety 一致）"""
+    if risk_info is None:
+        return "unknown"
+    risk_type = risk_info.get("risk_type", "Unknown")
+    if risk_info.get("is_risky", False):
+        return "risky"
+    if risk_type == "Unknown":
+        return "unknown"
+    if risk_type == "Partially Verified":
+        return "partial"
+    return "safe"
+
+
+def format_account_safety_batch(
+    total_input: int,
+    addresses: list,
+    reports: dict,
+    invalid: list = None,
+    verbosity: str = VERBOSITY_STANDARD,
+) -> dict:
+    """
+    格式化批量安全检查结果（紧凑的逐地址判定表 + 统计）
+
+    Args:
+        total_input: 输入地址数（去重前）
+        addresses: 去重后的有效地址列表（保持输入顺序）
+        reports: 地址 → check_account_risk 风险报告（查询失败的地址不在其中）
+        invalid: 格式无效的地址列表
+        verbosity: 为 full 时每行附带原始风险报告（raw）
+
+    Returns:
+        包含 counts, verdicts, risky_addresses, summary 的字典
+    """
+    invalid = invalid or []
+    counts = {"risky": 0, "safe": 0, "partial": 0, "unknown": 0, "invalid": len(invalid)}
+    verdicts = []
+    for address in addresses:
+        risk_info = reports.get(address)
+        verdict = _safety_verdict(risk_info)
+        counts[verdict] += 1
+        row = {
+            "address": address,
+            "verdict": verdict,
+            "risk_type": risk_info.get("risk_type", "Unknown") if risk_info else "Unknown",
+        }
+        if verdict == "risky":
+            row["reasons"] = risk_info.get("risk_reasons", [])
+        if verbosity == VERBOSITY_FULL:
+            row["raw"] = risk_info
+        verdicts.append(row)
+    for address in invalid:
+        verdicts.append({"address": address, "verdict": "invalid", "risk_type": "Invalid Address"})
+
+    risky_addresses = [row["address"] for row in verdicts if row["verdict"] == "risky"]
+    summary = (
+        f"批量安全检查完成：输入 {total_input} 个地址，去重后 {len(addresses) + len(invalid)} 个。"
+        f"⛔ 危险 {counts['risky']}，✅ 安全 {counts['safe']}，"
+        f"⚠️ 部分验证 {counts['partial']}，❓ 无法验证 {counts['unknown']}，"
+        f"❌ 格式无效 {counts['invalid']}。"
+    )
+    if risky_addresses:
+        preview = "、".join(risky_addresses[:_SAFETY_BATCH_PREVIEW])
+        more = f" 等 {len(risky_addresses)} 个" if len(risky_addresses) > _SAFETY_BATCH_PREVIEW else ""
+        summary += f"危险地址：{preview}{more}。"
+    if counts["unknown"]:
+        summary += "部分地址无法验证，请稍后重试或谨慎处理。"
+
+    return {
+        "total_input": total_input,
+        "unique": len(addresses) + len(invalid),
+        "counts": counts,
+        "verdicts": verdicts,
+        "risky_addresses": risky_addresses,
+        "summary": summary,
+    }
 
 
 def format_error(error_code: str, message: str) -> dict:
@@ -260,7 +364,7 @@ def format_signed_tx(
     tx_id = signed_tx.get("txID", "")
     return {
         "signed_tx": signed_tx,
-        "signed_tx_json": json.dumps(signed_tx),
+        "signed_tx_json": dumps(signed_tx),
         "txID": tx_id,
         "summary": (
             f"已签名交易: 从 {from_addr[:8]}... 向 {to_addr[:8]}... "
@@ -291,8 +395,9 @@ def format_transfer_result(
     token: str,
     security_check: dict = None,
     recipient_check: dict = None,
+    energy_topup: dict = None,
 ) -> dict:
-    """格式化一键转账结果"""
+    """格式化一键转账结果（energy_topup 为自动补足能量的结果，可选）"""
     tx_id = broadcast_result.get("txid", "")
     result = {
         "result": True,
@@ -312,6 +417,14 @@ def format_transfer_result(
         result["security_check"] = security_check
     if recipient_check:
         result["recipient_check"] = recipient_check
+    if energy_topup:
+        result["energy_topup"] = energy_topup
+        if energy_topup.get("status") == "leased":
+            result["summary"] += (
+                f"\n⚡ 已自动租赁 {energy_topup.get('lease_amount', 0):,} 能量，"
+                f"费用 {energy_topup.get('lease_cost_sun', 0) / 1_000_000:.2f} TRX，"
+                f"比燃烧节省 {energy_topup.get('saved_sun', 0) / 1_000_000:.2f} TRX。"
+            )
     return result
 
 
@@ -333,12 +446,22 @@ def format_wallet_info(
     }
 
 
+def transfer_parties(tx: dict) -> tuple:
+    """提取交易记录的 (发送方, 接收方) 地址，兼容 TRONSCAN / TronGrid 的不同字段名"""
+    from_addr = tx.get("transferFromAddress") or tx.get("from_address") or tx.get("from") or ""
+    to_addr = tx.get("transferToAddress") or tx.get("to_address") or tx.get("to") or ""
+    return from_addr, to_addr
+
+
 def format_transaction_history(
     address: str,
     transfers: list,
     total: int,
     token_filter: str = None,
     limit: int = 10,
+    labels: dict = None,
+    risk: dict = None,
+    verbosity: str = VERBOSITY_STANDARD,
 ) -> dict:
     """
     格式化交易历史记录
@@ -351,6 +474,11 @@ def format_transaction_history(
         total: 总交易数
         token_filter: 代币筛选条件
         limit: 请求的返回条数
+        labels: 地址 → 别名列表（可选，来自地址簿批量反查）；
+            提供时每条记录附带 from_alias / to_alias
+        risk: 地址 → 风险标签（可选，来自 risk_cache.risk_tag）；
+            提供时每条记录附带 counterparty / counterparty_risk
+        verbosity: 为 full 时每条记录附带上游原始记录（raw）
     
     Returns:
         格式化的交易历史结果
@@ -362,8 +490,7 @@ def format_transaction_history(
         txid = tx.get("transactionHash") or tx.get("transaction_id") or ""
         
         # 提取发送方和接收方地址
-        from_addr = tx.get("transferFromAddress") or tx.get("from_address") or tx.get("from") or ""
-        to_addr = tx.get("transferToAddress") or tx.get("to_address") or tx.get("to") or ""
+        from_addr, to_addr = transfer_parties(tx)
         
         # 提取金额（使用显式 None 检查避免零值被跳过）
         amount_raw = tx.get("quant")
@@ -415,7 +542,7 @@ def format_transaction_history(
             elif to_addr == address:
                 direction = "IN"
         
-        formatted_transfers.append({
+        row = {
             "txid": txid,
             "from": from_addr,
             "to": to_addr,
@@ -423,7 +550,19 @@ def format_transaction_history(
             "token": token_name,
             "timestamp": timestamp,
             "direction": direction,
-        })
+        }
+        if labels is not None:
+            row["from_alias"] = (labels.get(from_addr) or [None])[0]
+            row["to_alias"] = (labels.get(to_addr) or [None])[0]
+        if risk is not None:
+            counterparty = to_addr if from_addr == address else from_addr
+            if counterparty == address:
+                counterparty = ""
+            row["counterparty"] = counterparty
+            row["counterparty_risk"] = risk.get(counterparty)
+        if verbosity == VERBOSITY_FULL:
+            row["raw"] = tx
+        formatted_transfers.append(row)
     
     # 构建摘要
     filter_text = ""
@@ -434,6 +573,20 @@ def format_transaction_history(
         f"地址 {address} 共有 {total} 笔交易记录{filter_text}，"
         f"当前显示最近 {len(formatted_transfers)} 笔。"
     )
+    if labels:
+        labeled = sum(1 for row in formatted_transfers if row["from_alias"] or row["to_alias"])
+        if labeled:
+            summary += f"其中 {labeled} 笔的对手方在地址簿中。"
+    if risk is not None:
+        risky = [
+            row for row in formatted_transfers
+            if row["counterparty_risk"] and row["counterparty_risk"]["is_risky"]
+        ]
+        if risky:
+            risky_parties = {row["counterparty"] for row in risky}
+            summary += f"⚠️ {len(risky)} 笔交易的对手方存在风险标记（共 {len(risky_parties)} 个地址）。"
+        else:
+            summary += "对手方均未发现风险标记。"
     
     return {
         "address": address,
@@ -450,6 +603,7 @@ def format_internal_transactions(
     internal_txs: list,
     total: int,
     limit: int = 20,
+    verbosity: str = VERBOSITY_STANDARD,
 ) -> dict:
     """
     格式化内部交易记录
@@ -461,6 +615,7 @@ def format_internal_transactions(
         internal_txs: 从 API 获取的内部交易记录列表
         total: 总交易数
         limit: 请求的返回条数
+        verbosity: 为 full 时每条记录附带上游原始记录（raw）
     
     Returns:
         格式化的内部交易结果
@@ -502,7 +657,7 @@ def format_internal_transactions(
         # 备注
         note = tx.get("note") or ""
         
-        formatted_txs.append({
+        row = {
             "txid": txid,
             "caller": caller_addr,
             "to": to_addr,
@@ -511,7 +666,10 @@ def format_internal_transactions(
             "timestamp": timestamp,
             "revert": revert,
             "note": note,
-        })
+        }
+        if verbosity == VERBOSITY_FULL:
+            row["raw"] = tx
+        formatted_txs.append(row)
     
     # 构建摘要
     summary = (
@@ -659,6 +817,22 @@ def format_addressbook_list(result: dict) -> dict:
     return {**result, "summary": summary}
 
 
+def format_addressbook_reverse_lookup(result: dict) -> dict:
+    """格式化地址簿反查结果"""
+    address = result["address"]
+    contacts = result.get("contacts", [])
+
+    if contacts:
+        names = "、".join(
+            f"「{c['alias']}」" + (f"（{c['note']}）" if c.get("note") else "")
+            for c in contacts
+        )
+        summary = f"📒 地址 {address} 在地址簿中的联系人：{names}。"
+    else:
+        summary = f"📒 地址簿中没有地址 {address} 的联系人。"
+    return {**result, "summary": summary}
+
+
 # ============ QR Code 格式化 ============
 
 def format_qrcode_result(result: dict) -> dict:
@@ -746,6 +920,43 @@ def format_account_bandwidth(result: dict) -> dict:
     return {**result, "summary": "\n".join(lines)}
 
 
+def format_transfer_plan(plan: dict) -> dict:
+    """格式化批量转账手续费与资源规划"""
+    sun = 1_000_000
+    totals = plan["totals"]
+    lines = [f"🧮 {plan['transfer_count']} 笔转账的资源规划（付款地址 {plan['from']}）："]
+    lines.append(
+        f"  需求: 能量 {plan['demand']['energy']:,}（可用 {plan['resources']['energy_available']:,}），"
+        f"带宽 {plan['demand']['bandwidth']:,} 字节"
+    )
+    for key, label in (("energy", "能量"), ("bandwidth", "带宽")):
+        choice = plan[key]
+        if choice["strategy"] == "none":
+            lines.append(f"  {label}: 现有资源足够，无需燃烧或租赁")
+        elif choice["strategy"] == "lease":
+            lines.append(
+                f"  {label}: 缺口 {choice['shortfall']:,}，租赁 {choice['lease_amount']:,}"
+                f"（约 {choice['lease_cost_sun'] / sun:.2f} TRX，比燃烧省 {choice['saved_sun'] / sun:.2f} TRX）"
+            )
+        else:
+            lines.append(f"  {label}: 缺口 {choice['shortfall']:,}，燃烧约 {choice['burn_cost_sun'] / sun:.2f} TRX")
+    lines.append(
+        f"  预计总费用: {totals['total_cost_trx']:.2f} TRX"
+        f"（燃烧 {totals['burn_sun'] / sun:.2f} + 租赁 {totals['lease_sun'] / sun:.2f}）"
+    )
+    if totals["saved_sun"] > 0:
+        lines.append(f"  💰 相比全部燃烧节省 {totals['saved_sun'] / sun:.2f} TRX")
+    lines.append(f"  执行顺序: 共 {len(plan['steps'])} 步，先租赁资源，再按带宽从大到小执行转账")
+    if plan["feasible"] is False:
+        lines.append(
+            f"  ⚠️ 余额不足: 需要 {plan['required']['trx']:.2f} TRX / {plan['required']['usdt']} USDT，"
+            f"当前 {plan['balances'].get('trx', 0)} TRX / {plan['balances'].get('usdt', 0)} USDT"
+        )
+    elif plan["feasible"] is None:
+        lines.append("  ⚠️ 无法查询付款地址余额，执行前请确认余额充足")
+    return {**plan, "summary": "\n".join(lines)}
+
+
 def format_lease_energy(result: dict) -> dict:
     """格式化能量租赁结果"""
     address = result.get("address", "")
@@ -802,3 +1013,240 @@ def format_lease_bandwidth(result: dict) -> dict:
     lines.append(f"  状态: {status}")
     
     return {**result, "summary": "\n".join(lines)}
+
+
+def format_lease_quote(result: dict) -> dict:
+    """格式化能量租赁报价（与燃烧 TRX 对比）"""
+    cache_note = "（缓存）" if result.get("cached") else ""
+    if result.get("energy_amount") is None:
+        services = result.get("services")
+        count = len(services) if isinstance(services, (list, dict)) else 0
+        return {**result, "summary": f"💱 TronZap 价格表{cache_note}：共 {count} 项服务，详见 services 字段。"}
+
+    lines = [f"💱 能量租赁报价{cache_note}："]
+    lines.append(f"  接收地址: {result['address']}")
+    lines.append(f"  能量数量: {result['energy_amount']:,}，租赁时长: {result['duration']} 小时")
+    cost_trx = result.get("cost_trx")
+    if cost_trx is not None:
+        lines.append(f"  租赁费用: {cost_trx} TRX")
+    burn_trx = result.get("burn_cost_trx")
+    if burn_trx is not None:
+        lines.append(f"  直接燃烧: 约 {burn_trx:.2f} TRX（{result['energy_price_sun']} SUN/Energy）")
+        if cost_trx is not None:
+            if cost_trx < burn_trx:
+                lines.append(f"  📌 租赁更划算，节省约 {burn_trx - cost_trx:.2f} TRX")
+            else:
+                lines.append("  📌 直接燃烧 TRX 更划算")
+    return {**result, "summary": "\n".join(lines)}
+
+
+# 指标摘要中最多展示的动作 / 上游接口数（按 p95 从慢到快）
+_METRICS_SUMMARY_TOP = 5
+
+
+def format_metrics(snapshot: dict) -> dict:
+    """格式化运行指标摘要"""
+    if not snapshot.get("enabled"):
+        return {**snapshot, "summary": "📈 指标采集未开启，设置环境变量 TRON_METRICS=1 后重启服务。"}
+
+    def slowest(entries: dict) -> list:
+        ranked = sorted(entries.items(), key=lambda item: item[1].get("p95_ms") or 0, reverse=True)
+        return ranked[:_METRICS_SUMMARY_TOP]
+
+    actions = snapshot.get("actions", {})
+    upstream = snapshot.get("upstream", {})
+    lines = [f"📈 运行指标：{len(actions)} 个动作，{len(upstream)} 个上游接口"]
+    if actions:
+        lines.append("最慢动作（p50 / p95 / p99 毫秒）：")
+        for name, entry in slowest(actions):
+            errors = sum(entry.get("errors", {}).values())
+            error_note = f"，错误 {errors} 次" if errors else ""
+            lines.append(
+                f"  {name}: {entry['p50_ms']} / {entry['p95_ms']} / {entry['p99_ms']}"
+                f"（{entry['count']} 次{error_note}）"
+            )
+    if upstream:
+        lines.append("最慢上游接口（p50 / p95 / p99 毫秒）：")
+        for name, entry in slowest(upstream):
+            error_note = f"，异常 {entry['errors']} 次" if entry.get("errors") else ""
+            lines.append(
+                f"  {name}: {entry['p50_ms']} / {entry['p95_ms']} / {entry['p99_ms']}"
+                f"（{entry['count']} 次{error_note}）"
+            )
+    return {**snapshot, "summary": "\n".join(lines)}
+
+
+# 诊断摘要中展示的热点函数数
+_DIAGNOSTICS_SUMMARY_TOP = 10
+
+
+def format_diagnostics(snapshot: dict, action: str = None) -> dict:
+    """格式化剖析热点函数与慢调用摘要"""
+    if not snapshot.get("enabled"):
+        return {
+            **snapshot,
+            "summary": (
+                "🩺 剖析与慢调用日志未开启，设置 TRON_PROFILE_ACTIONS / TRON_PROFILE_SAMPLE_PERCENT"
+                " 或 TRON_SLOW_CALL_MS 后重启服务。"
+            ),
+        }
+
+    config = snapshot.get("config", {})
+    scope = f"动作 {action}" if action else "全部动作"
+    profiled = snapshot.get("profiled_calls", {})
+    profiled_count = profiled.get(action, 0) if action else sum(profiled.values())
+    lines = [f"🩺 诊断（{scope}）：已剖析 {profiled_count} 次调用，慢调用 {snapshot.get('slow_calls_total', 0)} 次"]
+    if config.get("slow_call_ms"):
+        lines.append(f"慢调用阈值 {config['slow_call_ms']}ms，日志: {config.get('slow_call_log')}")
+
+    hot = snapshot.get("hot_functions", [])
+    if hot:
+        lines.append("热点函数（自身耗时 / 累计耗时 毫秒）：")
+        for entry in hot[:_DIAGNOSTICS_SUMMARY_TOP]:
+            lines.append(
+                f"  {entry['function']}: {entry['tottime_ms']} / {entry['cumtime_ms']}（{entry['calls']} 次）"
+            )
+    elif not profiled_count:
+        lines.append("尚无剖析数据（未命中 TRON_PROFILE_ACTIONS 或抽样）。")
+
+    recent = snapshot.get("recent_slow_calls", [])
+    if recent:
+        lines.append("最近慢调用（总耗时 / 上游耗时 毫秒）：")
+        for entry in reversed(recent[-5:]):
+            error_note = f"，{entry['error_type']}" if entry.get("error_type") else ""
+            lines.append(
+                f"  {entry['time']} {entry['action']}: {entry['duration_ms']} / {entry['upstream_ms']}"
+                f"（上游 {entry['upstream_count']} 次{error_note}）"
+            )
+    return {**snapshot, "summary": "\n".join(lines)}
+
+
+# HD 派生结果摘要中最多展示的地址数
+_HD_SUMMARY_PREVIEW = 5
+
+
+def format_hd_addresses(entries: list, account: int, total_indexed: int) -> dict:
+    """格式化 HD 批量派生结果"""
+    lines = [f"🔑 已为账户 {account} 派生 {len(entries)} 个充值地址："]
+    for entry in entries[:_HD_SUMMARY_PREVIEW]:
+        lines.append(f"  #{entry['index']} {entry['address']} ({entry['path']})")
+    if len(entries) > _HD_SUMMARY_PREVIEW:
+        lines.append(f"  ... 其余 {len(entries) - _HD_SUMMARY_PREVIEW} 个见 addresses 字段")
+    lines.append(f"HD 地址索引当前共 {total_indexed} 个地址。")
+    return {
+        "account": account,
+        "count": len(entries),
+        "addresses": entries,
+        "total_indexed": total_indexed,
+        "summary": "\n".join(lines),
+    }
+
+
+def format_hd_lookup(address: str, result: dict = None) -> dict:
+    """格式化 HD 地址反查结果"""
+    if result is None:
+        return {
+            "address": address,
+            "found": False,
+            "summary": f"🔑 地址 {address} 不在 HD 地址索引中（非本种子派生，或尚未派生）。",
+        }
+    return {
+        "address": address,
+        "found": True,
+        **result,
+        "summary": (
+            f"🔑 地址 {address} 由 HD 种子派生：路径 {result['path']}"
+            f"（账户 {result['account']}，序号 {result['index']}）。"
+        ),
+    }
+
+
+# ============ 响应视图（verbosity / fields）============
+
+def _minimal_transfer(row: dict, address: str) -> dict:
+    """交易历史精简行：只保留对手方与金额，省去重复的本方地址"""
+    from_addr, to_addr = row.get("from", ""), row.get("to", "")
+    counterparty = row.get("counterparty")
+    if counterparty is None:
+        counterparty = to_addr if from_addr == address else from_addr
+        if counterparty == address:
+            counterparty = ""
+    compact = {
+        "txid": row.get("txid"),
+        "direction": row.get("direction"),
+        "counterparty": counterparty,
+        "amount": row.get("amount"),
+        "token": row.get("token"),
+        "timestamp": row.get("timestamp"),
+    }
+    alias = row.get("to_alias") if counterparty == to_addr else row.get("from_alias")
+    if alias:
+        compact["alias"] = alias
+    risk = row.get("counterparty_risk")
+    if risk:
+        compact["risky"] = bool(risk.get("is_risky"))
+    return compact
+
+
+def _pick(*keys):
+    return lambda row, address: {k: row[k] for k in keys if k in row}
+
+
+# minimal 模式：动作 → (保留的顶层字段, {列表字段: 行投影})
+# summary / error 始终保留；未列出的动作 minimal 与 standard 相同
+_MINIMAL_VIEWS = {
+    "get_usdt_balance": (("address", "balance_usdt"), {}),
+    "get_balance": (("address", "balance_trx"), {}),
+    "get_transaction_status": (("txid", "status", "success", "confirmations", "amount", "token_type"), {}),
+    "get_account_status": (("address", "is_activated", "has_trx", "trx_balance"), {}),
+    "check_account_safety": (("address", "is_safe", "is_risky", "risk_type", "safety_status"), {}),
+    "check_account_safety_batch": (
+        ("counts", "verdicts", "risky_addresses"),
+        {"verdicts": _pick("address", "verdict")},
+    ),
+    "get_transaction_history": (
+        ("address", "total", "displayed", "transfers"),
+        {"transfers": _minimal_transfer},
+    ),
+    "get_internal_transactions": (
+        ("address", "total", "displayed", "internal_transactions"),
+        {"internal_transactions": _pick("txid", "to", "amount", "token", "timestamp", "revert")},
+    ),
+    "get_account_tokens": (
+        ("address", "token_count", "tokens"),
+        {"tokens": _pick("token_abbr", "token_type", "balance")},
+    ),
+}
+
+# 任何视图下都保留的字段
+_ALWAYS_KEPT = ("summary", "error")
+
+
+def apply_view(action: str, result: dict, verbosity: str = VERBOSITY_STANDARD, fields: list = None) -> dict:
+    """
+    按 verbosity / fields 裁剪动作结果，减少返回给模型的 token
+
+    - minimal：按 _MINIMAL_VIEWS 只保留判定字段，列表逐行精简
+    - standard / full：字段由格式化函数决定（full 的原始数据在处理函数中附加）
+    - fields：在上述结果上再只保留指定的顶层字段
+
+    错误结果原样返回。
+    """
+    if not isinstance(result, dict) or "error" in result:
+        return result
+    if verbosity == VERBOSITY_MINIMAL and action in _MINIMAL_VIEWS:
+        keep, rows = _MINIMAL_VIEWS[action]
+        address = result.get("address", "")
+        view = {}
+        for key in keep:
+            if key not in result:
+                continue
+            value = result[key]
+            if key in rows and isinstance(value, list):
+                value = [rows[key](row, address) for row in value]
+            view[key] = value
+        view.update((k, result[k]) for k in _ALWAYS_KEPT if k in result)
+        result = view
+    if fields:
+        result = {k: v for k, v in result.items() if k in fields or k in _ALWAYS_KEPT}
+    return result
@@ -0,0 +1,175 @@
+"""streamable-HTTP 传输 — 可配置主机 / 端口 / worker 数的 HTTP 服务
+
+MCP streamable-HTTP 传输在单个端点（/mcp）上收发 JSON-RPC，适合部署在反向代理之后，
+由多个客户端共享。本模块:
+
+- create_app(): 构建 ASGI 应用（uvicorn 工厂），附带 GET /metrics 与停机排空
+- run(): 用 uvicorn 启动，workers > 1 时每个 worker 是独立进程
+
+多 worker 时的共享状态:
+- MCP 会话改为无状态（stateless_http），任意 worker 都能处理同一客户端的后续请求
+- 地址簿（JSON / SQLite）、HD 地址索引通过跨进程文件锁读改写，见 interprocess
+- 同一付款钱包的能量补足跨进程串行
+- 运行指标、剖析数据、上游缓存仍按进程统计，GET /metrics 只反映处理该请求的 worker
+
+优雅停机: 每个 worker 收到 SIGTERM / SIGINT 时先调用 lifecycle.begin_drain()，之后到达的
+转账 / 广播 / 租赁请求返回 server_draining；随后 uvicorn 停止接收新连接，并等待进行中的
+请求完成（最长 MCP_DRAIN_TIMEOUT 秒）。lifespan.shutdown 阶段再确认进行中的写操作已结束后退出。
+
+配置:
+- MCP_HOST: 监听地址（默认 127.0.0.1；绑定其他地址时服务对网络可见，请自行加鉴权代理）
+- MCP_PORT: 监听端口（默认 8765）
+- MCP_WORKERS: worker 进程数（默认 1）
+- MCP_DRAIN_TIMEOUT: 停机时等待进行中写操作的最长时间（秒，默认 30）
+"""
+
+import os
+import asyncio
+import logging
+import functools
+
+from . import lifecycle
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_DRAIN_TIMEOUT = 30.0
+MCP_PATH = "/mcp"
+_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def _get_int(name: str, default: int, minimum: int = 1) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(minimum, int(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+
+
+def get_host() -> str:
+    return os.getenv("MCP_HOST", "").strip() or DEFAULT_HOST
+
+
+def get_port() -> int:
+    return _get_int("MCP_PORT", DEFAULT_PORT)
+
+
+def get_workers() -> int:
+    return _get_int("MCP_WORKERS", 1)
+
+
+def get_drain_timeout() -> float:
+    raw = os.getenv("MCP_DRAIN_TIMEOUT", "").strip()
+    if not raw:
+        return DEFAULT_DRAIN_TIMEOUT
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 MCP_DRAIN_TIMEOUT: {raw}，使用默认值 {DEFAULT_DRAIN_TIMEOUT}")
+        return DEFAULT_DRAIN_TIMEOUT
+
+
+def drain_app(app, timeout: float):
+    """
+    包装 ASGI 应用: lifespan.shutdown 到达时先排空进行中的写操作，再交给原应用关闭
+
+    正常停机时排空已在收到信号时开始（见 _serve）；这里兜底等待仍未结束的写操作。
+
+    不依赖 starlette，可包装任意 ASGI 应用。
+    """
+
+    async def wrapped(scope, receive, send):
+        if scope.get("type") != "lifespan":
+            await app(scope, receive, send)
+            return
+
+        async def drained_receive():
+            message = await receive()
+            if message.get("type") == "lifespan.shutdown":
+                lifecycle.begin_drain()
+                pending = lifecycle.in_flight()
+                if pending:
+                    logger.info(f"停机排空: 等待 {pending} 个进行中的写操作（最长 {timeout}s）")
+                loop = asyncio.get_running_loop()
+                if not await loop.run_in_executor(None, lifecycle.wait_idle, timeout):
+                    logger.warning(f"停机排空超时，仍有 {lifecycle.in_flight()} 个写操作未完成")
+            return message
+
+        await app(scope, drained_receive, send)
+
+    return wrapped
+
+
+def create_app():
+    """构建 streamable-HTTP ASGI 应用（uvicorn factory，每个 worker 进程调用一次）"""
+    from .server import mcp
+
+    if get_workers() > 1:
+        # 多 worker 时同一客户端的请求可能落到不同进程，不能依赖进程内会话
+        mcp.settings.stateless_http = True
+    mcp.settings.streamable_http_path = MCP_PATH
+    return metrics.asgi_app(drain_app(mcp.streamable_http_app(), get_drain_timeout()))
+
+
+def _serve(config, sockets=None) -> None:
+    """
+    在当前进程运行 uvicorn Server（单 worker 直接调用，多 worker 时为每个子进程的入口）
+
+    收到停机信号时先进入排空再交给 uvicorn：uvicorn 停止接收连接并等待进行中的请求期间，
+    已建立连接上的新写请求会被拒绝，而不是在排空开始前被执行。
+    """
+    import uvicorn
+
+    server = uvicorn.Server(config)
+    handle_exit = server.handle_exit
+
+    def drain_then_exit(sig, frame):
+        lifecycle.begin_drain()
+        handle_exit(sig, frame)
+
+    server.handle_exit = drain_then_exit
+    server.run(sockets=sockets)
+
+
+def run(host=None, port=None, workers=None) -> None:
+    """
+    启动 streamable-HTTP 服务（参数为空时读取 MCP_HOST / MCP_PORT / MCP_WORKERS）
+
+    Raises:
+        ImportError: 未安装 uvicorn
+    """
+    import uvicorn
+
+    host = host or get_host()
+    port = port or get_port()
+    workers = workers or get_workers()
+    # worker 进程重新读取环境变量构建应用，命令行参数需经环境变量传递
+    os.environ["MCP_WORKERS"] = str(workers)
+
+    if host not in _LOOPBACK_HOSTS:
+        logger.warning(f"MCP 服务绑定在 {host}，对网络可见；转账等工具无鉴权，请置于鉴权代理之后")
+    print(f"🚀 TRON MCP Server (streamable-HTTP) 启动在 http://{host}:{port}{MCP_PATH}（{workers} 个 worker）")
+    if metrics.enabled():
+        print(f"📈 指标: http://{host}:{port}/metrics（按 worker 统计）")
+    config = uvicorn.Config(
+        "tron_mcp_server.http_transport:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=get_drain_timeout(),
+        log_level="info",
+    )
+    if workers > 1:
+        from uvicorn.supervisors import Multiprocess
+
+        # 与 uvicorn.run 相同的多进程启动方式，子进程入口换成带排空的 _serve
+        sock = config.bind_socket()
+        Multiprocess(config, target=functools.partial(_serve, config), sockets=[sock]).run()
+    else:
+        _serve(config)
@@ -0,0 +1,125 @@
+"""跨进程文件锁 — 多 worker 部署时保护共享的本地状态
+
+streamable-HTTP 多 worker 模式下，每个 worker 是独立进程，进程内的 threading.Lock
+无法阻止两个 worker 同时读改写同一个文件（JSON 地址簿、HD 地址索引），
+也无法阻止同一付款钱包被两个 worker 同时补足能量。本模块提供基于锁文件的互斥:
+
+- POSIX: fcntl.flock（进程退出时内核自动释放，不会残留死锁）
+- Windows: msvcrt.locking
+- 两者都不可用时退化为空操作（仅单进程安全）
+
+锁文件内容记录最近一次 mark() 的时间戳，持锁方可据此判断其他进程是否刚修改过
+共享状态（例如其他 worker 刚为同一钱包租赁了能量），从而让本进程缓存失效。
+
+配置:
+- TRON_LOCK_DIR: 锁文件目录（默认 ~/.tron_mcp/locks；锁文件不放在数据文件旁，
+  避免污染地址簿等数据目录）
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_DIR = Path.home() / ".tron_mcp" / "locks"
+
+
+def _get_lock_dir() -> Path:
+    custom_dir = os.getenv("TRON_LOCK_DIR", "").strip()
+    return Path(custom_dir).expanduser() if custom_dir else DEFAULT_LOCK_DIR
+
+
+def lock_path_for(name: str) -> Path:
+    """按名称（如 "energy-T..."）得到锁文件路径"""
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    return _get_lock_dir() / f"{safe_name}.lock"
+
+
+def lock_path_for_file(path) -> Path:
+    """保护某个数据文件的锁文件路径（按文件绝对路径区分，同一文件在各进程得到同一把锁）"""
+    resolved = Path(path).expanduser().resolve()
+    digest = hashlib.sha1(str(resolved).encode("utf-8")).hexdigest()[:16]
+    return lock_path_for(f"{resolved.name}-{digest}")
+
+
+class FileLock:
+    """
+    基于锁文件的跨进程互斥锁（不可重入；同一进程内的线程互斥请另用 threading.Lock）
+
+    用法:
+        with interprocess.FileLock(interprocess.lock_path_for_file(path)):
+            ...  # 读改写共享文件
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK 约 10 秒后放弃，继续等待
+                        continue
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def last_mark(self) -> float:
+        """最近一次 mark() 的时间戳（秒，从未 mark 时为 0；需持有锁）"""
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        raw = os.read(self._fd, 64).decode("ascii", errors="ignore").strip()
+        try:
+            return float(raw) if raw else 0.0
+        except ValueError:
+            return 0.0
+
+    def mark(self) -> None:
+        """记录共享状态刚被本进程修改（需持有锁）"""
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.ftruncate(self._fd, 0)
+        os.write(self._fd, f"{time.time():.6f}".encode("ascii"))
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.release()
+        return False
@@ -8,12 +8,20 @@
 """
 
 import os
+import hashlib
+import hmac
+import json
 import logging
-from typing import Optional
+import threading
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional
 
-import ecdsa
 import base58
-from Crypto.Hash import keccak as _keccak_mod
+
+# ecdsa / pycryptodome 为纯 Python 或带 C 扩展的重依赖，
+# 仅在真正派生地址或签名时才导入，以缩短 server 冷启动时间
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +30,8 @@ logger = logging.getLogger(__name__)
 
 def _keccak256(data: bytes) -> bytes:
     """计算 Keccak-256 哈希"""
+    from Crypto.Hash import keccak as _keccak_mod
+
     k = _keccak_mod.new(digest_bits=256)
     k.update(data)
     return k.digest()
@@ -39,7 +49,12 @@ def load_private_key() -> str:
     Raises:
         ValueError: 未配置私钥或格式无效
     """
-    pk = os.getenv("TRON_PRIVATE_KEY", "").strip()
+    return _parse_private_key(os.getenv("TRON_PRIVATE_KEY", ""))
+
+
+def _parse_private_key(raw: str) -> str:
+    """校验并规范化私钥字符串（去空白、去 0x 前缀）"""
+    pk = raw.strip()
     if not pk:
         raise ValueError(
             "未配置私钥，请设置环境变量 TRON_PRIVATE_KEY（64 位十六进制，不带 0x 前缀）"
@@ -62,31 +77,47 @@ def load_private_key() -> str:
     return pk
 
 
-def get_address_from_private_key(private_key_hex: str) -> str:
+# ============ 派生结果缓存 ============
+
+class _KeyMaterial(NamedTuple):
+    """由私钥派生出的全部签名材料"""
+
+    signing_key: object     # ecdsa.SigningKey
+    public_key: bytes       # 未压缩公钥 x + y (64 bytes)
+    address: str            # TRON 地址 (Base58Check)
+
+
+# 同一进程内通常只有一个（或少量）私钥，缓存其派生结果，
+# 避免每次请求都在纯 Python ecdsa 中重复做 EC 点乘和 Keccak 哈希
+_KEY_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=_KEY_CACHE_SIZE)
+def _derive_key_material(private_key_hex: str) -> _KeyMaterial:
     """
-    从私钥派生 TRON 地址 (Base58Check 格式)
+    从私钥派生 SigningKey、公钥和 TRON 地址（结果按私钥缓存）
 
     流程:
     1. 私钥 → secp256k1 公钥 (未压缩 64 bytes)
     2. 公钥 → Keccak256
     3. 取哈希后 20 bytes 加 0x41 前缀 (TRON 主网)
     4. Base58Check 编码
-
-    Args:
-        private_key_hex: 64 位十六进制私钥字符串
-
-    Returns:
-        TRON 地址 (Base58Check 格式, T 开头 34 字符)
     """
+    import ecdsa
+
     # 1. 私钥 → 公钥
     sk = ecdsa.SigningKey.from_string(
         bytes.fromhex(private_key_hex),
         curve=ecdsa.SECP256k1,
     )
-    vk = sk.get_verifying_key()
     # vk.to_string() 返回 64 bytes (x + y, 不含 04 前缀)
-    pub_key_bytes = vk.to_string()
+    pub_key_bytes = sk.get_verifying_key().to_string()
+
+    return _KeyMaterial(sk, pub_key_bytes, _address_from_public_key(pub_key_bytes))
 
+
+def _address_from_public_key(pub_key_bytes: bytes) -> str:
+    """未压缩公钥 (x + y, 64 bytes) → TRON 地址 (Base58Check)"""
     # 2. Keccak256 哈希
     addr_hash = _keccak256(pub_key_bytes)
 
@@ -97,6 +128,21 @@ def get_address_from_private_key(private_key_hex: str) -> str:
     return base58.b58encode_check(addr_bytes).decode("utf-8")
 
 
+def get_address_from_private_key(private_key_hex: str) -> str:
+    """
+    从私钥派生 TRON 地址 (Base58Check 格式)
+
+    派生结果按私钥缓存，重复调用几乎无开销。
+
+    Args:
+        private_key_hex: 64 位十六进制私钥字符串
+
+    Returns:
+        TRON 地址 (Base58Check 格式, T 开头 34 字符)
+    """
+    return _derive_key_material(private_key_hex).address
+
+
 def sign_transaction(tx_id_hex: str, private_key_hex: str) -> str:
     """
     对交易 ID 进行 ECDSA secp256k1 签名
@@ -110,38 +156,116 @@ def sign_transaction(tx_id_hex: str, private_key_hex: str) -> str:
     Returns:
         签名的十六进制字符串 (130 字符 = 65 bytes)
     """
-    sk = ecdsa.SigningKey.from_string(
-        bytes.fromhex(private_key_hex),
-        curve=ecdsa.SECP256k1,
-    )
-    vk = sk.get_verifying_key()
+    return _sign_digest(_derive_key_material(private_key_hex), tx_id_hex)
+
+
+def _sign_digest(material: _KeyMaterial, tx_id_hex: str, backend: Optional[str] = None) -> str:
+    """使用已缓存的派生材料对交易 ID 签名，返回 65 bytes 签名的十六进制"""
     tx_id_bytes = bytes.fromhex(tx_id_hex)
+    if (backend or _get_signing_backend()) == "coincurve":
+        signature = _sign_digest_coincurve(material, tx_id_bytes)
+    else:
+        signature = _sign_digest_ecdsa(material, tx_id_bytes)
+    return signature.hex()
 
-    # 使用 RFC 6979 确定性签名（防止随机数泄露私钥）
-    signature = sk.sign_digest_deterministic(
-        tx_id_bytes,
-        sigencode=ecdsa.util.sigencode_string,
-    )
 
-    # 确定 recovery_id (v)
-    # 尝试 recovery_id = 0 和 1, 找到能恢复出原始公钥的那个
-    recovery_id = 0
+# ============ 签名后端 ============
+
+# 签名后端: auto（默认，已安装 coincurve 时使用 libsecp256k1）/ ecdsa / coincurve
+SIGNING_BACKEND_ENV = "TRON_SIGNING_BACKEND"
+
+
+@lru_cache(maxsize=1)
+def _coincurve_available() -> bool:
     try:
-        recovered_keys = ecdsa.VerifyingKey.from_public_key_recovery_with_digest(
-            signature,
-            tx_id_bytes,
-            curve=ecdsa.SECP256k1,
-        )
-        for i, recovered_vk in enumerate(recovered_keys):
-            if recovered_vk.to_string() == vk.to_string():
-                recovery_id = i
-                break
-    except Exception as e:
-        logger.warning(f"recovery_id 推导失败，使用默认值 0: {e}")
+        import coincurve  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _get_signing_backend() -> str:
+    """
+    解析当前签名后端
+
+    Raises:
+        ValueError: 后端名称无效，或指定 coincurve 但未安装
+    """
+    backend = os.getenv(SIGNING_BACKEND_ENV, "auto").strip().lower() or "auto"
+    if backend == "auto":
+        return "coincurve" if _coincurve_available() else "ecdsa"
+    if backend == "coincurve" and not _coincurve_available():
+        raise ValueError("签名后端 coincurve 未安装，请执行 pip install coincurve 或改用 ecdsa")
+    if backend not in ("ecdsa", "coincurve"):
+        raise ValueError(f"不支持的签名后端: {backend}（可选 auto / ecdsa / coincurve）")
+    return backend
+
+
+def _sign_digest_ecdsa(material: _KeyMaterial, digest: bytes) -> bytes:
+    """
+    纯 Python ecdsa 签名，签名过程中直接得出 recovery_id
+
+    与 libsecp256k1 一致：RFC 6979 nonce 使用 HMAC-SHA256，s 规范化为 low-s，
+    因此与 coincurve 后端输出逐字节相同。保留了 nonce 点 R = k·G：recovery_id 由
+    R.y 的奇偶性及 R.x 是否 ≥ n 决定，无需再做两次公钥恢复（两次 EC 点乘）。
+    """
+    from ecdsa import SECP256k1, rfc6979
+    from ecdsa.numbertheory import inverse_mod
+
+    sk = material.signing_key
+    if len(digest) > SECP256k1.baselen:
+        raise ValueError(f"交易 ID 长度无效: 期望不超过 32 bytes，实际 {len(digest)} bytes")
+
+    generator = SECP256k1.generator
+    n = generator.order()
+    secexp = sk.privkey.secret_multiplier
+    z = int.from_bytes(digest, "big")
+
+    # 使用 RFC 6979 确定性签名（防止随机数泄露私钥）
+    retry_gen = 0
+    while True:
+        k = rfc6979.generate_k(n, secexp, hashlib.sha256, digest, retry_gen=retry_gen)
+        # 固定 nonce 位长，避免通过耗时泄露 k（与 ecdsa 库的实现一致）
+        ks = k + n
+        point = (ks + n if ks.bit_length() == n.bit_length() else ks) * generator
+        x, y = point.x(), point.y()
+        r = x % n
+        s = inverse_mod(k, n) * (z + (secexp * r) % n) % n
+        if r and s:
+            break
+        retry_gen += 1
+
+    # recovery_id (v): bit0 = R.y 奇偶, bit1 = R.x 是否溢出曲线阶 n
+    recovery_id = (y & 1) | (2 if x >= n else 0)
+
+    # low-s 规范化：s 取 n - s 等价于 nonce 点取反，R.y 奇偶随之翻转
+    if s > n // 2:
+        s = n - s
+        recovery_id ^= 1
 
     # TRON 签名: r(32) + s(32) + recovery_id(1)
-    full_signature = signature + bytes([recovery_id])
-    return full_signature.hex()
+    return r.to_bytes(32, "big") + s.to_bytes(32, "big") + bytes([recovery_id])
+
+
+@lru_cache(maxsize=_KEY_CACHE_SIZE)
+def _coincurve_key(secret: bytes):
+    """按私钥缓存 coincurve.PrivateKey"""
+    import coincurve
+
+    return coincurve.PrivateKey(secret)
+
+
+def _sign_digest_coincurve(material: _KeyMaterial, digest: bytes) -> bytes:
+    """
+    libsecp256k1 (coincurve) 可恢复签名
+
+    同样是 RFC 6979 确定性签名（HMAC-SHA256 nonce，low-s 规范化），
+    输出格式即 r(32) + s(32) + recovery_id(1)。
+    """
+    if len(digest) != 32:
+        raise ValueError(f"交易 ID 长度无效: 期望 32 bytes，实际 {len(digest)} bytes")
+    key = _coincurve_key(material.signing_key.to_string())
+    return key.sign_recoverable(digest, hasher=None)
 
 
 def get_configured_address() -> Optional[str]:
@@ -151,11 +275,7 @@ def get_configured_address() -> Optional[str]:
     Returns:
         TRON 地址 (Base58Check), 未配置私钥则返回 None
     """
-    try:
-        pk = load_private_key()
-        return get_address_from_private_key(pk)
-    except ValueError:
-        return None
+    return _default_key_manager.get_address()
 
 
 def verify_address_ownership(address: str) -> bool:
@@ -174,19 +294,511 @@ def verify_address_ownership(address: str) -> bool:
     return configured == address
 
 
+# ============ 批量签名 ============
+
+# 少于该笔数时直接在当前进程签名（进程池启动开销高于并行收益）
+BATCH_SIGN_MIN_PARALLEL = 16
+
+# 工作进程内的派生材料与签名后端，由进程池 initializer 在启动时设置一次
+_worker_material: Optional[_KeyMaterial] = None
+_worker_backend: Optional[str] = None
+
+
+def _init_sign_worker(private_key_hex: str, backend: str) -> None:
+    """进程池 initializer：每个工作进程启动时接收一次私钥并完成派生"""
+    global _worker_material, _worker_backend
+    _worker_material = _derive_key_material(private_key_hex)
+    _worker_backend = backend
+
+
+def _sign_in_worker(tx_id_hex: str) -> str:
+    """工作进程任务：只接收交易 ID，返回签名十六进制"""
+    return _sign_digest(_worker_material, tx_id_hex, _worker_backend)
+
+
+def _validate_unsigned_tx(tx_dict: dict, index: int) -> str:
+    """校验未签名交易结构，返回 txID"""
+    if "txID" not in tx_dict:
+        raise ValueError(f"第 {index + 1} 笔交易缺少 txID 字段")
+    if "raw_data" not in tx_dict:
+        raise ValueError(f"第 {index + 1} 笔交易缺少 raw_data 字段")
+    return tx_dict["txID"]
+
+
+def sign_transactions_batch(
+    tx_dicts: List[dict],
+    private_key_hex: str,
+    max_workers: Optional[int] = None,
+) -> List[dict]:
+    """
+    批量签名未签名交易，多笔时分发到进程池并行签名
+
+    纯 Python ECDSA 受 GIL 限制，线程无法并行；这里使用 ProcessPoolExecutor：
+    - 私钥仅通过 initializer 在工作进程启动时传递一次，任务只携带 txID
+    - RFC 6979 确定性签名与单笔签名结果逐字节一致
+    - 返回结果与输入顺序一致
+
+    Args:
+        tx_dicts: 未签名交易列表（需包含 txID 与 raw_data）
+        private_key_hex: 64 字符十六进制私钥
+        max_workers: 最大工作进程数，默认 os.cpu_count()
+
+    Returns:
+        已签名交易列表（与输入一一对应）
+
+    Raises:
+        ValueError: 交易结构无效、私钥无效或签名后端不可用
+    """
+    # 先在主进程完成所有校验，避免进程池启动后才失败
+    tx_ids = [_validate_unsigned_tx(tx, i) for i, tx in enumerate(tx_dicts)]
+    # 规范化后的私钥（去空白 / 0x 前缀）同时用于主进程与工作进程
+    private_key_hex = _parse_private_key(private_key_hex)
+    material = _derive_key_material(private_key_hex)
+    backend = _get_signing_backend()
+
+    workers = min(max_workers or os.cpu_count() or 1, len(tx_ids))
+    if workers <= 1 or len(tx_ids) < BATCH_SIGN_MIN_PARALLEL:
+        signatures = [_sign_digest(material, tx_id, backend) for tx_id in tx_ids]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # 每个工作进程分到若干连续批次，减少进程间通信次数
+        chunksize = max(1, len(tx_ids) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_sign_worker,
+            initargs=(private_key_hex, backend),
+        ) as executor:
+            signatures = list(executor.map(_sign_in_worker, tx_ids, chunksize=chunksize))
+
+    signed_list = []
+    for tx, sig in zip(tx_dicts, signatures):
+        signed = dict(tx)
+        signed["signature"] = [sig]
+        signed_list.append(signed)
+    return signed_list
+
+
+# ============ HD 钱包 (BIP32 / BIP44) ============
+#
+# 为每个客户生成独立充值地址：路径 m/44'/195'/account'/change/index（195 为 TRON coin_type）。
+# 种子来自环境变量 TRON_HD_SEED（十六进制）或 TRON_MNEMONIC（BIP39 助记词），
+# 与单私钥一样只在本地使用；派生出的地址及路径（不含私钥）持久化到索引文件，
+# 充值归属通过 地址 → 路径 的字典做 O(1) 反查。
+
+TRON_BIP44_PREFIX = "m/44'/195'"
+HD_HARDENED = 0x80000000
+
+# secp256k1 曲线阶 n
+_SECP256K1_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# 单次批量派生的地址数量上限
+HD_MAX_BATCH = 10000
+
+HD_INDEX_VERSION = 1
+
+
+def mnemonic_to_seed(mnemonic: str, passphrase: str = "") -> bytes:
+    """
+    BIP39 助记词 → 64 bytes 种子（PBKDF2-HMAC-SHA512, 2048 轮）
+
+    注意：不校验助记词单词表与校验和，请确保助记词由标准钱包生成。
+    """
+    words = " ".join(unicodedata.normalize("NFKD", mnemonic).split())
+    salt = "mnemonic" + unicodedata.normalize("NFKD", passphrase)
+    return hashlib.pbkdf2_hmac("sha512", words.encode("utf-8"), salt.encode("utf-8"), 2048)
+
+
+def load_hd_seed() -> bytes:
+    """
+    从环境变量加载 HD 种子
+
+    优先使用 TRON_HD_SEED（16~64 bytes 十六进制），否则使用
+    TRON_MNEMONIC（可选 TRON_MNEMONIC_PASSPHRASE）。
+
+    Raises:
+        ValueError: 未配置种子或格式无效
+    """
+    raw_seed = os.getenv("TRON_HD_SEED", "").strip()
+    if raw_seed:
+        if raw_seed.startswith(("0x", "0X")):
+            raw_seed = raw_seed[2:]
+        try:
+            seed = bytes.fromhex(raw_seed)
+        except ValueError:
+            raise ValueError("TRON_HD_SEED 包含非法字符，应为纯十六进制字符")
+        if not 16 <= len(seed) <= 64:
+            raise ValueError(f"TRON_HD_SEED 长度无效: 期望 16~64 bytes，实际 {len(seed)} bytes")
+        return seed
+
+    mnemonic = os.getenv("TRON_MNEMONIC", "").strip()
+    if mnemonic:
+        return mnemonic_to_seed(mnemonic, os.getenv("TRON_MNEMONIC_PASSPHRASE", ""))
+
+    raise ValueError("未配置 HD 种子，请设置环境变量 TRON_HD_SEED 或 TRON_MNEMONIC")
+
+
+def parse_derivation_path(path: str) -> tuple:
+    """
+    解析派生路径，如 "m/44'/195'/0'/0/5" → (44 | H, 195 | H, 0 | H, 0, 5)
+
+    Raises:
+        ValueError: 路径格式无效
+    """
+    parts = path.strip().split("/")
+    if not parts or parts[0] != "m":
+        raise ValueError(f"派生路径无效（应以 m 开头）: {path}")
+    indexes = []
+    for part in parts[1:]:
+        hardened = part.endswith(("'", "h", "H"))
+        number = part[:-1] if hardened else part
+        if not number.isdigit() or int(number) >= HD_HARDENED:
+            raise ValueError(f"派生路径无效: {path}")
+        indexes.append(int(number) | (HD_HARDENED if hardened else 0))
+    return tuple(indexes)
+
+
+def format_derivation_path(indexes: tuple) -> str:
+    """(44 | H, 195 | H, 0 | H, 0, 5) → "m/44'/195'/0'/0/5" """
+    return "/".join(["m"] + [
+        f"{i - HD_HARDENED}'" if i >= HD_HARDENED else str(i) for i in indexes
+    ])
+
+
+def tron_bip44_path(account: int = 0, index: int = 0, change: int = 0) -> str:
+    """TRON BIP44 路径 m/44'/195'/account'/change/index"""
+    return f"{TRON_BIP44_PREFIX}/{account}'/{change}/{index}"
+
+
+def _public_key_from_secret(secret: int) -> bytes:
+    """私钥标量 → 未压缩公钥 x + y (64 bytes)，已安装 coincurve 时使用 libsecp256k1"""
+    if _coincurve_available():
+        import coincurve
+
+        return coincurve.PublicKey.from_secret(secret.to_bytes(32, "big")).format(compressed=False)[1:]
+
+    from ecdsa import SECP256k1
+
+    point = SECP256k1.generator * secret
+    return point.x().to_bytes(32, "big") + point.y().to_bytes(32, "big")
+
+
+class _HDNode(NamedTuple):
+    """BIP32 扩展私钥节点"""
+
+    secret: int
+    chain_code: bytes
+    public_key: bytes       # 未压缩公钥 x + y (64 bytes)
+
+    def compressed_public_key(self) -> bytes:
+        return bytes([2 + (self.public_key[-1] & 1)]) + self.public_key[:32]
+
+
+def _hd_node(secret: int, chain_code: bytes) -> _HDNode:
+    if not 0 < secret < _SECP256K1_ORDER:
+        # 概率低于 2^-127，BIP32 规定跳过该索引
+        raise ValueError("派生出无效私钥，请跳过该索引")
+    return _HDNode(secret, chain_code, _public_key_from_secret(secret))
+
+
+def _ckd_priv(parent: _HDNode, index: int) -> _HDNode:
+    """BIP32 CKDpriv：父扩展私钥 → 子扩展私钥"""
+    if index >= HD_HARDENED:
+        data = b"\x00" + parent.secret.to_bytes(32, "big")
+    else:
+        data = parent.compressed_public_key()
+    digest = hmac.new(parent.chain_code, data + index.to_bytes(4, "big"), hashlib.sha512).digest()
+    tweak = int.from_bytes(digest[:32], "big")
+    if tweak >= _SECP256K1_ORDER:
+        raise ValueError("派生出无效私钥，请跳过该索引")
+    return _hd_node((tweak + parent.secret) % _SECP256K1_ORDER, digest[32:])
+
+
+class HDKeyDeriver:
+    """
+    BIP32 分层确定性派生器
+
+    缓存中间节点（如 m/44'/195'/0'/0），批量派生时每个地址只需一次 HMAC-SHA512
+    与一次 EC 点乘，不必从主节点逐级重算。
+    """
+
+    def __init__(self, seed: bytes):
+        digest = hmac.new(b"Bitcoin seed", seed, hashlib.sha512).digest()
+        self._master = _hd_node(int.from_bytes(digest[:32], "big"), digest[32:])
+        self._nodes = {(): self._master}
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self) -> str:
+        """种子指纹（主公钥 SHA-256 前 8 位十六进制），用于识别索引文件归属"""
+        return hashlib.sha256(self._master.compressed_public_key()).hexdigest()[:8]
+
+    def _node(self, indexes: tuple, cache: bool = True) -> _HDNode:
+        """派生节点：从最深的已缓存祖先开始逐级派生，可选缓存结果"""
+        with self._lock:
+            depth = len(indexes)
+            while indexes[:depth] not in self._nodes:
+                depth -= 1
+            node = self._nodes[indexes[:depth]]
+            for i in range(depth, len(indexes)):
+                node = _ckd_priv(node, indexes[i])
+                if cache or i < len(indexes) - 1:
+                    self._nodes[indexes[:i + 1]] = node
+            return node
+
+    def derive_private_key(self, path: str) -> str:
+        """派生指定路径的私钥（64 位十六进制）"""
+        return f"{self._node(parse_derivation_path(path), cache=False).secret:064x}"
+
+    def derive_address(self, path: str) -> str:
+        """派生指定路径的 TRON 地址"""
+        return _address_from_public_key(self._node(parse_derivation_path(path), cache=False).public_key)
+
+    def derive_addresses(self, account: int, start: int, count: int, change: int = 0) -> List[dict]:
+        """
+        批量派生 m/44'/195'/account'/change/start ... start+count-1
+
+        Returns:
+            [{"index", "path", "address"}, ...]
+        """
+        parent_path = parse_derivation_path(f"{TRON_BIP44_PREFIX}/{account}'/{change}")
+        parent = self._node(parent_path)
+        results = []
+        for index in range(start, start + count):
+            child = _ckd_priv(parent, index)
+            results.append({
+                "index": index,
+                "path": tron_bip44_path(account, index, change),
+                "address": _address_from_public_key(child.public_key),
+            })
+        return results
+
+
+def _get_hd_index_path():
+    """获取 HD 地址索引文件路径（TRON_HD_INDEX_PATH 或 ~/.tron_mcp/hd_index.json）"""
+    custom_path = os.getenv("TRON_HD_INDEX_PATH")
+    if custom_path:
+        return Path(custom_path)
+    return Path.home() / ".tron_mcp" / "hd_index.json"
+
+
+class HDAddressIndex:
+    """
+    已派生地址的持久化索引（地址 → 派生路径，以及每个账户的下一个地址序号）
+
+    索引文件只保存地址与路径，不保存任何私钥；文件记录种子指纹，
+    防止不同种子的索引互相混用。写入采用 临时文件 + rename，崩溃时不会损坏原文件。
+    多个进程共享同一索引文件时，refresh() 在文件被其他进程更新后重新加载。
+    """
+
+    def __init__(self, path, seed_fingerprint: str):
+        self.path = path
+        self.seed_fingerprint = seed_fingerprint
+        self._addresses: dict = {}
+        self._next_index: dict = {}
+        self._signature: Optional[tuple] = None
+        self._load()
+
+    def _stat_signature(self) -> Optional[tuple]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def refresh(self) -> None:
+        """索引文件被其他进程更新时重新加载"""
+        if self._stat_signature() != self._signature:
+            self._load()
+
+    def _load(self) -> None:
+        self._signature = self._stat_signature()
+        if self._signature is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"无法读取 HD 地址索引 {self.path}: {e}")
+        if data.get("seed_fingerprint") != self.seed_fingerprint:
+            raise ValueError(
+                f"HD 地址索引 {self.path} 属于另一个种子（指纹 {data.get('seed_fingerprint')}），"
+                f"请通过 TRON_HD_INDEX_PATH 指定其他索引文件"
+            )
+        self._addresses = data.get("addresses", {})
+        self._next_index = {int(k): v for k, v in data.get("next_index", {}).items()}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": HD_INDEX_VERSION,
+            "seed_fingerprint": self.seed_fingerprint,
+            "next_index": {str(k): v for k, v in sorted(self._next_index.items())},
+            "addresses": self._addresses,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._signature = self._stat_signature()
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    def lookup(self, address: str) -> Optional[str]:
+        """地址 → 派生路径（O(1)），未派生过返回 None"""
+        return self._addresses.get(address)
+
+    def next_index(self, account: int) -> int:
+        return self._next_index.get(account, 0)
+
+    def record(self, account: int, entries: List[dict]) -> None:
+        """记录一批已派生地址并推进该账户的下一个序号（需调用 save 持久化）"""
+        for entry in entries:
+            self._addresses[entry["address"]] = entry["path"]
+        if entries:
+            last = max(entry["index"] for entry in entries) + 1
+            self._next_index[account] = max(self.next_index(account), last)
+
+
+class HDWallet:
+    """HD 派生器 + 持久化地址索引"""
+
+    def __init__(self, seed: bytes, index_path=None):
+        self.deriver = HDKeyDeriver(seed)
+        self.index = HDAddressIndex(index_path or _get_hd_index_path(), self.deriver.fingerprint)
+        self._lock = threading.Lock()
+
+    def derive_next(self, count: int = 1, account: int = 0) -> List[dict]:
+        """
+        为指定账户派生接下来的 count 个地址，写入索引并返回
+
+        Raises:
+            ValueError: 数量或账户序号无效
+        """
+        if not 1 <= count <= HD_MAX_BATCH:
+            raise ValueError(f"派生数量无效: 应为 1~{HD_MAX_BATCH}，实际 {count}")
+        if not 0 <= account < HD_HARDENED:
+            raise ValueError(f"账户序号无效: {account}")
+        from . import interprocess
+
+        # 多 worker 进程共享索引文件：持跨进程锁并重新加载后再分配序号，避免重复派生
+        lock_path = interprocess.lock_path_for_file(self.index.path)
+        with self._lock, interprocess.FileLock(lock_path):
+            self.index.refresh()
+            start = self.index.next_index(account)
+            entries = self.deriver.derive_addresses(account, start, count)
+            self.index.record(account, entries)
+            self.index.save()
+        return entries
+
+    def lookup(self, address: str) -> Optional[dict]:
+        """
+        反查充值地址的派生路径
+
+        Returns:
+            {"path", "account", "change", "index"}，不是本种子派生的地址返回 None
+        """
+        path = self.index.lookup(address)
+        if path is None:
+            # 可能由其他 worker 进程刚派生
+            with self._lock:
+                self.index.refresh()
+                path = self.index.lookup(address)
+        if path is None:
+            return None
+        indexes = parse_derivation_path(path)
+        return {
+            "path": path,
+            "account": indexes[2] - HD_HARDENED,
+            "change": indexes[3],
+            "index": indexes[4],
+        }
+
+
+_hd_wallet: Optional[HDWallet] = None
+_hd_wallet_key: Optional[tuple] = None
+_hd_wallet_lock = threading.Lock()
+
+
+def get_hd_wallet() -> HDWallet:
+    """
+    获取全局 HD 钱包（种子或索引路径变化时重新加载）
+
+    Raises:
+        ValueError: 未配置种子、种子无效或索引文件属于其他种子
+    """
+    global _hd_wallet, _hd_wallet_key
+    key = (
+        os.getenv("TRON_HD_SEED", ""),
+        os.getenv("TRON_MNEMONIC", ""),
+        os.getenv("TRON_MNEMONIC_PASSPHRASE", ""),
+        str(_get_hd_index_path()),
+    )
+    with _hd_wallet_lock:
+        if _hd_wallet is None or key != _hd_wallet_key:
+            _hd_wallet = HDWallet(load_hd_seed())
+            _hd_wallet_key = key
+        return _hd_wallet
+
+
 class KeyManager:
-    """面向对象封装，供 call_router 等模块使用"""
+    """
+    面向对象封装，供 call_router 等模块使用
+
+    首次使用时加载并校验 TRON_PRIVATE_KEY，缓存 SigningKey、公钥和地址；
+    之后每次调用只比较环境变量原始值，值变化时自动失效并重新加载。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._raw_value: Optional[str] = None
+        self._material: Optional[_KeyMaterial] = None
+        self._load_error: Optional[str] = None
+
+    def _resolve(self) -> _KeyMaterial:
+        """
+        返回当前私钥的派生材料（带缓存）
+
+        Raises:
+            ValueError: 未配置私钥或格式无效
+        """
+        raw = os.getenv("TRON_PRIVATE_KEY", "")
+        with self._lock:
+            if raw != self._raw_value:
+                self._raw_value = raw
+                self._material = None
+                self._load_error = None
+                try:
+                    self._material = _derive_key_material(_parse_private_key(raw))
+                except ValueError as e:
+                    self._load_error = str(e)
+            if self._material is None:
+                raise ValueError(self._load_error)
+            return self._material
+
+    def invalidate(self) -> None:
+        """清除缓存，下次使用时重新加载私钥"""
+        with self._lock:
+            self._raw_value = None
+            self._material = None
+            self._load_error = None
 
     def is_configured(self) -> bool:
-        return get_configured_address() is not None
+        return self.get_address() is not None
 
     def get_address(self) -> Optional[str]:
         """获取当前配置的私钥对应的 TRON 地址"""
-        return get_configured_address()
+        try:
+            return self._resolve().address
+        except ValueError:
+            return None
 
     def sign_transaction(self, tx_dict: dict) -> dict:
         try:
-            pk = load_private_key()
+            material = self._resolve()
         except ValueError:
             raise ValueError("私钥未配置")
 
@@ -197,7 +809,19 @@ class KeyManager:
             raise ValueError("交易缺少 raw_data 字段")
 
         tx_id = tx_dict["txID"]
-        sig = sign_transaction(tx_id, pk)
+        sig = _sign_digest(material, tx_id)
         signed = dict(tx_dict)
         signed["signature"] = [sig]
         return signed
+
+    def sign_transactions(self, tx_dicts: List[dict], max_workers: Optional[int] = None) -> List[dict]:
+        """批量签名（进程池并行），返回顺序与输入一致"""
+        try:
+            material = self._resolve()
+        except ValueError:
+            raise ValueError("私钥未配置")
+        return sign_transactions_batch(tx_dicts, material.signing_key.to_string().hex(), max_workers)
+
+
+# 模块级默认实例，供 get_configured_address 等函数式接口复用缓存
+_default_key_manager = KeyManager()
@@ -0,0 +1,105 @@
+"""进程生命周期 — 优雅停机时排空进行中的链上写操作
+
+streamable-HTTP 模式下 worker 可能在滚动发布或扩缩容时被停止。转账、广播、租赁等
+动作一旦提交到链上就无法撤回，如果在签名后、广播结果返回前被中断，调用方将无法得知
+交易是否已上链。本模块:
+
+- 统计进行中的写操作（MUTATING_ACTIONS）
+- begin_drain() 后拒绝新的写操作（只读查询照常执行，由传输层决定何时停止接收请求）
+- wait_idle(timeout) 等待进行中的写操作全部完成
+
+stdio / SSE 模式下从不调用 begin_drain()，行为与原先一致。
+"""
+
+import threading
+import contextlib
+import time
+from typing import Optional
+
+# 会在链上产生交易或向 TronZap 下单的动作
+MUTATING_ACTIONS = frozenset({"transfer", "broadcast_tx", "lease_energy", "lease_bandwidth"})
+
+_condition = threading.Condition()
+_in_flight = 0
+_draining = False
+
+
+def draining() -> bool:
+    """是否已开始停机排空"""
+    return _draining
+
+
+def in_flight() -> int:
+    """进行中的写操作数"""
+    return _in_flight
+
+
+def begin_drain() -> None:
+    """开始停机排空：此后新的写操作被拒绝"""
+    global _draining
+    with _condition:
+        _draining = True
+        _condition.notify_all()
+
+
+def reset() -> None:
+    """恢复为接收请求状态（测试或嵌入使用）"""
+    global _draining
+    with _condition:
+        _draining = False
+
+
+def try_begin() -> bool:
+    """登记一个写操作；已开始排空时返回 False"""
+    global _in_flight
+    with _condition:
+        if _draining:
+            return False
+        _in_flight += 1
+        return True
+
+
+def end() -> None:
+    """写操作完成"""
+    global _in_flight
+    with _condition:
+        _in_flight -= 1
+        if _in_flight <= 0:
+            _condition.notify_all()
+
+
+@contextlib.contextmanager
+def track():
+    """
+    写操作上下文（需先 try_begin() 成功）
+
+    用法:
+        if not lifecycle.try_begin():
+            return 拒绝
+        with lifecycle.track():
+            ...
+    """
+    try:
+        yield
+    finally:
+        end()
+
+
+def wait_idle(timeout: Optional[float] = None) -> bool:
+    """
+    等待进行中的写操作全部完成
+
+    Args:
+        timeout: 最长等待秒数（None 表示一直等待）
+
+    Returns:
+        是否已全部完成（超时返回 False）
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _condition:
+        while _in_flight > 0:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            _condition.wait(remaining)
+        return True
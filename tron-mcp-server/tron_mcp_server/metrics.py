@@ -0,0 +1,335 @@
+"""运行指标 — 动作 / 上游请求耗时直方图与错误计数
+
+call_router.call 按动作分发，上游请求分散在 tron_client（TRONSCAN）、trongrid_client（TronGrid）
+和 tronzap_client（TronZap）中，原先无法判断是哪个动作或哪个上游接口变慢。本模块记录:
+
+- tron_action_duration_seconds{action}: 每个动作的耗时直方图
+- tron_action_errors_total{action, error_type}: 动作返回错误的次数（按 error_type 区分）
+- tron_upstream_request_duration_seconds{service, path}: 每个上游接口的耗时直方图
+- tron_upstream_errors_total{service, path}: 上游请求异常次数
+
+导出方式:
+- SSE 模式: GET /metrics（Prometheus 文本格式）
+- stdio 模式: tron_get_metrics 工具（JSON 摘要或 Prometheus 文本）
+
+配置:
+- TRON_METRICS: 1 开启（默认关闭）。关闭时 observe / track 直接返回，不加锁、不计时
+  （慢调用日志开启时 track_upstream 仍会计时，用于记录单次调用的上游明细）
+"""
+
+import os
+import math
+import time
+import threading
+import contextlib
+from typing import Dict, List, Optional, Tuple
+
+from . import profiling
+
+# 直方图分桶上界（秒），与 Prometheus 客户端默认分桶一致
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# tron_get_metrics 摘要中给出的分位数
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_enabled = os.getenv("TRON_METRICS", "").strip().lower() in ("1", "true", "yes")
+
+
+def enabled() -> bool:
+    """是否开启指标采集"""
+    return _enabled
+
+
+def set_enabled(value: bool) -> None:
+    """运行时开启 / 关闭指标采集（测试或嵌入使用）"""
+    global _enabled
+    _enabled = bool(value)
+
+
+class Histogram:
+    """按标签分组的累积分桶直方图（线程安全）"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # 标签值 → [各分桶计数..., +Inf 计数], 总和
+        self._series: Dict[tuple, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def collect(self) -> Dict[tuple, dict]:
+        """返回 {标签值: {counts, sum, count}}，counts 为非累积的各分桶计数"""
+        with self._lock:
+            return {
+                labels: {"counts": list(counts), "sum": total[0], "count": sum(counts)}
+                for labels, (counts, total) in self._series.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """按标签分组的计数器（线程安全）"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, int] = {}
+
+    def inc(self, labels: tuple, amount: int = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> Dict[tuple, int]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+ACTION_DURATION = Histogram(
+    "tron_action_duration_seconds", "call_router 动作耗时", ("action",),
+)
+ACTION_ERRORS = Counter(
+    "tron_action_errors_total", "call_router 动作返回错误次数", ("action", "error_type"),
+)
+UPSTREAM_DURATION = Histogram(
+    "tron_upstream_request_duration_seconds", "上游 API 请求耗时", ("service", "path"),
+)
+UPSTREAM_ERRORS = Counter(
+    "tron_upstream_errors_total", "上游 API 请求异常次数", ("service", "path"),
+)
+_HISTOGRAMS = (ACTION_DURATION, UPSTREAM_DURATION)
+_COUNTERS = (ACTION_ERRORS, UPSTREAM_ERRORS)
+
+
+def reset() -> None:
+    """清空全部指标"""
+    for metric in _HISTOGRAMS + _COUNTERS:
+        metric.reset()
+
+
+# ============ 采集 ============
+
+
+def result_error_type(result) -> Optional[str]:
+    """
+    从动作结果中提取错误类型
+
+    路由错误为 {"error": "<类型>"}，转账余额不足为 {"error": True, "error_type": "<类型>"}，
+    熔断拦截为 {"blocked": True, "error": False}（不计为错误）。
+    """
+    if not isinstance(result, dict):
+        return None
+    error = result.get("error")
+    if not error:
+        return None
+    if isinstance(error, str):
+        return error
+    return str(result.get("error_type") or "error")
+
+
+def observe_action(action: str, duration: float, result) -> None:
+    """记录一次动作调用（未开启时直接返回）"""
+    if not _enabled:
+        return
+    ACTION_DURATION.observe((action,), duration)
+    error_type = result_error_type(result)
+    if error_type:
+        ACTION_ERRORS.inc((action, error_type))
+
+
+def record_action_exception(action: str, duration: float, exc: BaseException) -> None:
+    """记录一次抛出异常的动作调用"""
+    if not _enabled:
+        return
+    ACTION_DURATION.observe((action,), duration)
+    ACTION_ERRORS.inc((action, type(exc).__name__))
+
+
+@contextlib.contextmanager
+def _track_upstream(service: str, path: str):
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        if _enabled:
+            UPSTREAM_ERRORS.inc((service, path))
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        if _enabled:
+            UPSTREAM_DURATION.observe((service, path), duration)
+        # 慢调用日志需要单次调用内的上游请求明细
+        profiling.record_upstream(service, path, duration, error)
+
+
+_NOOP = contextlib.nullcontext()
+
+
+def track_upstream(service: str, path: str):
+    """
+    上游请求计时上下文（未开启时返回共享的空上下文）
+
+    用法:
+        with metrics.track_upstream("trongrid", "wallet/createtransaction"):
+            response = httpx.post(...)
+    """
+    if not _enabled and not profiling.collecting():
+        return _NOOP
+    return _track_upstream(service, path)
+
+
+# ============ 导出 ============
+
+
+def _quantile(q: float, buckets: tuple, counts: List[int]) -> Optional[float]:
+    """按分桶线性插值估算分位数（与 Prometheus histogram_quantile 相同的算法）"""
+    total = sum(counts)
+    if total == 0:
+        return None
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count > 0:
+            if i == len(buckets):
+                # 落在 +Inf 分桶，只能给出最大有限上界
+                return buckets[-1]
+            lower = buckets[i - 1] if i > 0 else 0.0
+            return lower + (buckets[i] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return buckets[-1]
+
+
+def _series_summary(histogram: Histogram, series: dict) -> dict:
+    summary = {
+        "count": series["count"],
+        "mean_ms": round(series["sum"] / series["count"] * 1000, 3) if series["count"] else 0.0,
+    }
+    for q in SUMMARY_QUANTILES:
+        value = _quantile(q, histogram.buckets, series["counts"])
+        summary[f"p{int(q * 100)}_ms"] = round(value * 1000, 3) if value is not None else None
+    return summary
+
+
+def snapshot() -> dict:
+    """
+    指标 JSON 摘要
+
+    Returns:
+        包含 enabled, actions, upstream 的字典；actions / upstream 中每项含
+        count, mean_ms, p50_ms, p95_ms, p99_ms 与 errors
+    """
+    action_errors: Dict[str, Dict[str, int]] = {}
+    for (action, error_type), value in ACTION_ERRORS.collect().items():
+        action_errors.setdefault(action, {})[error_type] = value
+    actions = {}
+    for (action,), series in sorted(ACTION_DURATION.collect().items()):
+        entry = _series_summary(ACTION_DURATION, series)
+        entry["errors"] = action_errors.get(action, {})
+        actions[action] = entry
+
+    upstream_errors = UPSTREAM_ERRORS.collect()
+    upstream = {}
+    for (service, path), series in sorted(UPSTREAM_DURATION.collect().items()):
+        entry = _series_summary(UPSTREAM_DURATION, series)
+        entry["errors"] = upstream_errors.get((service, path), 0)
+        upstream[f"{service} {path}"] = entry
+
+    return {"enabled": _enabled, "actions": actions, "upstream": upstream}
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def render_prometheus() -> str:
+    """以 Prometheus 文本格式（0.0.4）导出全部指标"""
+    lines = []
+    for histogram in _HISTOGRAMS:
+        lines.append(f"# HELP {histogram.name} {histogram.help}")
+        lines.append(f"# TYPE {histogram.name} histogram")
+        bounds = histogram.buckets + (math.inf,)
+        for labels, series in sorted(histogram.collect().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series["counts"]):
+                cumulative += count
+                label_text = _format_labels(histogram.label_names, labels, ("le", _format_bound(bound)))
+                lines.append(f"{histogram.name}_bucket{label_text} {cumulative}")
+            label_text = _format_labels(histogram.label_names, labels)
+            lines.append(f"{histogram.name}_sum{label_text} {series['sum']}")
+            lines.append(f"{histogram.name}_count{label_text} {series['count']}")
+    for counter in _COUNTERS:
+        lines.append(f"# HELP {counter.name} {counter.help}")
+        lines.append(f"# TYPE {counter.name} counter")
+        for labels, value in sorted(counter.collect().items()):
+            lines.append(f"{counter.name}{_format_labels(counter.label_names, labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def asgi_app(app, path: str = "/metrics"):
+    """
+    包装 ASGI 应用: GET <path> 返回 Prometheus 文本，其余请求交给原应用
+
+    不依赖 starlette 路由，可包装 FastMCP.sse_app() 返回的任意 ASGI 应用。
+    """
+
+    async def wrapped(scope, receive, send):
+        if scope.get("type") == "http" and scope.get("path") == path:
+            if scope.get("method") not in ("GET", "HEAD"):
+                await send({
+                    "type": "http.response.start",
+                    "status": 405,
+                    "headers": [(b"allow", b"GET, HEAD"), (b"content-length", b"0")],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+            body = render_prometheus().encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", PROMETHEUS_CONTENT_TYPE.encode("ascii")),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body if scope["method"] == "GET" else b""})
+            return
+        await app(scope, receive, send)
+
+    return wrapped
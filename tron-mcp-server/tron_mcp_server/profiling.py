@@ -0,0 +1,312 @@
+"""性能剖析与慢调用日志 — call_router.call 的可选诊断模式
+
+指标（metrics）能看出某个动作变慢，追踪（tracing）能看出时间花在哪个阶段，
+但格式化、签名等纯本地代码的回归需要函数级的数据。本模块提供:
+
+- 按动作开启或按百分比抽样，用 cProfile 剖析单次调用，并按动作累计热点函数
+- 调用耗时超过阈值时写一条慢调用日志（JSON Lines）: 动作、脱敏后的参数、
+  耗时拆分（总耗时 / CPU / 上游 / 本地）、每次上游请求，以及剖析时的热点函数
+- get_diagnostics 动作汇总热点函数与最近的慢调用
+
+cProfile 只覆盖调用所在线程；提交到线程池的后台任务（如自动补足能量）不计入热点函数，
+但其上游请求如果在调用线程内发起则会出现在上游列表中。
+
+配置:
+- TRON_PROFILE_ACTIONS: 始终剖析的动作（逗号分隔，* 表示全部，默认不剖析）
+- TRON_PROFILE_SAMPLE_PERCENT: 其余调用的抽样剖析比例（0~100，默认 0）
+- TRON_SLOW_CALL_MS: 慢调用阈值（毫秒，默认 0 不记录）
+- TRON_SLOW_CALL_LOG: 慢调用日志路径（默认 ~/.tron_mcp/slow_calls.jsonl）
+"""
+
+import os
+import json
+import time
+import random
+import pstats
+import cProfile
+import logging
+import threading
+import contextvars
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PATH = Path.home() / ".tron_mcp" / "slow_calls.jsonl"
+# 慢调用日志中每次调用附带的热点函数数
+SLOW_CALL_TOP_FUNCTIONS = 15
+# 单次调用最多记录的上游请求数（批量安全检查等可能发起上千次）
+MAX_UPSTREAM_PER_CALL = 100
+# 内存中保留的最近慢调用条数
+RECENT_SLOW_CALLS = 50
+# 参数脱敏：键名包含以下片段时整体替换
+_SENSITIVE_KEY_PARTS = ("private", "secret", "password", "mnemonic", "seed", "signature")
+_MAX_PARAM_STRING = 120
+_MAX_PARAM_ITEMS = 10
+
+_PACKAGE_ROOT = str(Path(__file__).resolve().parent.parent)
+
+
+def _parse_actions(raw: str) -> frozenset:
+    return frozenset(a.strip() for a in (raw or "").split(",") if a.strip())
+
+
+def _parse_float(name: str, default: float, upper: Optional[float] = None) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+    return min(value, upper) if upper is not None else value
+
+
+_actions = _parse_actions(os.getenv("TRON_PROFILE_ACTIONS", ""))
+_sample_rate = _parse_float("TRON_PROFILE_SAMPLE_PERCENT", 0.0, 100.0) / 100
+_slow_ms = _parse_float("TRON_SLOW_CALL_MS", 0.0)
+_log_path = Path(os.getenv("TRON_SLOW_CALL_LOG", "").strip() or DEFAULT_LOG_PATH).expanduser()
+
+_upstream_calls: contextvars.ContextVar = contextvars.ContextVar("tron_profile_upstream", default=None)
+_lock = threading.Lock()
+# {动作: {(文件, 行号, 函数): [调用次数, 自身耗时, 累计耗时]}}
+_hot: Dict[str, Dict[tuple, list]] = {}
+_profiled: Dict[str, int] = {}
+_slow_total = 0
+_recent_slow: deque = deque(maxlen=RECENT_SLOW_CALLS)
+
+
+def enabled() -> bool:
+    """是否开启剖析或慢调用日志"""
+    return bool(_actions) or _sample_rate > 0 or _slow_ms > 0
+
+
+def configure(
+    actions=(),
+    sample_percent: float = 0.0,
+    slow_ms: float = 0.0,
+    log_path=None,
+) -> None:
+    """
+    运行时配置（参数全部为空时关闭）
+
+    Args:
+        actions: 始终剖析的动作（含 "*" 表示全部）
+        sample_percent: 其余调用的抽样剖析比例（0~100）
+        slow_ms: 慢调用阈值（毫秒，0 不记录）
+        log_path: 慢调用日志路径
+    """
+    global _actions, _sample_rate, _slow_ms, _log_path
+    if not 0 <= sample_percent <= 100:
+        raise ValueError(f"sample_percent 必须在 0~100 之间: {sample_percent}")
+    _actions = frozenset(actions)
+    _sample_rate = sample_percent / 100
+    _slow_ms = max(0.0, float(slow_ms))
+    if log_path is not None:
+        _log_path = Path(log_path).expanduser()
+
+
+def reset() -> None:
+    """清空累计的热点函数与慢调用"""
+    global _slow_total
+    with _lock:
+        _hot.clear()
+        _profiled.clear()
+        _recent_slow.clear()
+        _slow_total = 0
+
+
+def record_upstream(service: str, path: str, duration: float, error: Optional[str] = None) -> None:
+    """记录当前调用中的一次上游请求（由 metrics.track_upstream 调用）"""
+    calls = _upstream_calls.get()
+    if calls is None:
+        return
+    calls.append((service, path, duration, error))
+
+
+def collecting() -> bool:
+    """当前上下文是否在收集上游请求"""
+    return _upstream_calls.get() is not None
+
+
+def _should_profile(action: str) -> bool:
+    if action in _actions or "*" in _actions:
+        return True
+    return _sample_rate > 0 and random.random() < _sample_rate
+
+
+def redact_params(value, key: str = ""):
+    """脱敏并截断参数（敏感键整体替换，长字符串 / 长列表截断）"""
+    if key and any(part in key.lower() for part in _SENSITIVE_KEY_PARTS):
+        return "<redacted>"
+    if isinstance(value, dict):
+        return {k: redact_params(v, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [redact_params(v) for v in value[:_MAX_PARAM_ITEMS]]
+        if len(value) > _MAX_PARAM_ITEMS:
+            items.append(f"...(+{len(value) - _MAX_PARAM_ITEMS})")
+        return items
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    value = str(value)
+    if len(value) > _MAX_PARAM_STRING:
+        return f"{value[:_MAX_PARAM_STRING]}...({len(value)} chars)"
+    return value
+
+
+def _function_label(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    if filename.startswith(_PACKAGE_ROOT):
+        filename = os.path.relpath(filename, _PACKAGE_ROOT)
+    return f"{filename}:{line}({name})"
+
+
+def _rank(stats: Dict[tuple, list], top: int) -> List[dict]:
+    ranked = sorted(stats.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    return [
+        {
+            "function": _function_label(func),
+            "calls": ncalls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for func, (ncalls, tottime, cumtime) in ranked
+    ]
+
+
+def _collect_profile(action: str, profile: cProfile.Profile) -> Dict[tuple, list]:
+    """把单次剖析结果并入该动作的累计热点函数"""
+    stats = {func: [nc, tt, ct] for func, (cc, nc, tt, ct, callers) in pstats.Stats(profile).stats.items()}
+    with _lock:
+        _profiled[action] = _profiled.get(action, 0) + 1
+        totals = _hot.setdefault(action, {})
+        for func, (nc, tt, ct) in stats.items():
+            entry = totals.get(func)
+            if entry is None:
+                totals[func] = [nc, tt, ct]
+            else:
+                entry[0] += nc
+                entry[1] += tt
+                entry[2] += ct
+    return stats
+
+
+def _write_slow_call(entry: dict) -> None:
+    global _slow_total
+    with _lock:
+        _slow_total += 1
+        _recent_slow.append(entry)
+        try:
+            _log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"写入慢调用日志失败 ({_log_path}): {e}")
+    logger.warning(
+        f"慢调用 {entry['action']}: {entry['duration_ms']}ms"
+        f"（上游 {entry['upstream_ms']}ms / {entry['upstream_count']} 次）"
+    )
+
+
+def run(action: str, params: dict, fn: Callable[[], dict]) -> dict:
+    """
+    执行一次动作调用：按配置剖析，并在超过阈值时写慢调用日志
+
+    Args:
+        action: 动作名
+        params: 动作参数（写日志时脱敏）
+        fn: 实际执行动作的无参函数
+    """
+    profile = cProfile.Profile() if _should_profile(action) else None
+    calls: list = []
+    token = _upstream_calls.set(calls)
+    result = None
+    error_type = None
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # 其他剖析工具已占用解释器钩子
+                profile = None
+        result = fn()
+        return result
+    except Exception as e:
+        error_type = type(e).__name__
+        raise
+    finally:
+        if profile is not None:
+            profile.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+        cpu_ms = (time.thread_time() - cpu_start) * 1000
+        _upstream_calls.reset(token)
+        stats = _collect_profile(action, profile) if profile is not None else None
+        if _slow_ms > 0 and duration_ms >= _slow_ms:
+            if error_type is None and isinstance(result, dict):
+                from . import metrics
+                error_type = metrics.result_error_type(result)
+            upstream_ms = sum(c[2] for c in calls) * 1000
+            _write_slow_call({
+                "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "action": action,
+                "params": redact_params(params),
+                "duration_ms": round(duration_ms, 3),
+                "cpu_ms": round(cpu_ms, 3),
+                "upstream_ms": round(upstream_ms, 3),
+                "local_ms": round(max(0.0, duration_ms - upstream_ms), 3),
+                "upstream_count": len(calls),
+                "upstream": [
+                    {"service": s, "path": p, "ms": round(d * 1000, 3), **({"error": e} if e else {})}
+                    for s, p, d, e in calls[:MAX_UPSTREAM_PER_CALL]
+                ],
+                "error_type": error_type,
+                "profiled": stats is not None,
+                "hot_functions": _rank(stats, SLOW_CALL_TOP_FUNCTIONS) if stats is not None else [],
+            })
+
+
+def snapshot(top: int = 20, action: Optional[str] = None) -> dict:
+    """
+    诊断快照：累计热点函数（按自身耗时排序）与最近的慢调用
+
+    Args:
+        top: 返回的热点函数数
+        action: 只看指定动作（默认汇总全部）
+    """
+    with _lock:
+        if action:
+            merged = {func: list(v) for func, v in _hot.get(action, {}).items()}
+        else:
+            merged = {}
+            for totals in _hot.values():
+                for func, (nc, tt, ct) in totals.items():
+                    entry = merged.setdefault(func, [0, 0.0, 0.0])
+                    entry[0] += nc
+                    entry[1] += tt
+                    entry[2] += ct
+        profiled = dict(_profiled)
+        recent = [e for e in _recent_slow if not action or e["action"] == action]
+        slow_total = _slow_total
+    return {
+        "enabled": enabled(),
+        "config": {
+            "profile_actions": sorted(_actions),
+            "sample_percent": round(_sample_rate * 100, 3),
+            "slow_call_ms": _slow_ms,
+            "slow_call_log": str(_log_path),
+        },
+        "profiled_calls": profiled,
+        "hot_functions": _rank(merged, top),
+        "slow_calls_total": slow_total,
+        "recent_slow_calls": [
+            {k: e[k] for k in ("time", "action", "duration_ms", "upstream_ms", "upstream_count", "error_type")}
+            for e in recent[-10:]
+        ],
+    }
@@ -1,8 +1,6 @@
 """QR Code 生成模块 — 将 TRON 钱包地址生成二维码图片"""
 
 import os
-import qrcode
-from qrcode.image.pil import PilImage
 
 
 def generate_address_qrcode(
@@ -39,7 +37,9 @@ def generate_address_qrcode(
     
     file_path = os.path.join(output_dir, f"{filename}.png")
 
-    # 生成 QR Code
+    # 生成 QR Code（qrcode + PIL 较重，首次生成时才导入）
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -0,0 +1,288 @@
+"""TRONSCAN 热点响应的类型化 schema 与快速解码
+
+/account（可能带数百个 TRC20 持仓）、/transfer、/token_trc20/transfers、/transaction-info
+的响应体较大，而 tron_client / formatters 只读取其中少数字段。开启快速解码后这些路径
+按下方 schema 解码，只物化实际读取的字段：
+
+- msgspec：由 schema 生成 Struct，解析时直接跳过未声明字段
+- orjson / json：完整解析后按 schema 投影，丢弃未声明字段（不再被共享缓存与调用方持有）
+
+解码结果始终是普通 dict / list，调用方无需改动；字段类型与 schema 不符时回退完整解析。
+新增对上述路径响应字段的读取时，需同步在 schema 中声明。
+
+环境变量:
+- TRON_FAST_DECODE: off（默认）/ auto / msgspec / orjson / json
+  auto 依次选择 msgspec、orjson，都未安装时关闭；json 只减少常驻内存，解码反而更慢
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # 可选依赖
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # 可选依赖：pip install tron-mcp-server[fast]
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FAST_DECODE_ENV = "TRON_FAST_DECODE"
+
+BACKEND_OFF = "off"
+BACKEND_MSGSPEC = "msgspec"
+BACKEND_ORJSON = "orjson"
+BACKEND_JSON = "json"
+BACKENDS = (BACKEND_MSGSPEC, BACKEND_ORJSON, BACKEND_JSON)
+
+# ============ schema ============
+# 字段 → 叶子类型 / 嵌套对象 schema（dict）/ 对象列表 schema（[dict]）
+
+STR = Optional[str]
+NUM = Union[int, float, str, None]  # TRONSCAN 的金额、余额等字段有时为数字、有时为字符串
+BOOL = Optional[bool]
+ANY = Any
+
+# account 接口中 trc20token_balances / tokenBalances 的单条持仓
+TOKEN_BALANCE = {
+    "tokenId": STR,
+    "token_id": STR,
+    "contractAddress": STR,
+    "contract_address": STR,
+    "tokenAddress": STR,
+    "tokenName": STR,
+    "name": STR,
+    "tokenAbbr": STR,
+    "balance": NUM,
+    "tokenBalance": NUM,
+    "quantity": NUM,
+    "token_balance": NUM,
+    "tokenDecimal": NUM,
+    "token_decimals": NUM,
+    "decimals": NUM,
+}
+
+ACCOUNT = {
+    "address": STR,
+    "balance": NUM,
+    "balanceSun": NUM,
+    "totalBalance": NUM,
+    "total_balance": NUM,
+    "transactions": NUM,
+    "totalTransactionCount": NUM,
+    "total_transaction_count": NUM,
+    "transactionCount": NUM,
+    "trc20token_balances": [TOKEN_BALANCE],
+    "trc20TokenBalances": [TOKEN_BALANCE],
+    "tokenBalances": [TOKEN_BALANCE],
+}
+
+# /transfer 与 /token_trc20/transfers 的单条转账（字段与 formatters.format_transaction_history 对应）
+TRANSFER = {
+    "transactionHash": STR,
+    "transaction_id": STR,
+    "transferFromAddress": STR,
+    "transferToAddress": STR,
+    "from_address": STR,
+    "to_address": STR,
+    "from": STR,
+    "to": STR,
+    "quant": NUM,
+    "value": NUM,
+    "amount": NUM,
+    "tokenName": STR,
+    "symbol": STR,
+    "timestamp": NUM,
+    "block_ts": NUM,
+    "tokenInfo": {
+        "tokenAbbr": STR,
+        "tokenName": STR,
+        "tokenDecimal": NUM,
+    },
+}
+
+TRANSFER_PAGE = {
+    "total": NUM,
+    "data": [TRANSFER],
+    "token_transfers": [TRANSFER],
+}
+
+TRANSACTION_INFO = {
+    "hash": STR,
+    "contractRet": STR,
+    "contract_result": STR,
+    "confirmed": BOOL,
+    "block": NUM,
+    "blockNumber": NUM,
+    "block_number": NUM,
+    "ownerAddress": STR,
+    "owner_address": STR,
+    "toAddress": STR,
+    "to_address": STR,
+    "contractType": NUM,
+    "contract_type": NUM,
+    "amount": NUM,
+    "fee": NUM,
+    "timestamp": NUM,
+    "block_timestamp": NUM,
+    "contractData": {"amount": NUM},
+    "cost": {"fee": NUM},
+    "trigger_info": ANY,
+    "triggerInfo": ANY,
+    "tokenTransferInfo": ANY,
+    "token_transfer_info": ANY,
+}
+
+# 路径 → 响应 schema
+SCHEMAS: Dict[str, dict] = {
+    "account": ACCOUNT,
+    "transfer": TRANSFER_PAGE,
+    "token_trc20/transfers": TRANSFER_PAGE,
+    "transaction-info": TRANSACTION_INFO,
+}
+
+
+# ============ 后端 ============
+
+
+def get_backend() -> str:
+    """
+    解析当前解码后端（off 表示沿用 response.json()）
+
+    Raises:
+        ValueError: 后端名称无效，或指定的后端未安装
+    """
+    backend = os.getenv(FAST_DECODE_ENV, BACKEND_OFF).strip().lower() or BACKEND_OFF
+    if backend in ("0", "false", "no", BACKEND_OFF):
+        return BACKEND_OFF
+    if backend in ("1", "true", "yes", "auto"):
+        if msgspec is not None:
+            return BACKEND_MSGSPEC
+        return BACKEND_ORJSON if orjson is not None else BACKEND_OFF
+    if backend not in BACKENDS:
+        raise ValueError(f"不支持的解码后端: {backend}（可选 off / auto / msgspec / orjson / json）")
+    if (backend == BACKEND_MSGSPEC and msgspec is None) or (backend == BACKEND_ORJSON and orjson is None):
+        raise ValueError(f"解码后端 {backend} 未安装，请执行 pip install {backend} 或改用 auto")
+    return backend
+
+
+def _compile(schema):
+    """schema → 投影计划：对象为 (叶子字段集合, {嵌套字段: 子计划})，对象列表为 [子计划]"""
+    if isinstance(schema, list):
+        return [_compile(schema[0])]
+    leaves = frozenset(key for key, sub in schema.items() if not isinstance(sub, (dict, list)))
+    nested = {key: _compile(sub) for key, sub in schema.items() if isinstance(sub, (dict, list))}
+    return leaves, nested
+
+
+def _project(value, plan):
+    if isinstance(plan, list):
+        if not isinstance(value, list):
+            return value
+        # 对象列表（持仓、转账行等热点）逐行内联投影，省去每行一次递归调用
+        leaves, nested = plan[0]
+        rows = []
+        for item in value:
+            if isinstance(item, dict):
+                row = {key: field for key, field in item.items() if key in leaves}
+                for key, sub_plan in nested.items():
+                    if key in item:
+                        row[key] = _project(item[key], sub_plan)
+                item = row
+            rows.append(item)
+        return rows
+    if not isinstance(value, dict):
+        return value
+    leaves, nested = plan
+    # 遍历响应字段而非 schema 字段：每个字段只做一次集合查找
+    result = {key: field for key, field in value.items() if key in leaves}
+    for key, sub_plan in nested.items():
+        if key in value:
+            result[key] = _project(value[key], sub_plan)
+    return result
+
+
+def project(value, schema):
+    """按 schema 投影已解析的 JSON：只保留声明的字段，嵌套对象 / 对象列表递归投影"""
+    return _project(value, _compile(schema))
+
+
+# 路径 → 投影计划
+_PLANS = {path: _compile(schema) for path, schema in SCHEMAS.items()}
+
+
+# 路径 → msgspec Decoder（首次使用时生成）
+_decoders: Dict[str, Any] = {}
+
+
+def _struct_type(name: str, schema):
+    """schema → msgspec 类型（对象生成 Struct，缺失字段为 UNSET，转回 dict 时省略）"""
+    if isinstance(schema, list):
+        return Optional[List[_struct_type(name, schema[0])]]
+    if not isinstance(schema, dict):
+        return schema
+    fields, rename = [], {}
+    for i, (key, sub) in enumerate(schema.items()):
+        # 字段名可能是 Python 关键字（from）或含非法字符，统一用位置名并映射回 JSON 键
+        attr = f"f{i}"
+        rename[attr] = key
+        sub_type = _struct_type(f"{name}_{i}", sub)
+        if isinstance(sub, dict):
+            sub_type = Optional[sub_type]
+        if sub_type is not Any:
+            sub_type = Union[sub_type, msgspec.UnsetType]
+        fields.append((attr, sub_type, msgspec.UNSET))
+    return msgspec.defstruct(name, fields, rename=rename)
+
+
+def _msgspec_decoder(path: str):
+    decoder = _decoders.get(path)
+    if decoder is None:
+        type_name = "".join(part.capitalize() for part in path.replace("-", "_").replace("/", "_").split("_"))
+        decoder = msgspec.json.Decoder(_struct_type(type_name, SCHEMAS[path]))
+        _decoders[path] = decoder
+    return decoder
+
+
+def _loads(content: bytes, backend: str):
+    if backend == BACKEND_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def decode(path: str, content: bytes, backend: str = None):
+    """
+    按路径 schema 解码响应体（路径没有 schema 时完整解析）
+
+    Args:
+        path: TRONSCAN 路径（如 "account"）
+        content: 响应体字节
+        backend: 解码后端，默认按 TRON_FAST_DECODE 解析（off 时按 json 处理）
+    """
+    backend = backend or get_backend()
+    if path not in SCHEMAS:
+        return _loads(content, BACKEND_ORJSON if orjson is not None else BACKEND_JSON)
+    if backend == BACKEND_MSGSPEC:
+        try:
+            return msgspec.to_builtins(_msgspec_decoder(path).decode(content))
+        except msgspec.ValidationError as e:
+            # 上游字段类型与 schema 不符（或顶层不是对象）：完整解析后投影
+            logger.debug(f"{path} 响应与 schema 不符，回退投影解码: {e}")
+            return _project(msgspec.json.decode(content), _PLANS[path])
+    return _project(_loads(content, backend), _PLANS[path])
+
+
+def decode_response(path: str, response):
+    """
+    解码 httpx 响应：开启快速解码且路径有 schema 时只物化所需字段，否则 response.json()
+    """
+    backend = get_backend()
+    content = getattr(response, "content", None)
+    if backend == BACKEND_OFF or path not in SCHEMAS or not isinstance(content, (bytes, bytearray)):
+        return response.json()
+    return decode(path, bytes(content), backend)
@@ -0,0 +1,255 @@
+"""地址风险判定缓存：短 TTL 缓存 + 批量并发查询
+
+tron_client.check_account_risk 每次都要请求 TRONSCAN 的两个接口。
+交易历史一页最多 50 笔，逐笔检查对手方会产生上百次请求；
+同一地址在短时间内反复出现（常用交易所热钱包、老朋友）时结果也几乎不会变化。
+
+本模块在进程内维护一个 地址 → 风险报告 的短 TTL 缓存（LRU 淘汰），
+并提供批量接口：先去重、命中缓存，剩余地址用有限并发一次性查询。
+
+- TRON_RISK_CACHE_TTL: 缓存有效期（秒，默认 300，设为 0 关闭缓存）
+- TRON_RISK_CONCURRENCY: 批量查询的最大并发地址数（默认 4）
+- TRON_RISK_RATE_LIMIT: TRONSCAN 安全接口的全局限速（请求/秒，默认 8，每个地址计 2 次请求）
+- 两个安全接口都失败（risk_type == "Unknown"）的结果不缓存，下次重新查询
+- 开启本地黑名单预筛时，能在本地判定的地址不发网络请求（也不进入缓存）
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from . import tron_client
+from . import blacklist
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存有效期（秒）与最大条目数
+DEFAULT_RISK_CACHE_TTL = 300
+RISK_CACHE_MAX_ENTRIES = 10000
+# 批量查询的默认最大并发数与全局限速（每个地址对应两次 TRONSCAN 请求）
+RISK_FETCH_CONCURRENCY = 4
+DEFAULT_RISK_RATE_LIMIT = 8.0
+REQUESTS_PER_CHECK = 2
+
+
+def _get_ttl() -> float:
+    """获取缓存有效期（TRON_RISK_CACHE_TTL，非法值回退默认值）"""
+    raw = os.getenv("TRON_RISK_CACHE_TTL", "").strip()
+    if not raw:
+        return DEFAULT_RISK_CACHE_TTL
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 TRON_RISK_CACHE_TTL: {raw}，使用默认值 {DEFAULT_RISK_CACHE_TTL}")
+        return DEFAULT_RISK_CACHE_TTL
+
+
+def _get_concurrency() -> int:
+    raw = os.getenv("TRON_RISK_CONCURRENCY", "").strip()
+    try:
+        return max(1, int(raw)) if raw else RISK_FETCH_CONCURRENCY
+    except ValueError:
+        logger.warning(f"无效的 TRON_RISK_CONCURRENCY: {raw}，使用默认值 {RISK_FETCH_CONCURRENCY}")
+        return RISK_FETCH_CONCURRENCY
+
+
+def _get_rate_limit() -> float:
+    raw = os.getenv("TRON_RISK_RATE_LIMIT", "").strip()
+    try:
+        return max(0.0, float(raw)) if raw else DEFAULT_RISK_RATE_LIMIT
+    except ValueError:
+        logger.warning(f"无效的 TRON_RISK_RATE_LIMIT: {raw}，使用默认值 {DEFAULT_RISK_RATE_LIMIT}")
+        return DEFAULT_RISK_RATE_LIMIT
+
+
+class RateLimiter:
+    """
+    令牌桶限速器（线程安全）
+
+    桶容量等于每秒速率，允许短时突发；rate 为 0 表示不限速。
+    """
+
+    def __init__(self, rate: float, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self._capacity = max(rate, 1.0)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """取走 tokens 个令牌，不足时阻塞等待"""
+        if self.rate <= 0:
+            return
+        tokens = min(tokens, self._capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def _get_limiter() -> RateLimiter:
+    """全局限速器（速率配置变化时重建）"""
+    global _limiter
+    rate = _get_rate_limit()
+    with _limiter_lock:
+        if _limiter is None or _limiter.rate != rate:
+            _limiter = RateLimiter(rate)
+        return _limiter
+
+
+class RiskVerdictCache:
+    """线程安全的 地址 → 风险报告 TTL 缓存（超出容量时淘汰最久未使用的条目）"""
+
+    def __init__(self, max_entries: int = RISK_CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def get(self, address: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(address)
+            if entry is None:
+                return None
+            expires_at, report = entry
+            if expires_at <= self._clock():
+                del self._entries[address]
+                return None
+            self._entries.move_to_end(address)
+            return report
+
+    def put(self, address: str, report: dict, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[address] = (self._clock() + ttl, report)
+            self._entries.move_to_end(address)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_cache = RiskVerdictCache()
+
+
+def _cacheable(report: dict) -> bool:
+    """两个安全接口都失败的结果不可信，不进入缓存"""
+    return report.get("risk_type") != "Unknown"
+
+
+def get_risk_report(address: str) -> dict:
+    """
+    获取单个地址的风险报告（优先使用缓存）
+
+    Args:
+        address: TRON 地址
+
+    Returns:
+        tron_client.check_account_risk 的结果
+    """
+    report = _cache.get(address)
+    if report is not None:
+        return report
+    report = tron_client.check_account_risk(address)
+    blacklist.learn(address, report)
+    if _cacheable(report):
+        _cache.put(address, report, _get_ttl())
+    return report
+
+
+def get_risk_reports(addresses: Iterable[str], max_workers: Optional[int] = None) -> Dict[str, dict]:
+    """
+    批量获取风险报告：去重 → 命中缓存 / 本地黑名单预筛 → 剩余地址限速并发查询
+
+    单个地址查询失败不影响其他地址，失败的地址不出现在返回结果中。
+
+    Args:
+        addresses: TRON 地址可迭代对象（允许重复与空值）
+        max_workers: 最大并发查询数（默认 TRON_RISK_CONCURRENCY）
+
+    Returns:
+        地址 → 风险报告 的字典
+    """
+    reports: Dict[str, dict] = {}
+    misses = []
+    for address in dict.fromkeys(a for a in addresses if a):
+        report = _cache.get(address)
+        if report is None:
+            report = blacklist.prescreen(address)
+        if report is not None:
+            reports[address] = report
+        else:
+            misses.append(address)
+    if not misses:
+        return reports
+
+    limiter = _get_limiter()
+
+    def fetch(address: str):
+        limiter.acquire(REQUESTS_PER_CHECK)
+        try:
+            return address, tron_client.check_account_risk(address)
+        except Exception as e:
+            logger.warning(f"风险查询失败 {address}: {e}")
+            return address, None
+
+    ttl = _get_ttl()
+    workers = max(1, min(max_workers or _get_concurrency(), len(misses)))
+    if workers == 1:
+        results = map(fetch, misses)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            results = list(executor.map(fetch, misses))
+        finally:
+            executor.shutdown(wait=False)
+    for address, report in results:
+        if report is None:
+            continue
+        reports[address] = report
+        blacklist.learn(address, report)
+        if _cacheable(report):
+            _cache.put(address, report, ttl)
+    return reports
+
+
+def risk_tag(report: dict) -> dict:
+    """
+    将完整风险报告压缩为列表展示用的风险标签
+
+    Returns:
+        包含 is_risky, risk_type, reasons 的字典
+    """
+    return {
+        "is_risky": bool(report.get("is_risky", False)),
+        "risk_type": report.get("risk_type", "Unknown"),
+        "reasons": list(report.get("risk_reasons", [])),
+    }
+
+
+def clear_cache() -> None:
+    """清空风险缓存"""
+    _cache.clear()
@@ -16,6 +16,15 @@ from . import config  # 触发 load_dotenv()，确保 API Key 等环境变量被
 mcp = FastMCP("tron-mcp-server")
 
 
+def _with_view(params: dict, verbosity: str = None, fields: str = None) -> dict:
+    """仅在调用方指定时附加 verbosity / fields，保持默认调用参数不变"""
+    if verbosity:
+        params["verbosity"] = verbosity
+    if fields:
+        params["fields"] = fields
+    return params
+
+
 # ============ 标准 MCP 工具（推荐使用）============
 
 @mcp.tool()
@@ -128,7 +137,7 @@ def tron_build_tx(
 
 
 @mcp.tool()
-def tron_check_account_safety(address: str) -> dict:
+def tron_check_account_safety(address: str, verbosity: str = None, fields: str = None) -> dict:
     """
     检查指定地址是否为恶意地址（钓鱼、诈骗等）。
     
@@ -137,6 +146,9 @@ def tron_check_account_safety(address: str) -> dict:
     
     Args:
         address: TRON 地址（Base58 格式以 T 开头，或 Hex 格式以 0x41 开头）
+        verbosity: 响应详略（可选）：minimal 只保留 address, is_safe, is_risky, risk_type,
+                   safety_status，standard 为默认输出，full 附带上游原始风险数据（raw）
+        fields: 只返回指定的顶层字段（可选，逗号分隔，summary 始终保留）
     
     Returns:
         包含 is_safe, is_risky, risk_type, safety_status, warnings, summary 的结果
@@ -147,7 +159,32 @@ def tron_check_account_safety(address: str) -> dict:
         - warnings: 警告信息列表
         - summary: 检查结果摘要
     """
-    return call_router.call("check_account_safety", {"address": address})
+    return call_router.call("check_account_safety", _with_view({"address": address}, verbosity, fields))
+
+
+@mcp.tool()
+def tron_check_account_safety_batch(addresses: list, verbosity: str = None, fields: str = None) -> dict:
+    """
+    批量检查多个地址是否为恶意地址（如结算前筛查一批交易对手）。
+
+    输入会先去重；短时间内检查过的地址直接使用缓存结果，
+    其余地址在并发上限与限速下查询 TRONSCAN 安全接口。
+
+    Args:
+        addresses: TRON 地址列表（最多 1000 个）
+        verbosity: 响应详略（可选）：minimal 只保留 counts, risky_addresses 与 verdicts
+                   （每项仅 address, verdict），standard 为默认输出，full 在每项 verdict 中附带上游原始数据（raw）
+        fields: 只返回指定的顶层字段（可选，逗号分隔，summary 始终保留）
+
+    Returns:
+        包含 counts, verdicts, risky_addresses, summary 的结果
+        - counts: 各判定的数量（risky / safe / partial / unknown / invalid）
+        - verdicts: 逐地址判定表，每项包含 address, verdict, risk_type（危险地址附带 reasons）
+        - risky_addresses: 危险地址列表
+    """
+    return call_router.call(
+        "check_account_safety_batch", _with_view({"addresses": addresses}, verbosity, fields)
+    )
 
 
 # ============ 转账闭环工具（签名 / 广播 / 一键转账）============
@@ -199,19 +236,23 @@ def tron_transfer(
     token: str = "USDT",
     force_execution: bool = False,
     memo: str = "",
+    from_address: str = "",
+    wallet_policy: str = "",
+    auto_energy_topup: bool = None,
 ) -> dict:
     """
     一键转账闭环：安全检查 → 构建交易 → 签名 → 广播。
     
     这是完整的转账工具，自动完成全部流程。
-    发送方地址自动从本地私钥派生。
+    发送方地址自动从本地私钥派生；配置了多钱包密钥池时按策略选择付款钱包。
     
     安全机制（与 tron_build_tx 相同）：
     - Anti-Fraud: 检查接收方是否为恶意地址
     - Gas Guard: 检查发送方余额是否充足
     - Recipient Check: 检查接收方账户状态
     
-    前置条件：需设置环境变量 TRON_PRIVATE_KEY。
+    前置条件：需设置环境变量 TRON_PRIVATE_KEY，或配置多钱包密钥池
+    （TRON_PRIVATE_KEYS / TRON_PRIVATE_KEY_1.. / TRON_KEYSTORE_PATH）。
     
     Args:
         to_address: 接收方地址
@@ -221,17 +262,30 @@ def tron_transfer(
                         只有设置为 True 才能继续转账。
         memo: 交易备注/留言（可选）。会被编码为十六进制写入交易的 data 字段，
               在区块链浏览器上可查看。例如："还你的饭钱"、"Invoice #1234"。
+        from_address: 指定付款地址（可选，须在密钥池中）。
+        wallet_policy: 多钱包选择策略（可选）：round_robin（轮询）/
+                       most_energy（剩余能量最多）/ most_balance（转账代币余额最多），
+                       默认取 TRON_WALLET_POLICY。
+        auto_energy_topup: USDT 转账前自动补足能量（可选，默认取 TRON_AUTO_ENERGY_TOPUP）。
+                           只租赁能量缺口，且仅在租赁比燃烧 TRX 便宜时下单，与安全检查并发执行。
     
     Returns:
-        包含 txid, result, summary 的转账结果
+        包含 txid, result, summary 的转账结果（开启自动补足时附带 energy_topup）
     """
-    return call_router.call("transfer", {
+    params = {
         "to": to_address,
         "amount": amount,
         "token": token,
         "force_execution": force_execution,
         "memo": memo,
-    })
+    }
+    if from_address:
+        params["from"] = from_address
+    if wallet_policy:
+        params["wallet_policy"] = wallet_policy
+    if auto_energy_topup is not None:
+        params["auto_energy_topup"] = auto_energy_topup
+    return call_router.call("transfer", params)
 
 
 @mcp.tool()
@@ -256,11 +310,15 @@ def tron_get_transaction_history(
     limit: int = 10,
     start: int = 0,
     token: str = None,
+    enrich: bool = False,
+    verbosity: str = None,
+    fields: str = None,
 ) -> dict:
     """
     查询指定地址的交易历史记录。
 
-    支持自定义返回条数和按代币类型筛选。
+    支持自定义返回条数和按代币类型筛选。每条记录会附带地址簿中的
+    对手方别名（from_alias / to_alias）。
 
     Args:
         address: TRON 地址（Base58 格式以 T 开头，或 Hex 格式以 0x41 开头）
@@ -272,16 +330,26 @@ def tron_get_transaction_history(
                - "USDT": 仅查询 USDT (TRC20) 转账
                - TRC20 合约地址: 查询指定 TRC20 代币的转账记录
                - TRC10 代币名称: 查询指定 TRC10 代币的转账记录
+        enrich: 是否为每条记录附加对手方风险标签（counterparty_risk），默认 False。
+                一页内的对手方去重后批量检查并短时缓存，无需再逐笔调用
+                tron_check_account_safety
+        verbosity: 响应详略（可选）：minimal 每条记录只保留 txid, direction, counterparty, amount, token,
+                   timestamp（有别名 / 风险标签时附带 alias, risky），standard 为默认输出，
+                   full 在每条记录中附带上游原始数据（raw）
+        fields: 只返回指定的顶层字段（可选，逗号分隔，summary 始终保留）
 
     Returns:
         包含 address, total, displayed, token_filter, transfers 列表和 summary 的结果
     """
-    return call_router.call("get_transaction_history", {
+    params = {
         "address": address,
         "limit": limit,
         "start": start,
         "token": token,
-    })
+    }
+    if enrich:
+        params["enrich"] = True
+    return call_router.call("get_transaction_history", _with_view(params, verbosity, fields))
 
 
 @mcp.tool()
@@ -289,6 +357,8 @@ def tron_get_internal_transactions(
     address: str,
     limit: int = 20,
     start: int = 0,
+    verbosity: str = None,
+    fields: str = None,
 ) -> dict:
     """
     查询地址的内部交易（合约内部调用产生的转账）。
@@ -300,19 +370,22 @@ def tron_get_internal_transactions(
         address: TRON 地址
         limit: 返回条数，默认 20，最大 50
         start: 偏移量（分页），默认 0
+        verbosity: 响应详略（可选）：minimal 只保留 address, total, displayed 与每条记录的 txid, to,
+                   amount, token, timestamp, revert，standard 为默认输出，full 在每条记录中附带上游原始数据（raw）
+        fields: 只返回指定的顶层字段（可选，逗号分隔，summary 始终保留）
     
     Returns:
         包含内部交易列表和统计摘要的结果
     """
-    return call_router.call("get_internal_transactions", {
+    return call_router.call("get_internal_transactions", _with_view({
         "address": address,
         "limit": limit,
         "start": start,
-    })
+    }, verbosity, fields))
 
 
 @mcp.tool()
-def tron_get_account_tokens(address: str) -> dict:
+def tron_get_account_tokens(address: str, verbosity: str = None, fields: str = None) -> dict:
     """
     查询地址持有的所有代币列表（TRX + TRC20 + TRC10）。
     
@@ -321,11 +394,14 @@ def tron_get_account_tokens(address: str) -> dict:
     
     Args:
         address: TRON 地址
+        verbosity: 响应详略（可选）：minimal 只保留 address, token_count 与每个代币的 token_abbr,
+                   token_type, balance，standard / full 为默认输出
+        fields: 只返回指定的顶层字段（可选，逗号分隔，summary 始终保留）
     
     Returns:
         包含 token_count, tokens 列表和 summary 的结果
     """
-    return call_router.call("get_account_tokens", {"address": address})
+    return call_router.call("get_account_tokens", _with_view({"address": address}, verbosity, fields))
 
 
 @mcp.tool()
@@ -430,6 +506,25 @@ def tron_addressbook_lookup(alias: str) -> dict:
     return call_router.call("addressbook_lookup", {"alias": alias})
 
 
+@mcp.tool()
+def tron_addressbook_reverse_lookup(address: str) -> dict:
+    """
+    通过 TRON 地址反查地址簿中的联系人。
+
+    使用场景：
+    - "这个地址是谁的"
+    - 为交易对手方、收款地址标注联系人名称
+
+    Args:
+        address: TRON 地址（Base58 格式以 T 开头）
+
+    Returns:
+        包含 address, found, aliases, contacts, summary 的结果。
+        每个 contact 包含 alias, note, created_at。
+    """
+    return call_router.call("addressbook_reverse_lookup", {"address": address})
+
+
 @mcp.tool()
 def tron_addressbook_list() -> dict:
     """
@@ -533,25 +628,190 @@ def tron_lease_bandwidth(
     })
 
 
-def main():
-    """启动 MCP Server（支持 stdio 和 SSE 模式）"""
-    import sys
-    import os
+@mcp.tool()
+def tron_get_lease_quote(
+    to_address: str = "",
+    amount: int = None,
+    duration: int = 1,
+    activate_account: bool = False,
+) -> dict:
+    """
+    查询 TronZap 能量租赁报价（不下单），并与直接燃烧 TRX 的费用对比。
+
+    不传 amount 时返回 TronZap 价格表。报价与价格表均有短时缓存。
+
+    前置条件：需设置环境变量 TRONZAP_API_TOKEN 和 TRONZAP_API_SECRET。
+
+    Args:
+        to_address: 接收能量的钱包地址（查询报价时必填）
+        amount: 能量数量（整数，可选）
+        duration: 租赁时长（小时），可选值：1 或 24，默认 1
+        activate_account: 是否同时激活账户，默认 False
 
-    # 默认端口（可通过环境变量覆盖）
-    port = int(os.getenv("MCP_PORT", "8765"))
+    Returns:
+        包含 cost_trx, burn_cost_trx, cached, summary 的报价结果（或 services 价格表）
+    """
+    params = {"duration": duration, "activate_account": activate_account}
+    if to_address:
+        params["to_address"] = to_address
+    if amount is not None:
+        params["amount"] = amount
+    return call_router.call("get_lease_quote", params)
 
-    # 检查命令行参数
-    if len(sys.argv) > 1 and sys.argv[1] == "--sse":
+
+@mcp.tool()
+def tron_plan_transfers(
+    transfers: list,
+    from_address: str = "",
+    energy_lease_price_sun: float = None,
+    bandwidth_lease_price_sun: float = None,
+    lease_duration: int = 1,
+) -> dict:
+    """
+    批量转账前的手续费与资源规划。
+
+    一次性查询付款账户的能量/带宽与链上能量单价，估算每笔转账的资源需求，
+    比较租赁（TronZap）与燃烧 TRX 的成本，返回最便宜的组合与执行顺序。
+    返回的 steps 按顺序为 lease_energy / lease_bandwidth / transfer 动作及参数，可依次执行。
+
+    Args:
+        transfers: 转账列表，每项为 {"to": 地址, "amount": 金额, "token": "USDT" 或 "TRX"}
+        from_address: 付款地址（可选，默认本地钱包）
+        energy_lease_price_sun: 能量租赁单价（SUN/Energy，可选；未提供且未配置时只考虑燃烧）
+        bandwidth_lease_price_sun: 带宽租赁单价（SUN/字节，可选）
+        lease_duration: 能量租期（小时），1 或 24，默认 1
+
+    Returns:
+        包含 demand, energy, bandwidth, steps, totals, feasible, summary 的规划结果
+    """
+    params = {"transfers": transfers, "lease_duration": lease_duration}
+    if from_address:
+        params["from"] = from_address
+    if energy_lease_price_sun is not None:
+        params["energy_lease_price_sun"] = energy_lease_price_sun
+    if bandwidth_lease_price_sun is not None:
+        params["bandwidth_lease_price_sun"] = bandwidth_lease_price_sun
+    return call_router.call("plan_transfers", params)
+
+
+# ============ HD 钱包工具 ============
+
+@mcp.tool()
+def tron_hd_derive_addresses(count: int = 1, account: int = 0) -> dict:
+    """
+    从 HD 种子批量派生充值地址（BIP44 路径 m/44'/195'/account'/0/index）。
+
+    每次调用从该账户上次派生到的序号继续，派生结果写入本地地址索引，
+    之后可用 tron_hd_lookup_address 反查充值归属。只返回地址和路径，不返回私钥。
+
+    前置条件：需设置环境变量 TRON_HD_SEED 或 TRON_MNEMONIC。
+
+    Args:
+        count: 派生数量，默认 1，最大 10000
+        account: BIP44 账户序号，默认 0
+
+    Returns:
+        包含 account, count, addresses（index / path / address 列表）, summary 的结果
+    """
+    return call_router.call("hd_derive_addresses", {"count": count, "account": account})
+
+
+@mcp.tool()
+def tron_hd_lookup_address(address: str) -> dict:
+    """
+    反查充值地址对应的 HD 派生路径，用于充值归属。
+
+    Args:
+        address: TRON 地址
+
+    Returns:
+        包含 found, path, account, index, summary 的结果
+    """
+    return call_router.call("hd_lookup_address", {"address": address})
+
+
+# ============ 运维工具 ============
+
+@mcp.tool()
+def tron_get_metrics(format: str = "json") -> dict:
+    """
+    查看服务运行指标：每个动作、每个上游接口（TRONSCAN / TronGrid / TronZap）的
+    耗时分位数（p50 / p95 / p99）以及按 error_type 统计的错误次数。
+
+    需设置环境变量 TRON_METRICS=1 开启采集；SSE 模式下同时提供 GET /metrics。
+
+    Args:
+        format: json（默认，分位数摘要）或 prometheus（Prometheus 文本格式）
+
+    Returns:
+        json: 包含 enabled, actions, upstream, summary 的结果
+        prometheus: 包含 text, content_type, summary 的结果
+    """
+    return call_router.call("get_metrics", {"format": format})
+
+
+@mcp.tool()
+def tron_get_diagnostics(top: int = 20, action: str = None) -> dict:
+    """
+    查看性能诊断：cProfile 剖析累计的热点函数（按自身耗时排序）与最近的慢调用
+    （含耗时拆分与上游请求数），用于发现格式化、签名等本地代码的性能回归。
+
+    需设置 TRON_PROFILE_ACTIONS（指定动作，* 为全部）、TRON_PROFILE_SAMPLE_PERCENT（抽样比例）
+    或 TRON_SLOW_CALL_MS（慢调用阈值）；慢调用明细另写入 TRON_SLOW_CALL_LOG。
+
+    Args:
+        top: 返回的热点函数数（默认 20，最大 200）
+        action: 只看指定动作（可选，如 "transfer"）
+
+    Returns:
+        包含 enabled, config, profiled_calls, hot_functions, recent_slow_calls, summary 的结果
+    """
+    params = {"top": top}
+    if action:
+        params["action"] = action
+    return call_router.call("get_diagnostics", params)
+
+
+def main():
+    """启动 MCP Server（支持 stdio、SSE 和 streamable-HTTP 模式）"""
+    import sys
+    import argparse
+
+    from . import http_transport
+
+    parser = argparse.ArgumentParser(prog="tron-mcp-server", description="TRON MCP Server")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--sse", action="store_true", help="SSE 模式（单进程）")
+    mode.add_argument("--http", action="store_true", help="streamable-HTTP 模式（支持多 worker）")
+    parser.add_argument("--host", default=None, help="监听地址（默认 MCP_HOST 或 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=None, help="监听端口（默认 MCP_PORT 或 8765）")
+    parser.add_argument("--workers", type=int, default=None, help="worker 进程数，仅 --http（默认 MCP_WORKERS 或 1）")
+    args = parser.parse_args(sys.argv[1:])
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须大于等于 1")
+
+    if args.http:
+        try:
+            http_transport.run(args.host, args.port, args.workers)
+        except ImportError:
+            print("❌ streamable-HTTP 模式需要安装 uvicorn: pip install uvicorn")
+            sys.exit(1)
+    elif args.sse:
         # SSE 模式：用 uvicorn 启动 HTTP 服务
         try:
             import uvicorn
         except ImportError:
             print("❌ SSE 模式需要安装 uvicorn: pip install uvicorn")
             sys.exit(1)
-        print(f"🚀 TRON MCP Server (SSE) 启动在 http://127.0.0.1:{port}/sse")
-        app = mcp.sse_app()
-        uvicorn.run(app, host="127.0.0.1", port=port, log_level="info")
+        from . import metrics
+
+        host = args.host or http_transport.get_host()
+        port = args.port or http_transport.get_port()
+        print(f"🚀 TRON MCP Server (SSE) 启动在 http://{host}:{port}/sse")
+        if metrics.enabled():
+            print(f"📈 指标: http://{host}:{port}/metrics")
+        app = metrics.asgi_app(mcp.sse_app())
+        uvicorn.run(app, host=host, port=port, log_level="info")
     else:
         # 默认 stdio 模式
         mcp.run()
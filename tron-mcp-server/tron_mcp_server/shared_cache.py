@@ -0,0 +1,682 @@
+"""跨进程共享读缓存 — tron_client 的 TRONSCAN 查询结果
+
+stdio 模式下每个 Agent 会话都会拉起一个独立的 server 进程，会话通常很短，
+进程内缓存（如 risk_cache）还没热起来进程就退出了；同一台机器上的多个会话
+反复查询同样的 /account、/chainparameters、transaction-info 与安全接口。
+本模块把这些只读响应放进可插拔的缓存后端，同一主机上的所有实例共享:
+
+- memory: 进程内 LRU（仅单进程有效，适合常驻的 SSE / HTTP 服务）
+- sqlite: 磁盘上的 SQLite 文件（WAL 模式，多进程并发读写）
+- socket: Unix socket 守护进程（内存 LRU，首次使用时自动拉起，空闲超时后退出）
+
+各后端都按 TTL 过期，并受条目数与字节数上限约束（超出时淘汰最久未访问的条目）。
+只缓存下列路径的成功响应，TTL 按路径设置:
+
+- account: 5 秒（余额变化快；广播交易后主动失效付款方与收款方）
+- chainparameters: 300 秒
+- transaction-info: 86400 秒（仅已上链的交易，未确认的交易不缓存）
+- accountv2 / security/account/data: 300 秒（地址风险检查）
+
+配置:
+- TRON_CACHE_BACKEND: off（默认）/ memory / sqlite / socket
+- TRON_CACHE_PATH: SQLite 缓存文件（默认 ~/.tron_mcp/cache.db）
+- TRON_CACHE_SOCKET: 守护进程 socket 路径（默认 ~/.tron_mcp/cache.sock）
+- TRON_CACHE_MAX_ENTRIES: 最大条目数（默认 10000）
+- TRON_CACHE_MAX_BYTES: 最大字节数（默认 64 MiB）
+- TRON_CACHE_TTLS: 按路径覆盖 TTL，如 "account=10,chainparameters=600"（0 表示不缓存该路径）
+- TRON_CACHE_DAEMON_IDLE: 守护进程无请求多久后退出（秒，默认 3600，0 表示常驻）
+
+守护进程也可手动启动 / 查看:
+    python -m tron_mcp_server.shared_cache serve [--socket PATH]
+    python -m tron_mcp_server.shared_cache stats
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import hashlib
+import logging
+import sqlite3
+import threading
+import subprocess
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from . import interprocess
+
+logger = logging.getLogger(__name__)
+
+BACKEND_OFF = "off"
+BACKEND_MEMORY = "memory"
+BACKEND_SQLITE = "sqlite"
+BACKEND_SOCKET = "socket"
+_BACKENDS = (BACKEND_OFF, BACKEND_MEMORY, BACKEND_SQLITE, BACKEND_SOCKET)
+
+DEFAULT_DB_PATH = Path.home() / ".tron_mcp" / "cache.db"
+DEFAULT_SOCKET_PATH = Path.home() / ".tron_mcp" / "cache.sock"
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_DAEMON_IDLE = 3600.0
+
+# 路径 → 默认 TTL（秒）
+DEFAULT_TTLS: Dict[str, float] = {
+    "account": 5,
+    "chainparameters": 300,
+    "transaction-info": 86400,
+    "accountv2": 300,
+    "security/account/data": 300,
+}
+
+# 守护进程不可用时，多久后再尝试连接（秒），避免每次查询都付出连接超时
+SOCKET_RETRY_INTERVAL = 30.0
+SOCKET_TIMEOUT = 1.0
+# 自动拉起守护进程后等待其就绪的最长时间（秒）
+DAEMON_START_WAIT = 3.0
+
+
+def _is_final_transaction(data: dict) -> bool:
+    """交易已上链（有执行结果与区块号）且未被标记为未确认"""
+    return bool(data.get("contractRet") and data.get("block")) and data.get("confirmed") is not False
+
+
+# 路径 → 响应是否可缓存
+_CACHEABLE: Dict[str, Callable[[dict], bool]] = {
+    "transaction-info": _is_final_transaction,
+}
+
+
+# ============ 后端 ============
+
+
+class MemoryCacheBackend:
+    """进程内 LRU 缓存（线程安全）"""
+
+    name = BACKEND_MEMORY
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        size = len(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self._clock() + ttl, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteCacheBackend:
+    """
+    SQLite 文件缓存（多进程共享）
+
+    访问时间最多每秒更新一次，读多写少时不会让读者互相等待写锁；
+    上限检查每 evict_interval 次写入做一次，条目数 / 字节数可能短暂超出上限。
+    """
+
+    name = BACKEND_SQLITE
+    evict_interval = 32
+
+    def __init__(self, path, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path).expanduser()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ? AND accessed_at < ?", (now, key, now - 1),
+            )
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        size = len(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now + ttl, now, size),
+            )
+            self._writes += 1
+            if self._writes % self.evict_interval == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """删除过期条目，再按最久未访问淘汰超出上限的部分（调用方需持有锁）"""
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM ("
+            "SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running FROM cache"
+            ") WHERE running > ?)",
+            (self.max_bytes,),
+        )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict(time.time())
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {"entries": entries, "bytes": total, "path": str(self.path)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SocketCacheBackend:
+    """
+    Unix socket 守护进程缓存的客户端
+
+    协议为按行的文本命令（键为十六进制摘要，值为单行 JSON）:
+        GET <key>            → <value> 或空行（未命中）
+        SET <key> <ttl> <value> → OK
+        DEL <key>            → OK
+        CLEAR                → OK
+        STATS                → <JSON>
+
+    守护进程不可用时视为未命中，SOCKET_RETRY_INTERVAL 秒内不再重试；
+    autostart 开启时首次连接失败会在后台拉起守护进程。
+    """
+
+    name = BACKEND_SOCKET
+
+    def __init__(self, path, autostart: bool = True):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("当前平台不支持 Unix socket，请改用 TRON_CACHE_BACKEND=sqlite")
+        self.path = Path(path).expanduser()
+        self.autostart = autostart
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._retry_at = 0.0
+
+    def _connect(self) -> bool:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(SOCKET_TIMEOUT)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            return False
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+        return True
+
+    def _ensure_connected(self) -> bool:
+        if self._sock is not None:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        if self._connect():
+            return True
+        if self.autostart and _start_daemon(self.path) and self._connect():
+            return True
+        logger.warning(f"共享缓存守护进程不可用 ({self.path})，{SOCKET_RETRY_INTERVAL:.0f}s 内不使用缓存")
+        self._retry_at = time.monotonic() + SOCKET_RETRY_INTERVAL
+        return False
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def _request(self, line: str) -> Optional[str]:
+        """发送一条命令并读取一行响应（连接断开时重连一次，仍失败返回 None）"""
+        data = (line + "\n").encode("utf-8")
+        with self._lock:
+            for _ in range(2):
+                if not self._ensure_connected():
+                    return None
+                try:
+                    self._sock.sendall(data)
+                    response = self._reader.readline()
+                    if response:
+                        return response.decode("utf-8").rstrip("\n")
+                except OSError as e:
+                    logger.debug(f"共享缓存请求失败，重连: {e}")
+                self._disconnect()
+        return None
+
+    def get(self, key: str) -> Optional[str]:
+        response = self._request(f"GET {key}")
+        if not response or response.startswith("ERR"):
+            return None
+        return response
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        if ttl > 0:
+            self._request(f"SET {key} {ttl} {value}")
+
+    def delete(self, key: str) -> None:
+        self._request(f"DEL {key}")
+
+    def clear(self) -> None:
+        self._request("CLEAR")
+
+    def stats(self) -> dict:
+        raw = self._request("STATS")
+        if raw is None:
+            return {"available": False, "socket": str(self.path)}
+        return {**json.loads(raw), "available": True, "socket": str(self.path)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+# ============ 守护进程 ============
+
+
+def _handle_command(backend: MemoryCacheBackend, line: str) -> str:
+    command, _, rest = line.partition(" ")
+    if command == "GET":
+        return backend.get(rest) or ""
+    if command == "SET":
+        key, ttl, value = rest.split(" ", 2)
+        backend.set(key, value, float(ttl))
+        return "OK"
+    if command == "DEL":
+        backend.delete(rest)
+        return "OK"
+    if command == "CLEAR":
+        backend.clear()
+        return "OK"
+    if command == "STATS":
+        return json.dumps({**backend.stats(), "max_entries": backend.max_entries, "max_bytes": backend.max_bytes})
+    return "ERR unknown command"
+
+
+class CacheDaemon:
+    """Unix socket 缓存守护进程（每个连接一个线程，后端为内存 LRU）"""
+
+    def __init__(self, path, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 idle_timeout: float = 0.0):
+        import socketserver
+
+        self.path = Path(path).expanduser()
+        self.backend = MemoryCacheBackend(max_entries, max_bytes)
+        self.idle_timeout = idle_timeout
+        self._last_active = time.monotonic()
+        self._connections = 0
+        self._state_lock = threading.Lock()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with daemon._state_lock:
+                    daemon._connections += 1
+                try:
+                    for raw in self.rfile:
+                        daemon._last_active = time.monotonic()
+                        try:
+                            response = _handle_command(daemon.backend, raw.decode("utf-8").rstrip("\n"))
+                        except (ValueError, UnicodeDecodeError) as e:
+                            response = f"ERR {e}"
+                        self.wfile.write((response + "\n").encode("utf-8"))
+                finally:
+                    with daemon._state_lock:
+                        daemon._connections -= 1
+                        daemon._last_active = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if _probe(self.path):
+                raise RuntimeError(f"共享缓存守护进程已在运行: {self.path}")
+            # 上一个守护进程异常退出残留的 socket 文件
+            self.path.unlink()
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.path), Handler)
+        self._server.daemon_threads = True
+        os.chmod(self.path, 0o600)
+
+    def _idle(self) -> bool:
+        with self._state_lock:
+            return self._connections == 0 and time.monotonic() - self._last_active >= self.idle_timeout
+
+    def _watch_idle(self) -> None:
+        while not self._stopped.wait(min(self.idle_timeout, 60.0)):
+            if self._idle():
+                logger.info(f"共享缓存守护进程空闲 {self.idle_timeout:.0f}s，退出")
+                self._server.shutdown()
+                return
+
+    def serve_forever(self) -> None:
+        self._stopped = threading.Event()
+        if self.idle_timeout > 0:
+            threading.Thread(target=self._watch_idle, name="cache-daemon-idle", daemon=True).start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopped.set()
+            self._server.server_close()
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def start(self) -> threading.Thread:
+        """在后台线程中运行（测试或嵌入使用），用 stop() 停止"""
+        thread = threading.Thread(target=self.serve_forever, name="cache-daemon", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._server.shutdown()
+
+
+def _probe(path: Path) -> bool:
+    """socket 是否有守护进程在监听"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def _start_daemon(path: Path) -> bool:
+    """拉起守护进程并等待就绪（跨进程加锁，避免多个实例同时拉起）"""
+    with interprocess.FileLock(interprocess.lock_path_for("cache-daemon")):
+        if _probe(path):
+            return True
+        logger.info(f"启动共享缓存守护进程: {path}")
+        try:
+            subprocess.Popen(
+                [sys.executable, "-m", "tron_mcp_server.shared_cache", "serve", "--socket", str(path)],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as e:
+            logger.warning(f"无法启动共享缓存守护进程: {e}")
+            return False
+        deadline = time.monotonic() + DAEMON_START_WAIT
+        while time.monotonic() < deadline:
+            if path.exists() and _probe(path):
+                return True
+            time.sleep(0.05)
+        return False
+
+
+# ============ 配置与接口 ============
+
+
+def _get_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+
+
+def _get_daemon_idle() -> float:
+    raw = os.getenv("TRON_CACHE_DAEMON_IDLE", "").strip()
+    if not raw:
+        return DEFAULT_DAEMON_IDLE
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 TRON_CACHE_DAEMON_IDLE: {raw}，使用默认值 {DEFAULT_DAEMON_IDLE}")
+        return DEFAULT_DAEMON_IDLE
+
+
+def _get_backend_name() -> str:
+    name = os.getenv("TRON_CACHE_BACKEND", "").strip().lower() or BACKEND_OFF
+    if name not in _BACKENDS:
+        logger.warning(f"无效的 TRON_CACHE_BACKEND: {name}，不使用共享缓存")
+        return BACKEND_OFF
+    return name
+
+
+def _get_ttls() -> Dict[str, float]:
+    raw = os.getenv("TRON_CACHE_TTLS", "").strip()
+    if raw == _ttls_source[0]:
+        return _ttls_source[1]
+    ttls = dict(DEFAULT_TTLS)
+    for item in raw.split(","):
+        path, sep, value = item.partition("=")
+        if not sep:
+            continue
+        try:
+            ttls[path.strip()] = max(0.0, float(value))
+        except ValueError:
+            logger.warning(f"无效的 TRON_CACHE_TTLS 条目: {item}")
+    _ttls_source[:] = [raw, ttls]
+    return ttls
+
+
+_ttls_source: list = ["", dict(DEFAULT_TTLS)]
+_backends: Dict[tuple, object] = {}
+_backends_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_hits: Dict[str, int] = {}
+_misses: Dict[str, int] = {}
+
+
+def _get_backend():
+    """当前配置对应的后端（按后端 + 路径缓存；关闭时返回 None）"""
+    name = _get_backend_name()
+    if name == BACKEND_OFF:
+        return None
+    max_entries = _get_int("TRON_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+    max_bytes = _get_int("TRON_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+    if name == BACKEND_SQLITE:
+        location = os.getenv("TRON_CACHE_PATH", "").strip() or str(DEFAULT_DB_PATH)
+    elif name == BACKEND_SOCKET:
+        location = os.getenv("TRON_CACHE_SOCKET", "").strip() or str(DEFAULT_SOCKET_PATH)
+    else:
+        location = ""
+    key = (name, location, max_entries, max_bytes)
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            if name == BACKEND_SQLITE:
+                backend = SqliteCacheBackend(location, max_entries, max_bytes)
+            elif name == BACKEND_SOCKET:
+                backend = SocketCacheBackend(location)
+            else:
+                backend = MemoryCacheBackend(max_entries, max_bytes)
+            _backends[key] = backend
+        return backend
+
+
+def make_key(service: str, url: str, params: Optional[dict] = None) -> str:
+    """缓存键：服务 + 完整 URL（含网络）+ 排序后的参数的摘要"""
+    raw = f"{service}|{url}|{json.dumps(params or {}, sort_keys=True, separators=(',', ':'))}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _count(counter: Dict[str, int], path: str) -> None:
+    with _stats_lock:
+        counter[path] = counter.get(path, 0) + 1
+
+
+def get(service: str, path: str, url: str, params: Optional[dict] = None):
+    """
+    读取缓存的响应
+
+    Returns:
+        缓存的 JSON 数据；未开启缓存、路径不可缓存或未命中时返回 None
+    """
+    if _get_backend_name() == BACKEND_OFF or _get_ttls().get(path, 0) <= 0:
+        return None
+    try:
+        raw = _get_backend().get(make_key(service, url, params))
+    except (OSError, sqlite3.Error, ValueError) as e:
+        logger.warning(f"读取共享缓存失败: {e}")
+        raw = None
+    if raw is None:
+        _count(_misses, path)
+        return None
+    _count(_hits, path)
+    return json.loads(raw)
+
+
+def put(service: str, path: str, url: str, params: Optional[dict], data) -> None:
+    """写入成功的响应（未开启缓存、路径不可缓存或响应不满足缓存条件时忽略）"""
+    if _get_backend_name() == BACKEND_OFF:
+        return
+    ttl = _get_ttls().get(path, 0)
+    if ttl <= 0 or not data:
+        return
+    predicate = _CACHEABLE.get(path)
+    if predicate is not None and not predicate(data):
+        return
+    try:
+        # ASCII 编码：字符数即字节数，且值中不含换行（socket 协议按行分隔）
+        value = json.dumps(data, separators=(",", ":"))
+        _get_backend().set(make_key(service, url, params), value, ttl)
+    except (OSError, sqlite3.Error, ValueError, TypeError) as e:
+        logger.warning(f"写入共享缓存失败: {e}")
+
+
+def invalidate(service: str, url: str, params: Optional[dict] = None) -> None:
+    """删除一条缓存（如广播交易后的账户信息）"""
+    if _get_backend_name() == BACKEND_OFF:
+        return
+    try:
+        _get_backend().delete(make_key(service, url, params))
+    except (OSError, sqlite3.Error, ValueError) as e:
+        logger.warning(f"删除共享缓存失败: {e}")
+
+
+def clear() -> None:
+    """清空当前后端的全部缓存与本进程的命中统计"""
+    backend = _get_backend()
+    if backend is not None:
+        backend.clear()
+    with _stats_lock:
+        _hits.clear()
+        _misses.clear()
+
+
+def stats() -> dict:
+    """当前后端状态与本进程按路径的命中 / 未命中次数"""
+    backend = _get_backend()
+    with _stats_lock:
+        hits, misses = dict(_hits), dict(_misses)
+    return {
+        "backend": backend.name if backend is not None else BACKEND_OFF,
+        "hits": hits,
+        "misses": misses,
+        **(backend.stats() if backend is not None else {}),
+    }
+
+
+def close() -> None:
+    """关闭已打开的后端（测试或切换配置使用）"""
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.close()
+        _backends.clear()
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m tron_mcp_server.shared_cache", description="TRON MCP 共享缓存")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="运行 Unix socket 缓存守护进程")
+    serve.add_argument("--socket", default=None, help="socket 路径（默认 TRON_CACHE_SOCKET）")
+    serve.add_argument("--idle", type=float, default=None, help="空闲多久后退出（秒，0 表示常驻）")
+    stats_cmd = sub.add_parser("stats", help="查看守护进程状态")
+    stats_cmd.add_argument("--socket", default=None)
+    args = parser.parse_args(argv)
+
+    path = args.socket or os.getenv("TRON_CACHE_SOCKET", "").strip() or str(DEFAULT_SOCKET_PATH)
+    if args.command == "stats":
+        print(json.dumps(SocketCacheBackend(path, autostart=False).stats(), ensure_ascii=False, indent=2))
+        return 0
+    daemon = CacheDaemon(
+        path,
+        max_entries=_get_int("TRON_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+        max_bytes=_get_int("TRON_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+        idle_timeout=_get_daemon_idle() if args.idle is None else max(0.0, args.idle),
+    )
+    daemon.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,7 +35,20 @@ SKILLS = [
     {
         "action": "check_account_safety",
         "desc": "检查地址是否为恶意地址（钓鱼、诈骗等）",
-        "params": {"address": "TRON 地址"},
+        "params": {
+            "address": "TRON 地址",
+            "verbosity": "响应详略：minimal / standard / full（可选，默认 standard）",
+            "fields": "只返回的顶层字段，逗号分隔（可选）",
+        },
+    },
+    {
+        "action": "check_account_safety_batch",
+        "desc": "批量筛查地址安全性（去重、缓存、限速并发），返回逐地址判定表与统计",
+        "params": {
+            "addresses": "TRON 地址列表（最多 1000 个）",
+            "verbosity": "响应详略：minimal / standard / full（可选，默认 standard）",
+            "fields": "只返回的顶层字段，逗号分隔（可选）",
+        },
     },
     {
         "action": "build_tx",
@@ -62,6 +75,9 @@ SKILLS = [
             "amount": "转账数量 (数字)",
             "token": "TRX 或 USDT",
             "force_execution": "布尔值，强制执行（接收方有风险时）",
+            "from": "指定付款地址（可选，须在密钥池中）",
+            "wallet_policy": "多钱包选择策略（可选）：round_robin / most_energy / most_balance",
+            "auto_energy_topup": "布尔值，USDT 转账前自动租赁能量缺口（可选，仅在比燃烧便宜时租赁）",
         },
     },
     {
@@ -77,6 +93,9 @@ SKILLS = [
             "limit": "返回条数（默认 10，最大 50）",
             "start": "偏移量（默认 0）",
             "token": "代币筛选：TRX / USDT / TRC20合约地址 / TRC10名称（可选）",
+            "enrich": "为每条记录附加对手方风险标签（可选，默认 false）",
+            "verbosity": "响应详略：minimal / standard / full（可选，默认 standard）",
+            "fields": "只返回的顶层字段，逗号分隔（可选）",
         },
     },
     {
@@ -98,6 +117,11 @@ SKILLS = [
         "desc": "通过别名查找 TRON 地址（支持模糊搜索）",
         "params": {"alias": "联系人别名"},
     },
+    {
+        "action": "addressbook_reverse_lookup",
+        "desc": "通过 TRON 地址反查地址簿中的联系人别名",
+        "params": {"address": "TRON 地址"},
+    },
     {
         "action": "addressbook_list",
         "desc": "列出地址簿中所有联系人",
@@ -140,6 +164,53 @@ SKILLS = [
             "amount": "租赁带宽数值（整数）",
         },
     },
+    {
+        "action": "get_lease_quote",
+        "desc": "查询 TronZap 能量租赁报价并与燃烧 TRX 对比（不下单，结果短时缓存）；不传 amount 时返回价格表",
+        "params": {
+            "to_address": "接收能量的地址（查询报价时必填）",
+            "amount": "能量数量（可选）",
+            "duration": "租赁时长：1 或 24 小时（默认 1）",
+            "activate_account": "是否同时激活账户（布尔值，默认 false）",
+        },
+    },
+    {
+        "action": "plan_transfers",
+        "desc": "批量转账前的资源规划：汇总能量/带宽需求，选择最便宜的租赁/燃烧组合，给出可直接执行的步骤顺序",
+        "params": {
+            "transfers": "转账列表，每项为 {to, amount, token}（token 默认 USDT）",
+            "from": "付款地址（可选，默认本地钱包）",
+            "energy_lease_price_sun": "能量租赁单价 SUN/Energy（可选，默认读取 TRON_ENERGY_LEASE_PRICE_SUN）",
+            "bandwidth_lease_price_sun": "带宽租赁单价 SUN/字节（可选，默认读取 TRON_BANDWIDTH_LEASE_PRICE_SUN）",
+            "lease_duration": "能量租期：1 或 24 小时（默认 1）",
+        },
+    },
+    {
+        "action": "hd_derive_addresses",
+        "desc": "从 HD 种子批量派生充值地址（BIP44 m/44'/195'/account'/0/index），不返回私钥",
+        "params": {
+            "count": "派生数量（默认 1，最大 10000）",
+            "account": "BIP44 账户序号（默认 0）",
+        },
+    },
+    {
+        "action": "hd_lookup_address",
+        "desc": "反查充值地址对应的 HD 派生路径（充值归属）",
+        "params": {"address": "TRON 地址"},
+    },
+    {
+        "action": "get_metrics",
+        "desc": "查看各动作 / 上游接口的耗时分位数与错误计数（需设置 TRON_METRICS=1）",
+        "params": {"format": "json（默认，分位数摘要）或 prometheus（文本格式）"},
+    },
+    {
+        "action": "get_diagnostics",
+        "desc": "查看剖析得到的热点函数与最近的慢调用（需设置 TRON_PROFILE_ACTIONS / TRON_PROFILE_SAMPLE_PERCENT / TRON_SLOW_CALL_MS）",
+        "params": {
+            "top": "返回的热点函数数（默认 20，最大 200）",
+            "action": "只看指定动作（可选，默认汇总全部）",
+        },
+    },
 ]
 
 
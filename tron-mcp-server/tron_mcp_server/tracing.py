@@ -0,0 +1,304 @@
+"""请求追踪 — 路由 / 交易构建 / HTTP 层的嵌套 span
+
+一次 tron_transfer 耗时 9 秒时，原先无法区分时间花在 build_unsigned_tx 的哪项检查、
+TronGrid 构建、签名还是广播上。本模块提供轻量的上下文追踪:
+
+- span(name, **attributes): 嵌套计时上下文，父子关系通过 contextvars 在同一调用链内传递
+- 最外层 span 结束时整条 trace 写入本地目录，可离线查看:
+  - chrome: Chrome trace-event 格式（chrome://tracing / Perfetto 打开）
+  - otlp: OpenTelemetry OTLP/JSON 格式（otel-cli / Jaeger 等导入）
+
+后台线程（如自动补足能量）需通过 wrap_context 提交任务才能挂到当前 trace 下。
+
+配置:
+- TRON_TRACE_DIR: trace 文件输出目录（设置后开启追踪，默认关闭）
+- TRON_TRACE_FORMAT: chrome（默认）/ otlp / both
+- TRON_TRACE_MIN_MS: 只导出总耗时不低于该值的 trace（毫秒，默认 0）
+"""
+
+import os
+import json
+import time
+import logging
+import secrets
+import threading
+import contextvars
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "tron-mcp-server"
+FORMATS = ("chrome", "otlp", "both")
+# 单条 trace 最多记录的 span 数（防止批量操作占用过多内存）
+MAX_SPANS_PER_TRACE = 10000
+
+# OTLP span kind
+_KIND_INTERNAL = 1
+_KIND_CLIENT = 3
+
+
+class Span:
+    """一次计时区间"""
+
+    __slots__ = (
+        "trace", "name", "span_id", "parent_id", "kind", "attributes",
+        "start_ns", "end_ns", "error", "thread_id", "_token",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: str, attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self.thread_id = threading.get_ident()
+        self._token = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.trace.finish(self)
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+class _NoopSpan:
+    """关闭追踪时使用的共享空 span"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """一条 trace：同一根 span 下的全部 span"""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def finish(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+        if span is self.root:
+            _export(self)
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("tron_trace_span", default=None)
+
+
+def _parse_min_ms(raw: str) -> float:
+    try:
+        return max(0.0, float(raw)) if raw.strip() else 0.0
+    except ValueError:
+        logger.warning(f"无效的 TRON_TRACE_MIN_MS: {raw}，使用默认值 0")
+        return 0.0
+
+
+def _parse_format(raw: str) -> str:
+    value = (raw or "chrome").strip().lower()
+    if value not in FORMATS:
+        logger.warning(f"无效的 TRON_TRACE_FORMAT: {raw}，使用默认值 chrome")
+        return "chrome"
+    return value
+
+
+_directory: Optional[str] = os.getenv("TRON_TRACE_DIR", "").strip() or None
+_format = _parse_format(os.getenv("TRON_TRACE_FORMAT", ""))
+_min_ms = _parse_min_ms(os.getenv("TRON_TRACE_MIN_MS", ""))
+
+
+def enabled() -> bool:
+    """是否开启追踪"""
+    return _directory is not None
+
+
+def configure(directory: Optional[str] = None, fmt: str = "chrome", min_duration_ms: float = 0.0) -> None:
+    """
+    运行时配置追踪（directory 为 None 时关闭）
+
+    Args:
+        directory: trace 文件输出目录
+        fmt: chrome / otlp / both
+        min_duration_ms: 只导出总耗时不低于该值的 trace
+    """
+    global _directory, _format, _min_ms
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的 trace 格式: {fmt}，可选 {', '.join(FORMATS)}")
+    _directory = directory
+    _format = fmt
+    _min_ms = max(0.0, float(min_duration_ms))
+
+
+def span(name: str, kind: str = "internal", **attributes):
+    """
+    创建一个 span（关闭追踪时返回共享的空 span）
+
+    当前上下文没有 span 时，新 span 作为根开启一条新 trace。
+
+    用法:
+        with tracing.span("tx_builder.check_sender_balance", token=token) as s:
+            ...
+            s.set_attribute("sufficient", True)
+    """
+    if _directory is None:
+        return _NOOP_SPAN
+    parent = _current_span.get()
+    if parent is None:
+        trace = Trace()
+        new_span = Span(trace, name, None, kind, attributes)
+        trace.root = new_span
+        return new_span
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+def current_span():
+    """当前上下文中的 span（无则返回空 span）"""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def wrap_context(fn):
+    """捕获当前上下文，使提交到线程池的任务中的 span 挂到当前 trace 下"""
+    if _directory is None or _current_span.get() is None:
+        return fn
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+
+    return run
+
+
+# ============ 导出 ============
+
+
+def _sorted_spans(trace: Trace) -> List[Span]:
+    with trace._lock:
+        return sorted(trace.spans, key=lambda s: s.start_ns)
+
+
+def _json_value(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def to_chrome(trace: Trace) -> dict:
+    """转换为 Chrome trace-event 格式（complete event，微秒）"""
+    pid = os.getpid()
+    events = []
+    for s in _sorted_spans(trace):
+        args = {k: _json_value(v) for k, v in s.attributes.items()}
+        args["span_id"] = s.span_id
+        if s.parent_id:
+            args["parent_id"] = s.parent_id
+        if s.error:
+            args["error"] = s.error
+        events.append({
+            "name": s.name,
+            "cat": s.kind,
+            "ph": "X",
+            "ts": s.start_ns / 1000,
+            "dur": (s.end_ns - s.start_ns) / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": args,
+        })
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"service": SERVICE_NAME, "trace_id": trace.trace_id, "dropped_spans": trace.dropped},
+    }
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> dict:
+    """转换为 OTLP/JSON（ExportTraceServiceRequest）格式"""
+    spans = []
+    for s in _sorted_spans(trace):
+        entry = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": _KIND_CLIENT if s.kind == "client" else _KIND_INTERNAL,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            entry["parentSpanId"] = s.parent_id
+        spans.append(entry)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }],
+    }
+
+
+def _file_stem(trace: Trace) -> str:
+    root = trace.root
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in root.name)[:64]
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(root.start_ns / 1e9))
+    return f"{stamp}-{safe_name}-{trace.trace_id[:8]}"
+
+
+def _export(trace: Trace) -> None:
+    """根 span 结束时写出 trace（低于 TRON_TRACE_MIN_MS 的跳过）"""
+    directory, fmt = _directory, _format
+    if directory is None or trace.root.duration_ms < _min_ms:
+        return
+    try:
+        path = Path(directory).expanduser()
+        path.mkdir(parents=True, exist_ok=True)
+        stem = _file_stem(trace)
+        if fmt in ("chrome", "both"):
+            (path / f"{stem}.trace.json").write_text(json.dumps(to_chrome(trace), ensure_ascii=False), encoding="utf-8")
+        if fmt in ("otlp", "both"):
+            (path / f"{stem}.otlp.json").write_text(json.dumps(to_otlp(trace), ensure_ascii=False), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"写出 trace 失败 ({directory}): {e}")
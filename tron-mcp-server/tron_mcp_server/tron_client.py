@@ -6,7 +6,12 @@ from typing import Optional
 import httpx
 import base58
 
+from . import cassette
 from . import config
+from . import metrics
+from . import response_schemas
+from . import shared_cache
+from . import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +22,9 @@ USDT_CONTRACT_HEX = config.get_usdt_contract_hex()
 # 超时设置
 TIMEOUT = config.get_timeout()
 
+# transfer(address,uint256) 函数选择器
+TRC20_TRANSFER_SELECTOR = "a9059cbb"
+
 
 def _get_api_url() -> str:
     """获取 TRONSCAN API URL"""
@@ -38,13 +46,38 @@ def _get_headers() -> dict:
 
 
 def _get(path: str, params: Optional[dict] = None) -> dict:
-    """发送 GET 请求"""
-    url = f"{_get_api_url()}/{path.lstrip('/')}"
-    response = httpx.get(url, params=params, headers=_get_headers(), timeout=TIMEOUT)
-    response.raise_for_status()
-    data = response.json()
+    """发送 GET 请求（可缓存的路径先查共享缓存）"""
+    path = path.lstrip("/")
+    url = f"{_get_api_url()}/{path}"
+    cached = shared_cache.get("tronscan", path, url, params)
+    if cached is not None:
+        return cached
+    with metrics.track_upstream("tronscan", path), tracing.span(f"tronscan {path}", kind="client"):
+        response = cassette.request(
+            "tronscan", path, httpx.get, "GET", url, params=params, headers=_get_headers(), timeout=TIMEOUT,
+        )
+        response.raise_for_status()
+    data = response_schemas.decode_response(path, response)
     if data is None:
         raise ValueError("TRONSCAN 响应为空")
+    shared_cache.put("tronscan", path, url, params, data)
+    return data
+
+
+def _get_security(path: str, address: str, headers: dict) -> dict:
+    """请求 TRONSCAN 安全相关接口（只缓存 HTTP 200 的响应）"""
+    url = f"{config.get_security_api_url()}/{path}"
+    params = {"address": address}
+    cached = shared_cache.get("tronscan", path, url, params)
+    if cached is not None:
+        return cached
+    with metrics.track_upstream("tronscan", path), tracing.span(f"tronscan {path}", kind="client"):
+        response = cassette.request(
+            "tronscan", path, httpx.get, "GET", url, params=params, headers=headers, timeout=TIMEOUT,
+        )
+    data = response.json()
+    if response.status_code == 200:
+        shared_cache.put("tronscan", path, url, params, data)
     return data
 
 
@@ -346,9 +379,7 @@ def check_account_risk(address: str) -> dict:
     
     # --- Layer 1: Account V2 API (查标签 + 投诉) ---
     try:
-        account_url = "https://apilist.tronscanapi.com/api/accountv2"
-        response = httpx.get(account_url, params={"address": normalized_addr}, headers=headers, timeout=TIMEOUT)
-        data_v2 = response.json()
+        data_v2 = _get_security("accountv2", normalized_addr, headers)
         v2_success = True
         
         red_tag = data_v2.get("redTag") or ""
@@ -388,9 +419,7 @@ def check_account_risk(address: str) -> dict:
     
     # --- Layer 2: Security Service API (查黑产行为) ---
     try:
-        security_url = "https://apilist.tronscanapi.com/api/security/account/data"
-        response = httpx.get(security_url, params={"address": normalized_addr}, headers=headers, timeout=TIMEOUT)
-        data_sec = response.json()
+        data_sec = _get_security("security/account/data", normalized_addr, headers)
         sec_success = True
         
         is_black_list = bool(data_sec.get("is_black_list", False))
@@ -486,12 +515,17 @@ def broadcast_transaction(signed_tx: dict) -> dict:
     if "signature" not in signed_tx or not signed_tx["signature"]:
         raise ValueError("交易未签名：缺少 signature 字段")
 
-    url = "https://api.trongrid.io/wallet/broadcasttransaction"
+    url = f"{config.get_trongrid_url()}/wallet/broadcasttransaction"
     headers = _get_headers()
     headers["Content-Type"] = "application/json"
 
-    response = httpx.post(url, json=signed_tx, headers=headers, timeout=TIMEOUT)
-    response.raise_for_status()
+    with metrics.track_upstream("trongrid", "wallet/broadcasttransaction"), \
+            tracing.span("trongrid wallet/broadcasttransaction", kind="client"):
+        response = cassette.request(
+            "trongrid", "wallet/broadcasttransaction", httpx.post, "POST", url,
+            json=signed_tx, headers=headers, timeout=TIMEOUT,
+        )
+        response.raise_for_status()
     data = response.json()
 
     if not data.get("result", False):
@@ -504,12 +538,40 @@ def broadcast_transaction(signed_tx: dict) -> dict:
                 pass
         raise ValueError(f"广播失败: {error_msg}")
 
+    invalidate_accounts(signed_tx)
     return {
         "result": True,
         "txid": data.get("txid", signed_tx.get("txID", "")),
     }
 
 
+def invalidate_accounts(signed_tx: dict) -> None:
+    """广播成功后，交易双方的账户信息（余额 / 资源）已变化，使共享缓存失效
+
+    TRC20 转账的收款方不在 to_address 中，而是编码在合约调用 data 里（transfer(address,uint256)）。
+    """
+    try:
+        value = signed_tx["raw_data"]["contract"][0]["parameter"]["value"]
+    except (KeyError, IndexError, TypeError):
+        return
+    addresses = [value.get(key) for key in ("owner_address", "to_address", "receiver_address")]
+    addresses.append(_trc20_transfer_recipient(value.get("data")))
+    url = f"{_get_api_url()}/account"
+    for address in addresses:
+        if isinstance(address, str) and address:
+            shared_cache.invalidate("tronscan", url, {"address": _normalize_address(address)})
+
+
+def _trc20_transfer_recipient(data) -> Optional[str]:
+    """从 transfer(address,uint256) 调用数据中解析收款地址（Hex 41 前缀），无法解析时返回 None"""
+    if not isinstance(data, str) or not data.lower().startswith(TRC20_TRANSFER_SELECTOR):
+        return None
+    word = data[len(TRC20_TRANSFER_SELECTOR):len(TRC20_TRANSFER_SELECTOR) + 64]
+    if len(word) != 64:
+        return None
+    return "41" + word[24:].lower()
+
+
 def get_account_status(address: str) -> dict:
     """
     检查账户激活状态
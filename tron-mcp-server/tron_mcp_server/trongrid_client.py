@@ -16,7 +16,10 @@ from typing import Optional
 import httpx
 import base58
 
+from . import cassette
 from . import config
+from . import metrics
+from . import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -51,9 +54,13 @@ def _get_headers() -> dict:
 
 def _post(path: str, data: dict) -> dict:
     """发送 POST 请求到 TronGrid"""
-    url = f"{_get_trongrid_url()}/{path.lstrip('/')}"
-    response = httpx.post(url, json=data, headers=_get_headers(), timeout=TIMEOUT)
-    response.raise_for_status()
+    path = path.lstrip("/")
+    url = f"{_get_trongrid_url()}/{path}"
+    with metrics.track_upstream("trongrid", path), tracing.span(f"trongrid {path}", kind="client"):
+        response = cassette.request(
+            "trongrid", path, httpx.post, "POST", url, json=data, headers=_get_headers(), timeout=TIMEOUT,
+        )
+        response.raise_for_status()
     result = response.json()
     if result is None:
         raise ValueError("TronGrid 响应为空")
@@ -84,6 +91,22 @@ def _base58_to_hex(address: str) -> str:
         raise ValueError(f"无效的 TRON 地址: {address}") from e
 
 
+# ============ ABI 参数编码 ============
+
+def _encode_address_parameter(address: str) -> str:
+    """将地址编码为 32 字节 ABI 参数（去掉 41 前缀，补齐到 64 字符）"""
+    addr_hex = _base58_to_hex(address)
+    addr_hex = addr_hex[2:] if addr_hex.startswith("41") else addr_hex
+    return addr_hex.zfill(64)
+
+
+def _encode_trc20_transfer_parameter(to_address: str, amount: float, decimals: int) -> str:
+    """编码 transfer(address,uint256) 参数"""
+    # 金额转换为最小单位
+    amount_raw = int(Decimal(str(amount)) * (10 ** decimals))
+    return _encode_address_parameter(to_address) + hex(amount_raw)[2:].zfill(64)
+
+
 # ============ 交易构建 ============
 
 def build_trx_transfer(
@@ -138,6 +161,17 @@ def build_trx_transfer(
     return result
 
 
+def _decode_result_message(result: dict) -> str:
+    """提取 TronGrid 错误信息（message 可能是 hex 编码）"""
+    message = result.get("result", {}).get("message", "Unknown error")
+    if isinstance(message, str) and message and all(c in "0123456789abcdefABCDEF" for c in message):
+        try:
+            message = bytes.fromhex(message).decode("utf-8", errors="ignore")
+        except Exception:
+            pass
+    return message
+
+
 def build_trc20_transfer(
     owner_address: str,
     to_address: str,
@@ -171,17 +205,7 @@ def build_trc20_transfer(
     if fee_limit is None:
         fee_limit = DEFAULT_FEE_LIMIT
 
-    # 编码 transfer(address,uint256) 参数
-    to_hex = _base58_to_hex(to_address)
-    # 去掉 41 前缀，补齐到 64 字符
-    to_hex_no_prefix = to_hex[2:] if to_hex.startswith("41") else to_hex
-    to_padded = to_hex_no_prefix.zfill(64)
-
-    # 金额转换为最小单位
-    amount_raw = int(Decimal(str(amount)) * (10 ** decimals))
-    amount_padded = hex(amount_raw)[2:].zfill(64)
-
-    parameter = to_padded + amount_padded
+    parameter = _encode_trc20_transfer_parameter(to_address, amount, decimals)
 
     data = {
         "owner_address": _base58_to_hex(owner_address),
@@ -201,14 +225,7 @@ def build_trc20_transfer(
 
     # 检查结果
     if not result.get("result", {}).get("result", False):
-        error_msg = result.get("result", {}).get("message", "Unknown error")
-        # TronGrid 返回的 message 可能是 hex 编码
-        if isinstance(error_msg, str) and all(c in "0123456789abcdefABCDEF" for c in error_msg):
-            try:
-                error_msg = bytes.fromhex(error_msg).decode("utf-8", errors="ignore")
-            except Exception:
-                pass
-        raise ValueError(f"TronGrid 构建 TRC20 交易失败: {error_msg}")
+        raise ValueError(f"TronGrid 构建 TRC20 交易失败: {_decode_result_message(result)}")
 
     transaction = result.get("transaction")
     if not transaction or "txID" not in transaction:
@@ -217,6 +234,85 @@ def build_trc20_transfer(
     return transaction
 
 
+# ============ 能量估算（只读调用，不上链） ============
+
+def estimate_trc20_transfer_energy(
+    owner_address: str,
+    to_address: str,
+    amount: float,
+    contract_address: Optional[str] = None,
+    decimals: int = 6,
+) -> int:
+    """
+    估算一笔 TRC20 转账实际消耗的能量
+
+    优先使用 wallet/estimateenergy（需节点开启 vm.estimateEnergy）；
+    节点不支持时回退到 wallet/triggerconstantcontract 的 energy_used。
+
+    Args:
+        owner_address: 发送方地址
+        to_address: 接收方地址
+        amount: 转账金额 (代币单位)
+        contract_address: TRC20 合约地址, 默认 USDT
+        decimals: 代币小数位, 默认 6 (USDT)
+
+    Returns:
+        预估能量 (Energy)
+
+    Raises:
+        ValueError: 两种接口都无法给出估算时抛出
+    """
+    if contract_address is None:
+        contract_address = USDT_CONTRACT_BASE58
+    data = {
+        "owner_address": _base58_to_hex(owner_address),
+        "contract_address": _base58_to_hex(contract_address),
+        "function_selector": "transfer(address,uint256)",
+        "parameter": _encode_trc20_transfer_parameter(to_address, amount, decimals),
+        "visible": False,
+    }
+
+    try:
+        result = _post("wallet/estimateenergy", data)
+        if result.get("result", {}).get("result") and result.get("energy_required"):
+            return int(result["energy_required"])
+        logger.debug(f"estimateenergy 不可用，回退 triggerconstantcontract: {_decode_result_message(result)}")
+    except httpx.HTTPError as e:
+        logger.debug(f"estimateenergy 请求失败，回退 triggerconstantcontract: {e}")
+
+    result = _post("wallet/triggerconstantcontract", data)
+    if not result.get("result", {}).get("result", False):
+        raise ValueError(f"TronGrid 能量估算失败: {_decode_result_message(result)}")
+    energy = result.get("energy_used")
+    if not energy:
+        raise ValueError(f"TronGrid 响应缺少 energy_used: {result}")
+    return int(energy)
+
+
+def trc20_balance_of(address: str, contract_address: Optional[str] = None) -> int:
+    """
+    通过 triggerconstantcontract 调用 balanceOf(address)，返回最小单位余额
+
+    Args:
+        address: 查询地址
+        contract_address: TRC20 合约地址, 默认 USDT
+    """
+    if contract_address is None:
+        contract_address = USDT_CONTRACT_BASE58
+    data = {
+        "owner_address": _base58_to_hex(address),
+        "contract_address": _base58_to_hex(contract_address),
+        "function_selector": "balanceOf(address)",
+        "parameter": _encode_address_parameter(address),
+        "visible": False,
+    }
+    result = _post("wallet/triggerconstantcontract", data)
+    constant_result = result.get("constant_result") or []
+    if not result.get("result", {}).get("result", False) or not constant_result:
+        raise ValueError(f"TronGrid balanceOf 调用失败: {_decode_result_message(result)}")
+    return int(constant_result[0] or "0", 16)
+
+
 # ============ 交易广播 ============
 
 def broadcast_transaction(signed_tx: dict) -> dict:
@@ -263,6 +359,9 @@ def broadcast_transaction(signed_tx: dict) -> dict:
                 pass
         raise ValueError(f"交易广播失败 [{code}]: {message}")
 
+    # 交易双方余额 / 资源已变化，使 TRONSCAN 账户缓存失效
+    from . import tron_client
+    tron_client.invalidate_accounts(signed_tx)
     return {
         "result": True,
         "txid": signed_tx["txID"],
@@ -0,0 +1,251 @@
+"""TronZap API 客户端 — 长连接复用 + 价格 / 报价缓存
+
+原先每次租赁都会新建 tronzap_sdk.Client，每次调用都要重新建立 TCP / TLS 连接，
+也没有办法在下单前查看价格。本模块直接实现 TronZap HTTP API:
+
+- 进程内按 (API URL, Token, Secret) 复用同一个客户端，底层 httpx.Client 保持长连接
+- services（价格表）与 calculate（能量报价）结果按 TTL 缓存，重复询价不再请求
+- TRONZAP_API_URL 可指向本地 stub 服务，离线测试完整的请求 / 签名流程
+
+鉴权: Authorization: Bearer <API Token>，X-Signature 为 sha256(请求体 + API Secret)。
+响应: {"code": 0, "result": ...}，code 非 0 时抛出 TronZapError。
+
+配置:
+- TRONZAP_PRICE_TTL: 价格表缓存有效期（秒，默认 300）
+- TRONZAP_QUOTE_TTL: 能量报价缓存有效期（秒，默认 60）
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from . import cassette
+from . import config
+from . import metrics
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICE_TTL = 300
+DEFAULT_QUOTE_TTL = 60
+# 报价缓存的最大条目数（按地址 / 数量 / 时长区分）
+QUOTE_CACHE_MAX_ENTRIES = 1000
+# 长连接池参数
+MAX_KEEPALIVE_CONNECTIONS = 4
+KEEPALIVE_EXPIRY = 60.0
+
+
+class TronZapError(Exception):
+    """TronZap API 返回错误（code 非 0 或响应无法解析）"""
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
+def _get_seconds(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"无效的 {name}: {raw}，使用默认值 {default}")
+        return default
+
+
+class TronZapClient:
+    """
+    TronZap API 客户端（线程安全，可长期复用）
+
+    Args:
+        api_token: API Token
+        api_secret: API Secret（用于请求签名）
+        base_url: API 根地址
+        timeout: 请求超时（秒）
+        clock: 时钟函数（测试用）
+    """
+
+    def __init__(self, api_token: str, api_secret: str, base_url: str, timeout: float = 15.0, clock=time.monotonic):
+        self._api_token = api_token
+        self._api_secret = api_secret
+        self._http = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        # 缓存: 键 → (过期时间, 结果)
+        self._services: Optional[Tuple[float, list]] = None
+        self._quotes: Dict[tuple, Tuple[float, dict]] = {}
+
+    def _request(self, endpoint: str, payload: Optional[dict] = None):
+        body = json.dumps(payload or {}, separators=(",", ":"), ensure_ascii=False)
+        signature = hashlib.sha256((body + self._api_secret).encode("utf-8")).hexdigest()
+        with metrics.track_upstream("tronzap", endpoint), tracing.span(f"tronzap {endpoint}", kind="client"):
+            response = cassette.request(
+                "tronzap", endpoint, self._http.post, "POST",
+                f"/v1/{endpoint}",
+                content=body.encode("utf-8"),
+                headers={
+                    "Authorization": f"Bearer {self._api_token}",
+                    "X-Signature": signature,
+                    "Content-Type": "application/json",
+                },
+            )
+        try:
+            data = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise TronZapError(f"TronZap 响应无法解析 (HTTP {response.status_code})")
+        if not isinstance(data, dict):
+            raise TronZapError("TronZap 响应格式无效")
+        code = data.get("code", 0)
+        if code != 0:
+            raise TronZapError(data.get("error") or data.get("message") or f"错误码 {code}", code)
+        response.raise_for_status()
+        return data.get("result", data)
+
+    # ============ 查询（带缓存） ============
+
+    def get_services(self) -> dict:
+        """
+        获取服务与价格表（缓存 TRONZAP_PRICE_TTL 秒）
+
+        Returns:
+            包含 services, cached 的字典
+        """
+        now = self._clock()
+        with self._lock:
+            if self._services is not None and now < self._services[0]:
+                return {"services": self._services[1], "cached": True}
+        services = self._request("services")
+        ttl = _get_seconds("TRONZAP_PRICE_TTL", DEFAULT_PRICE_TTL)
+        with self._lock:
+            self._services = (now + ttl, services) if ttl > 0 else None
+        return {"services": services, "cached": False}
+
+    def quote_energy(self, address: str, energy_amount: int, duration: int = 1, activate_address: bool = False) -> dict:
+        """
+        查询租赁能量的报价（缓存 TRONZAP_QUOTE_TTL 秒，不下单）
+
+        Returns:
+            TronZap calculate 结果，附加 cached 字段
+        """
+        key = (address, int(energy_amount), int(duration), bool(activate_address))
+        now = self._clock()
+        with self._lock:
+            entry = self._quotes.get(key)
+            if entry is not None and now < entry[0]:
+                return {**entry[1], "cached": True}
+        quote = self._request("calculate", {
+            "address": address,
+            "energy": int(energy_amount),
+            "duration": int(duration),
+            "activate_address": bool(activate_address),
+        })
+        if not isinstance(quote, dict):
+            raise TronZapError("TronZap 报价响应格式无效")
+        ttl = _get_seconds("TRONZAP_QUOTE_TTL", DEFAULT_QUOTE_TTL)
+        if ttl > 0:
+            with self._lock:
+                # 先清理过期报价，仍超出上限时丢弃最早写入的条目
+                self._quotes = {k: v for k, v in self._quotes.items() if now < v[0]}
+                while len(self._quotes) >= QUOTE_CACHE_MAX_ENTRIES:
+                    self._quotes.pop(next(iter(self._quotes)))
+                self._quotes[key] = (now + ttl, quote)
+        return {**quote, "cached": False}
+
+    def get_balance(self) -> dict:
+        """查询 TronZap 账户余额（不缓存）"""
+        return self._request("balance")
+
+    # ============ 下单 ============
+
+    def create_energy_transaction(
+        self, address: str, energy_amount: int, duration: int = 1, activate_address: bool = False,
+    ) -> dict:
+        """租赁能量"""
+        return self._request("transaction/new", {
+            "service": "energy",
+            "params": {
+                "address": address,
+                "energy_amount": int(energy_amount),
+                "duration": int(duration),
+                "activate_address": bool(activate_address),
+            },
+        })
+
+    def create_bandwidth_transaction(self, address: str, amount: int) -> dict:
+        """租赁带宽"""
+        return self._request("transaction/new", {
+            "service": "bandwidth",
+            "params": {"address": address, "amount": int(amount)},
+        })
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._services = None
+            self._quotes.clear()
+
+    def close(self) -> None:
+        self._http.close()
+
+
+def quote_cost_trx(quote: dict) -> Optional[float]:
+    """
+    从报价 / 下单结果中提取 TRX 费用
+
+    cost 可能是 {"trx": ..., "usdt": ...} 或数值；缺失时尝试 price 字段。
+    """
+    cost = quote.get("cost")
+    if isinstance(cost, dict):
+        cost = cost.get("trx")
+    if cost is None:
+        cost = quote.get("price")
+    try:
+        return float(cost) if cost is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+_clients: Dict[tuple, TronZapClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_token: Optional[str] = None, api_secret: Optional[str] = None) -> TronZapClient:
+    """
+    获取进程内共享的 TronZap 客户端（按 API URL 与凭证复用）
+
+    Raises:
+        ValueError: 未配置 TRONZAP_API_TOKEN / TRONZAP_API_SECRET
+    """
+    api_token = api_token if api_token is not None else config.get_tronzap_api_token()
+    api_secret = api_secret if api_secret is not None else config.get_tronzap_api_secret()
+    if not api_token or not api_secret:
+        raise ValueError("缺少 TronZap API 凭证，请设置环境变量 TRONZAP_API_TOKEN 和 TRONZAP_API_SECRET")
+    key = (config.get_tronzap_api_url(), api_token, api_secret)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = TronZapClient(api_token, api_secret, key[0], timeout=config.get_timeout())
+            _clients[key] = client
+        return client
+
+
+def reset_clients() -> None:
+    """关闭并清空所有共享客户端（切换凭证或测试时使用）"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
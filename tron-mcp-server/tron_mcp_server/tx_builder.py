@@ -5,8 +5,12 @@ import os
 import time
 import hashlib
 import base58
+from typing import Optional
 from . import tron_client
 from . import validators
+from . import blacklist
+from . import energy_estimator
+from . import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -151,12 +155,10 @@ def _build_trx_transfer(from_addr: str, to_addr: str, amount: float) -> dict:
     return {"txID": tx_id, "raw_data": raw_data}
 
 
-# TRC20 转账预估能量消耗（SUN 单位）
-# 激活账户约 29,000 Energy，未激活账户约 65,000 Energy
-# 保守估计使用较高值
-ESTIMATED_USDT_ENERGY = int(os.getenv("ESTIMATED_USDT_ENERGY", "65000"))
-# 每单位 Energy 的 SUN 价格（默认 420 SUN）
-ENERGY_PRICE_SUN = int(os.getenv("ENERGY_PRICE_SUN", "420"))
+# TRC20 转账默认预估能量与 Energy 单价（兼容旧导入，取值由 energy_estimator 统一定义）
+# 实际估算（含 ESTIMATED_USDT_ENERGY / ENERGY_PRICE_SUN 环境变量覆盖）请调用 energy_estimator
+ESTIMATED_USDT_ENERGY = energy_estimator.DEFAULT_ESTIMATED_USDT_ENERGY
+ENERGY_PRICE_SUN = energy_estimator.DEFAULT_ENERGY_PRICE_SUN
 # TRX 转账最小 Gas 费用（SUN 单位，约 0.1 TRX = 100,000 SUN）
 MIN_TRX_TRANSFER_FEE = int(os.getenv("MIN_TRX_TRANSFER_FEE", "100000"))
 
@@ -165,6 +167,8 @@ MIN_TRX_TRANSFER_FEE = int(os.getenv("MIN_TRX_TRANSFER_FEE", "100000"))
 FREE_BANDWIDTH_DAILY = int(os.getenv("FREE_BANDWIDTH_DAILY", "600"))
 # USDT TRC20 转账消耗的带宽（约 350 字节）
 USDT_BANDWIDTH_BYTES = int(os.getenv("USDT_BANDWIDTH_BYTES", "350"))
+# TRX 转账消耗的带宽（约 270 字节）
+TRX_BANDWIDTH_BYTES = int(os.getenv("TRX_BANDWIDTH_BYTES", "270"))
 # 每单位带宽的 SUN 价格（默认 1000 SUN）
 BANDWIDTH_PRICE_SUN = int(os.getenv("BANDWIDTH_PRICE_SUN", "1000"))
 
@@ -182,6 +186,7 @@ def check_sender_balance(
     from_address: str,
     amount: float,
     token: str,
+    to_address: Optional[str] = None,
 ) -> dict:
     """
     检查发送方余额是否充足，拦截必死交易
@@ -193,6 +198,7 @@ def check_sender_balance(
         from_address: 发送方地址
         amount: 转账金额
         token: 代币类型 (USDT 或 TRX)
+        to_address: 接收方地址（USDT 转账时用于估算实际能量消耗，可选）
     
     Returns:
         包含检查结果的字典:
@@ -200,6 +206,7 @@ def check_sender_balance(
         - sufficient: 余额是否充足
         - errors: 错误列表（如果余额不足）
         - balances: 当前余额信息
+        - fee_estimate: USDT 转账的能量估算（energy_estimator.estimate_trc20_fee 结果）
     
     Raises:
         InsufficientBalanceError: 余额明确不足时抛出，阻止交易构建
@@ -247,8 +254,11 @@ def check_sender_balance(
             })
         
         # 检查 TRX 是否足够支付 Gas（Energy 费 + 带宽费，免费带宽仅抵扣带宽部分）
-        # 能量费用：固定消耗，免费带宽无法抵扣
-        energy_fee_sun = ESTIMATED_USDT_ENERGY * ENERGY_PRICE_SUN
+        # 能量费用：按接收方是否已持币估算能量，乘以链上当前能量单价；免费带宽无法抵扣
+        fee_estimate = energy_estimator.estimate_trc20_fee(
+            from_address, to_address, amount, contract_address=USDT_CONTRACT,
+        )
+        energy_fee_sun = fee_estimate["energy_fee_sun"]
         # 带宽费用：每笔 USDT 转账消耗约 350 字节
         # 每地址每天 600 免费带宽点，1 点 = 1 字节
         # 若免费带宽足够覆盖，带宽部分费用为 0
@@ -273,6 +283,7 @@ def check_sender_balance(
             "trx": trx_balance,
             "trx_sun": trx_balance_sun,
         }
+        fee_estimate["estimated_fee_sun"] = estimated_fee_sun
     
     else:
         # TRX 转账检查
@@ -296,6 +307,7 @@ def check_sender_balance(
             "trx": trx_balance,
             "trx_sun": trx_balance_sun,
         }
+        fee_estimate = None
     
     # 如果有错误，抛出异常阻止交易构建
     if errors:
@@ -308,6 +320,7 @@ def check_sender_balance(
             details={
                 "errors": errors,
                 "balances": balances,
+                "fee_estimate": fee_estimate,
             }
         )
     
@@ -317,6 +330,7 @@ def check_sender_balance(
         "errors": [],
         "error_message": None,
         "balances": balances,
+        "fee_estimate": fee_estimate,
     }
 
 
@@ -394,7 +408,11 @@ def check_recipient_security(to_address: str) -> dict:
         - security_warning: 高优先级安全警告 (仅当 is_risky=True)
     """
     try:
-        risk_info = tron_client.check_account_risk(to_address)
+        # 本地黑名单快照预筛（TRON_BLACKLIST_PRESCREEN=1 时生效），能本地判定时不走网络
+        risk_info = blacklist.prescreen(to_address)
+        if risk_info is None:
+            risk_info = tron_client.check_account_risk(to_address)
+            blacklist.learn(to_address, risk_info)
     except Exception as e:
         logger.warning(f"安全检查失败 ({to_address}): {e}")
         return {
@@ -418,13 +436,17 @@ def check_recipient_security(to_address: str) -> dict:
     if is_risky:
         security_warning = f"⛔ 严重安全警告: 接收方地址被 TRONSCAN 标记为 【{sanitized_risk_type}】。转账极可能导致资产丢失！"
     
-    return {
+    result = {
         "checked": True,
         "is_risky": is_risky,
         "risk_type": sanitized_risk_type,
         "detail": risk_info.get("detail"),
         "security_warning": security_warning,
+        "risk_reasons": list(risk_info.get("risk_reasons", [])),
     }
+    if risk_info.get("source"):
+        result["source"] = risk_info["source"]
+    return result
 
 
 def build_unsigned_tx(
@@ -475,13 +497,18 @@ def build_unsigned_tx(
     # Phase 2: 安全性检查 - 检查接收方地址是否被标记为恶意
     security_check = None
     if check_security:
-        security_check = check_recipient_security(to_address)
+        with tracing.span("tx_builder.check_recipient_security") as span:
+            security_check = check_recipient_security(to_address)
+            span.set_attribute("is_risky", bool(security_check.get("is_risky")))
         
         # 🚨 零容忍熔断机制：检测到任何风险，且没有强制执行 -> 拦截！
         if security_check.get("is_risky") and not force_execution:
-            # 获取详细的风险原因
-            risk_info = tron_client.check_account_risk(to_address)
-            risk_reasons = risk_info.get("risk_reasons", [])
+            # 获取详细的风险原因（安全检查已带回时不再重复请求）
+            if "risk_reasons" in security_check:
+                risk_reasons = security_check["risk_reasons"]
+            else:
+                risk_info = tron_client.check_account_risk(to_address)
+                risk_reasons = risk_info.get("risk_reasons", [])
             reasons_text = "\n".join(risk_reasons) if risk_reasons else security_check.get("detail", "Unknown risk")
             
             return {
@@ -507,17 +534,20 @@ def build_unsigned_tx(
     sender_check = None
     if check_balance:
         # 如果余额不足，check_sender_balance 会抛出 InsufficientBalanceError
-        sender_check = check_sender_balance(from_address, amount, token_upper)
+        with tracing.span("tx_builder.check_sender_balance", token=token_upper):
+            sender_check = check_sender_balance(from_address, amount, token_upper, to_address=to_address)
 
     # 对于 TRC20 转账，检查接收方账户状态
     recipient_check = None
     if token_upper == "USDT" and check_recipient:
-        recipient_check = check_recipient_status(to_address)
-
-    if token_upper == "USDT":
-        result = _trigger_smart_contract(to_address, amount, from_address, token_upper)
-    else:
-        result = _build_trx_transfer(from_address, to_address, amount)
+        with tracing.span("tx_builder.check_recipient_status"):
+            recipient_check = check_recipient_status(to_address)
+
+    with tracing.span("tx_builder.build_preview", token=token_upper):
+        if token_upper == "USDT":
+            result = _trigger_smart_contract(to_address, amount, from_address, token_upper)
+        else:
+            result = _build_trx_transfer(from_address, to_address, amount)
     
     # 将安全检查结果添加到返回值
     if security_check:
@@ -0,0 +1,331 @@
+"""多钱包密钥池：按策略选择付款钱包
+
+单个 TRON_PRIVATE_KEY 会让所有出款都串行经过同一个热钱包，其带宽和能量成为瓶颈。
+密钥池允许配置多个钱包，tron_transfer 按策略选择付款钱包，把负载分散到多个钱包上。
+
+私钥来源（合并去重，保持配置顺序）:
+1. TRON_PRIVATE_KEYS: 逗号分隔的多个私钥
+2. TRON_PRIVATE_KEY_1 ... TRON_PRIVATE_KEY_N: 编号私钥（从 1 开始连续编号，遇到空缺停止）
+3. TRON_KEYSTORE_PATH + TRON_KEYSTORE_PASSWORD: 加密 keystore 文件（scrypt + AES-256-GCM）
+4. TRON_PRIVATE_KEY: 单私钥（兼容旧配置）
+
+选择策略（TRON_WALLET_POLICY，默认 round_robin）:
+- round_robin: 轮询
+- most_energy: 剩余能量最多的钱包
+- most_balance: 转账代币（USDT / TRX）余额最多的钱包
+
+每个钱包持有独立的锁：同一钱包上的 "余额检查 → 构建 → 签名 → 广播" 串行执行，
+避免并发出款在余额检查上互相踩踏；不同钱包之间完全并行，空闲钱包优先被选中。
+
+与 key_manager 相同，私钥只在本地用于派生地址和签名，永远不会通过 MCP 工具返回。
+"""
+
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional
+
+from . import key_manager
+
+logger = logging.getLogger(__name__)
+
+POLICY_ROUND_ROBIN = "round_robin"
+POLICY_MOST_ENERGY = "most_energy"
+POLICY_MOST_BALANCE = "most_balance"
+POLICIES = (POLICY_ROUND_ROBIN, POLICY_MOST_ENERGY, POLICY_MOST_BALANCE)
+
+# 编号私钥的最大数量（防止误配置时无限探测）
+_MAX_NUMBERED_KEYS = 256
+
+# keystore 文件格式版本与 scrypt 参数
+KEYSTORE_VERSION = 1
+_SCRYPT_N = 2 ** 15
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+
+
+class Wallet(NamedTuple):
+    """密钥池中的单个钱包"""
+
+    address: str
+    private_key: str
+
+
+# ============ 加密 keystore ============
+
+def _derive_keystore_key(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    from Crypto.Protocol.KDF import scrypt
+
+    return scrypt(password.encode("utf-8"), salt, key_len=32, N=n, r=r, p=p)
+
+
+def write_keystore(path: str, private_keys: List[str], password: str) -> None:
+    """
+    将多个私钥加密写入 keystore 文件
+
+    Args:
+        path: 输出文件路径
+        private_keys: 64 位十六进制私钥列表
+        password: 加密口令
+
+    Raises:
+        ValueError: 口令为空或私钥格式无效
+    """
+    from Crypto.Cipher import AES
+    from Crypto.Random import get_random_bytes
+
+    if not password:
+        raise ValueError("keystore 口令不能为空")
+    keys = [key_manager._parse_private_key(k) for k in private_keys]
+
+    salt = get_random_bytes(16)
+    cipher = AES.new(_derive_keystore_key(password, salt, _SCRYPT_N, _SCRYPT_R, _SCRYPT_P),
+                     AES.MODE_GCM)
+    ciphertext, tag = cipher.encrypt_and_digest(json.dumps(keys).encode("utf-8"))
+    data = {
+        "version": KEYSTORE_VERSION,
+        "kdf": "scrypt",
+        "kdfparams": {"n": _SCRYPT_N, "r": _SCRYPT_R, "p": _SCRYPT_P, "salt": salt.hex()},
+        "cipher": "aes-256-gcm",
+        "nonce": cipher.nonce.hex(),
+        "ciphertext": ciphertext.hex(),
+        "tag": tag.hex(),
+    }
+    # 仅所有者可读写
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def read_keystore(path: str, password: str) -> List[str]:
+    """
+    解密 keystore 文件，返回私钥列表
+
+    Raises:
+        ValueError: 文件格式无效或口令错误
+    """
+    from Crypto.Cipher import AES
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"无法读取 keystore 文件 {path}: {e}")
+
+    if data.get("version") != KEYSTORE_VERSION or data.get("kdf") != "scrypt" \
+            or data.get("cipher") != "aes-256-gcm":
+        raise ValueError(f"不支持的 keystore 格式: {path}")
+
+    try:
+        params = data["kdfparams"]
+        key = _derive_keystore_key(password, bytes.fromhex(params["salt"]),
+                                   params["n"], params["r"], params["p"])
+        cipher = AES.new(key, AES.MODE_GCM, nonce=bytes.fromhex(data["nonce"]))
+        plaintext = cipher.decrypt_and_verify(bytes.fromhex(data["ciphertext"]),
+                                              bytes.fromhex(data["tag"]))
+    except (KeyError, ValueError):
+        raise ValueError("keystore 解密失败：口令错误或文件已损坏")
+    return json.loads(plaintext.decode("utf-8"))
+
+
+# ============ 私钥来源 ============
+
+def _config_fingerprint() -> tuple:
+    """当前密钥配置的指纹，任一来源变化时密钥池需要重新加载"""
+    numbered = []
+    for i in range(1, _MAX_NUMBERED_KEYS + 1):
+        value = os.getenv(f"TRON_PRIVATE_KEY_{i}")
+        if not value:
+            break
+        numbered.append(value)
+
+    keystore_path = os.getenv("TRON_KEYSTORE_PATH", "")
+    try:
+        keystore_mtime = os.path.getmtime(keystore_path) if keystore_path else None
+    except OSError:
+        keystore_mtime = None
+
+    return (
+        os.getenv("TRON_PRIVATE_KEYS", ""),
+        tuple(numbered),
+        keystore_path,
+        keystore_mtime,
+        os.getenv("TRON_KEYSTORE_PASSWORD", ""),
+        os.getenv("TRON_PRIVATE_KEY", ""),
+    )
+
+
+def _collect_private_keys(fingerprint: tuple) -> List[str]:
+    """按来源优先级收集私钥（已校验、去重）"""
+    multi, numbered, keystore_path, _, keystore_password, single = fingerprint
+
+    raw_keys = [k for k in multi.split(",") if k.strip()]
+    raw_keys.extend(numbered)
+    if keystore_path:
+        if not keystore_password:
+            raise ValueError("已设置 TRON_KEYSTORE_PATH，但未设置 TRON_KEYSTORE_PASSWORD")
+        raw_keys.extend(read_keystore(keystore_path, keystore_password))
+    if single.strip():
+        raw_keys.append(single)
+
+    keys = []
+    for raw in raw_keys:
+        key = key_manager._parse_private_key(raw)
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+# ============ 密钥池 ============
+
+class WalletPool:
+    """
+    多钱包密钥池
+
+    按策略选择钱包并持有该钱包的锁，确保同一钱包上的出款串行、不同钱包之间并行。
+    """
+
+    def __init__(self, private_keys: List[str]):
+        self._wallets = [
+            Wallet(key_manager.get_address_from_private_key(pk), pk)
+            for pk in private_keys
+        ]
+        self._locks = {w.address: threading.Lock() for w in self._wallets}
+        self._state_lock = threading.Lock()
+        self._cursor = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._wallets)
+
+    @property
+    def addresses(self) -> List[str]:
+        return [w.address for w in self._wallets]
+
+    def get(self, address: str) -> Optional[Wallet]:
+        for wallet in self._wallets:
+            if wallet.address == address:
+                return wallet
+        return None
+
+    def _is_busy(self, wallet: Wallet) -> bool:
+        return self._locks[wallet.address].locked()
+
+    def _next_round_robin(self, candidates: List[Wallet]) -> Wallet:
+        with self._state_lock:
+            ordered = self._wallets[self._cursor:] + self._wallets[:self._cursor]
+            chosen = next(w for w in ordered if w in candidates)
+            self._cursor = (self._wallets.index(chosen) + 1) % len(self._wallets)
+            return chosen
+
+    def _metric(self, wallet: Wallet, policy: str, token: str) -> float:
+        """查询钱包的排序指标（查询失败视为 0）"""
+        from . import tron_client
+
+        try:
+            if policy == POLICY_MOST_ENERGY:
+                return tron_client.get_account_energy(wallet.address).get("energy_remaining", 0)
+            if token.upper() == "TRX":
+                return tron_client.get_balance_trx(wallet.address)
+            return tron_client.get_usdt_balance(wallet.address)
+        except Exception as e:
+            logger.warning(f"查询钱包 {wallet.address} 资源失败: {e}")
+            return 0
+
+    def _rank_by_metric(self, candidates: List[Wallet], policy: str, token: str) -> Wallet:
+        if len(candidates) == 1:
+            return candidates[0]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            metrics = list(executor.map(lambda w: self._metric(w, policy, token), candidates))
+        # 指标相同时按配置顺序取第一个
+        best = max(range(len(candidates)), key=lambda i: (metrics[i], -i))
+        return candidates[best]
+
+    def select(
+        self,
+        policy: str = POLICY_ROUND_ROBIN,
+        token: str = "USDT",
+        address: Optional[str] = None,
+    ) -> Wallet:
+        """
+        按策略选择钱包（不加锁）
+
+        空闲钱包优先；全部繁忙时在所有钱包中选择，调用方随后在该钱包的锁上排队。
+
+        Args:
+            policy: 选择策略
+            token: 转账代币（most_balance 策略按该代币余额排序）
+            address: 指定付款地址（必须在密钥池中），指定后忽略 policy
+
+        Raises:
+            ValueError: 指定地址不在密钥池中、密钥池为空或策略无效
+        """
+        if address:
+            wallet = self.get(address)
+            if wallet is None:
+                raise ValueError(f"付款地址 {address} 不在密钥池中")
+            return wallet
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的钱包选择策略: {policy}（可选 {' / '.join(POLICIES)}）")
+        if not self._wallets:
+            raise ValueError("密钥池为空，请配置 TRON_PRIVATE_KEYS / TRON_PRIVATE_KEY_1.. / TRON_KEYSTORE_PATH")
+
+        candidates = [w for w in self._wallets if not self._is_busy(w)] or list(self._wallets)
+        if policy == POLICY_ROUND_ROBIN:
+            return self._next_round_robin(candidates)
+        return self._rank_by_metric(candidates, policy, token)
+
+    @contextmanager
+    def hold(self, wallet: Wallet) -> Iterator[Wallet]:
+        """在 with 块内独占钱包（同一钱包的出款串行执行）"""
+        with self._locks[wallet.address]:
+            yield wallet
+
+    @contextmanager
+    def acquire(
+        self,
+        policy: str = POLICY_ROUND_ROBIN,
+        token: str = "USDT",
+        address: Optional[str] = None,
+    ) -> Iterator[Wallet]:
+        """选择钱包并在 with 块内独占该钱包，参数同 select"""
+        with self.hold(self.select(policy, token, address)) as wallet:
+            yield wallet
+
+
+# ============ 全局密钥池 ============
+
+_pool: Optional[WalletPool] = None
+_pool_fingerprint: Optional[tuple] = None
+_pool_lock = threading.Lock()
+
+
+def get_default_policy() -> str:
+    """获取默认钱包选择策略"""
+    return os.getenv("TRON_WALLET_POLICY", POLICY_ROUND_ROBIN).strip().lower() or POLICY_ROUND_ROBIN
+
+
+def get_wallet_pool() -> WalletPool:
+    """
+    获取全局密钥池（配置变化时自动重新加载）
+
+    Raises:
+        ValueError: 私钥格式无效或 keystore 无法解密
+    """
+    global _pool, _pool_fingerprint
+    fingerprint = _config_fingerprint()
+    with _pool_lock:
+        if _pool is None or fingerprint != _pool_fingerprint:
+            _pool = WalletPool(_collect_private_keys(fingerprint))
+            _pool_fingerprint = fingerprint
+        return _pool
+
+
+def is_multi_wallet_configured() -> bool:
+    """是否配置了多钱包来源（TRON_PRIVATE_KEYS / 编号私钥 / keystore）"""
+    multi, numbered, keystore_path, _, _, _ = _config_fingerprint()
+    return bool(multi.strip() or numbered or keystore_path)